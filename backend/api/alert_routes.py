@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import List
 
@@ -62,7 +63,8 @@ async def add_alert(alert_data: AlertCreate, current_user: User = Depends(get_cu
 @router.get("/user/alerts", response_model=List[AlertResponse])
 async def get_user_alerts(current_user: User = Depends(get_current_user)):
     """Get all alerts for the current user."""
-    alerts = get_alerts_for_user(current_user)  # Pass user object instead of email
+    # The market data lookup may download from yfinance: keep it off the event loop
+    alerts = await asyncio.to_thread(get_alerts_for_user, current_user)  # Pass user object instead of email
     return alerts
 
 
@@ -96,9 +98,9 @@ async def remove_alert(alert_id: int, current_user: User = Depends(get_current_u
 
 
 @router.get("/triggered")
-async def get_triggered_alerts(limit: int = Query(50, ge=1, le=100)):
-    """Get recently triggered alerts."""
-    alerts = alert_manager.get_recent_triggered_alerts(limit)
+async def get_triggered_alerts(limit: int = Query(50, ge=1, le=100), current_user: User = Depends(get_current_user)):
+    """Get the current user's recently triggered alerts."""
+    alerts = alert_manager.get_recent_triggered_alerts(limit, user_id=current_user.id)
     return {"triggered_alerts": alerts}
 
 
@@ -1,7 +1,10 @@
+import asyncio
+import json
 import logging
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 from backend.models.database import Stock
 from backend.services.stock_service import (
@@ -16,16 +19,18 @@ from backend.services.stock_service import (
     search_stocks,
 )
 from backend.services.tradingview_service import (
+    aget_market_movers,
+    aget_stock_details_tv,
+    aget_stocks_with_filters,
     get_first_five_min_candle,
     get_previous_day_data,
     get_stock_chart_data,
-    get_stock_details_tv,
     get_stocks_crossing_prev_day_high,
     get_stocks_with_consecutive_negative_candles,
     get_stocks_with_consecutive_positive_candles,
-    get_stocks_with_filters,
     get_stocks_with_open_below_prev_day_high,
     get_stocks_with_open_below_prev_high_and_crossed,
+    iter_stocks_with_open_below_prev_day_high,
 )
 
 router = APIRouter()
@@ -122,7 +127,7 @@ async def get_popular_stocks(limit: int = 10):
     """Get a list of popular stocks based on market cap and trading volume."""
     try:
         # Get stocks with high market cap and volume
-        stocks = get_stocks_with_filters(min_volume=1000000, limit=limit)  # Min 1M volume
+        stocks = await aget_stocks_with_filters(min_volume=1000000, limit=limit)  # Min 1M volume
 
         # Format response
         return {"popular_stocks": stocks}
@@ -174,7 +179,7 @@ async def filter_stocks(
     limit: int = Query(50, ge=1, le=100),
 ):
     """Filter stocks using TradingView API."""
-    stocks = get_stocks_with_filters(
+    stocks = await aget_stocks_with_filters(
         min_price=min_price,
         max_price=max_price,
         min_change_percent=min_change_percent,
@@ -188,6 +193,15 @@ async def filter_stocks(
     return {"stocks": stocks}
 
 
+@router.get("/tradingview/movers")
+async def get_tradingview_movers(limit: int = Query(10, ge=1, le=100)):
+    """Get TradingView top gainers, top losers and most active stocks in one concurrent request."""
+    try:
+        return await aget_market_movers(limit=limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/debug/tv-fields")
 async def debug_tradingview_fields():
     """Debug endpoint to explore TradingView API fields."""
@@ -200,26 +214,55 @@ async def debug_tradingview_fields():
 @router.get("/debug/cookies")
 async def debug_cookies():
     """Debug endpoint to check TradingView cookie extraction."""
-    from backend.services.tradingview_service import explore_available_fields, tv_cookies
+    from backend.services.tradingview_service import explore_available_fields, tv_credentials
 
-    has_cookies = bool(tv_cookies)
     fields_check = explore_available_fields()
 
     return {
-        "has_cookies": has_cookies,
-        "cookie_count": len(tv_cookies) if hasattr(tv_cookies, "__len__") else "unknown",
+        **tv_credentials.stats(),
         "fields_check": fields_check,
         "message": "Check server logs for more details",
     }
 
 
+@router.get("/debug/snapshot")
+async def debug_snapshot():
+    """Debug endpoint to check the shared TradingView universe snapshot."""
+    from backend.services.tradingview_service import market_snapshot, tv_async_client
+
+    return {**market_snapshot.stats(), "client": tv_async_client.stats()}
+
+
+@router.get("/debug/prev-day-levels")
+async def debug_prev_day_levels():
+    """Debug endpoint to check the shared previous day levels table."""
+    from backend.services.prev_day_levels import prev_day_levels
+
+    await asyncio.to_thread(prev_day_levels.ensure_loaded)
+    return prev_day_levels.stats()
+
+
+@router.get("/debug/market-calendar")
+async def debug_market_calendar():
+    """Debug endpoint to check the precomputed trading session table."""
+    from backend.services.market_calendar import market_calendar
+
+    await asyncio.to_thread(market_calendar.load)
+    previous_session = market_calendar.previous_session()
+    return {
+        **market_calendar.stats(),
+        "is_market_open": market_calendar.is_market_open(),
+        "previous_session": previous_session.isoformat() if previous_session else None,
+    }
+
+
 @router.get("/details/{symbol}")
 async def get_stock_details_endpoint(symbol: str):
     """
     Get detailed information for a specific stock
     """
     try:
-        stock_data = get_stock_details_tv(symbol)
+        stock_data = await aget_stock_details_tv(symbol)
         return stock_data
     except Exception as e:
         logger.error(f"Error getting stock details for {symbol}: {str(e)}")
@@ -233,7 +276,7 @@ async def get_stock_chart_endpoint(symbol: str, timeframe: str = "1D"):
     Timeframe options: 1D, 5D, 1M, 3M, 6M, 1Y, 5Y
     """
     try:
-        chart_data = get_stock_chart_data(symbol, timeframe)
+        chart_data = await asyncio.to_thread(get_stock_chart_data, symbol, timeframe)
         return chart_data
     except Exception as e:
         logger.error(f"Error getting chart data for {symbol}: {str(e)}")
@@ -246,7 +289,7 @@ async def get_previous_day_endpoint(symbol: str):
     Get previous trading day's high and low for a specific stock
     """
     try:
-        data = get_previous_day_data(symbol)
+        data = await asyncio.to_thread(get_previous_day_data, symbol)
         return data
     except Exception as e:
         logger.error(f"Error getting previous day data for {symbol}: {str(e)}")
@@ -259,7 +302,7 @@ async def get_first_candle_endpoint(symbol: str):
     Get the first 5-minute candle of the trading day (9:30-9:35 AM) for a specific stock
     """
     try:
-        data = get_first_five_min_candle(symbol)
+        data = await asyncio.to_thread(get_first_five_min_candle, symbol)
         return data
     except Exception as e:
         logger.error(f"Error getting first 5-minute candle for {symbol}: {str(e)}")
@@ -276,7 +319,7 @@ async def get_consecutive_positive_screener(
     Screen for stocks with consecutive positive candles
     """
     try:
-        stocks = get_stocks_with_consecutive_positive_candles(timeframe, num_candles, limit)
+        stocks = await asyncio.to_thread(get_stocks_with_consecutive_positive_candles, timeframe, num_candles, limit)
 
         # Extra validation to ensure no None/null values for numeric fields
         for stock in stocks:
@@ -331,7 +374,7 @@ async def get_consecutive_negative_screener(
     Screen for stocks with consecutive negative candles
     """
     try:
-        stocks = get_stocks_with_consecutive_negative_candles(timeframe, num_candles, limit)
+        stocks = await asyncio.to_thread(get_stocks_with_consecutive_negative_candles, timeframe, num_candles, limit)
 
         # Extra validation to ensure no None/null values for numeric fields
         for stock in stocks:
@@ -426,7 +469,7 @@ async def get_stocks_crossing_prev_day_high_endpoint(
             return value
 
         # First, get the stocks crossing above previous day high
-        stocks = get_stocks_crossing_prev_day_high(limit)
+        stocks = await asyncio.to_thread(get_stocks_crossing_prev_day_high, limit)
 
         # Apply filters if any are provided
         filtered_stocks = []
@@ -579,6 +622,29 @@ async def get_stocks_crossing_prev_day_low_endpoint(
         raise HTTPException(status_code=500, detail=f"Error screening for stocks: {str(e)}")
 
 
+async def _stream_open_below_prev_high(pages):
+    """Encode each page of matches as one NDJSON line, pulling pages off the event loop."""
+    count = 0
+    page_number = 0
+    try:
+        while True:
+            records = await asyncio.to_thread(next, pages, None)
+            if records is None:
+                break
+            page_number += 1
+            count += len(records)
+            yield json.dumps({"page": page_number, "stocks": records, "count": count}, default=str) + "\n"
+    except Exception as e:
+        logger.error(f"Error streaming stocks with open below previous day high: {str(e)}")
+        yield json.dumps({"error": str(e), "count": count}) + "\n"
+    finally:
+        try:
+            pages.close()
+        except ValueError:
+            # A page request is still running in its worker thread (client disconnected)
+            pass
+
+
 @router.get("/screener/open-below-prev-high")
 async def get_stocks_open_below_prev_high_endpoint(
     limit: int = Query(50, ge=1, le=10_000, description="Maximum number of stocks to return"),
@@ -590,26 +656,39 @@ async def get_stocks_open_below_prev_high_endpoint(
     max_diff_percent: float = Query(1000.0, description="Maximum difference percentage from previous day high"),
     min_change_percent: float = Query(-100.0, description="Minimum change percentage from previous day high"),
     max_change_percent: float = Query(100.0, description="Maximum change percentage from previous day high"),
+    stream: bool = Query(False, description="Stream matches page by page as newline-delimited JSON"),
 ):
     """
     Get stocks where the current day's open price is below the previous day's high.
     This can identify potential stocks that opened in a buyable range below resistance.
+
+    With `stream=true` every scanned page that has matches is sent as soon as it is filtered,
+    one JSON object per line: {"page": n, "stocks": [...], "count": total so far}.
     """
+    screen_params = {
+        "limit": limit,
+        "min_price": min_price,
+        "max_price": max_price,
+        "batch_size": batch_size,
+        "min_volume": min_volume,
+        "min_diff_percent": min_diff_percent,
+        "max_diff_percent": max_diff_percent,
+        "min_change_percent": min_change_percent,
+        "max_change_percent": max_change_percent,
+    }
+
+    if stream:
+        logger.info(f"Streaming stocks with open below previous day high (limit: {limit})")
+        return StreamingResponse(
+            _stream_open_below_prev_high(iter_stocks_with_open_below_prev_day_high(**screen_params)),
+            media_type="application/x-ndjson",
+        )
+
     try:
         logger.info(f"Screening for stocks with open below previous day high (limit: {limit})")
 
         # Call the service function with the provided parameters
-        stocks = get_stocks_with_open_below_prev_day_high(
-            limit=limit,
-            min_price=min_price,
-            max_price=max_price,
-            batch_size=batch_size,
-            min_volume=min_volume,
-            min_diff_percent=min_diff_percent,
-            max_diff_percent=max_diff_percent,
-            min_change_percent=min_change_percent,
-            max_change_percent=max_change_percent,
-        )
+        stocks = await asyncio.to_thread(get_stocks_with_open_below_prev_day_high, **screen_params)
 
         return {
             "stocks": stocks[:limit],
@@ -644,7 +723,8 @@ async def get_stocks_open_below_prev_high_and_crossed_endpoint(
     try:
         # For now, use the existing crossing-prev-day-high endpoint
         # This ensures we have a working endpoint while we develop the specialized one
-        stocks = get_stocks_with_open_below_prev_high_and_crossed(
+        stocks = await asyncio.to_thread(
+            get_stocks_with_open_below_prev_high_and_crossed,
             limit=limit,
             min_price=min_price,
             max_price=max_price,
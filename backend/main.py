@@ -14,6 +14,7 @@ import json
 import logging
 import time
 from datetime import datetime
+from typing import Optional
 
 import numpy as np
 from api.stock_routes import router as stock_router
@@ -21,13 +22,24 @@ from fastapi.responses import JSONResponse, ORJSONResponse
 
 from backend.api.alert_routes import router as alert_router
 from backend.api.auth_routes import router as auth_router
-from backend.models.database import db_session, initialize_db
+from backend.api.auth_routes import username_from_token
+from backend.models.database import User, db_session, initialize_db
 from backend.services.alert_service import alert_manager
+from backend.services.cross_detector import CrossDetector
+from backend.services.market_calendar import market_calendar
+from backend.services.market_data_stream import market_data_stream
+from backend.services.notification_service import WebSocketSender, notification_dispatcher
+from backend.services.screener_deltas import screener_deltas
 from backend.services.tradingview_service import (
-    check_stocks_cross_above_prev_day_high,
+    detect_prev_day_high_crosses,
+    detect_streamed_prev_day_high_crosses,
     get_stocks_crossing_prev_day_high,
     get_stocks_with_open_below_prev_day_high,
+    market_snapshot,
+    tv_async_client,
+    watch_prev_day_high_crosses,
 )
+from backend.services.websocket_hub import BroadcastHub, screener_topic
 
 # Configure logging
 # Set up logging configuration
@@ -128,8 +140,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Store active WebSocket connections
-active_connections = []
+# Fan-out of push messages to the connected WebSockets (encoded once per message); lagging or
+# out-of-sequence clients are resynced from the screener snapshots
+ws_hub = BroadcastHub(
+    encoder=lambda message: json.dumps(message, cls=CustomJSONEncoder),
+    snapshot_messages=screener_deltas.snapshots,
+)
+
+# Screener whose live list is pushed as sequenced deltas by periodic_stock_screener
+CROSSING_SCREENER = "crossing_prev_day_high"
 
 # Store the last set of stocks crossing above previous day high
 previous_crossing_stocks = set()
@@ -137,6 +156,9 @@ previous_crossing_stocks = set()
 # Global variable to store stocks with open below prev day high
 open_below_prev_high_stocks = []
 
+# Below/above state of the watched stocks, so each cross above the previous day high is sent once
+prev_high_cross_detector = CrossDetector()
+
 # Include routers
 app.include_router(auth_router, prefix="/api/auth", tags=["auth"])
 app.include_router(stock_router, prefix="/api/stocks", tags=["stocks"])
@@ -150,6 +172,23 @@ async def startup_event():
         logger.info("Starting up Stock Screener API")
         initialize_db()
 
+        # Precompute the trading session table off the event loop
+        await asyncio.to_thread(market_calendar.load)
+
+        # Deliver triggered alerts to the users' dashboards off the alert check loop
+        notification_dispatcher.add_sender(WebSocketSender(ws_hub))
+        notification_dispatcher.start()
+
+        # Index the active price alerts first so the stream subscribes to their symbols
+        try:
+            await asyncio.to_thread(alert_manager.load_index)
+        except Exception as e:
+            logger.error(f"Error loading the alert index: {str(e)}")
+
+        # Stream trades / quotes into the last tick table; price alerts are checked on every trade
+        market_data_stream.add_listener(alert_manager.on_prices)
+        market_data_stream.start()
+
         # Start periodic tasks
         # asyncio.create_task(periodic_stock_screener())
         # asyncio.create_task(monitor_open_below_prev_high_stocks())
@@ -165,6 +204,15 @@ async def shutdown_event():
     """Shutdown tasks and close db connections."""
     logger.info("Shutting down application")
     alert_manager.stop_monitoring()
+    await market_data_stream.stop()
+    await notification_dispatcher.stop()
+
+    # Write the triggered alerts still held in memory to the database
+    await alert_manager.triggered_alerts.flush()
+
+    # Close the pooled TradingView scanner connections and the dashboard WebSockets
+    await tv_async_client.close()
+    await ws_hub.close()
 
     # Close any outstanding SQLAlchemy sessions
     db_session.remove()
@@ -228,17 +276,41 @@ async def handle_json_serialization(request: Request, call_next):
     return response
 
 
+def _websocket_user_id(token: Optional[str]) -> Optional[int]:
+    """User id of a websocket access token (None for anonymous or invalid tokens)."""
+    username = username_from_token(token) if token else None
+    if username is None:
+        return None
+    try:
+        user = db_session.query(User.id).filter(User.username == username).first()
+        return user.id if user else None
+    except Exception as e:
+        logger.error(f"Error resolving websocket user: {str(e)}")
+        return None
+
+
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time updates."""
+async def websocket_endpoint(websocket: WebSocket, token: Optional[str] = None):
+    """
+    WebSocket endpoint for real-time updates.
+
+    Clients receive every event until they subscribe to topics, e.g.
+    {"action": "subscribe", "topics": ["screener:crossed_above_prev_day_high"], "symbols": ["AAPL"]}.
+    Live screener lists arrive as "screener_delta" messages with a per-screener "seq"; after a gap
+    send {"action": "resync", "screener": name} to get a "screener_snapshot".
+    Connections opened with ?token=<access token> also receive the user's own triggered
+    alerts as "alert_notifications" messages.
+    """
     await websocket.accept()
-    active_connections.append(websocket)
+    ws_hub.register(websocket, user_id=_websocket_user_id(token))
     try:
         while True:
-            # Keep connection alive
-            await websocket.receive_text()
+            # Subscription requests; anything else (e.g. "ping") just keeps the connection alive
+            ws_hub.handle_message(websocket, await websocket.receive_text())
     except WebSocketDisconnect:
-        active_connections.remove(websocket)
+        pass
+    finally:
+        ws_hub.unregister(websocket)
 
 
 async def periodic_stock_screener():
@@ -255,6 +327,11 @@ async def periodic_stock_screener():
             # Create a set of current stock symbols
             current_symbols = {stock["symbol"] for stock in current_stocks}
 
+            # Push only what changed in the list (added / removed / changed fields) with a sequence number
+            delta = screener_deltas.update(CROSSING_SCREENER, safe_json_serialize(current_stocks))
+            if delta:
+                ws_hub.publish_message(screener_topic(CROSSING_SCREENER), delta)
+
             # Find new stocks that weren't in the previous set
             new_stocks = []
             if previous_crossing_stocks:
@@ -269,19 +346,8 @@ async def periodic_stock_screener():
                 # Convert NumPy values to Python native types
                 safe_new_stocks = safe_json_serialize(new_stocks)
 
-                # Send alerts to all connected clients
-                alert_data = {
-                    "type": "new_crossing_stocks",
-                    "data": safe_new_stocks,
-                    "timestamp": datetime.now().isoformat(),
-                }
-
-                # Send to all connected WebSockets
-                for connection in active_connections:
-                    try:
-                        await connection.send_text(json.dumps(alert_data, cls=CustomJSONEncoder))
-                    except Exception as e:
-                        logger.error(f"Error sending to WebSocket: {e}")
+                # Queue for the subscribed WebSockets (each one is written by its own task)
+                ws_hub.publish("new_crossing_stocks", safe_new_stocks)
 
             # Update previous stocks set
             previous_crossing_stocks = current_symbols
@@ -297,10 +363,11 @@ async def monitor_open_below_prev_high_stocks():
     """
     Background task to:
     1. Fetch stocks with open below previous day high
-    2. Monitor these stocks every 5 seconds
+    2. Monitor these stocks on every streamed trade (every 5 seconds without the stream)
     3. Send notifications when they cross above the previous day high
     """
     global open_below_prev_high_stocks
+    last_refresh = 0.0
 
     # First-time fetch delay
     await asyncio.sleep(5)
@@ -326,9 +393,11 @@ async def monitor_open_below_prev_high_stocks():
     while True:
         try:
             # Fetch stocks with open below previous day high if list is empty or every 5 minutes
-            if not open_below_prev_high_stocks or time.time() % 300 < 5:
+            if not open_below_prev_high_stocks or time.time() - last_refresh >= 300:
+                last_refresh = time.time()
                 logger.info("Fetching stocks with open below previous day high")
-                stocks = get_stocks_with_open_below_prev_day_high(
+                stocks = await asyncio.to_thread(
+                    get_stocks_with_open_below_prev_day_high,
                     limit=500,
                     min_price=0.25,
                     max_price=100.0,
@@ -345,46 +414,41 @@ async def monitor_open_below_prev_high_stocks():
 
                 logger.info(f"Found {len(open_below_prev_high_stocks)} stocks with open below previous day high")
 
-            # Check if any stocks crossed above previous day high
+                # Already watched symbols keep their state, so a refresh does not repeat alerts
+                await asyncio.to_thread(
+                    watch_prev_day_high_crosses, prev_high_cross_detector, open_below_prev_high_stocks
+                )
+                market_data_stream.set_watchlist("open_below_prev_high", open_below_prev_high_stocks)
+
+            # Check if any stocks crossed above previous day high (one vectorized pass over the watch list)
             if open_below_prev_high_stocks:
-                logger.info(f"Checking {len(open_below_prev_high_stocks)} stocks for crossing above previous day high")
-                crossed_stocks = check_stocks_cross_above_prev_day_high(open_below_prev_high_stocks, test_mode=False)
+                streamed = market_data_stream.table.prices(open_below_prev_high_stocks)
+                if len(streamed) == len(set(open_below_prev_high_stocks)):
+                    # Every watched stock has a fresh streamed price: no TradingView scan needed
+                    crossed_stocks = await detect_streamed_prev_day_high_crosses(prev_high_cross_detector, streamed)
+                else:
+                    stock_df = await market_snapshot.aget_frame()
+                    # Streamed last trades replace the snapshot prices where they are fresh
+                    stock_df = market_data_stream.table.overlay(
+                        stock_df[stock_df["name"].isin(open_below_prev_high_stocks)], key="name", price_column="close"
+                    )
+                    crossed_stocks = detect_prev_day_high_crosses(prev_high_cross_detector, stock_df)
 
                 if crossed_stocks:
                     logger.info(f"Found {len(crossed_stocks)} stocks that crossed above previous day high")
 
-                    # Remove these stocks from the watch list
-                    for stock in crossed_stocks:
-                        if stock["symbol"] in open_below_prev_high_stocks:
-                            open_below_prev_high_stocks.remove(stock["symbol"])
-
                     # Convert data to safe JSON
                     safe_crossed_stocks = safe_json_serialize(crossed_stocks)
 
-                    # Send alerts to all connected clients
-                    alert_data = {
-                        "type": "crossed_above_prev_day_high",
-                        "data": safe_crossed_stocks,
-                        "timestamp": datetime.now().isoformat(),
-                    }
-
-                    logger.info(f"Sending alert data to {len(active_connections)} WebSocket connections")
-
-                    # Send to all connected WebSockets
-                    for connection in active_connections:
-                        try:
-                            await connection.send_text(json.dumps(alert_data, cls=CustomJSONEncoder))
-                            logger.info("Alert sent successfully via WebSocket")
-                        except Exception as e:
-                            logger.error(f"Error sending to WebSocket: {e}")
-                else:
-                    logger.info("No stocks found crossing above previous day high in this check")
+                    # Queue for the subscribed WebSockets (each one is written by its own task)
+                    delivered = ws_hub.publish("crossed_above_prev_day_high", safe_crossed_stocks)
+                    logger.info(f"Queued alert data for {delivered} of {len(ws_hub)} WebSocket connections")
 
         except Exception as e:
             logger.error(f"Error in monitoring open below prev high stocks: {e}")
 
-        # Check every 5 seconds
-        await asyncio.sleep(5)
+        # Check again on the next trade of a watched stock (at most 5 seconds later)
+        await market_data_stream.wait_for_trades(open_below_prev_high_stocks, timeout=5)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+"""3: triggered alerts
+
+Revision ID: 8d2c61f0a7e4
+Revises: 366f6fd78554
+Create Date: 2026-10-17 09:12:40.118205
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2c61f0a7e4"
+down_revision: Union[str, None] = "366f6fd78554"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "triggered_alerts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("alert_id", sa.Integer(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("stock_symbol", sa.String(), nullable=True),
+        sa.Column("alert_type", sa.String(), nullable=True),
+        sa.Column("threshold_value", sa.Float(), nullable=True),
+        sa.Column("current_value", sa.Float(), nullable=True),
+        sa.Column("triggered_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["alert_id"], ["alerts.id"], ondelete="SET NULL"),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_triggered_alerts_id"), "triggered_alerts", ["id"], unique=False)
+    op.create_index(op.f("ix_triggered_alerts_user_id"), "triggered_alerts", ["user_id"], unique=False)
+    op.create_index(op.f("ix_triggered_alerts_stock_symbol"), "triggered_alerts", ["stock_symbol"], unique=False)
+    op.create_index(op.f("ix_triggered_alerts_triggered_at"), "triggered_alerts", ["triggered_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_triggered_alerts_triggered_at"), table_name="triggered_alerts")
+    op.drop_index(op.f("ix_triggered_alerts_stock_symbol"), table_name="triggered_alerts")
+    op.drop_index(op.f("ix_triggered_alerts_user_id"), table_name="triggered_alerts")
+    op.drop_index(op.f("ix_triggered_alerts_id"), table_name="triggered_alerts")
+    op.drop_table("triggered_alerts")
@@ -81,6 +81,19 @@ class Alert(Base):
     stock = relationship("Stock", back_populates="alerts")
 
 
+class TriggeredAlert(Base):
+    __tablename__ = "triggered_alerts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    alert_id = Column(Integer, ForeignKey("alerts.id", ondelete="SET NULL"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    stock_symbol = Column(String, index=True)
+    alert_type = Column(String)
+    threshold_value = Column(Float)
+    current_value = Column(Float)
+    triggered_at = Column(DateTime, index=True)
+
+
 class PriceHistory(Base):
     __tablename__ = "price_history"
 
@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+"""
+Benchmark the columnar scanner post-processing against the old row-by-row loops.
+
+Runs the top gainers formatting and the open-below-previous-day-high screen on synthetic
+TradingView scanner frames, once with the legacy `iterrows` implementation and once with
+`backend.services.tradingview_transforms`, and prints the timings for each frame size.
+
+Usage:
+    python -m backend.scripts.benchmark_scanner_transforms [--rows 5000 30000] [--repeat 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.services import tradingview_transforms as tvx
+
+
+def make_scanner_frame(rows: int, seed: int = 42):
+    """Build a synthetic scanner frame and matching previous day levels."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"SYM{i}" for i in range(rows)], dtype=object)
+    close = rng.uniform(0.25, 50, rows).round(2)
+    open_ = (close * rng.uniform(0.9, 1.1, rows)).round(2)
+    volume = rng.integers(0, 50_000_000, rows).astype(float)
+    volume[rng.random(rows) < 0.02] = np.nan
+
+    stock_df = pd.DataFrame(
+        {
+            "name": names,
+            "description": [f"Company {i}" for i in range(rows)],
+            "open": open_,
+            "high": (np.maximum(open_, close) * 1.02).round(2),
+            "close": close,
+            "change_abs": (close - open_).round(2),
+            "change": rng.uniform(-20, 40, rows).round(2),
+            "volume": volume,
+            "market_cap_basic": rng.uniform(1e6, 5e11, rows),
+            "sector": "Technology",
+            "exchange": "NASDAQ",
+        }
+    )
+
+    # Roughly 80% of the universe has a price history row for the previous session
+    has_prev = rng.random(rows) < 0.8
+    prev_day_df = pd.DataFrame(
+        {"name": names[has_prev], "high": (open_[has_prev] * rng.uniform(0.95, 1.2, has_prev.sum())).round(2)}
+    ).set_index("name")
+    return stock_df, prev_day_df
+
+
+def legacy_gainers(df: pd.DataFrame):
+    gainers = []
+    for _, row in df.iterrows():
+        price = row.get("close", 0)
+        price = 0 if pd.isna(price) else float(price)
+        change_abs = row.get("change_abs", 0)
+        change_abs = 0 if pd.isna(change_abs) else float(change_abs)
+        change_pct = row.get("change", 0)
+        change_pct = 0 if pd.isna(change_pct) else float(change_pct)
+        volume = row.get("volume", 0)
+        volume = 0 if pd.isna(volume) else int(volume)
+        if volume >= 1_000_000:
+            volume_display = f"{volume/1_000_000:.1f}M"
+        elif volume >= 1_000:
+            volume_display = f"{volume/1_000:.0f}K"
+        else:
+            volume_display = str(volume)
+        gainers.append(
+            {
+                "symbol": row.get("name"),
+                "name": row.get("description", row.get("name")),
+                "price": price,
+                "change": change_abs,
+                "percent_change": change_pct,
+                "volume": volume_display,
+                "sector": row.get("sector", "N/A"),
+            }
+        )
+    return gainers
+
+
+def vectorized_gainers(df: pd.DataFrame):
+    df = tvx.clean_numeric(df.copy(), ["close", "change_abs", "change", "volume"])
+    return tvx.to_records(
+        df,
+        {
+            "symbol": "name",
+            "name": tvx.fill_text(df, "description", df["name"]),
+            "price": "close",
+            "change": "change_abs",
+            "percent_change": "change",
+            "volume": tvx.format_volume_short(df["volume"]),
+            "sector": tvx.fill_text(df, "sector", "N/A"),
+        },
+    )
+
+
+def _format_volume(volume):
+    if pd.isna(volume):
+        return "N/A"
+    volume = int(volume)
+    if volume >= 1_000_000_000:
+        return f"{volume/1_000_000_000:.2f}B"
+    elif volume >= 1_000_000:
+        return f"{volume/1_000_000:.2f}M"
+    elif volume >= 1_000:
+        return f"{volume/1_000:.2f}K"
+    return f"{volume:,}"
+
+
+def _format_market_cap(market_cap):
+    if pd.isna(market_cap):
+        return "N/A"
+    if market_cap >= 1_000_000_000:
+        return f"${market_cap/1_000_000_000:.2f}B"
+    elif market_cap >= 1_000_000:
+        return f"${market_cap/1_000_000:.2f}M"
+    return f"${market_cap:,.2f}"
+
+
+def legacy_open_below(stock_df: pd.DataFrame, prev_day_df: pd.DataFrame, **filters):
+    previous_day_lookup = {}
+    for symbol, row in prev_day_df.iterrows():
+        previous_day_lookup[symbol] = {"previous_day_high": row["high"]}
+
+    results = []
+    for _, stock in stock_df.iterrows():
+        symbol = stock.get("name")
+        current_open = float(stock.get("open"))
+        current_price = float(stock.get("close"))
+        prev_day_high = previous_day_lookup.get(symbol, {}).get("previous_day_high")
+        if current_price < filters["min_price"] or current_price > filters["max_price"]:
+            continue
+        if prev_day_high is None or not current_open < prev_day_high:
+            continue
+        diff_percent = ((prev_day_high - current_open) / prev_day_high) * 100
+        if diff_percent < filters["min_diff_percent"] or diff_percent > filters["max_diff_percent"]:
+            continue
+        change_percent = float(stock.get("change", 0))
+        if filters["min_change_percent"] > change_percent or change_percent > filters["max_change_percent"]:
+            continue
+        results.append(
+            {
+                "symbol": symbol,
+                "name": stock.get("description", symbol),
+                "open_price": str(current_open),
+                "prev_day_high": str(prev_day_high),
+                "diff_percent": str(round(diff_percent, 2)),
+                "current_price": str(current_price),
+                "change_percent": str(round(change_percent, 2)),
+                "volume": _format_volume(stock.get("volume", 0)),
+                "market_cap": _format_market_cap(stock.get("market_cap_basic", 0)),
+                "exchange": stock.get("exchange", ""),
+                "_diff": diff_percent,
+            }
+        )
+    results.sort(key=lambda x: x.pop("_diff"))
+    return results
+
+
+def vectorized_open_below(stock_df: pd.DataFrame, prev_day_df: pd.DataFrame, **filters):
+    matches = tvx.screen_open_below_prev_high(stock_df, prev_day_df, **filters)
+    return tvx.to_records(
+        matches,
+        {
+            "symbol": "name",
+            "name": tvx.fill_text(matches, "description", matches["name"]),
+            "open_price": matches["open"].astype(str),
+            "prev_day_high": matches["prev_day_high"].astype(str),
+            "diff_percent": matches["diff_percent"].round(2).astype(str),
+            "current_price": matches["close"].astype(str),
+            "change_percent": matches["change"].round(2).astype(str),
+            "volume": tvx.format_volume_series(matches["volume"]),
+            "market_cap": tvx.format_market_cap_series(matches["market_cap_basic"]),
+            "exchange": tvx.fill_text(matches, "exchange", ""),
+        },
+    )
+
+
+def best_of(func, repeat: int, *args, **kwargs):
+    """Return the fastest wall time of `repeat` runs and the last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scanner DataFrame post-processing")
+    parser.add_argument("--rows", type=int, nargs="+", default=[5_000, 30_000], help="Frame sizes to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    filters = {
+        "min_price": 0.25,
+        "max_price": 20,
+        "min_diff_percent": 1.0,
+        "max_diff_percent": 10000.0,
+        "min_change_percent": 1.0,
+        "max_change_percent": 1000.0,
+    }
+
+    print(f"{'rows':>8} {'transform':<14} {'legacy (s)':>11} {'vectorized (s)':>15} {'speedup':>8} {'match':>6}")
+    for rows in args.rows:
+        stock_df, prev_day_df = make_scanner_frame(rows)
+
+        legacy_time, legacy = best_of(legacy_gainers, args.repeat, stock_df)
+        fast_time, fast = best_of(vectorized_gainers, args.repeat, stock_df)
+        print(
+            f"{rows:>8} {'gainers':<14} {legacy_time:>11.4f} {fast_time:>15.4f} "
+            f"{legacy_time / fast_time:>7.1f}x {str(legacy == fast):>6}"
+        )
+
+        legacy_time, legacy = best_of(legacy_open_below, args.repeat, stock_df, prev_day_df, **filters)
+        fast_time, fast = best_of(vectorized_open_below, args.repeat, stock_df, prev_day_df, **filters)
+        print(
+            f"{rows:>8} {'open_below':<14} {legacy_time:>11.4f} {fast_time:>15.4f} "
+            f"{legacy_time / fast_time:>7.1f}x {str(legacy == fast):>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,8 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from sqlalchemy import func
 
 from backend.models.database import PriceHistory, Stock, db_session
+from backend.services.candle_streak_engine import daily_close_history
+from backend.services.prev_day_levels import prev_day_levels
 from backend.services.tradingview_service import get_stocks_with_filters_no_post_filters
 
 # Configure logging
@@ -264,6 +266,10 @@ def run_daily_update(date: str = None):
         else:
             saved_count = save_stocks_to_db(stocks)
 
+        # Rebuild the shared previous day tables on next access (when run inside the API process)
+        prev_day_levels.invalidate()
+        daily_close_history.invalidate()
+
         logger.info(f"Daily stock update completed successfully. Processed {saved_count} stocks.")
         return True
     except Exception as e:
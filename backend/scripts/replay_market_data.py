@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+"""
+Local stand-in for the Alpaca trades / quotes WebSocket, for testing the market data stream.
+
+Speaks the same protocol as the real feed (connected / auth / subscribe / unsubscribe and
+"t" / "q" messages) and sends every client the messages of the symbols it subscribed to.
+Messages come from a JSON lines file of recorded Alpaca messages, replayed with their
+original spacing divided by --speed, or, without --file, from a random walk per
+subscribed symbol.
+
+Usage:
+    python -m backend.scripts.replay_market_data [--port 8765] [--file ticks.jsonl] [--speed 10] [--loop]
+    python -m backend.scripts.replay_market_data --rate 20
+
+Then start the API with MARKET_DATA_STREAM_URL=ws://localhost:8765/v2/iex
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Set
+
+import pandas as pd
+from aiohttp import WSMsgType, web
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+class ReplayServer:
+    """Fan the replayed messages out to the connected clients, filtered by subscription."""
+
+    def __init__(self):
+        self.clients: Dict[web.WebSocketResponse, Set[str]] = {}
+
+    def subscribed(self) -> Set[str]:
+        return set().union(*self.clients.values())
+
+    async def handle(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json([{"T": "success", "msg": "connected"}])
+
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                continue
+            action = json.loads(message.data)
+            if action.get("action") == "auth":
+                self.clients[ws] = set()
+                await ws.send_json([{"T": "success", "msg": "authenticated"}])
+            elif ws not in self.clients:
+                await ws.send_json([{"T": "error", "code": 401, "msg": "not authenticated"}])
+            elif action.get("action") in ("subscribe", "unsubscribe"):
+                symbols = set(action.get("trades", [])) | set(action.get("quotes", []))
+                if action["action"] == "subscribe":
+                    self.clients[ws] |= symbols
+                else:
+                    self.clients[ws] -= symbols
+                current = sorted(self.clients[ws])
+                await ws.send_json([{"T": "subscription", "trades": current, "quotes": current}])
+                logger.info(f"{request.remote} {action['action']}d {len(symbols)} symbols ({len(current)} total)")
+
+        self.clients.pop(ws, None)
+        return ws
+
+    async def broadcast(self, items: List[Dict[str, Any]]):
+        """Send each client the messages of its subscribed symbols, as one frame."""
+        for ws, symbols in list(self.clients.items()):
+            frame = [item for item in items if item.get("S") in symbols]
+            if frame and not ws.closed:
+                try:
+                    await ws.send_json(frame)
+                except ConnectionError:
+                    self.clients.pop(ws, None)
+
+
+async def replay_file(server: ReplayServer, path: str, speed: float, loop: bool):
+    """Replay recorded messages grouped by timestamp, keeping their spacing (divided by `speed`)."""
+    with open(path) as file:
+        items = [json.loads(line) for line in file if line.strip()]
+    items.sort(key=lambda item: item["t"])
+    times = pd.to_datetime([item["t"] for item in items], utc=True)
+    logger.info(f"Replaying {len(items)} messages from {path} at {speed}x")
+
+    while True:
+        start = 0
+        while start < len(items):
+            end = start
+            while end < len(items) and times[end] == times[start]:
+                end += 1
+            await server.broadcast(items[start:end])
+            if end < len(items):
+                await asyncio.sleep((times[end] - times[start]).total_seconds() / speed)
+            start = end
+        if not loop:
+            logger.info("Replay finished")
+            return
+
+
+async def random_walk(server: ReplayServer, rate: float):
+    """Send a trade and a quote per subscribed symbol `rate` times per second."""
+    prices: Dict[str, float] = {}
+    while True:
+        await asyncio.sleep(1 / rate)
+        timestamp = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        items = []
+        for symbol in server.subscribed():
+            price = prices.get(symbol, random.uniform(5, 100)) * (1 + random.gauss(0, 0.001))
+            prices[symbol] = price
+            spread = max(round(price * 0.0005, 2), 0.01)
+            items.append({"T": "t", "S": symbol, "p": round(price, 2), "s": random.randint(1, 500), "t": timestamp})
+            items.append(
+                {
+                    "T": "q",
+                    "S": symbol,
+                    "bp": round(price - spread, 2),
+                    "bs": random.randint(1, 20),
+                    "ap": round(price + spread, 2),
+                    "as": random.randint(1, 20),
+                    "t": timestamp,
+                }
+            )
+        if items:
+            await server.broadcast(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--file", help="JSON lines file of recorded Alpaca trade / quote messages")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier for --file")
+    parser.add_argument("--loop", action="store_true", help="Restart the file replay when it ends")
+    parser.add_argument("--rate", type=float, default=10.0, help="Random walk ticks per second without --file")
+    args = parser.parse_args()
+
+    server = ReplayServer()
+
+    async def start_source(app: web.Application):
+        if args.file:
+            source = replay_file(server, args.file, args.speed, args.loop)
+        else:
+            source = random_walk(server, args.rate)
+        app["source"] = asyncio.create_task(source)
+
+    async def stop_source(app: web.Application):
+        app["source"].cancel()
+        for ws in list(server.clients):
+            await ws.close()
+
+    app = web.Application()
+    app.router.add_get("/{path:.*}", server.handle)
+    app.on_startup.append(start_source)
+    app.on_shutdown.append(stop_source)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
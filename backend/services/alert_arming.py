@@ -0,0 +1,206 @@
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# A fired alert re-arms once its value is back on the other side of the threshold by this
+# share of the threshold (percent), e.g. 1 -> a $100 price_above alert re-arms below $99
+HYSTERESIS_PERCENT = float(os.environ.get("ALERT_HYSTERESIS_PERCENT", "1"))
+
+# Time after which a fired alert re-arms even if its value never left the threshold
+COOLDOWN_SECONDS = float(os.environ.get("ALERT_COOLDOWN_SECONDS", "900"))
+
+# How the two re-arm conditions combine: "either" re-arms on the hysteresis band or once the
+# cooldown passed, "both" needs the band and the cooldown (at most one firing per cooldown)
+REARM_RULE = os.environ.get("ALERT_REARM_RULE", "either")
+
+# Market data column each alert type compares against (must match alert_service)
+VALUE_COLUMNS = {
+    "price_above": "price",
+    "price_below": "price",
+    "volume_above": "volume",
+    "percent_change": "change_percent",
+}
+
+# Alert types whose condition also holds exactly at the threshold (must match alert_service)
+INCLUSIVE_TYPES = {"percent_change"}
+
+
+def _direction(alert_type: str, threshold: float) -> int:
+    """+1 when the alert fires above its threshold, -1 when it fires below."""
+    if alert_type == "price_below":
+        return -1
+    if alert_type == "percent_change" and threshold < 0:
+        return -1
+    return 1
+
+
+class _Fired:
+    """An alert that fired and waits to be re-armed."""
+
+    __slots__ = ("symbol", "alert_type", "threshold", "fired_at", "retreated")
+
+    def __init__(self, symbol: str, alert_type: str, threshold: float, fired_at: datetime):
+        self.symbol = symbol
+        self.alert_type = alert_type
+        self.threshold = threshold
+        self.fired_at = fired_at
+        self.retreated = False
+
+
+class AlertArming:
+    """
+    Edge-triggered firing for alerts, with hysteresis and a cooldown.
+
+    Every alert starts armed. An armed alert whose condition becomes true fires once and is
+    disarmed; while disarmed it never fires, however many ticks its condition stays true.
+    It re-arms once its value has been seen back beyond the threshold by the hysteresis
+    band or once the cooldown since it fired has passed (with the "both" rule: the band
+    and the cooldown). Only disarmed alerts are tracked, so the state stays as small as the
+    number of recently fired alerts and lives in memory.
+    """
+
+    def __init__(
+        self,
+        hysteresis_percent: float = HYSTERESIS_PERCENT,
+        cooldown_seconds: float = COOLDOWN_SECONDS,
+        rearm_rule: str = REARM_RULE,
+    ):
+        """
+        Args:
+            hysteresis_percent: Band beyond the threshold (percent of it) that re-arms an alert
+            cooldown_seconds: Time since firing that re-arms an alert
+            rearm_rule: "either" (band or cooldown) or "both" (band and cooldown)
+        """
+        if rearm_rule not in ("either", "both"):
+            raise ValueError(f"Unknown alert re-arm rule: {rearm_rule}")
+        self.hysteresis = hysteresis_percent / 100
+        self.cooldown_seconds = cooldown_seconds
+        self.rearm_rule = rearm_rule
+        self._lock = threading.Lock()
+        self._fired: Dict[int, _Fired] = {}
+        self.fire_count = 0
+        self.suppressed_count = 0
+
+    def __len__(self) -> int:
+        return len(self._fired)
+
+    def is_armed(self, alert_id: int) -> bool:
+        return alert_id not in self._fired
+
+    def fire(
+        self, alert_id: int, symbol: str, alert_type: str, threshold: float, now: Optional[datetime] = None
+    ) -> bool:
+        """
+        Record that the condition of an alert is true.
+
+        Returns:
+            True if the alert was armed and fires now, False if it is still disarmed
+        """
+        with self._lock:
+            if alert_id in self._fired:
+                self.suppressed_count += 1
+                return False
+            self._fired[alert_id] = _Fired(symbol, alert_type, float(threshold), now or datetime.now())
+            self.fire_count += 1
+            return True
+
+    def restore(
+        self, alerts: Iterable[Tuple[int, str, str, float, Optional[datetime]]], now: Optional[datetime] = None
+    ):
+        """
+        Disarm alerts that fired within the cooldown before a restart.
+
+        Args:
+            alerts: (alert id, symbol, alert type, threshold, last triggered) rows
+        """
+        now = now or datetime.now()
+        with self._lock:
+            for alert_id, symbol, alert_type, threshold, last_triggered in alerts:
+                if threshold is None or last_triggered is None:
+                    continue
+                if (now - last_triggered).total_seconds() < self.cooldown_seconds:
+                    self._fired[alert_id] = _Fired(symbol, alert_type, float(threshold), last_triggered)
+        logger.info(f"{len(self._fired)} alerts disarmed from their last trigger time")
+
+    def forget(self, alert_id: int):
+        """Re-arm an alert immediately (it was edited or deleted)."""
+        with self._lock:
+            self._fired.pop(alert_id, None)
+
+    def rearm(self, market: pd.DataFrame, now: Optional[datetime] = None) -> List[Tuple[int, float]]:
+        """
+        Re-arm disarmed alerts from this tick's market data.
+
+        Args:
+            market: Frame indexed by symbol with (some of) the VALUE_COLUMNS columns, e.g. the
+                periodic market data or a frame of streamed prices
+            now: Time of the tick
+
+        Returns:
+            (alert id, value) of the alerts re-armed on this tick whose condition already holds
+            again, so edges that happened during the cooldown are not lost
+        """
+        now = now or datetime.now()
+        with self._lock:
+            if not self._fired:
+                return []
+            ids = np.fromiter(self._fired, dtype=np.int64, count=len(self._fired))
+            entries = list(self._fired.values())
+
+            symbols = pd.Index([entry.symbol for entry in entries])
+            thresholds = np.array([entry.threshold for entry in entries], dtype=float)
+            directions = np.array([_direction(entry.alert_type, entry.threshold) for entry in entries])
+            inclusive = np.array([entry.alert_type in INCLUSIVE_TYPES for entry in entries])
+            columns = np.array([VALUE_COLUMNS.get(entry.alert_type, "price") for entry in entries], dtype=object)
+
+            # Current value of every disarmed alert, from the column matching its type
+            values = np.full(len(entries), np.nan)
+            rows = market.index.get_indexer(symbols)
+            for column in np.unique(columns):
+                if column not in market:
+                    continue
+                selected = (columns == column) & (rows >= 0)
+                values[selected] = market[column].to_numpy(dtype=float)[rows[selected]]
+
+            band = np.abs(thresholds) * self.hysteresis
+            with np.errstate(invalid="ignore"):
+                distance = directions * (values - thresholds)
+                retreated = distance < -band
+                holds = (distance > 0) | (inclusive & (distance == 0))
+            elapsed = np.array([(now - entry.fired_at).total_seconds() >= self.cooldown_seconds for entry in entries])
+
+            # Alerts without a value on this tick (symbol or column missing) keep their state
+            observed = ~np.isnan(values)
+
+            triggered = []
+            for position, entry in enumerate(entries):
+                entry.retreated = entry.retreated or bool(retreated[position])
+                if self.rearm_rule == "both":
+                    rearmed = entry.retreated and elapsed[position]
+                else:
+                    rearmed = entry.retreated or elapsed[position]
+                if rearmed and observed[position]:
+                    alert_id = int(ids[position])
+                    del self._fired[alert_id]
+                    if holds[position]:
+                        triggered.append((alert_id, float(values[position])))
+            return triggered
+
+    def stats(self):
+        """Return arming counters for debugging."""
+        with self._lock:
+            return {
+                "disarmed": len(self._fired),
+                "fired": self.fire_count,
+                "suppressed": self.suppressed_count,
+                "hysteresis_percent": self.hysteresis * 100,
+                "cooldown_seconds": self.cooldown_seconds,
+                "rearm_rule": self.rearm_rule,
+            }
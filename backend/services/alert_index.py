@@ -0,0 +1,200 @@
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Alert types kept in the index (must match alert_service)
+PRICE_ABOVE = "price_above"
+PRICE_BELOW = "price_below"
+INDEXED_TYPES = (PRICE_ABOVE, PRICE_BELOW)
+
+
+class _SymbolBook:
+    """Sorted thresholds (with their alert ids) of one symbol, one pair of arrays per side."""
+
+    def __init__(self):
+        self.thresholds = {side: np.empty(0, dtype=float) for side in INDEXED_TYPES}
+        self.ids = {side: np.empty(0, dtype=np.int64) for side in INDEXED_TYPES}
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self.ids.values())
+
+    def insert(self, side: str, threshold: float, alert_id: int):
+        position = np.searchsorted(self.thresholds[side], threshold, side="right")
+        self.thresholds[side] = np.insert(self.thresholds[side], position, threshold)
+        self.ids[side] = np.insert(self.ids[side], position, alert_id)
+
+    def delete(self, side: str, threshold: float, alert_id: int):
+        # Only the run of equal thresholds has to be scanned for the id
+        lo = np.searchsorted(self.thresholds[side], threshold, side="left")
+        hi = np.searchsorted(self.thresholds[side], threshold, side="right")
+        matches = np.flatnonzero(self.ids[side][lo:hi] == alert_id)
+        if len(matches):
+            position = lo + matches[0]
+            self.thresholds[side] = np.delete(self.thresholds[side], position)
+            self.ids[side] = np.delete(self.ids[side], position)
+
+    def crossed(self, p0: float, p1: float) -> np.ndarray:
+        """Ids whose condition became true on the move p0 -> p1 (binary search on both sides)."""
+        if p1 > p0:
+            # price_above fires when price > threshold: thresholds in [p0, p1)
+            thresholds = self.thresholds[PRICE_ABOVE]
+            lo, hi = np.searchsorted(thresholds, p0, side="left"), np.searchsorted(thresholds, p1, side="left")
+            return self.ids[PRICE_ABOVE][lo:hi]
+        if p1 < p0:
+            # price_below fires when price < threshold: thresholds in (p1, p0]
+            thresholds = self.thresholds[PRICE_BELOW]
+            lo, hi = np.searchsorted(thresholds, p1, side="right"), np.searchsorted(thresholds, p0, side="right")
+            return self.ids[PRICE_BELOW][lo:hi]
+        return np.empty(0, dtype=np.int64)
+
+    def satisfied(self, price: float) -> np.ndarray:
+        """Ids whose condition holds at `price`."""
+        above = self.ids[PRICE_ABOVE][: np.searchsorted(self.thresholds[PRICE_ABOVE], price, side="left")]
+        below = self.ids[PRICE_BELOW][np.searchsorted(self.thresholds[PRICE_BELOW], price, side="right") :]
+        return np.concatenate([above, below])
+
+
+class ThresholdIndex:
+    """
+    In-memory index of price_above / price_below alert thresholds per symbol.
+
+    Each symbol keeps its thresholds as sorted arrays (one for each direction). When the
+    price of a symbol moves from p0 to p1, the alerts whose thresholds lie in the crossed
+    interval are found with two binary searches, so a tick costs O(log n + k) per moved
+    symbol instead of a comparison against every alert. Alerts added since the last tick
+    are checked once against the current price, so an alert created on an already-true
+    condition still fires.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._books: Dict[str, _SymbolBook] = {}
+        self._alerts: Dict[int, Tuple[str, str, float]] = {}
+        self._last_prices: Dict[str, float] = {}
+        self._fresh: Set[int] = set()
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    @staticmethod
+    def _indexable(alert_type: str, threshold: Optional[float]) -> bool:
+        return alert_type in INDEXED_TYPES and threshold is not None and not np.isnan(threshold)
+
+    def load(self, alerts: Iterable[Tuple[int, str, str, float]]):
+        """
+        Rebuild the index from (alert id, symbol, alert type, threshold) rows.
+
+        Every loaded alert is checked against the next observed price of its symbol.
+        """
+        rows = [row for row in alerts if self._indexable(row[2], row[3])]
+        books: Dict[str, _SymbolBook] = {}
+        grouped: Dict[Tuple[str, str], List[Tuple[float, int]]] = {}
+        for alert_id, symbol, alert_type, threshold in rows:
+            grouped.setdefault((symbol, alert_type), []).append((float(threshold), alert_id))
+
+        for (symbol, side), entries in grouped.items():
+            book = books.setdefault(symbol, _SymbolBook())
+            thresholds = np.array([threshold for threshold, _ in entries], dtype=float)
+            ids = np.array([alert_id for _, alert_id in entries], dtype=np.int64)
+            order = np.argsort(thresholds, kind="stable")
+            book.thresholds[side], book.ids[side] = thresholds[order], ids[order]
+
+        with self._lock:
+            self._books = books
+            self._alerts = {
+                alert_id: (symbol, alert_type, float(threshold)) for alert_id, symbol, alert_type, threshold in rows
+            }
+            self._fresh = set(self._alerts)
+            self.loaded = True
+        logger.info(f"Indexed {len(rows)} price alerts on {len(books)} symbols")
+
+    def add(self, alert_id: int, symbol: str, alert_type: str, threshold: float):
+        """Insert or replace an alert (ignored for non-price alert types)."""
+        with self._lock:
+            self._remove(alert_id)
+            if not self._indexable(alert_type, threshold):
+                return
+            threshold = float(threshold)
+            self._books.setdefault(symbol, _SymbolBook()).insert(alert_type, threshold, alert_id)
+            self._alerts[alert_id] = (symbol, alert_type, threshold)
+            self._fresh.add(alert_id)
+
+    def remove(self, alert_id: int):
+        """Remove an alert if it is indexed."""
+        with self._lock:
+            self._remove(alert_id)
+
+    def _remove(self, alert_id: int):
+        entry = self._alerts.pop(alert_id, None)
+        self._fresh.discard(alert_id)
+        if entry is None:
+            return
+        symbol, alert_type, threshold = entry
+        book = self._books.get(symbol)
+        if book is None:
+            return
+        book.delete(alert_type, threshold, alert_id)
+        if not len(book):
+            del self._books[symbol]
+
+    def symbols(self) -> List[str]:
+        """Symbols with at least one indexed alert."""
+        with self._lock:
+            return list(self._books)
+
+    def threshold(self, alert_id: int) -> Optional[float]:
+        """Threshold of an indexed alert."""
+        entry = self._alerts.get(alert_id)
+        return entry[2] if entry else None
+
+    def observe(self, prices: Dict[str, float]) -> List[Tuple[int, float]]:
+        """
+        Record new prices and return the alerts they trigger.
+
+        Args:
+            prices: Current price per symbol (symbols without a price keep their last one)
+
+        Returns:
+            List of (alert id, price) for alerts whose threshold was crossed since the previous
+            observation of their symbol, plus fresh alerts whose condition holds now
+        """
+        triggered: List[Tuple[int, float]] = []
+        with self._lock:
+            for symbol, price in prices.items():
+                if price is None or np.isnan(price):
+                    continue
+                book = self._books.get(symbol)
+                previous = self._last_prices.get(symbol)
+                self._last_prices[symbol] = price
+                if book is None:
+                    continue
+                ids = book.satisfied(price) if previous is None else book.crossed(previous, price)
+                triggered.extend((int(alert_id), price) for alert_id in ids)
+
+            # Alerts added since the last tick are compared with the current price once
+            seen = {alert_id for alert_id, _ in triggered}
+            for alert_id in list(self._fresh):
+                symbol, alert_type, threshold = self._alerts[alert_id]
+                price = self._last_prices.get(symbol)
+                if price is None or symbol not in prices:
+                    continue
+                self._fresh.discard(alert_id)
+                holds = price > threshold if alert_type == PRICE_ABOVE else price < threshold
+                if holds and alert_id not in seen:
+                    triggered.append((alert_id, price))
+        return triggered
+
+    def stats(self):
+        """Return index sizes for debugging."""
+        with self._lock:
+            return {
+                "alerts": len(self._alerts),
+                "symbols": len(self._books),
+                "pending": len(self._fresh),
+                "tracked_prices": len(self._last_prices),
+            }
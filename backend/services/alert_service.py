@@ -3,10 +3,17 @@ import logging
 from datetime import datetime
 
 import numpy as np
+import pandas as pd
+from sqlalchemy.orm import joinedload
 
 from backend.models.database import Alert, Stock, User
 from backend.models.database import db_session as db
-from backend.services.stock_service import get_current_price
+from backend.services.alert_arming import AlertArming
+from backend.services.alert_index import ThresholdIndex
+from backend.services.market_data_stream import market_data_stream
+from backend.services.notification_service import notification_dispatcher
+from backend.services.stock_service import get_market_data_batch
+from backend.services.triggered_alert_store import TriggeredAlertStore
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +23,9 @@ PRICE_BELOW = "price_below"
 VOLUME_ABOVE = "volume_above"
 PERCENT_CHANGE = "percent_change"
 
+# Alert types evaluated from the market data frame instead of the threshold index
+MARKET_DATA_TYPES = [VOLUME_ABOVE, PERCENT_CHANGE]
+
 
 # Function to convert NumPy values to Python native types
 def convert_numpy_types(value):
@@ -28,12 +38,66 @@ def convert_numpy_types(value):
     return value
 
 
+def _alert_values(alerts, codes, market):
+    """
+    Pick the market value each alert compares against: price, volume or change %.
+
+    Args:
+        alerts: Alerts to evaluate
+        codes: Row of every alert in `market`
+        market: Frame from get_market_data_batch, reindexed on the alerts' distinct symbols
+
+    Returns:
+        Current value per alert (NaN when unknown)
+    """
+    alert_types = np.array([alert.alert_type for alert in alerts], dtype=object)
+    columns = market[["price", "volume", "change_percent"]].to_numpy(dtype=float)[codes]
+    return np.select(
+        [alert_types == VOLUME_ABOVE, alert_types == PERCENT_CHANGE],
+        [columns[:, 1], columns[:, 2]],
+        default=columns[:, 0],
+    )
+
+
+def _threshold_mask(alerts, current):
+    """
+    Compare every alert with its current value in one vectorized pass.
+
+    A positive PERCENT_CHANGE threshold fires on a gain of at least that many percent, a
+    negative one on a drop of at least that many percent (the same comparison AlertArming
+    uses to decide whether a re-armed alert holds).
+
+    Args:
+        alerts: Alerts to evaluate
+        current: Current value per alert from _alert_values (NaN never triggers)
+
+    Returns:
+        Boolean array, True for alerts whose condition holds
+    """
+    alert_types = np.array([alert.alert_type for alert in alerts], dtype=object)
+    thresholds = np.array([np.nan if alert.threshold_value is None else alert.threshold_value for alert in alerts])
+
+    with np.errstate(invalid="ignore"):
+        above = (alert_types == PRICE_ABOVE) & (current > thresholds)
+        below = (alert_types == PRICE_BELOW) & (current < thresholds)
+        volume = (alert_types == VOLUME_ABOVE) & (current > thresholds)
+        gain = (thresholds >= 0) & (current >= thresholds)
+        drop = (thresholds < 0) & (current <= thresholds)
+        change = (alert_types == PERCENT_CHANGE) & (gain | drop)
+    return above | below | volume | change
+
+
 class AlertManager:
     """Manages the creation, checking, and triggering of alerts."""
 
     def __init__(self):
-        self.triggered_alerts = []
+        self.triggered_alerts = TriggeredAlertStore()
+        self.index = ThresholdIndex()
+        self.arming = AlertArming()
         self._running = False
+        # Alerts hit by streamed prices, waiting to be saved by the worker task (id -> price)
+        self._streamed_hits = {}
+        self._streamed_task = None
 
     async def start_monitoring(self, check_interval=60):
         """Start monitoring alerts in the background."""
@@ -50,78 +114,261 @@ class AlertManager:
         """Stop the alert monitoring."""
         self._running = False
 
+    def load_index(self):
+        """
+        Build the price threshold index from the active alerts (one query) and disarm the
+        alerts that fired within the cooldown before the last restart.
+        """
+        rows = (
+            db.query(Alert.id, Stock.symbol, Alert.alert_type, Alert.threshold_value, Alert.last_triggered)
+            .join(Stock, Alert.stock_id == Stock.id)
+            .filter(Alert.is_active == True)
+            .all()
+        )
+        self.index.load(row[:4] for row in rows)
+        self.arming.restore(rows)
+        self.watch_index_symbols()
+
+    def watch_index_symbols(self):
+        """Stream the trades of every symbol with a price alert."""
+        market_data_stream.set_watchlist("alerts", self.index.symbols())
+
+    def on_prices(self, prices):
+        """
+        Evaluate the price alerts against streamed trade prices (market data stream listener).
+
+        Runs on the event loop for every frame, so only the in-memory threshold index and the
+        disarmed alerts are consulted here; a frame that crosses no threshold costs a few
+        lookups. The alerts it does hit are handed to a worker task that loads and saves them
+        in a worker thread. Fired price alerts re-arm from the same prices, so a pull-back and
+        a new cross between two periodic checks still fires. The index is loaded at startup.
+        """
+        try:
+            hits = dict(self.index.observe(prices))
+            hits.update(self.arming.rearm(pd.DataFrame({"price": pd.Series(prices, dtype=float)})))
+        except Exception as e:
+            logger.error(f"Error checking streamed prices: {str(e)}")
+            return
+        if not hits:
+            return
+        self._streamed_hits.update(hits)
+        if self._streamed_task is None or self._streamed_task.done():
+            self._streamed_task = asyncio.create_task(self._trigger_streamed_hits())
+
+    async def _trigger_streamed_hits(self):
+        """Save and fire the alerts hit by streamed prices, one batch at a time."""
+        while self._streamed_hits:
+            hits, self._streamed_hits = self._streamed_hits, {}
+            try:
+                alerts_data = await asyncio.to_thread(self._commit_streamed_hits, hits)
+                self._fire_triggers(alerts_data)
+            except Exception as e:
+                logger.error(f"Error triggering {len(hits)} streamed alerts: {str(e)}")
+
+    def _commit_streamed_hits(self, hits):
+        """Load the alerts hit by streamed prices and save their trigger (runs in a worker thread)."""
+        try:
+            alerts = (
+                db.query(Alert)
+                .options(joinedload(Alert.stock), joinedload(Alert.user))
+                .filter(Alert.id.in_(list(hits)), Alert.is_active == True)
+                .all()
+            )
+            return self._commit_triggers([(alert, hits[alert.id]) for alert in alerts])
+        finally:
+            # The worker thread's session is not reused by the event loop
+            db.remove()
+
     async def check_all_alerts(self):
-        """Check all active alerts."""
+        """
+        Check all active alerts with one market data frame per tick.
+
+        The symbols of the threshold index and of the volume / change % alerts are fetched
+        with one batched download. Price alerts go through the index, which returns only the
+        alerts whose threshold was crossed since the last tick; volume and change % alerts
+        are compared with the same frame in one vectorized pass.
+
+        Firing is edge-triggered: an alert fires when its condition becomes true and then
+        stays quiet until it re-arms (see AlertArming).
+
+        While the market data stream runs, price alerts already fire from `on_prices` as
+        trades arrive, and this periodic check uses the streamed prices where they are fresh.
+        """
         try:
-            active_alerts = db.query(Alert).filter(Alert.is_active == True).all()
-            for alert in active_alerts:
-                await self.check_alert(alert)
+            if not self.index.loaded:
+                self.load_index()
+
+            market_alerts = (
+                db.query(Alert)
+                .options(joinedload(Alert.stock), joinedload(Alert.user))
+                .filter(Alert.is_active == True, Alert.alert_type.in_(MARKET_DATA_TYPES))
+                .all()
+            )
+            symbols = list(dict.fromkeys(self.index.symbols() + [alert.stock.symbol for alert in market_alerts]))
+            if not symbols:
+                return []
+
+            market = await asyncio.to_thread(get_market_data_batch, symbols)
+            # Prefer the streamed last trade over the polled price where the stream has a fresh one
+            streamed = market_data_stream.table.prices(market.index)
+            if streamed:
+                market = market.copy()
+                market.loc[list(streamed), "price"] = list(streamed.values())
+            results = []
+
+            hits = dict(self.index.observe(market["price"].to_dict()))
+            # Alerts re-armed on this tick whose condition already holds again
+            hits.update(self.arming.rearm(market))
+            if hits:
+                alerts = (
+                    db.query(Alert)
+                    .options(joinedload(Alert.stock), joinedload(Alert.user))
+                    .filter(Alert.id.in_(list(hits)), Alert.is_active == True)
+                    .all()
+                )
+                results += self._trigger_many([(alert, hits[alert.id]) for alert in alerts])
+
+            market_alerts = [alert for alert in market_alerts if alert.id not in hits]
+            if market_alerts:
+                results += await self.evaluate_alerts(market_alerts, market)
+            return results
         except Exception as e:
             logger.error(f"Error checking alerts: {str(e)}")
+            return []
 
     async def check_alert(self, alert):
         """Check if a specific alert should be triggered."""
+        return await self.evaluate_alerts([alert])
+
+    async def evaluate_alerts(self, alerts, market=None):
+        """
+        Evaluate many alerts against one batch of market data.
+
+        Alerts are grouped by symbol, the price, volume and change % of the distinct symbols
+        are fetched with a single batched download (unless `market` is given), every
+        threshold is compared at once and all `last_triggered` updates are written with one
+        commit.
+
+        Args:
+            alerts: Alerts with their stock relation loaded
+            market: Frame from get_market_data_batch already fetched for this tick
+
+        Returns:
+            List of triggered alert data
+        """
+        if not alerts:
+            return []
+
+        # Group by symbol: one market row per distinct symbol, broadcast back to its alerts
+        codes, symbols = pd.factorize(pd.Series([alert.stock.symbol for alert in alerts], dtype=object))
+        if market is None:
+            market = await asyncio.to_thread(get_market_data_batch, list(symbols))
+        current = _alert_values(alerts, codes, market.reindex(symbols))
+
+        triggered = _threshold_mask(alerts, current)
+        results = self._trigger_many([(alerts[position], current[position]) for position in np.flatnonzero(triggered)])
+        logger.info(f"{len(results)} of {len(alerts)} alerts triggered ({len(symbols)} symbols)")
+        return results
+
+    def _trigger_many(self, triggered):
+        """
+        Trigger (alert, current value) pairs whose alert is armed and write every
+        last_triggered update with one commit. The alerts are disarmed, stored and handed
+        to the notification dispatcher only once that commit succeeded.
+        """
+        return self._fire_triggers(self._commit_triggers(triggered))
+
+    def _commit_triggers(self, triggered):
+        """
+        Save the last_triggered time of the armed alerts among (alert, current value) pairs
+        with one commit.
+
+        Returns:
+            Triggered alert data of the saved alerts ([] if the commit failed)
+        """
+        # Disarmed alerts already fired for this condition
+        armed = [(alert, current_value) for alert, current_value in triggered if self.arming.is_armed(alert.id)]
+        if not armed:
+            return []
+
+        triggered_at = datetime.now()
         try:
-            current_price = get_current_price(alert.stock.symbol)
-            if current_price is None:
-                return
-
-            triggered = False
-
-            if alert.alert_type == PRICE_ABOVE:
-                triggered = current_price > alert.threshold_value
-            elif alert.alert_type == PRICE_BELOW:
-                triggered = current_price < alert.threshold_value
-            elif alert.alert_type == VOLUME_ABOVE:
-                # Would need to get volume data from stock service
-                pass
-            elif alert.alert_type == PERCENT_CHANGE:
-                # Would need to calculate percent change
-                pass
-
-            if triggered:
-                self.trigger_alert(alert, current_price)
-        except Exception as e:
-            logger.error(f"Error checking alert {alert.id}: {str(e)}")
-
-    def trigger_alert(self, alert, current_value):
-        """Trigger an alert by adding it to the triggered alerts list and updating DB."""
-        try:
-            # Update the alert in the database
-            alert.last_triggered = datetime.now()
+            for alert, _ in armed:
+                alert.last_triggered = triggered_at
             db.commit()
-
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error saving {len(armed)} triggered alerts: {str(e)}")
+            return []
+        return [self._alert_data(alert, current_value, triggered_at) for alert, current_value in armed]
+
+    def _fire_triggers(self, alerts_data):
+        """Disarm saved triggered alerts, then store and deliver those that were still armed."""
+        results = []
+        for alert_data in alerts_data:
+            fired = self.arming.fire(
+                alert_data["id"],
+                alert_data["stock_symbol"],
+                alert_data["alert_type"],
+                alert_data["threshold_value"],
+                alert_data["triggered_at"],
+            )
+            if not fired:
+                continue
+            self._publish(alert_data)
+            results.append(alert_data)
+        return results
+
+    @staticmethod
+    def _alert_data(alert, current_value, triggered_at):
+        """Build the triggered alert record of an alert."""
+        return {
+            "id": alert.id,
+            "stock_symbol": alert.stock.symbol,
+            "stock_name": alert.stock.name,
+            "alert_type": alert.alert_type,
+            "threshold_value": alert.threshold_value,
             # Convert NumPy values to Python native types
-            current_value_native = convert_numpy_types(current_value)
+            "current_value": convert_numpy_types(current_value),
+            "user_id": alert.user_id,
+            "user_email": alert.user.email,
+            "triggered_at": triggered_at,
+        }
 
-            # Add to triggered alerts
-            alert_data = {
-                "id": alert.id,
-                "stock_symbol": alert.stock.symbol,
-                "stock_name": alert.stock.name,
-                "alert_type": alert.alert_type,
-                "threshold_value": alert.threshold_value,
-                "current_value": current_value_native,
-                "user_email": alert.user.email,
-                "triggered_at": datetime.now(),
-            }
-            self.triggered_alerts.append(alert_data)
+    def _publish(self, alert_data):
+        """Store a saved triggered alert and queue it for delivery."""
+        self.triggered_alerts.add(alert_data)
 
-            # Would typically send an email or notification here
-            logger.info(f"Alert triggered: {alert_data}")
+        # Delivery happens on the dispatcher's workers, never inside the check loop
+        notification_dispatcher.submit(alert_data)
+        logger.info(f"Alert triggered: {alert_data}")
+
+    def trigger_alert(self, alert, current_value, triggered_at=None):
+        """Trigger an alert: save its last_triggered time, then store and deliver it."""
+        try:
+            triggered_at = triggered_at or datetime.now()
+            alert.last_triggered = triggered_at
+            db.commit()
 
+            alert_data = self._alert_data(alert, current_value, triggered_at)
+            self._publish(alert_data)
             return alert_data
         except Exception as e:
+            db.rollback()
             logger.error(f"Error triggering alert {alert.id}: {str(e)}")
             return None
 
-    def get_recent_triggered_alerts(self, limit=50):
-        """Get recently triggered alerts."""
-        return self.triggered_alerts[-limit:] if self.triggered_alerts else []
+    def get_recent_triggered_alerts(self, limit=50, user_id=None):
+        """Get recently triggered alerts (of one user when `user_id` is given), oldest first."""
+        if user_id is None:
+            alerts = self.triggered_alerts.recent(limit)
+        else:
+            alerts = self.triggered_alerts.recent_for_user(user_id, limit)
+        return alerts[::-1]
 
     def clear_triggered_alerts(self):
-        """Clear the list of triggered alerts."""
-        self.triggered_alerts = []
+        """Clear the in-memory triggered alerts (they are still written to the database)."""
+        self.triggered_alerts.clear()
 
 
 # Global alert manager instance
@@ -152,6 +399,9 @@ def create_alert(stock_symbol: str, user: User, alert_type: str, threshold_value
         db.add(alert)
         db.commit()
 
+        alert_manager.index.add(alert.id, stock.symbol, alert.alert_type, alert.threshold_value)
+        alert_manager.watch_index_symbols()
+
         return {"success": True, "message": f"Alert created for {stock_symbol}", "alert_id": alert.id}
     except Exception as e:
         db.rollback()
@@ -162,13 +412,17 @@ def create_alert(stock_symbol: str, user: User, alert_type: str, threshold_value
 def get_alerts_for_user(user: User):
     """Get all alerts for a user"""
     try:
-        alerts = db.query(Alert).join(Stock).filter(Alert.user_id == user.id).all()
+        alerts = db.query(Alert).options(joinedload(Alert.stock)).filter(Alert.user_id == user.id).all()
+        if not alerts:
+            return {"success": True, "alerts": []}
 
-        alerts_data = []
-        for alert in alerts:
-            # Get current price for comparison
-            current_price = get_current_price(alert.stock.symbol)
+        # One cached / batched market data lookup for the distinct symbols
+        codes, symbols = pd.factorize(pd.Series([alert.stock.symbol for alert in alerts], dtype=object))
+        market = get_market_data_batch(list(symbols))
+        current = _alert_values(alerts, codes, market.reindex(symbols))
 
+        alerts_data = []
+        for alert, current_value in zip(alerts, current):
             alerts_data.append(
                 {
                     "id": alert.id,
@@ -176,7 +430,7 @@ def get_alerts_for_user(user: User):
                     "stock_name": alert.stock.name,
                     "alert_type": alert.alert_type,
                     "threshold_value": alert.threshold_value,
-                    "current_value": current_price,
+                    "current_value": None if np.isnan(current_value) else float(current_value),
                     "is_active": alert.is_active,
                     "last_triggered": alert.last_triggered,
                     "created_at": alert.created_at,
@@ -205,6 +459,13 @@ def update_alert(alert_id: int, is_active: bool = None, threshold_value: float =
 
         db.commit()
 
+        alert_manager.arming.forget(alert.id)
+        if alert.is_active:
+            alert_manager.index.add(alert.id, alert.stock.symbol, alert.alert_type, alert.threshold_value)
+        else:
+            alert_manager.index.remove(alert.id)
+        alert_manager.watch_index_symbols()
+
         return {
             "success": True,
             "message": "Alert updated",
@@ -232,6 +493,10 @@ def delete_alert(alert_id: int) -> bool:
         db.delete(alert)
         db.commit()
 
+        alert_manager.index.remove(alert_id)
+        alert_manager.arming.forget(alert_id)
+        alert_manager.watch_index_symbols()
+
         return {"success": True, "message": "Alert deleted successfully"}
     except Exception as e:
         db.rollback()
@@ -2,17 +2,75 @@ import logging
 import os
 from datetime import datetime
 
+import numpy as np
 from alpaca.data import StockHistoricalDataClient
-from alpaca.data.requests import StockLatestQuoteRequest
+from alpaca.data.requests import StockBarsRequest, StockLatestQuoteRequest
+from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
 from alpaca.trading.client import TradingClient
-from alpaca.trading.enums import AssetStatus, OrderSide, TimeInForce
-from alpaca.trading.requests import GetCalendarRequest, LimitOrderRequest, MarketOrderRequest, StopOrderRequest
+from alpaca.trading.enums import OrderSide, TimeInForce
+from alpaca.trading.requests import LimitOrderRequest, MarketOrderRequest, StopOrderRequest
 from dotenv import load_dotenv
 
+from backend.services.asset_catalog import AssetCatalog
+from backend.services.bar_cache import bar_cache
+from backend.services.market_calendar import MARKET_TIMEZONE, market_calendar
+from backend.services.quote_batcher import QuoteBatcher
+
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Symbols per multi-symbol bars request; the SDK follows the page tokens of each request
+BARS_SYMBOLS_PER_REQUEST = int(os.environ.get("ALPACA_BARS_SYMBOLS_PER_REQUEST", "200"))
+
+# Columnar bar layout returned by get_bars_bulk (timestamps are UTC)
+BAR_DTYPE = np.dtype([("t", "datetime64[ns]"), ("o", "f8"), ("h", "f8"), ("l", "f8"), ("c", "f8"), ("v", "f8")])
+
+# Bar timeframes by name (unknown names fall back to 1 minute)
+TIMEFRAMES = {
+    "1Min": TimeFrame(1, TimeFrameUnit.Minute),
+    "5Min": TimeFrame(5, TimeFrameUnit.Minute),
+    "15Min": TimeFrame(15, TimeFrameUnit.Minute),
+    "1H": TimeFrame(1, TimeFrameUnit.Hour),
+    "1D": TimeFrame(1, TimeFrameUnit.Day),
+}
+
+# Regular session in UTC minutes of the day, as filtered by the screener and backtest
+REGULAR_HOURS_UTC = (14 * 60 + 30, 21 * 60)
+
+
+def _as_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date() if isinstance(value, str) else value
+
+
+def _to_bar_array(frame):
+    """Convert one symbol's bars (a BarSet.df slice) to a BAR_DTYPE array."""
+    bars = np.empty(len(frame), dtype=BAR_DTYPE)
+    timestamps = frame.index.get_level_values("timestamp")
+    bars["t"] = timestamps.tz_convert("UTC").tz_localize(None).to_numpy() if timestamps.tz else timestamps.to_numpy()
+    for field, column in (("o", "open"), ("h", "high"), ("l", "low"), ("c", "close"), ("v", "volume")):
+        bars[field] = frame[column].to_numpy(dtype=float)
+    return bars
+
+
+def regular_hours(bars):
+    """Keep the bars between 14:30 and 21:00 UTC."""
+    minutes = (bars["t"] - bars["t"].astype("datetime64[D]")).astype("timedelta64[m]").astype(np.int64)
+    return bars[(minutes >= REGULAR_HOURS_UTC[0]) & (minutes < REGULAR_HOURS_UTC[1])]
+
+
+def split_sessions(bars):
+    """
+    Split time-sorted bars by UTC day.
+
+    Returns:
+        Dictionary of 'YYYY-MM-DD' to the bars of that day (views, not copies)
+    """
+    days = bars["t"].astype("datetime64[D]")
+    unique_days, starts = np.unique(days, return_index=True)
+    ends = np.append(starts[1:], len(bars))
+    return {str(day): bars[start:end] for day, start, end in zip(unique_days, starts, ends)}
+
 
 class AlpacaService:
     def __init__(self):
@@ -29,16 +87,18 @@ class AlpacaService:
             self.api_key, self.api_secret, paper=self.paper_trading, url_override=os.environ.get("ALPACA_BASE_URL")
         )
         self.data_client = StockHistoricalDataClient(self.api_key, self.api_secret)
-        assets = self.trading_client.get_all_assets()
-        self.active_assets = [asset for asset in assets if asset.status == AssetStatus.ACTIVE and asset.tradable]
+        self.quote_batcher = QuoteBatcher(self.get_latest_quotes)
+        self.bar_request_count = 0
+        # Assets are loaded on first use, not at startup
+        self.catalog = AssetCatalog(self.trading_client)
         logger.info(f"Alpaca service initialized (Paper Trading: {self.paper_trading})")
 
+    @property
+    def active_assets(self):
+        return self.catalog.assets
+
     def find_symbol(self, symbol):
-        matching_symbols = [
-            asset
-            for asset in self.active_assets
-            if symbol.upper() in asset.symbol.upper() or (asset.name and symbol.upper() in asset.name.upper())
-        ]
+        matching_symbols = self.catalog.search(symbol)
         for asset in matching_symbols:
             print(f"Symbol: {asset.symbol} - Name: {asset.name}")
 
@@ -210,15 +270,8 @@ class AlpacaService:
             List of date strings in format 'YYYY-MM-DD'
         """
         try:
-            # Convert string dates to datetime objects
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-            end = datetime.strptime(end_date, "%Y-%m-%d")
-
-            # Get calendar from Alpaca
-            calendar = self.trading_client.get_calendar(filters=GetCalendarRequest(start=start, end=end))
-
-            # Extract dates as strings
-            trading_days = [day.date.strftime("%Y-%m-%d") for day in calendar]
+            # Served from the precomputed exchange calendar instead of a broker round trip
+            trading_days = [day.strftime("%Y-%m-%d") for day in market_calendar.sessions_between(start_date, end_date)]
 
             return trading_days
 
@@ -226,13 +279,118 @@ class AlpacaService:
             logger.error(f"Error getting trading days: {str(e)}")
             return []
 
+    def _request_bars(self, symbols, start_date, end_date, tf):
+        """One multi-symbol bars request (paged by the SDK); raises on failure."""
+        start = datetime.combine(_as_date(start_date), datetime.min.time())
+        end = datetime.combine(_as_date(end_date), datetime.max.time())
+        request = StockBarsRequest(symbol_or_symbols=symbols, timeframe=tf, start=start, end=end)
+        frame = self.data_client.get_stock_bars(request).df
+        self.bar_request_count += 1
+        if frame.empty:
+            return {}
+        return {
+            symbol: _to_bar_array(bars.sort_index(level="timestamp"))
+            for symbol, bars in frame.groupby(level="symbol", sort=False)
+        }
+
+    def get_bars_bulk(self, symbols, start_date, end_date, timeframe="1Min"):
+        """
+        Get bars for many symbols over a date range with multi-symbol requests.
+
+        Symbols are sent BARS_SYMBOLS_PER_REQUEST at a time through the shared data client,
+        which pages through each response, so N symbols x D days cost about
+        N / BARS_SYMBOLS_PER_REQUEST requests (plus extra pages) instead of N x D.
+
+        Args:
+            symbols: Symbols or Alpaca assets
+            start_date: First day ('YYYY-MM-DD' or date)
+            end_date: Last day, inclusive ('YYYY-MM-DD' or date)
+            timeframe: Bar timeframe name (see TIMEFRAMES)
+
+        Returns:
+            Dictionary of symbol to a time-sorted BAR_DTYPE array; symbols without bars are left out
+        """
+        names = list(dict.fromkeys(getattr(symbol, "symbol", symbol) for symbol in symbols))
+        tf = TIMEFRAMES.get(timeframe, TimeFrame.Minute)
+
+        result = {}
+        for position in range(0, len(names), BARS_SYMBOLS_PER_REQUEST):
+            chunk = names[position : position + BARS_SYMBOLS_PER_REQUEST]
+            try:
+                result.update(self._request_bars(chunk, start_date, end_date, tf))
+            except Exception as e:
+                logger.error(f"Error getting bars for {len(chunk)} symbols: {str(e)}")
+
+        logger.info(f"Fetched {timeframe} bars for {len(result)}/{len(names)} symbols, {start_date} to {end_date}")
+        return result
+
+    def get_session_bars(self, symbols, start_date, end_date, timeframe="1Min"):
+        """
+        Get bars per symbol and session, read through the on-disk bar cache.
+
+        Completed sessions found in the cache are memory mapped and never requested; the
+        missing ones are fetched with multi-symbol requests (one span per group of symbols
+        missing the same sessions) and written to the cache. Only exchange calendar sessions
+        covered by a successful request are cached, and sessions that came back without bars
+        expire after BAR_CACHE_EMPTY_TTL_SECONDS so a transient gap is fetched again. The
+        current session is always fetched and never cached.
+
+        Args:
+            symbols: Symbols or Alpaca assets
+            start_date: First day ('YYYY-MM-DD' or date)
+            end_date: Last day, inclusive ('YYYY-MM-DD' or date)
+            timeframe: Bar timeframe name (see TIMEFRAMES)
+
+        Returns:
+            Dictionary of symbol to {'YYYY-MM-DD': BAR_DTYPE array} for every session in the
+            range (empty arrays for sessions without bars); cached arrays are read-only
+        """
+        names = list(dict.fromkeys(getattr(symbol, "symbol", symbol) for symbol in symbols))
+        sessions = [day.strftime("%Y-%m-%d") for day in market_calendar.sessions_between(start_date, end_date)]
+        today = datetime.now(MARKET_TIMEZONE).strftime("%Y-%m-%d")
+        completed = [day for day in sessions if day < today]
+        open_sessions = [day for day in sessions if day >= today]
+
+        result, missing = bar_cache.lookup(names, completed, timeframe)
+        for symbol in names:
+            result.setdefault(symbol, {})
+            if open_sessions:
+                missing.setdefault(symbol, []).extend(open_sessions)
+
+        # Symbols missing the same sessions share requests over exactly that span
+        spans = {}
+        for symbol, days in missing.items():
+            spans.setdefault((days[0], days[-1]), []).append(symbol)
+
+        tf = TIMEFRAMES.get(timeframe, TimeFrame.Minute)
+        empty = np.empty(0, dtype=BAR_DTYPE)
+        for (first, last), span_symbols in spans.items():
+            for position in range(0, len(span_symbols), BARS_SYMBOLS_PER_REQUEST):
+                chunk = span_symbols[position : position + BARS_SYMBOLS_PER_REQUEST]
+                try:
+                    fetched = self._request_bars(chunk, first, last, tf)
+                except Exception as e:
+                    # Nothing is cached for a failed request, so it is retried next time
+                    logger.error(f"Error getting bars for {len(chunk)} symbols: {str(e)}")
+                    continue
+                for symbol in chunk:
+                    by_day = split_sessions(fetched[symbol]) if symbol in fetched else {}
+                    for day in missing[symbol]:
+                        bars = by_day.get(day, empty)
+                        result[symbol][day] = bars
+                        if day < today:
+                            bar_cache.store(symbol, day, timeframe, bars)
+
+        fetched_days = sum(len(days) for days in missing.values())
+        logger.info(
+            f"{timeframe} bars for {len(names)} symbols x {len(sessions)} sessions: "
+            f"{len(names) * len(sessions) - fetched_days} cached, {fetched_days} requested"
+        )
+        return result
+
     def get_historical_bar(self, symbol, date, timeframe):
         """Get historical bars for a symbol on a specific date"""
         try:
-            from alpaca.data import StockHistoricalDataClient
-            from alpaca.data.requests import StockBarsRequest
-            from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
-
             # Format date if it's a string
             if isinstance(date, str):
                 date = datetime.strptime(date, "%Y-%m-%d").date()
@@ -241,23 +399,12 @@ class AlpacaService:
             start = datetime.combine(date, datetime.min.time())
             end = datetime.combine(date, datetime.max.time())
 
-            # Create a market data client
-            data_client = StockHistoricalDataClient(self.api_key, self.api_secret)
-
-            # Map timeframe string to TimeFrame object
-            timeframe_map = {
-                "1Min": TimeFrame(1, TimeFrameUnit.Minute),
-                "5Min": TimeFrame(5, TimeFrameUnit.Minute),
-                "15Min": TimeFrame(15, TimeFrameUnit.Minute),
-                "1H": TimeFrame(1, TimeFrameUnit.Hour),
-                "1D": TimeFrame(1, TimeFrameUnit.Day),
-            }
-            tf = timeframe_map.get(timeframe, TimeFrame.Minute)
+            tf = TIMEFRAMES.get(timeframe, TimeFrame.Minute)
             # Create request
             request = StockBarsRequest(symbol_or_symbols=symbol.symbol, timeframe=tf, start=start, end=end)
 
-            # Get bars
-            bars_response = data_client.get_stock_bars(request)
+            # Get bars (with the shared market data client)
+            bars_response = self.data_client.get_stock_bars(request)
 
             # Convert to list of dictionaries
             bars_list = []
@@ -343,10 +490,25 @@ class AlpacaService:
             logger.error(f"Error getting historical bars for {symbol} on {date}: {str(e)}")
             return []
 
+    def get_latest_quotes(self, symbols):
+        """
+        Get the latest quote of many stocks with one multi-symbol request (blocking).
+
+        Args:
+            symbols: Stock symbols
+
+        Returns:
+            Dictionary of symbol to Alpaca Quote
+        """
+        return self.data_client.get_stock_latest_quote(StockLatestQuoteRequest(symbol_or_symbols=list(symbols)))
+
     async def get_current_price(self, symbol):
         """
         Get the current price of a stock from Alpaca API
 
+        Concurrent calls are coalesced by the quote batcher into multi-symbol requests that
+        run off the event loop.
+
         Args:
             symbol: Stock symbol
 
@@ -354,10 +516,8 @@ class AlpacaService:
             Current price as a float
         """
         try:
-            # Get the latest quote for the symbol
-            multisymbol_request_params = StockLatestQuoteRequest(symbol_or_symbols=[symbol])
-            quote = self.trading_client.get_stock_latest_quote(multisymbol_request_params)
-            return quote[symbol].ask_price
+            quote = await self.quote_batcher.get(symbol)
+            return quote.ask_price
         except Exception:
             # logger.error(f"Error getting current price for {symbol}: {str(e)}")
             raise
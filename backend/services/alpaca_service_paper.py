@@ -5,10 +5,14 @@ from datetime import datetime
 from alpaca.data import StockHistoricalDataClient
 from alpaca.data.requests import StockLatestQuoteRequest
 from alpaca.trading.client import TradingClient
-from alpaca.trading.enums import AssetStatus, OrderSide, TimeInForce
-from alpaca.trading.requests import GetCalendarRequest, LimitOrderRequest, MarketOrderRequest, StopOrderRequest
+from alpaca.trading.enums import OrderSide, TimeInForce
+from alpaca.trading.requests import LimitOrderRequest, MarketOrderRequest, StopOrderRequest
 from dotenv import load_dotenv
 
+from backend.services.asset_catalog import AssetCatalog
+from backend.services.market_calendar import market_calendar
+from backend.services.quote_batcher import QuoteBatcher
+
 logger = logging.getLogger(__name__)
 
 load_dotenv()
@@ -27,16 +31,17 @@ class AlpacaPaperService:
         # Initialize Alpaca clients
         self.trading_client = TradingClient(self.api_key, self.api_secret, paper=self.paper_trading)
         self.data_client = StockHistoricalDataClient(self.api_key, self.api_secret)
-        assets = self.trading_client.get_all_assets()
-        self.active_assets = [asset for asset in assets if asset.status == AssetStatus.ACTIVE and asset.tradable]
+        self.quote_batcher = QuoteBatcher(self.get_latest_quotes)
+        # Assets are loaded on first use, not at startup
+        self.catalog = AssetCatalog(self.trading_client)
         logger.info(f"Alpaca service initialized (Paper Trading: {self.paper_trading})")
 
+    @property
+    def active_assets(self):
+        return self.catalog.assets
+
     def find_symbol(self, symbol):
-        matching_symbols = [
-            asset
-            for asset in self.active_assets
-            if symbol.upper() in asset.symbol.upper() or (asset.name and symbol.upper() in asset.name.upper())
-        ]
+        matching_symbols = self.catalog.search(symbol)
         for asset in matching_symbols:
             print(f"Symbol: {asset.symbol} - Name: {asset.name}")
 
@@ -208,15 +213,8 @@ class AlpacaPaperService:
             List of date strings in format 'YYYY-MM-DD'
         """
         try:
-            # Convert string dates to datetime objects
-            start = datetime.strptime(start_date, "%Y-%m-%d")
-            end = datetime.strptime(end_date, "%Y-%m-%d")
-
-            # Get calendar from Alpaca
-            calendar = self.trading_client.get_calendar(filters=GetCalendarRequest(start=start, end=end))
-
-            # Extract dates as strings
-            trading_days = [day.date.strftime("%Y-%m-%d") for day in calendar]
+            # Served from the precomputed exchange calendar instead of a broker round trip
+            trading_days = [day.strftime("%Y-%m-%d") for day in market_calendar.sessions_between(start_date, end_date)]
 
             return trading_days
 
@@ -341,10 +339,25 @@ class AlpacaPaperService:
             logger.error(f"Error getting historical bars for {symbol} on {date}: {str(e)}")
             return []
 
+    def get_latest_quotes(self, symbols):
+        """
+        Get the latest quote of many stocks with one multi-symbol request (blocking).
+
+        Args:
+            symbols: Stock symbols
+
+        Returns:
+            Dictionary of symbol to Alpaca Quote
+        """
+        return self.data_client.get_stock_latest_quote(StockLatestQuoteRequest(symbol_or_symbols=list(symbols)))
+
     async def get_current_price(self, symbol):
         """
         Get the current price of a stock from Alpaca API
 
+        Concurrent calls are coalesced by the quote batcher into multi-symbol requests that
+        run off the event loop.
+
         Args:
             symbol: Stock symbol
 
@@ -352,10 +365,8 @@ class AlpacaPaperService:
             Current price as a float
         """
         try:
-            # Get the latest quote for the symbol
-            multisymbol_request_params = StockLatestQuoteRequest(symbol_or_symbols=[symbol])
-            quote = self.trading_client.get_stock_latest_quote(multisymbol_request_params)
-            return quote[symbol].ask_price
+            quote = await self.quote_batcher.get(symbol)
+            return quote.ask_price
         except Exception:
             # logger.error(f"Error getting current price for {symbol}: {str(e)}")
             raise
@@ -0,0 +1,185 @@
+import bisect
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from alpaca.trading.enums import AssetStatus
+from alpaca.trading.models import Asset
+
+from backend.services.market_calendar import MARKET_TIMEZONE
+
+logger = logging.getLogger(__name__)
+
+# Active tradable assets are cached here and refreshed once per (New York) day
+CACHE_FILE = os.environ.get(
+    "ALPACA_ASSETS_CACHE_FILE", os.path.join(tempfile.gettempdir(), "stockscreener", "alpaca_assets.json")
+)
+
+# Length of the n-grams indexed for substring search
+NGRAM_SIZE = 3
+
+
+def _ngrams(text: str) -> Set[str]:
+    return {text[start : start + NGRAM_SIZE] for start in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class AssetCatalog:
+    """
+    Lazily loaded catalog of the active, tradable Alpaca assets.
+
+    Nothing is downloaded when the catalog is created. The first lookup loads the assets
+    from a JSON cache written the same day or, failing that, from the Alpaca API (then
+    writes the cache). Lookups go through in-memory indexes built once per load: a hash
+    map for exact symbols, a sorted symbol list for prefix search (bisect) and an n-gram
+    index over symbols and names for substring search, so a query only verifies the few
+    assets sharing all its n-grams instead of scanning the whole catalog.
+    """
+
+    def __init__(self, trading_client, cache_file: Optional[str] = CACHE_FILE):
+        """
+        Args:
+            trading_client: Alpaca TradingClient used to download the assets
+            cache_file: JSON file used to persist the catalog (None disables caching)
+        """
+        self.trading_client = trading_client
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._loaded_day: Optional[str] = None
+
+        self._assets: List[Asset] = []
+        self._by_symbol: Dict[str, Asset] = {}
+        self._sorted_symbols: List[str] = []
+        self._symbol_keys: List[str] = []
+        self._name_keys: List[str] = []
+        self._ngram_index: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(MARKET_TIMEZONE).strftime("%Y-%m-%d")
+
+    def _read_cache(self, day: str) -> Optional[List[Asset]]:
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return None
+        try:
+            with open(self.cache_file) as file:
+                cached = json.load(file)
+            if cached.get("day") != day:
+                return None
+            return [Asset(**raw) for raw in cached["assets"]]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable asset cache {self.cache_file}: {str(e)}")
+            return None
+
+    def _write_cache(self, day: str, assets: List[Asset]):
+        if not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            temporary = f"{self.cache_file}.{os.getpid()}.tmp"
+            with open(temporary, "w") as file:
+                raw = [asset.model_dump(mode="json", by_alias=True) for asset in assets]
+                json.dump({"day": day, "assets": raw}, file)
+            os.replace(temporary, self.cache_file)
+        except Exception as e:
+            logger.warning(f"Could not write asset cache {self.cache_file}: {str(e)}")
+
+    def _download(self) -> List[Asset]:
+        assets = self.trading_client.get_all_assets()
+        return [asset for asset in assets if asset.status == AssetStatus.ACTIVE and asset.tradable]
+
+    def _build(self, assets: List[Asset]):
+        """Install the assets and rebuild every index."""
+        by_symbol = {asset.symbol.upper(): asset for asset in assets}
+        symbol_keys = [asset.symbol.upper() for asset in assets]
+        name_keys = [(asset.name or "").upper() for asset in assets]
+        ngram_index: Dict[str, List[int]] = {}
+        for position, (symbol_key, name_key) in enumerate(zip(symbol_keys, name_keys)):
+            for gram in _ngrams(symbol_key) | _ngrams(name_key):
+                ngram_index.setdefault(gram, []).append(position)
+
+        self._assets = assets
+        self._by_symbol = by_symbol
+        self._sorted_symbols = sorted(by_symbol)
+        self._symbol_keys = symbol_keys
+        self._name_keys = name_keys
+        self._ngram_index = ngram_index
+
+    def load(self, force: bool = False):
+        """Load (or reload after a day change) the catalog from the cache or the API."""
+        day = self._today()
+        with self._lock:
+            if self._loaded_day == day and not force:
+                return
+            assets = None if force else self._read_cache(day)
+            source = "cache"
+            if assets is None:
+                try:
+                    assets = self._download()
+                    source = "Alpaca"
+                    self._write_cache(day, assets)
+                except Exception as e:
+                    if self._loaded_day is None:
+                        raise
+                    # Keep serving yesterday's catalog until the API is reachable again
+                    logger.error(f"Error refreshing Alpaca assets: {str(e)}")
+                    self._loaded_day = day
+                    return
+            self._build(assets)
+            self._loaded_day = day
+        logger.info(f"Loaded {len(assets)} active Alpaca assets from {source}")
+
+    @property
+    def assets(self) -> List[Asset]:
+        """Every active, tradable asset."""
+        self.load()
+        return self._assets
+
+    def get(self, symbol: str) -> Optional[Asset]:
+        """Exact symbol lookup (case-insensitive)."""
+        self.load()
+        return self._by_symbol.get(symbol.upper())
+
+    def prefix(self, text: str, limit: Optional[int] = None) -> List[Asset]:
+        """Assets whose symbol starts with `text`, in symbol order."""
+        self.load()
+        text = text.upper()
+        start = bisect.bisect_left(self._sorted_symbols, text)
+        end = bisect.bisect_left(self._sorted_symbols, text + "\uffff")
+        if limit is not None:
+            end = min(end, start + limit)
+        symbols = self._sorted_symbols[start:end]
+        return [self._by_symbol[symbol] for symbol in symbols]
+
+    def search(self, text: str) -> List[Asset]:
+        """Assets whose symbol or name contains `text` (case-insensitive), in catalog order."""
+        self.load()
+        text = text.upper()
+        if len(text) < NGRAM_SIZE:
+            # Too short for the n-gram index
+            positions = range(len(self._assets))
+        else:
+            postings = sorted((self._ngram_index.get(gram, []) for gram in _ngrams(text)), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    break
+            positions = sorted(candidates)
+        return [
+            self._assets[position]
+            for position in positions
+            if text in self._symbol_keys[position] or text in self._name_keys[position]
+        ]
+
+    def stats(self):
+        """Return catalog sizes for debugging."""
+        return {
+            "loaded_day": self._loaded_day,
+            "assets": len(self._assets),
+            "ngrams": len(self._ngram_index),
+            "cache_file": self.cache_file,
+        }
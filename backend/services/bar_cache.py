@@ -0,0 +1,118 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Completed sessions are stored here as one .npy file per timeframe / symbol / session
+CACHE_DIR = os.environ.get("BAR_CACHE_DIR", os.path.join(tempfile.gettempdir(), "stockscreener", "bars"))
+
+# A session stored without bars is requested again once its entry is older than this, so
+# a transient empty response (feed gap, symbol not listed yet) is not cached for good
+EMPTY_TTL_SECONDS = float(os.environ.get("BAR_CACHE_EMPTY_TTL_SECONDS", "86400"))
+
+
+class BarCache:
+    """
+    Read-through disk cache of historical bars for completed sessions.
+
+    Bars of a finished session never change, so each symbol-session is written once as a
+    structured NumPy array (.npy, columnar fields t/o/h/l/c/v) under
+    `<cache_dir>/<timeframe>/<SYMBOL>/<YYYY-MM-DD>.npy`. Reads are memory mapped: a
+    cached session costs a file open and only the pages actually touched are read. A
+    session without bars is stored as an empty array that expires after
+    `empty_ttl_seconds`, so it is not requested on every run but is retried later.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = CACHE_DIR, empty_ttl_seconds: float = EMPTY_TTL_SECONDS):
+        """
+        Args:
+            cache_dir: Root directory of the cache (None disables it)
+            empty_ttl_seconds: Lifetime of the entries of sessions without bars
+        """
+        self.cache_dir = cache_dir
+        self.empty_ttl_seconds = empty_ttl_seconds
+        self._lock = threading.Lock()
+        self.hit_count = 0
+        self.miss_count = 0
+        self.write_count = 0
+
+    def path(self, symbol: str, day: str, timeframe: str) -> str:
+        return os.path.join(self.cache_dir, timeframe, symbol.replace("/", "_"), f"{day}.npy")
+
+    def load(self, symbol: str, day: str, timeframe: str) -> Optional[np.ndarray]:
+        """Memory-map the cached bars of one symbol-session (None if not cached or an expired empty entry)."""
+        if not self.cache_dir:
+            return None
+        path = self.path(symbol, day, timeframe)
+        if not os.path.exists(path):
+            return None
+        try:
+            bars = np.load(path, mmap_mode="r")
+            if not len(bars) and time.time() - os.path.getmtime(path) > self.empty_ttl_seconds:
+                return None
+            return bars
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable bar cache file {path}: {str(e)}")
+            return None
+
+    def lookup(
+        self, symbols: Iterable[str], days: List[str], timeframe: str
+    ) -> Tuple[Dict[str, Dict[str, np.ndarray]], Dict[str, List[str]]]:
+        """
+        Split symbol-sessions into cached and missing ones.
+
+        Returns:
+            (symbol -> {day: cached bars}, symbol -> days that are not cached)
+        """
+        cached: Dict[str, Dict[str, np.ndarray]] = {}
+        missing: Dict[str, List[str]] = {}
+        hits = 0
+        for symbol in symbols:
+            for day in days:
+                bars = self.load(symbol, day, timeframe)
+                if bars is None:
+                    missing.setdefault(symbol, []).append(day)
+                else:
+                    cached.setdefault(symbol, {})[day] = bars
+                    hits += 1
+        with self._lock:
+            self.hit_count += hits
+            self.miss_count += sum(len(days) for days in missing.values())
+        return cached, missing
+
+    def store(self, symbol: str, day: str, timeframe: str, bars: np.ndarray):
+        """Write the bars of one completed symbol-session (atomically, via a temporary file)."""
+        if not self.cache_dir:
+            return
+        path = self.path(symbol, day, timeframe)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as file:
+                np.save(file, np.ascontiguousarray(bars))
+            os.replace(temporary, path)
+            with self._lock:
+                self.write_count += 1
+        except Exception as e:
+            logger.warning(f"Could not write bar cache file {path}: {str(e)}")
+
+    def stats(self):
+        """Return cache counters for debugging."""
+        with self._lock:
+            return {
+                "cache_dir": self.cache_dir,
+                "empty_ttl_seconds": self.empty_ttl_seconds,
+                "hits": self.hit_count,
+                "misses": self.miss_count,
+                "writes": self.write_count,
+            }
+
+
+# Process-wide bar cache shared by the Alpaca services
+bar_cache = BarCache()
@@ -0,0 +1,282 @@
+import logging
+import threading
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.services.market_calendar import market_calendar
+
+logger = logging.getLogger(__name__)
+
+# Format of PriceHistory.date as written by the daily job
+PRICE_HISTORY_DATE_FORMAT = "%Y/%m/%d"
+
+# Bars loaded per symbol when no lookback is given
+DEFAULT_BARS = 60
+
+DAILY_TIMEFRAMES = {"1d", "1D", "D"}
+
+# Screener timeframes mapped to the chart data timeframes that carry bars of that size
+CHART_TIMEFRAMES = {
+    "1m": "1D",
+    "5m": "1D",
+    "15m": "5D",
+    "30m": "5D",
+    "1h": "1M",
+    "4h": "1M",
+}
+
+
+def trailing_streaks(closes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Length of the current run of rising and falling closes for every row of a close matrix.
+
+    A bar is "up" when its close is above the previous bar's close and "down" when it is
+    below. The run is counted backwards from the last column and stops at the first bar that
+    breaks it; NaN (a missing bar) always breaks a run.
+
+    Args:
+        closes: symbols x bars matrix of closes, oldest bar first
+
+    Returns:
+        Tuple of (up streaks, down streaks), one integer per row
+    """
+    closes = np.asarray(closes, dtype=float)
+    if closes.ndim != 2 or closes.shape[1] < 2:
+        empty = np.zeros(closes.shape[0] if closes.ndim == 2 else 0, dtype=np.int64)
+        return empty, empty.copy()
+
+    # Reverse the bar axis so the most recent change comes first
+    changes = np.diff(closes, axis=1)[:, ::-1]
+    num_changes = changes.shape[1]
+
+    def run_length(flags: np.ndarray) -> np.ndarray:
+        # Position of the first break, or the full width when every change continues the run
+        first_break = np.argmin(flags, axis=1)
+        return np.where(flags.all(axis=1), num_changes, first_break).astype(np.int64)
+
+    with np.errstate(invalid="ignore"):
+        return run_length(changes > 0), run_length(changes < 0)
+
+
+class CandleStreakEngine:
+    """
+    Consecutive-candle screen over a whole symbol universe.
+
+    Closes are held as one symbols x bars matrix (oldest bar first, NaN for missing bars) and
+    the current up/down streak of every symbol is computed with a single vectorized pass, so
+    screening thousands of symbols costs about as much as screening one.
+    """
+
+    def __init__(self, symbols: Sequence[str], closes: np.ndarray, timeframe: str = "1d"):
+        """
+        Args:
+            symbols: Row labels of `closes`
+            closes: symbols x bars matrix of closes, oldest bar first
+            timeframe: Timeframe of the bars (informational)
+        """
+        self.symbols = pd.Index(list(symbols), dtype=object)
+        self.closes = np.asarray(closes, dtype=float).reshape(len(self.symbols), -1)
+        self.timeframe = timeframe
+        self.up, self.down = trailing_streaks(self.closes)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def streaks(self, direction: str = "up") -> pd.Series:
+        """Return the current streak of every symbol for `direction` ("up" or "down")."""
+        if direction not in ("up", "down"):
+            raise ValueError(f"Unknown streak direction: {direction}")
+        return pd.Series(self.up if direction == "up" else self.down, index=self.symbols)
+
+    def rank(
+        self,
+        direction: str = "up",
+        min_streak: int = 3,
+        limit: Optional[int] = None,
+        tiebreak: Optional[pd.Series] = None,
+    ) -> pd.DataFrame:
+        """
+        Symbols whose current streak is at least `min_streak`, best first.
+
+        Args:
+            direction: "up" for rising closes, "down" for falling closes
+            min_streak: Minimum number of consecutive candles
+            limit: Maximum number of rows to return (None for all)
+            tiebreak: Percent change per symbol used to order equal streaks (largest move
+                first in the streak's direction); defaults to the change of the last bar
+
+        Returns:
+            DataFrame indexed by symbol with streak, last_close and change_percent columns
+        """
+        streak = self.streaks(direction)
+        last_close = self.closes[:, -1] if self.closes.shape[1] else np.full(len(self), np.nan)
+
+        if tiebreak is None:
+            previous_close = self.closes[:, -2] if self.closes.shape[1] > 1 else np.full(len(self), np.nan)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                change = (last_close - previous_close) / previous_close * 100
+        else:
+            change = pd.to_numeric(tiebreak.reindex(self.symbols), errors="coerce").to_numpy(dtype=float)
+
+        ranked = pd.DataFrame(
+            {"streak": streak.to_numpy(), "last_close": last_close, "change_percent": change}, index=self.symbols
+        )
+        ranked = ranked[ranked["streak"] >= min_streak]
+
+        # Longest streak first, then the strongest move in the streak's direction
+        order_key = ranked["change_percent"] if direction == "up" else -ranked["change_percent"]
+        ranked = ranked.assign(_order=order_key.fillna(-np.inf)).sort_values(
+            ["streak", "_order"], ascending=False, kind="stable"
+        )
+        ranked = ranked.drop(columns="_order")
+        return ranked if limit is None else ranked.head(limit)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, timeframe: str = "1d") -> "CandleStreakEngine":
+        """Build an engine from a DataFrame indexed by symbol with one column per bar (oldest first)."""
+        return cls(frame.index, frame.to_numpy(dtype=float), timeframe)
+
+    @classmethod
+    def from_bars(cls, bars: Dict[str, Sequence[float]], timeframe: str = "1d") -> "CandleStreakEngine":
+        """
+        Build an engine from per-symbol close lists of possibly different lengths.
+
+        Shorter series are left-padded with NaN so every row ends on its most recent bar.
+        """
+        symbols = list(bars)
+        width = max((len(values) for values in bars.values()), default=0)
+        closes = np.full((len(symbols), width), np.nan)
+        for row, symbol in enumerate(symbols):
+            values = np.asarray(bars[symbol], dtype=float)
+            if len(values):
+                closes[row, width - len(values) :] = values
+        return cls(symbols, closes, timeframe)
+
+
+class DailyCloseHistory:
+    """
+    Daily closes of every stored symbol over the last sessions, as a symbols x sessions frame.
+
+    Loaded from `price_history` with one query and reused until a newer session is expected or
+    `invalidate` is called (for example at the end of the daily job).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache: Dict[Tuple[str, int], pd.DataFrame] = {}
+
+    @staticmethod
+    def _load(first_session: str, last_session: str, bars: int) -> pd.DataFrame:
+        from backend.models.database import PriceHistory, Stock, db_session
+
+        db = db_session()
+        try:
+            rows = (
+                db.query(Stock.name, PriceHistory.date, PriceHistory.close)
+                .join(Stock, PriceHistory.stock_id == Stock.id)
+                # Today's bar (stored by the daily job after the close) is excluded: the live
+                # close is appended as today's column by build_daily_engine
+                .filter(PriceHistory.date >= first_session, PriceHistory.date <= last_session)
+                .all()
+            )
+        finally:
+            db.close()
+
+        df = pd.DataFrame(rows, columns=["symbol", "date", "close"])
+        df = df[df["symbol"].notna()].drop_duplicates(["symbol", "date"], keep="last")
+        # Dates are zero-padded "%Y/%m/%d" strings, so column order is date order
+        frame = df.pivot(index="symbol", columns="date", values="close").sort_index(axis=1)
+        return frame.iloc[:, -bars:].astype(float)
+
+    def get(self, bars: int = DEFAULT_BARS) -> pd.DataFrame:
+        """
+        Return the closes of the last `bars` sessions before today.
+
+        Args:
+            bars: Number of sessions per symbol
+
+        Returns:
+            DataFrame indexed by symbol with one column per session date (oldest first)
+        """
+        last_session = market_calendar.previous_session()
+        if last_session is None:
+            return pd.DataFrame()
+        sessions = market_calendar.sessions_between(last_session - timedelta(days=bars * 2 + 10), last_session)
+        first_session = sessions[-bars:][0].strftime(PRICE_HISTORY_DATE_FORMAT)
+
+        last_session = last_session.strftime(PRICE_HISTORY_DATE_FORMAT)
+        key = (last_session, bars)
+        frame = self._cache.get(key)
+        if frame is not None:
+            return frame
+
+        with self._lock:
+            frame = self._cache.get(key)
+            if frame is None:
+                frame = self._load(first_session, last_session, bars)
+                self._cache = {key: frame}
+                logger.info(f"Loaded {frame.shape[1]} daily closes for {frame.shape[0]} symbols")
+        return frame
+
+    def invalidate(self):
+        """Drop the cached closes (call after new price history was stored)."""
+        with self._lock:
+            self._cache = {}
+
+
+def build_daily_engine(
+    symbols: Sequence[str],
+    live_closes: Optional[pd.Series] = None,
+    bars: int = DEFAULT_BARS,
+) -> CandleStreakEngine:
+    """
+    Build a daily engine from stored history, with today's live close as the last bar.
+
+    Args:
+        symbols: Universe to screen
+        live_closes: Current price per symbol; appended as today's bar when today is a session
+        bars: Number of stored sessions per symbol
+
+    Returns:
+        CandleStreakEngine over `symbols` (symbols without history get NaN rows)
+    """
+    history = daily_close_history.get(bars).reindex(pd.Index(list(symbols), dtype=object))
+    if live_closes is not None and market_calendar.is_session():
+        history = history.assign(today=pd.to_numeric(live_closes.reindex(history.index), errors="coerce"))
+    return CandleStreakEngine.from_frame(history, "1d")
+
+
+def build_intraday_engine(
+    symbols: Sequence[str],
+    timeframe: str,
+    load_bars: Callable[[str, str], List[float]],
+) -> CandleStreakEngine:
+    """
+    Build an intraday engine from per-symbol chart closes.
+
+    Args:
+        symbols: Universe to screen
+        timeframe: Screener timeframe (1m, 5m, 15m, 30m, 1h, 4h)
+        load_bars: Callable returning the closes (oldest first) for (symbol, chart timeframe)
+
+    Returns:
+        CandleStreakEngine over the symbols whose bars could be loaded
+    """
+    chart_timeframe = CHART_TIMEFRAMES.get(timeframe, "1D")
+    bars = {}
+    for symbol in symbols:
+        try:
+            closes = load_bars(symbol, chart_timeframe)
+        except Exception as e:
+            logger.error(f"Error loading {timeframe} bars for {symbol}: {str(e)}")
+            continue
+        if closes:
+            bars[symbol] = closes
+    return CandleStreakEngine.from_bars(bars, timeframe)
+
+
+# Process-wide daily close matrix shared by the consecutive-candle screens
+daily_close_history = DailyCloseHistory()
@@ -0,0 +1,134 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class CrossDetector:
+    """
+    Stateful below-to-above cross detection for a watch list of symbols.
+
+    The watch list is held as aligned NumPy arrays: the level to watch (for example the
+    previous day high), the last observed price and whether the price was above the level
+    at the last observation. Every tick compares the whole watch list with one vectorized
+    operation and only reports symbols whose state flipped from below to above, so a stock
+    trading above its level is reported once, not on every tick.
+    """
+
+    def __init__(self, level_column: str = "prev_day_high"):
+        """
+        Args:
+            level_column: Name of the column holding the level in the rows returned by `update`
+        """
+        self.level_column = level_column
+
+        self.symbols = pd.Index([], dtype=object)
+        self.levels = np.empty(0, dtype=float)
+        self.last_prices = np.empty(0, dtype=float)
+        self.above = np.zeros(0, dtype=bool)
+
+        # Row positions of the watch list in the last frame seen (reused while the frame is unchanged)
+        self._aligned_frame: Optional[pd.DataFrame] = None
+        self._positions = np.empty(0, dtype=np.int64)
+
+        self.updated_at: Optional[datetime] = None
+        self.tick_count = 0
+        self.event_count = 0
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def set_watchlist(self, symbols: Sequence[str], levels: Sequence[float]):
+        """
+        Replace the watch list.
+
+        Symbols that were already watched keep their last price and above/below state, so
+        refreshing the list does not re-report a cross. New symbols start below their level.
+
+        Args:
+            symbols: Symbols to watch
+            levels: Level per symbol (NaN for unknown levels, which never cross)
+        """
+        frame = pd.DataFrame({"symbol": list(symbols), "level": np.asarray(levels, dtype=float)})
+        frame = frame.drop_duplicates("symbol", keep="last")
+        new_symbols = pd.Index(frame["symbol"].to_numpy(dtype=object))
+
+        previous = self.symbols.get_indexer(new_symbols)
+        carried = previous >= 0
+
+        last_prices = np.full(len(new_symbols), np.nan)
+        last_prices[carried] = self.last_prices[previous[carried]]
+        above = np.zeros(len(new_symbols), dtype=bool)
+        above[carried] = self.above[previous[carried]]
+
+        self.symbols = new_symbols
+        self.levels = frame["level"].to_numpy(dtype=float)
+        self.last_prices = last_prices
+        self.above = above
+        self._aligned_frame = None
+        logger.info(f"Watching {len(self.symbols)} symbols ({int(carried.sum())} carried over)")
+
+    def _align(self, frame: pd.DataFrame, key: str) -> np.ndarray:
+        """Row position of every watched symbol in `frame` (-1 if missing)."""
+        if frame is self._aligned_frame:
+            return self._positions
+        names = pd.Index(frame[key])
+        if names.is_unique:
+            positions = names.get_indexer(self.symbols)
+        else:
+            # Keep the first row of duplicated symbols
+            first = ~names.duplicated()
+            rows = np.flatnonzero(first)
+            found = names[first].get_indexer(self.symbols)
+            positions = np.where(found >= 0, rows[found], -1)
+        self._aligned_frame = frame
+        self._positions = positions
+        return positions
+
+    def update(self, frame: pd.DataFrame, key: str = "name", price_column: str = "close") -> pd.DataFrame:
+        """
+        Observe a new price for every watched symbol and return the fresh crosses.
+
+        Args:
+            frame: Quotes for (at least) the watched symbols, e.g. the market snapshot
+            key: Column with the symbols
+            price_column: Column with the current price
+
+        Returns:
+            Rows of `frame` for symbols that moved from below to above their level since the
+            previous observation, with the level added as `level_column`
+        """
+        positions = self._align(frame, key)
+        found = positions >= 0
+
+        prices = np.full(len(positions), np.nan)
+        prices[found] = pd.to_numeric(frame[price_column], errors="coerce").to_numpy(dtype=float)[positions[found]]
+
+        observed = ~np.isnan(prices) & ~np.isnan(self.levels)
+        above_now = observed & (prices > self.levels)
+        crossed = above_now & ~self.above
+
+        # Symbols without a price this tick keep their previous state
+        self.above = np.where(observed, above_now, self.above)
+        self.last_prices = np.where(np.isnan(prices), self.last_prices, prices)
+        self.updated_at = datetime.now()
+        self.tick_count += 1
+        self.event_count += int(crossed.sum())
+
+        rows = frame.iloc[positions[crossed]].copy()
+        rows[self.level_column] = self.levels[crossed]
+        return rows
+
+    def stats(self) -> Dict[str, Any]:
+        """Return watch list counters for debugging."""
+        return {
+            "watching": len(self.symbols),
+            "above": int(self.above.sum()),
+            "tick_count": self.tick_count,
+            "event_count": self.event_count,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
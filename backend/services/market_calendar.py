@@ -0,0 +1,283 @@
+import importlib.util
+import logging
+import os
+import tempfile
+import threading
+from datetime import date, datetime, time, timezone
+from typing import List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_NAME = os.environ.get("MARKET_CALENDAR_NAME", "NYSE")
+
+# Years of sessions precomputed before and after today
+YEARS_BACK = int(os.environ.get("MARKET_CALENDAR_YEARS_BACK", "5"))
+YEARS_FORWARD = int(os.environ.get("MARKET_CALENDAR_YEARS_FORWARD", "2"))
+
+# Session tables are cached here so restarts skip the calendar computation
+CACHE_FILE = os.environ.get(
+    "MARKET_CALENDAR_CACHE_FILE",
+    os.path.join(tempfile.gettempdir(), "stockscreener", f"market_calendar_{CALENDAR_NAME.lower()}.npz"),
+)
+
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+
+# Regular hours used when pandas_market_calendars is not installed
+FALLBACK_OPEN = time(9, 30)
+FALLBACK_CLOSE = time(16, 0)
+
+DateLike = Union[date, datetime, str]
+
+# Session sources, stored in the cache so a fallback table is rebuilt once the real calendar is available
+EXCHANGE_SOURCE = "pandas_market_calendars"
+WEEKDAY_SOURCE = "weekdays"
+
+
+def _calendar_source() -> str:
+    """Source `_build_sessions` would use in this environment."""
+    return EXCHANGE_SOURCE if importlib.util.find_spec("pandas_market_calendars") else WEEKDAY_SOURCE
+
+
+def _to_day(value: Optional[DateLike] = None) -> np.datetime64:
+    """Normalise a date, datetime or "YYYY-MM-DD" string (default: today in New York) to datetime64[D]."""
+    if value is None:
+        value = datetime.now(MARKET_TIMEZONE).date()
+    elif isinstance(value, str):
+        value = datetime.strptime(value[:10].replace("/", "-"), "%Y-%m-%d").date()
+    elif isinstance(value, datetime):
+        value = value.astimezone(MARKET_TIMEZONE).date() if value.tzinfo else value.date()
+    return np.datetime64(value, "D")
+
+
+def _build_sessions(start: date, end: date) -> Tuple[np.ndarray, np.ndarray, np.ndarray, str]:
+    """
+    Compute session days with their open and close times (UTC epoch seconds).
+
+    Uses the exchange calendar from pandas_market_calendars (holidays, early closes) and
+    falls back to weekdays with regular hours if it is not installed.
+
+    Returns:
+        (sessions, opens, closes, source)
+    """
+    try:
+        import pandas_market_calendars as mcal
+
+        schedule = mcal.get_calendar(CALENDAR_NAME).schedule(start_date=start, end_date=end)
+        sessions = schedule.index.values.astype("datetime64[D]")
+        opens = schedule["market_open"].dt.tz_convert("UTC").dt.tz_localize(None).values.astype("datetime64[s]")
+        closes = schedule["market_close"].dt.tz_convert("UTC").dt.tz_localize(None).values.astype("datetime64[s]")
+        return sessions, opens.astype(np.int64), closes.astype(np.int64), EXCHANGE_SOURCE
+    except ImportError:
+        logger.warning("pandas_market_calendars not installed, using weekday sessions without holidays")
+
+    days = pd.bdate_range(start, end)
+    local_open = (days + pd.Timedelta(hours=FALLBACK_OPEN.hour, minutes=FALLBACK_OPEN.minute)).tz_localize(
+        MARKET_TIMEZONE
+    )
+    local_close = (days + pd.Timedelta(hours=FALLBACK_CLOSE.hour, minutes=FALLBACK_CLOSE.minute)).tz_localize(
+        MARKET_TIMEZONE
+    )
+    opens = local_open.tz_convert("UTC").tz_localize(None).values.astype("datetime64[s]").astype(np.int64)
+    closes = local_close.tz_convert("UTC").tz_localize(None).values.astype("datetime64[s]").astype(np.int64)
+    return days.values.astype("datetime64[D]"), opens, closes, WEEKDAY_SOURCE
+
+
+class MarketCalendar:
+    """
+    Precomputed exchange session table with constant-time lookups.
+
+    Sessions for `years_back` years before and `years_forward` years after today are computed
+    once (or loaded from `cache_file`) into sorted arrays. Two day-indexed arrays then map any
+    calendar day in the range straight to the previous and next session, so previous/next
+    session, session open/close and "is the market open" are plain array reads.
+    """
+
+    def __init__(
+        self,
+        years_back: int = YEARS_BACK,
+        years_forward: int = YEARS_FORWARD,
+        cache_file: Optional[str] = CACHE_FILE,
+    ):
+        """
+        Args:
+            years_back: Years of history to precompute
+            years_forward: Years of future sessions to precompute
+            cache_file: .npz file used to persist the session table (None disables caching)
+        """
+        self.years_back = years_back
+        self.years_forward = years_forward
+        self.cache_file = cache_file
+
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.source: Optional[str] = None
+
+        self.sessions = np.empty(0, dtype="datetime64[D]")
+        self.opens = np.empty(0, dtype=np.int64)
+        self.closes = np.empty(0, dtype=np.int64)
+
+        # Day-indexed lookups: offset from _first_day -> session position
+        self._first_day = np.datetime64("1970-01-01", "D")
+        self._session_at = np.empty(0, dtype=np.int64)  # -1 on non-session days
+        self._last_at_or_before = np.empty(0, dtype=np.int64)  # -1 before the first session
+
+    def _wanted_range(self) -> Tuple[date, date]:
+        today = datetime.now(MARKET_TIMEZONE).date()
+        return date(today.year - self.years_back, 1, 1), date(today.year + self.years_forward, 12, 31)
+
+    def _load_cache(self, start: date, end: date) -> bool:
+        """Load the session table from the cache file if it covers [start, end]."""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return False
+        try:
+            with np.load(self.cache_file) as cached:
+                if str(cached["calendar"]) != CALENDAR_NAME:
+                    return False
+                # Tables cached without a source predate it and are treated as weekday fallbacks
+                source = str(cached["source"]) if "source" in cached.files else WEEKDAY_SOURCE
+                if source != _calendar_source():
+                    return False
+                if cached["start"] > np.datetime64(start, "D") or cached["end"] < np.datetime64(end, "D"):
+                    return False
+                self._set_sessions(
+                    cached["sessions"], cached["opens"], cached["closes"], cached["start"], cached["end"]
+                )
+                self.source = source
+            return True
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable market calendar cache {self.cache_file}: {str(e)}")
+            return False
+
+    def _save_cache(self, start: date, end: date):
+        if not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            np.savez(
+                self.cache_file,
+                calendar=np.array(CALENDAR_NAME),
+                source=np.array(self.source),
+                start=np.datetime64(start, "D"),
+                end=np.datetime64(end, "D"),
+                sessions=self.sessions,
+                opens=self.opens,
+                closes=self.closes,
+            )
+        except Exception as e:
+            logger.warning(f"Could not write market calendar cache {self.cache_file}: {str(e)}")
+
+    def _set_sessions(self, sessions, opens, closes, start, end):
+        """Install session arrays and rebuild the day-indexed lookups for [start, end]."""
+        first_day = np.datetime64(start, "D")
+        num_days = int((np.datetime64(end, "D") - first_day).astype(np.int64)) + 1
+        offsets = (sessions - first_day).astype(np.int64)
+
+        session_at = np.full(num_days, -1, dtype=np.int64)
+        session_at[offsets] = np.arange(len(sessions))
+
+        # Position of the last session on or before each day (forward fill of session_at)
+        last_at_or_before = np.maximum.accumulate(session_at)
+
+        self.sessions, self.opens, self.closes = sessions, opens, closes
+        self._first_day, self._session_at, self._last_at_or_before = first_day, session_at, last_at_or_before
+
+    def load(self):
+        """Precompute (or load from cache) the session table. Safe to call repeatedly."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            start, end = self._wanted_range()
+            if self._load_cache(start, end):
+                logger.info(f"Loaded {len(self.sessions)} {CALENDAR_NAME} sessions from {self.cache_file}")
+            else:
+                sessions, opens, closes, self.source = _build_sessions(start, end)
+                self._set_sessions(sessions, opens, closes, start, end)
+                self._save_cache(start, end)
+                logger.info(f"Computed {len(self.sessions)} {CALENDAR_NAME} sessions ({start} to {end})")
+            self._loaded = True
+
+    def _offset(self, day: np.datetime64) -> int:
+        """
+        Offset of `day` in the day-indexed arrays (raises if outside the precomputed range).
+
+        Loads the table on first use, so callers must read the arrays only after calling this.
+        """
+        self.load()
+        offset = int((day - self._first_day).astype(np.int64))
+        if offset < 0 or offset >= len(self._session_at):
+            raise ValueError(f"{day} is outside the precomputed {CALENDAR_NAME} calendar")
+        return offset
+
+    def is_session(self, day: Optional[DateLike] = None) -> bool:
+        """Return True if `day` (default: today) is a trading session."""
+        offset = self._offset(_to_day(day))
+        return self._session_at[offset] >= 0
+
+    def previous_session(self, day: Optional[DateLike] = None) -> Optional[date]:
+        """Return the last session strictly before `day` (default: today)."""
+        offset = self._offset(_to_day(day))
+        position = self._last_at_or_before[offset - 1] if offset > 0 else -1
+        return self.sessions[position].astype(date) if position >= 0 else None
+
+    def session_on_or_before(self, day: Optional[DateLike] = None) -> Optional[date]:
+        """Return `day` if it is a session, otherwise the last session before it."""
+        offset = self._offset(_to_day(day))
+        position = self._last_at_or_before[offset]
+        return self.sessions[position].astype(date) if position >= 0 else None
+
+    def next_session(self, day: Optional[DateLike] = None) -> Optional[date]:
+        """Return the first session strictly after `day` (default: today)."""
+        offset = self._offset(_to_day(day))
+        position = self._last_at_or_before[offset] + 1
+        return self.sessions[position].astype(date) if position < len(self.sessions) else None
+
+    def session_open_close(self, day: Optional[DateLike] = None) -> Optional[Tuple[datetime, datetime]]:
+        """Return the (open, close) times of the session on `day` as UTC datetimes, or None."""
+        offset = self._offset(_to_day(day))
+        position = self._session_at[offset]
+        if position < 0:
+            return None
+        return (
+            datetime.fromtimestamp(int(self.opens[position]), tz=timezone.utc),
+            datetime.fromtimestamp(int(self.closes[position]), tz=timezone.utc),
+        )
+
+    def is_market_open(self, at: Optional[datetime] = None) -> bool:
+        """Return True if the regular session is open at `at` (default: now)."""
+        at = at or datetime.now(timezone.utc)
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=MARKET_TIMEZONE)
+        offset = self._offset(_to_day(at))
+        position = self._session_at[offset]
+        if position < 0:
+            return False
+        timestamp = int(at.timestamp())
+        return bool(self.opens[position] <= timestamp < self.closes[position])
+
+    def sessions_between(self, start: DateLike, end: DateLike) -> List[date]:
+        """Return all sessions in [start, end], inclusive."""
+        self.load()
+        lo = np.searchsorted(self.sessions, _to_day(start), side="left")
+        hi = np.searchsorted(self.sessions, _to_day(end), side="right")
+        return self.sessions[lo:hi].astype(date).tolist()
+
+    def stats(self):
+        """Return table information for debugging."""
+        return {
+            "calendar": CALENDAR_NAME,
+            "source": self.source,
+            "sessions": len(self.sessions),
+            "first_session": str(self.sessions[0]) if len(self.sessions) else None,
+            "last_session": str(self.sessions[-1]) if len(self.sessions) else None,
+            "cache_file": self.cache_file,
+        }
+
+
+# Process-wide calendar, loaded on first use (or at API startup)
+market_calendar = MarketCalendar()
@@ -0,0 +1,391 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import aiohttp
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Trades / quotes WebSocket (Alpaca market data protocol); point it at the replay server for local testing
+STREAM_URL = os.environ.get(
+    "MARKET_DATA_STREAM_URL", f"wss://stream.data.alpaca.markets/v2/{os.environ.get('ALPACA_DATA_FEED', 'iex')}"
+)
+
+# Set to false to keep every component on REST polling
+STREAM_ENABLED = os.environ.get("MARKET_DATA_STREAM_ENABLED", "true").lower() == "true"
+
+# Streamed prices older than this are not trusted by readers of the table
+MAX_AGE_SECONDS = float(os.environ.get("MARKET_DATA_MAX_AGE_SECONDS", "60"))
+
+# Reconnect backoff bounds after a dropped connection
+RECONNECT_MIN_SECONDS = float(os.environ.get("MARKET_DATA_RECONNECT_MIN_SECONDS", "1"))
+RECONNECT_MAX_SECONDS = float(os.environ.get("MARKET_DATA_RECONNECT_MAX_SECONDS", "60"))
+
+
+class _Tick:
+    __slots__ = (
+        "price",
+        "size",
+        "trade_time",
+        "trade_received",
+        "bid",
+        "ask",
+        "bid_size",
+        "ask_size",
+        "quote_time",
+        "quote_received",
+    )
+
+    def __init__(self):
+        self.price = self.size = self.trade_time = self.trade_received = None
+        self.bid = self.ask = self.bid_size = self.ask_size = self.quote_time = self.quote_received = None
+
+
+class LastTickTable:
+    """
+    Last trade and last quote per symbol, updated in place by the stream consumer.
+
+    Readers get the latest streamed price in O(1) instead of asking the REST API. Every
+    entry remembers when it was received, so readers can ignore prices older than
+    `max_age_seconds` (e.g. after a disconnect) and fall back to their REST path.
+    """
+
+    def __init__(self, max_age_seconds: float = MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self._ticks: Dict[str, _Tick] = {}
+
+    def __len__(self) -> int:
+        return len(self._ticks)
+
+    def update_trade(self, symbol: str, price: float, size: Optional[float], timestamp: Optional[str], received: float):
+        tick = self._ticks.get(symbol)
+        if tick is None:
+            tick = self._ticks[symbol] = _Tick()
+        tick.price, tick.size, tick.trade_time, tick.trade_received = price, size, timestamp, received
+
+    def update_quote(
+        self,
+        symbol: str,
+        bid: Optional[float],
+        ask: Optional[float],
+        bid_size: Optional[float],
+        ask_size: Optional[float],
+        timestamp: Optional[str],
+        received: float,
+    ):
+        tick = self._ticks.get(symbol)
+        if tick is None:
+            tick = self._ticks[symbol] = _Tick()
+        tick.bid, tick.ask, tick.bid_size, tick.ask_size = bid, ask, bid_size, ask_size
+        tick.quote_time, tick.quote_received = timestamp, received
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Last trade and quote of a symbol (None if nothing was streamed for it)."""
+        tick = self._ticks.get(symbol)
+        if tick is None:
+            return None
+        return {name: getattr(tick, name) for name in _Tick.__slots__}
+
+    def price(self, symbol: str, max_age_seconds: Optional[float] = None) -> Optional[float]:
+        """Last trade price of a symbol, or None if there is none younger than `max_age_seconds`."""
+        max_age_seconds = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+        tick = self._ticks.get(symbol)
+        if tick is None or tick.price is None or time.time() - tick.trade_received > max_age_seconds:
+            return None
+        return tick.price
+
+    def prices(self, symbols: Iterable[str], max_age_seconds: Optional[float] = None) -> Dict[str, float]:
+        """Fresh last trade prices of the symbols that have one."""
+        prices = {}
+        for symbol in symbols:
+            price = self.price(symbol, max_age_seconds)
+            if price is not None:
+                prices[symbol] = price
+        return prices
+
+    def overlay(
+        self, frame: pd.DataFrame, key: str, price_column: str, max_age_seconds: Optional[float] = None
+    ) -> pd.DataFrame:
+        """
+        Return a copy of `frame` with `price_column` replaced by the fresh streamed prices.
+
+        Rows without a fresh streamed price keep the value they had.
+        """
+        prices = self.prices(frame[key].unique(), max_age_seconds)
+        frame = frame.copy()
+        if prices:
+            streamed = frame[key].map(prices)
+            frame[price_column] = streamed.fillna(pd.to_numeric(frame[price_column], errors="coerce"))
+        return frame
+
+    def forget(self, symbols: Iterable[str]):
+        """Drop the entries of symbols that are no longer subscribed."""
+        for symbol in symbols:
+            self._ticks.pop(symbol, None)
+
+
+class MarketDataStream:
+    """
+    WebSocket consumer of real-time trades and quotes feeding a LastTickTable.
+
+    Components declare what they need with `set_watchlist(owner, symbols)`; the stream
+    subscribes to the union of every owner's symbols and sends subscribe / unsubscribe
+    messages as the watch lists change (also from worker threads). Each frame received
+    updates the table, calls the listeners once with the trade prices of the frame and
+    wakes the tasks waiting in `wait_for_trades` / `next_price` for one of its symbols,
+    so a price change reaches them in milliseconds instead of at the next poll. The
+    connection is re-established with exponential backoff and the current union is
+    subscribed again.
+    """
+
+    def __init__(self, url: str = STREAM_URL, api_key: Optional[str] = None, api_secret: Optional[str] = None):
+        """
+        Args:
+            url: WebSocket URL of the trades / quotes feed
+            api_key: API key sent in the auth message (defaults to ALPACA_API_KEY)
+            api_secret: API secret sent in the auth message (defaults to ALPACA_API_SECRET)
+        """
+        self.url = url
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.table = LastTickTable()
+
+        self._lock = threading.Lock()
+        self._watchlists: Dict[str, Set[str]] = {}
+        self._subscribed: Set[str] = set()
+        self._listeners: List[Callable[[Dict[str, float]], Any]] = []
+        self._waiters: Dict[str, Set[asyncio.Future]] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._changed: Optional[asyncio.Event] = None
+        self.connected = False
+
+        self.message_count = 0
+        self.trade_count = 0
+        self.quote_count = 0
+        self.reconnect_count = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def symbols(self) -> Set[str]:
+        """Union of every owner's watch list."""
+        with self._lock:
+            return set().union(*self._watchlists.values())
+
+    def set_watchlist(self, owner: str, symbols: Iterable[str]):
+        """
+        Replace the symbols watched by `owner` (an empty list removes the owner).
+
+        Safe to call from any thread; the subscription change is sent by the event loop.
+        """
+        symbols = {symbol.upper() for symbol in symbols}
+        with self._lock:
+            if symbols:
+                self._watchlists[owner] = symbols
+            else:
+                self._watchlists.pop(owner, None)
+        if self.running:
+            try:
+                self._loop.call_soon_threadsafe(self._changed.set)
+            except RuntimeError:
+                # The loop is already closed (shutdown)
+                pass
+
+    def add_listener(self, listener: Callable[[Dict[str, float]], Any]):
+        """Call `listener(prices)` with the trade prices of every received frame."""
+        self._listeners.append(listener)
+
+    def start(self):
+        """Start the consumer task (call from the running event loop)."""
+        if self.running:
+            return
+        if not STREAM_ENABLED:
+            logger.info("Market data stream disabled, components keep polling REST")
+            return
+        self.api_key = self.api_key or os.environ.get("ALPACA_API_KEY")
+        self.api_secret = self.api_secret or os.environ.get("ALPACA_API_SECRET")
+        self._loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Market data stream started ({self.url})")
+
+    async def stop(self):
+        """Stop the consumer task and close the connection."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.connected = False
+
+    async def _run(self):
+        delay = RECONNECT_MIN_SECONDS
+        while True:
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.ws_connect(self.url, heartbeat=30) as ws:
+                        await self._authenticate(ws)
+                        self.connected = True
+                        delay = RECONNECT_MIN_SECONDS
+                        logger.info(f"Market data stream connected to {self.url}")
+                        await self._consume(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Market data stream error: {str(e)}")
+            finally:
+                self.connected = False
+                self._subscribed = set()
+
+            self.reconnect_count += 1
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+            delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+
+    async def _expect(self, ws, expected: str):
+        """Read one control frame and fail unless it is the `expected` success message."""
+        message = await ws.receive(timeout=10)
+        if message.type != aiohttp.WSMsgType.TEXT:
+            raise ConnectionError(f"Unexpected {message.type.name} message during the handshake")
+        for item in json.loads(message.data):
+            if item.get("T") == "error":
+                raise ConnectionError(f"Stream refused the connection: {item.get('code')} {item.get('msg')}")
+            if item.get("T") == "success" and item.get("msg") == expected:
+                return
+        raise ConnectionError(f"Expected '{expected}' from the stream, got {message.data}")
+
+    async def _authenticate(self, ws):
+        await self._expect(ws, "connected")
+        await ws.send_json({"action": "auth", "key": self.api_key, "secret": self.api_secret})
+        await self._expect(ws, "authenticated")
+
+    async def _consume(self, ws):
+        """Read frames while a second task keeps the subscriptions in line with the watch lists."""
+        self._changed.set()
+        subscriber = asyncio.create_task(self._sync_subscriptions(ws))
+        try:
+            async for message in ws:
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    self._handle(json.loads(message.data))
+                elif message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    break
+        finally:
+            subscriber.cancel()
+            await asyncio.gather(subscriber, return_exceptions=True)
+
+    async def _sync_subscriptions(self, ws):
+        while True:
+            await self._changed.wait()
+            self._changed.clear()
+            wanted = self.symbols()
+            added = sorted(wanted - self._subscribed)
+            removed = sorted(self._subscribed - wanted)
+            if added:
+                await ws.send_json({"action": "subscribe", "trades": added, "quotes": added})
+            if removed:
+                await ws.send_json({"action": "unsubscribe", "trades": removed, "quotes": removed})
+                self.table.forget(removed)
+            self._subscribed = wanted
+            if added or removed:
+                logger.info(f"Streaming {len(wanted)} symbols (+{len(added)} / -{len(removed)})")
+
+    def _handle(self, items: List[Dict[str, Any]]):
+        """Apply one frame of messages to the table and notify listeners and waiters once."""
+        received = time.time()
+        prices: Dict[str, float] = {}
+        for item in items:
+            kind = item.get("T")
+            if kind == "t":
+                self.table.update_trade(item["S"], item["p"], item.get("s"), item.get("t"), received)
+                prices[item["S"]] = item["p"]
+                self.trade_count += 1
+            elif kind == "q":
+                self.table.update_quote(
+                    item["S"], item.get("bp"), item.get("ap"), item.get("bs"), item.get("as"), item.get("t"), received
+                )
+                self.quote_count += 1
+            elif kind == "error":
+                logger.error(f"Market data stream error {item.get('code')}: {item.get('msg')}")
+        self.message_count += len(items)
+        if not prices:
+            return
+
+        for listener in self._listeners:
+            try:
+                listener(prices)
+            except Exception as e:
+                logger.error(f"Market data listener error: {str(e)}")
+
+        woken = set()
+        for symbol in prices:
+            woken.update(self._waiters.get(symbol, ()))
+        for future in woken:
+            if not future.done():
+                future.set_result(prices)
+
+    async def wait_for_trades(self, symbols: Iterable[str], timeout: float) -> Dict[str, float]:
+        """
+        Wait until a trade of one of `symbols` arrives.
+
+        Returns:
+            Trade prices of the awaited symbols in the frame that woke us (empty on timeout)
+        """
+        symbols = [symbol.upper() for symbol in symbols]
+        if not self.connected or not symbols:
+            await asyncio.sleep(timeout)
+            return {}
+        future = asyncio.get_running_loop().create_future()
+        for symbol in symbols:
+            self._waiters.setdefault(symbol, set()).add(future)
+        try:
+            prices = await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            return {}
+        finally:
+            for symbol in symbols:
+                waiters = self._waiters.get(symbol)
+                if waiters is not None:
+                    waiters.discard(future)
+                    if not waiters:
+                        del self._waiters[symbol]
+        return {symbol: prices[symbol] for symbol in symbols if symbol in prices}
+
+    async def next_price(self, symbol: str, timeout: float) -> Optional[float]:
+        """
+        Wait for the next trade of `symbol` (at most `timeout` seconds).
+
+        Returns:
+            The new trade price, the last streamed price if nothing traded in time but that
+            price is still fresh, or None when the stream has no fresh price (poll REST instead)
+        """
+        symbol = symbol.upper()
+        prices = await self.wait_for_trades([symbol], timeout)
+        if symbol in prices:
+            return prices[symbol]
+        return self.table.price(symbol)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return connection and traffic counters for debugging."""
+        return {
+            "url": self.url,
+            "connected": self.connected,
+            "owners": len(self._watchlists),
+            "subscribed": len(self._subscribed),
+            "symbols": len(self.table),
+            "messages": self.message_count,
+            "trades": self.trade_count,
+            "quotes": self.quote_count,
+            "reconnects": self.reconnect_count,
+            "waiters": sum(len(waiters) for waiters in self._waiters.values()),
+        }
+
+
+# Process-wide stream shared by the strategies, the alert engine and the cross monitor
+market_data_stream = MarketDataStream()
@@ -2,7 +2,10 @@ import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
 
+import pandas as pd
+
 from backend.services.alpaca_service import AlpacaService
+from backend.services.market_data_stream import market_data_stream
 from backend.services.stock_screener_service import StockScreenerService
 from backend.services.tradingview_service import get_stock_price_tv
 
@@ -336,14 +339,19 @@ class TradingStrategyService:
         Monitor a stock and buy when price crosses above the previous day's high
         (previous check below, current check above), then sell 5 minutes after each entry.
 
+        Prices come from the market data stream as trades happen; while the stream has no
+        fresh price for the symbol it falls back to polling REST every 5 seconds.
+
         Args:
             symbol: Stock symbol
             target_price: Price threshold (prev day high)
             shares: Number of shares to buy
             position_size: Dollar amount to invest
         """
+        watch_owner = f"{type(self).__name__}:{symbol}"
         try:
             logger.info(f"Monitoring {symbol} for crosses above ${target_price}")
+            market_data_stream.set_watchlist(watch_owner, [symbol])
 
             # Track when we're in a position to avoid multiple entries at once
             in_position = False
@@ -369,10 +377,13 @@ class TradingStrategyService:
                     logger.info(f"Reached maximum trades for {symbol} today")
                     break
 
-                try:
-                    current_price = self.alpaca.get_current_price(symbol)
-                except Exception:
-                    current_price = get_stock_price_tv(symbol)["price"]
+                # Wake up on the next streamed trade; poll REST when the stream has no fresh price
+                current_price = await market_data_stream.next_price(symbol, timeout=5)
+                if current_price is None:
+                    try:
+                        current_price = await self.alpaca.get_current_price(symbol)
+                    except Exception:
+                        current_price = get_stock_price_tv(symbol)["price"]
 
                 # Detect crossing above target price (previous check below, current check above)
                 if (
@@ -405,9 +416,6 @@ class TradingStrategyService:
                 # Update last price
                 last_price = current_price
 
-                # Wait for next price update
-                await asyncio.sleep(5)  # Check price every 5 seconds
-
             # Wait for any remaining active trades to complete
             if active_trades:
                 await asyncio.gather(*active_trades)
@@ -420,6 +428,8 @@ class TradingStrategyService:
         except Exception as e:
             logger.error(f"Error monitoring and trading {symbol}: {str(e)}")
             return {"success": False, "message": str(e)}
+        finally:
+            market_data_stream.set_watchlist(watch_owner, [])
 
     def _position_closed_callback(self, symbol):
         """Callback function when a position is closed"""
@@ -446,7 +456,7 @@ class TradingStrategyService:
 
             # Get current price for logging
             try:
-                current_price = self.alpaca.get_current_price(symbol)
+                current_price = await self.alpaca.get_current_price(symbol)
             except Exception:
                 current_price = get_stock_price_tv(symbol)["price"]
 
@@ -503,6 +513,9 @@ class TradingStrategyService:
             # Get list of trading days in the date range
             trading_days = self.alpaca.get_trading_days(start_date, end_date)
 
+            # 1-minute bars of the whole universe and date range in one bulk fetch
+            history = await self.screener.load_historical_bars(start_date, end_date)
+
             # Initialize results
             backtest_results = {
                 "trades": [],
@@ -528,7 +541,7 @@ class TradingStrategyService:
                 logger.info(f"Backtesting day: {day}")
 
                 # Get stocks that opened below previous day's high for this day
-                stocks = await self.screener.get_historical_stocks_open_below_prev_high(day, screener_params)
+                stocks = await self.screener.get_historical_stocks_open_below_prev_high(day, screener_params, history)
 
                 # Skip if no stocks found
                 if not stocks:
@@ -544,26 +557,16 @@ class TradingStrategyService:
                     # Calculate target price (previous day's high)
                     target_price = prev_day_high
 
-                    # Get 1-minute bars for this stock on this day
-                    try:
-                        bars = self.alpaca.get_historical_bar(symbol, day, "1Min")
-                    except Exception as e:
-                        logger.error(f"Could not get bars for {symbol} on {day}: {str(e)}")
-                        continue
+                    # Regular-hours 1-minute bars for this stock on this day
+                    bars = history.get(getattr(symbol, "symbol", symbol), {}).get(day)
 
                     # Skip if no bars found
-                    if not bars:
+                    if bars is None or len(bars) < 6:  # Need at least 6 bars (5 for initial wait + 1 for trading)
                         continue
 
-                    # Filter bars to only include market hours
-                    bars = [
-                        b
-                        for b in bars
-                        if b["t"].hour >= 14 and b["t"].hour < 21 and (b["t"].hour != 14 or b["t"].minute >= 30)
-                    ]
-
-                    if len(bars) < 6:  # Need at least 6 bars (5 for initial wait + 1 for trading)
-                        continue
+                    # Columnar closes and UTC bar times
+                    closes = bars["c"].tolist()
+                    times = pd.DatetimeIndex(bars["t"]).tz_localize("UTC")
 
                     # Skip first 5 minutes of trading day
                     start_index = 5
@@ -577,16 +580,13 @@ class TradingStrategyService:
                         # if trades_today >= max_trades_per_day:
                         #     break
 
-                        prev_bar = bars[i - 1]
-                        current_bar = bars[i]
-
-                        prev_price = prev_bar["c"]
-                        current_price = current_bar["c"]
+                        prev_price = closes[i - 1]
+                        current_price = closes[i]
 
                         # Check for crossing above target price (prev bar below, current bar above)
                         if prev_price < target_price and current_price >= target_price:
                             # Price has crossed above target - BUY
-                            entry_time = current_bar["t"]
+                            entry_time = times[i]
                             entry_price = current_price
 
                             # Calculate position size
@@ -599,8 +599,8 @@ class TradingStrategyService:
 
                             # Find exit price (5 minutes after entry)
                             exit_index = min(i + 5, len(bars) - 1)  # 5 minutes later or end of day
-                            exit_price = bars[exit_index]["c"]
-                            exit_time = bars[exit_index]["t"]
+                            exit_price = closes[exit_index]
+                            exit_time = times[exit_index]
 
                             # Calculate profit/loss
                             profit_loss = (exit_price - entry_price) * shares
@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import os
+import random
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Triggered alerts waiting for delivery; beyond it new alerts are dropped (they stay
+# available from /api/alerts/triggered)
+QUEUE_SIZE = int(os.environ.get("NOTIFY_QUEUE_SIZE", "10000"))
+
+# Concurrent delivery workers
+WORKERS = int(os.environ.get("NOTIFY_WORKERS", "2"))
+
+# How long a worker keeps collecting alerts after the first one before delivering
+COALESCE_SECONDS = float(os.environ.get("NOTIFY_COALESCE_SECONDS", "0.5"))
+
+# Upper bound on alerts collected into one round of deliveries
+MAX_BATCH_SIZE = int(os.environ.get("NOTIFY_MAX_BATCH_SIZE", "500"))
+
+# Retries of a failed send, with exponential backoff starting at RETRY_BASE_SECONDS
+MAX_RETRIES = int(os.environ.get("NOTIFY_MAX_RETRIES", "3"))
+RETRY_BASE_SECONDS = float(os.environ.get("NOTIFY_RETRY_BASE_SECONDS", "1"))
+
+# A single send slower than this counts as failed
+SEND_TIMEOUT_SECONDS = float(os.environ.get("NOTIFY_SEND_TIMEOUT_SECONDS", "10"))
+
+NOTIFICATION_MESSAGE_TYPE = "alert_notifications"
+
+
+class NotificationSender:
+    """
+    Delivery channel for batched alert notifications.
+
+    Subclasses implement `send`; raising an exception marks the delivery as failed and it
+    is retried with backoff by the dispatcher.
+    """
+
+    name = "sender"
+
+    async def send(self, user_id, alerts: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+
+class WebSocketSender(NotificationSender):
+    """Push notifications to the user's authenticated dashboard connections."""
+
+    name = "websocket"
+
+    def __init__(self, hub):
+        """
+        Args:
+            hub: BroadcastHub holding the connections
+        """
+        self.hub = hub
+
+    async def send(self, user_id, alerts: List[Dict[str, Any]]):
+        message = {
+            "type": NOTIFICATION_MESSAGE_TYPE,
+            "alerts": alerts,
+            "count": len(alerts),
+            "timestamp": datetime.now().isoformat(),
+        }
+        # No open dashboard, or every connection was lagging: fail so the dispatcher retries
+        # (a reconnecting dashboard or a drained queue gets the batch on a later attempt)
+        if not self.hub.send_to_user(user_id, message):
+            raise ConnectionError(f"No WebSocket connection of user {user_id} accepted the notifications")
+
+
+class NotificationDispatcher:
+    """
+    Asynchronous delivery of triggered alerts, decoupled from alert evaluation.
+
+    The alert engine only puts alerts on an asyncio queue (never waiting). Worker tasks
+    take the first queued alert, keep collecting for `coalesce_seconds`, group what they
+    collected by user and hand one batch per user to every sender. Failed sends are
+    retried with exponential backoff and jitter; slow or failing channels only delay
+    their own worker, never the alert checks.
+    """
+
+    def __init__(
+        self,
+        workers: int = WORKERS,
+        queue_size: int = QUEUE_SIZE,
+        coalesce_seconds: float = COALESCE_SECONDS,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_retries: int = MAX_RETRIES,
+        retry_base_seconds: float = RETRY_BASE_SECONDS,
+        send_timeout: float = SEND_TIMEOUT_SECONDS,
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.coalesce_seconds = coalesce_seconds
+        self.max_batch_size = max_batch_size
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.send_timeout = send_timeout
+
+        self.senders: List[NotificationSender] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self.submitted_count = 0
+        self.dropped_count = 0
+        self.batch_count = 0
+        self.retry_count = 0
+        self.failed_count = 0
+
+    def add_sender(self, sender: NotificationSender):
+        """Register a delivery channel."""
+        self.senders.append(sender)
+
+    def start(self):
+        """Create the queue and the worker tasks (call from the running event loop)."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker(number)) for number in range(self.workers)]
+        logger.info(f"Notification dispatcher started with {self.workers} workers, senders: {self._sender_names()}")
+
+    async def stop(self, timeout: float = 5):
+        """Deliver what is queued (up to `timeout` seconds) and stop the workers."""
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Stopping with {self._queue.qsize()} undelivered notifications")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, alert_data: Dict[str, Any]) -> bool:
+        """
+        Queue a triggered alert for delivery without waiting.
+
+        Returns:
+            False if the dispatcher is not running or its queue is full
+        """
+        if self._queue is None or not self.senders:
+            return False
+        try:
+            self._queue.put_nowait(alert_data)
+        except asyncio.QueueFull:
+            self.dropped_count += 1
+            return False
+        self.submitted_count += 1
+        return True
+
+    async def _collect(self) -> List[Dict[str, Any]]:
+        """Wait for one alert, then gather more for the coalescing window."""
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.coalesce_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker(self, number: int):
+        while True:
+            batch = await self._collect()
+            try:
+                by_user: Dict[Any, List[Dict[str, Any]]] = {}
+                for alert_data in batch:
+                    by_user.setdefault(alert_data.get("user_id"), []).append(alert_data)
+                self.batch_count += 1
+                await asyncio.gather(
+                    *(
+                        self._deliver(sender, user_id, alerts)
+                        for user_id, alerts in by_user.items()
+                        for sender in self.senders
+                    )
+                )
+            except Exception as e:
+                logger.error(f"Notification worker {number} error: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _deliver(self, sender: NotificationSender, user_id, alerts: List[Dict[str, Any]]):
+        """Send one user's batch through one channel, retrying with exponential backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                await asyncio.wait_for(sender.send(user_id, alerts), timeout=self.send_timeout)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.failed_count += 1
+                    logger.error(f"Giving up {sender.name} notification of {len(alerts)} alerts to {user_id}: {e}")
+                    return
+                self.retry_count += 1
+                delay = self.retry_base_seconds * 2**attempt
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+    def _sender_names(self) -> List[str]:
+        return [sender.name for sender in self.senders]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue and delivery counters for debugging."""
+        return {
+            "senders": self._sender_names(),
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "submitted": self.submitted_count,
+            "dropped": self.dropped_count,
+            "batches": self.batch_count,
+            "retries": self.retry_count,
+            "failed": self.failed_count,
+        }
+
+
+# Global dispatcher fed by the alert engine; senders are registered at application startup
+notification_dispatcher = NotificationDispatcher()
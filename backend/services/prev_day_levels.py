@@ -0,0 +1,198 @@
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+
+from backend.models.database import PriceHistory, Stock, db_session
+
+logger = logging.getLogger(__name__)
+
+# Format of PriceHistory.date as written by the daily job
+PRICE_HISTORY_DATE_FORMAT = "%Y/%m/%d"
+
+LEVEL_FIELDS = ["open", "high", "low", "close", "volume"]
+
+# How often to check whether the daily job has stored a newer session
+RECHECK_SECONDS = float(os.environ.get("PREV_DAY_LEVELS_RECHECK_SECONDS", "900"))
+
+
+class PrevDayLevels:
+    """
+    Previous session open/high/low/close/volume for every stored symbol, held in NumPy arrays.
+
+    The table is loaded from `price_history` with one query, keyed by the TradingView ticker
+    (`Stock.name`, the "name" column of the scanner snapshot) and shared by every
+    previous-day screener. It is rebuilt when the calendar day changes, when `invalidate`
+    is called (for example at the end of the daily job) or when a periodic check finds a
+    newer stored session.
+    """
+
+    def __init__(self, recheck_seconds: float = RECHECK_SECONDS):
+        """
+        Args:
+            recheck_seconds: Minimum interval between checks for a newer stored session
+        """
+        self.recheck_seconds = recheck_seconds
+
+        self._lock = threading.Lock()
+        self._as_of: Optional[date] = None
+        self._checked_at = 0.0
+        self._stale = True
+
+        self.session_date: Optional[str] = None
+        self.loaded_at: Optional[datetime] = None
+        self.load_count = 0
+        self._reset()
+
+    def _reset(self):
+        """Clear the arrays."""
+        self._index = pd.Index([], dtype=object)
+        self._arrays = {field: np.empty(0, dtype=float) for field in LEVEL_FIELDS}
+        self._frame = pd.DataFrame(columns=LEVEL_FIELDS, dtype=float)
+
+    @staticmethod
+    def _latest_session_before(day: date) -> Optional[str]:
+        """Return the most recent stored session date strictly before `day`."""
+        # Dates are zero-padded "%Y/%m/%d" strings, so string order is date order
+        db = db_session()
+        try:
+            return (
+                db.query(func.max(PriceHistory.date))
+                .filter(PriceHistory.date < day.strftime(PRICE_HISTORY_DATE_FORMAT))
+                .scalar()
+            )
+        finally:
+            db.close()
+
+    def _load(self, session_date: str):
+        """Load every symbol's levels for `session_date` into the arrays."""
+        db = db_session()
+        try:
+            rows = (
+                db.query(
+                    Stock.name,
+                    PriceHistory.open,
+                    PriceHistory.high,
+                    PriceHistory.low,
+                    PriceHistory.close,
+                    PriceHistory.volume,
+                )
+                .join(Stock, PriceHistory.stock_id == Stock.id)
+                .filter(PriceHistory.date == session_date)
+                .all()
+            )
+        finally:
+            db.close()
+
+        df = pd.DataFrame(rows, columns=["symbol", *LEVEL_FIELDS])
+        df = df[df["symbol"].notna()].drop_duplicates("symbol", keep="last")
+
+        self._index = pd.Index(df["symbol"].astype(str).to_numpy(dtype=object))
+        self._arrays = {
+            field: pd.to_numeric(df[field], errors="coerce").to_numpy(dtype=float) for field in LEVEL_FIELDS
+        }
+        self._frame = pd.DataFrame(self._arrays, index=self._index)
+        self.session_date = session_date
+        self.loaded_at = datetime.now()
+        self.load_count += 1
+        logger.info(f"Loaded previous day levels for {len(self._index)} symbols ({session_date})")
+
+    def ensure_loaded(self):
+        """Load or refresh the table if the day changed or a newer session was stored."""
+        today = datetime.now().date()
+        if self._as_of == today and (time.monotonic() - self._checked_at) < self.recheck_seconds:
+            return
+
+        with self._lock:
+            if self._as_of == today and (time.monotonic() - self._checked_at) < self.recheck_seconds:
+                return
+            try:
+                session_date = self._latest_session_before(today)
+                if session_date is None:
+                    logger.warning("No previous session found in price_history")
+                    self._reset()
+                    self.session_date = None
+                elif self._stale or session_date != self.session_date:
+                    self._load(session_date)
+                self._stale = False
+            except Exception as e:
+                logger.error(f"Error loading previous day levels: {str(e)}")
+            self._as_of = today
+            self._checked_at = time.monotonic()
+
+    def invalidate(self):
+        """Force a reload on the next access (call after new price history was stored)."""
+        with self._lock:
+            self._as_of = None
+            self._stale = True
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """Levels as a read-only DataFrame indexed by symbol with the LEVEL_FIELDS columns."""
+        self.ensure_loaded()
+        return self._frame
+
+    def __len__(self) -> int:
+        self.ensure_loaded()
+        return len(self._index)
+
+    def join(self, df: pd.DataFrame, key: str = "name", prefix: str = "prev_day_") -> pd.DataFrame:
+        """
+        Attach previous day levels to a frame with one hash lookup per column.
+
+        Args:
+            df: Frame holding the symbols to look up (not modified)
+            key: Column with the symbols
+            prefix: Prefix of the added columns (prev_day_open, prev_day_high, ...)
+
+        Returns:
+            Copy of `df` with the level columns added (NaN for unknown symbols)
+        """
+        self.ensure_loaded()
+        positions = self._index.get_indexer(df[key].astype(str))
+        found = positions >= 0
+        out = df.copy()
+        for field in LEVEL_FIELDS:
+            values = np.full(len(positions), np.nan)
+            values[found] = self._arrays[field][positions[found]]
+            out[f"{prefix}{field}"] = values
+        return out
+
+    def lookup(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """
+        Get one symbol's previous day levels.
+
+        Returns:
+            Dictionary with previous_day_date and previous_day_* fields, or None if unknown
+        """
+        self.ensure_loaded()
+        if not symbol:
+            return None
+        position = self._index.get_indexer([symbol.strip().upper()])[0]
+        if position < 0:
+            return None
+        levels = {f"previous_day_{field}": float(self._arrays[field][position]) for field in LEVEL_FIELDS}
+        volume = levels["previous_day_volume"]
+        levels["previous_day_volume"] = 0 if np.isnan(volume) else int(volume)
+        session_day = datetime.strptime(self.session_date, PRICE_HISTORY_DATE_FORMAT)
+        levels["previous_day_date"] = session_day.strftime("%Y-%m-%d")
+        return levels
+
+    def stats(self) -> Dict[str, Any]:
+        """Return load information for debugging."""
+        return {
+            "symbols": len(self._index),
+            "session_date": self.session_date,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "load_count": self.load_count,
+        }
+
+
+# Process-wide table shared by every previous-day screener
+prev_day_levels = PrevDayLevels()
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# How long the first price request waits for others to join its batch
+WINDOW_SECONDS = float(os.environ.get("QUOTE_BATCH_WINDOW_SECONDS", "0.05"))
+
+# Symbols per multi-symbol latest-quote request
+SYMBOLS_PER_REQUEST = int(os.environ.get("QUOTE_SYMBOLS_PER_REQUEST", "200"))
+
+
+class QuoteBatcher:
+    """
+    Coalesces concurrent latest-quote lookups into multi-symbol requests.
+
+    The first caller in a window schedules a flush `window_seconds` later; every caller
+    until then only adds its symbol and awaits a future. The flush sends the distinct
+    symbols in chunks of `max_symbols`, each chunk as one blocking request in a worker
+    thread, and resolves every waiting future with its symbol's quote (or the error of
+    its chunk). Hundreds of monitoring tasks polling on the same tick cost a handful of
+    requests instead of one each, and the event loop never blocks on them.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[List[str]], Dict[str, Any]],
+        window_seconds: float = WINDOW_SECONDS,
+        max_symbols: int = SYMBOLS_PER_REQUEST,
+    ):
+        """
+        Args:
+            fetch: Blocking function returning the latest quote per symbol for a list of symbols
+            window_seconds: Collection window opened by the first request of a batch
+            max_symbols: Symbols per `fetch` call
+        """
+        self.fetch = fetch
+        self.window_seconds = window_seconds
+        self.max_symbols = max_symbols
+
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self.request_count = 0
+        self.lookup_count = 0
+        self.batch_count = 0
+
+    async def get(self, symbol: str) -> Any:
+        """
+        Return the latest quote of one symbol, batched with concurrent lookups.
+
+        Raises:
+            KeyError: If the provider returned no quote for the symbol
+            Exception: Whatever the provider request raised
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(symbol, []).append(future)
+        self.lookup_count += 1
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+        return await future
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.window_seconds)
+        pending, self._pending = self._pending, {}
+        self._flush_task = None
+
+        symbols = list(pending)
+        chunks = [symbols[start : start + self.max_symbols] for start in range(0, len(symbols), self.max_symbols)]
+        self.batch_count += 1
+        await asyncio.gather(*(self._fetch_chunk(chunk, pending) for chunk in chunks))
+
+    async def _fetch_chunk(self, symbols: List[str], pending: Dict[str, List[asyncio.Future]]):
+        self.request_count += 1
+        try:
+            quotes = await asyncio.to_thread(self.fetch, symbols)
+        except Exception as e:
+            for symbol in symbols:
+                self._resolve(pending[symbol], error=e)
+            return
+        for symbol in symbols:
+            quote = quotes.get(symbol)
+            if quote is None:
+                self._resolve(pending[symbol], error=KeyError(symbol))
+            else:
+                self._resolve(pending[symbol], result=quote)
+
+    @staticmethod
+    def _resolve(futures: List[asyncio.Future], result: Any = None, error: Optional[Exception] = None):
+        for future in futures:
+            # Callers that were cancelled while waiting are skipped
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batching counters for debugging."""
+        return {
+            "lookups": self.lookup_count,
+            "batches": self.batch_count,
+            "requests": self.request_count,
+            "pending": sum(len(futures) for futures in self._pending.values()),
+        }
@@ -0,0 +1,131 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DELTA_MESSAGE_TYPE = "screener_delta"
+SNAPSHOT_MESSAGE_TYPE = "screener_snapshot"
+
+
+class _ScreenerState:
+    """Last published rows and sequence number of one screener."""
+
+    def __init__(self):
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.order: List[str] = []
+        self.sequence = 0
+        self.updated_at: Optional[datetime] = None
+
+
+class ScreenerDeltaPublisher:
+    """
+    Versioned change sets for live screener lists.
+
+    For every screener the last published rows are kept by symbol. Each new result is
+    compared with them and turned into a delta holding the rows that were added, the
+    symbols that were removed and, for rows that stayed, only the fields that changed.
+    Every non-empty delta gets the next sequence number of its screener; a client that
+    sees a gap in the sequence asks for a snapshot (rows plus current sequence) and
+    applies the following deltas on top of it.
+    """
+
+    def __init__(self, key: str = "symbol"):
+        """
+        Args:
+            key: Row field identifying a row (the stock symbol)
+        """
+        self.key = key
+        self._lock = threading.Lock()
+        self._screeners: Dict[str, _ScreenerState] = {}
+
+    def update(self, screener: str, rows: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Record the latest result of a screener and return the delta to publish.
+
+        Args:
+            screener: Screener name (also the suffix of its websocket topic)
+            rows: Complete current result, JSON-serialisable
+
+        Returns:
+            Delta message, or None if nothing changed
+        """
+        current = {}
+        order = []
+        for row in rows:
+            symbol = row.get(self.key)
+            if symbol is None or symbol in current:
+                continue
+            current[symbol] = row
+            order.append(symbol)
+
+        with self._lock:
+            state = self._screeners.setdefault(screener, _ScreenerState())
+            previous = state.rows
+
+            added = [current[symbol] for symbol in order if symbol not in previous]
+            removed = [symbol for symbol in state.order if symbol not in current]
+            changed = []
+            for symbol in order:
+                before = previous.get(symbol)
+                if before is None:
+                    continue
+                fields = {field: value for field, value in current[symbol].items() if before.get(field) != value}
+                fields.update({field: None for field in before if field not in current[symbol]})
+                if fields:
+                    changed.append({self.key: symbol, **fields})
+
+            state.rows = current
+            state.order = order
+            state.updated_at = datetime.now()
+            if not (added or removed or changed):
+                return None
+
+            state.sequence += 1
+            sequence = state.sequence
+
+        logger.info(
+            f"Screener {screener} delta #{sequence}: "
+            f"{len(added)} added, {len(removed)} removed, {len(changed)} changed"
+        )
+        return {
+            "type": DELTA_MESSAGE_TYPE,
+            "screener": screener,
+            "seq": sequence,
+            "added": added,
+            "removed": removed,
+            "changed": changed,
+            "timestamp": datetime.now().isoformat(),
+        }
+
+    def snapshot(self, screener: str) -> Optional[Dict[str, Any]]:
+        """Return the full current rows of a screener with their sequence number (None if unknown)."""
+        with self._lock:
+            state = self._screeners.get(screener)
+            if state is None:
+                return None
+            rows = [state.rows[symbol] for symbol in state.order]
+            sequence = state.sequence
+            updated_at = state.updated_at
+        return {
+            "type": SNAPSHOT_MESSAGE_TYPE,
+            "screener": screener,
+            "seq": sequence,
+            "rows": rows,
+            "timestamp": (updated_at or datetime.now()).isoformat(),
+        }
+
+    def snapshots(self, screener: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return the snapshot of one screener, or of every screener when `screener` is None."""
+        names = list(self._screeners) if screener is None else [screener]
+        return [message for message in map(self.snapshot, names) if message is not None]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-screener row counts and sequence numbers for debugging."""
+        with self._lock:
+            return {name: {"rows": len(state.rows), "seq": state.sequence} for name, state in self._screeners.items()}
+
+
+# Process-wide publisher shared by the live screener loops
+screener_deltas = ScreenerDeltaPublisher()
@@ -1,10 +1,11 @@
+import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 
 import aiohttp
-from alpaca.trading.enums import AssetStatus
 
-from backend.services.alpaca_service import AlpacaService
+from backend.services.alpaca_service import AlpacaService, regular_hours
+from backend.services.market_calendar import market_calendar
 
 logger = logging.getLogger(__name__)
 
@@ -148,13 +149,39 @@ class StockScreenerService:
 
         return processed_stocks
 
-    async def get_historical_stocks_open_below_prev_high(self, date, params):
+    async def load_historical_bars(self, start_date, end_date):
+        """
+        Fetch the regular-hours 1-minute bars of the screening universe in bulk (completed
+        sessions come from the on-disk bar cache).
+
+        The range starts one session before `start_date` so the first day has its previous
+        day high.
+
+        Args:
+            start_date: First day in format 'YYYY-MM-DD'
+            end_date: Last day in format 'YYYY-MM-DD'
+
+        Returns:
+            Dictionary of symbol to {'YYYY-MM-DD': bar array} (see AlpacaService.get_bars_bulk)
+        """
+        universe = await self._get_stock_universe()
+        first = market_calendar.previous_session(datetime.strptime(start_date, "%Y-%m-%d"))
+        first_date = first.strftime("%Y-%m-%d") if first is not None else start_date
+
+        sessions = await asyncio.to_thread(self.alpaca.get_session_bars, universe, first_date, end_date, "1Min")
+        return {
+            symbol: {day: regular_hours(bars) for day, bars in by_day.items()} for symbol, by_day in sessions.items()
+        }
+
+    async def get_historical_stocks_open_below_prev_high(self, date, params, history=None):
         """
         Get historical stocks that opened below previous day's high on a specific date
 
         Args:
             date: Date string in format 'YYYY-MM-DD'
             params: Screening parameters
+            history: Bars from `load_historical_bars` covering the date and the session before
+                (fetched for this date only when omitted)
 
         Returns:
             List of stocks with symbol, open price, and prev_day_high
@@ -163,47 +190,39 @@ class StockScreenerService:
             # Convert date to datetime
             dt = datetime.strptime(date, "%Y-%m-%d")
 
-            # Calculate previous trading day
-            # Note: This is a simplification. In a real implementation,
-            # you would need to account for weekends and holidays
-            prev_day = dt - timedelta(days=1)
-            if prev_day.weekday() >= 5:  # Saturday or Sunday
-                prev_day = dt - timedelta(days=3)  # Go back to Friday
+            # Previous trading session (weekends and exchange holidays skipped)
+            prev_day = market_calendar.previous_session(dt)
+            if prev_day is None:
+                logger.warning(f"Could not determine the session before {date}")
+                return []
 
             prev_date = prev_day.strftime("%Y-%m-%d")
 
             # Get universe of stocks to screen
             universe = await self._get_stock_universe()
+            if history is None:
+                history = await self.load_historical_bars(date, date)
 
             # Filter stocks based on price and volume criteria
             filtered_stocks = []
 
             for symbol in universe:
                 try:
-                    # Get daily data for current and previous day
-                    current_day_data = self.alpaca.get_historical_bar(symbol, date, "1Day")
-                    prev_day_data = self.alpaca.get_historical_bar(symbol, prev_date, "1Day")
-
-                    # Filter data to only include standard market hours (14:30 to 21:00 UTC)
-                    current_day_data = [
-                        c
-                        for c in current_day_data
-                        if c["t"].hour >= 14 and c["t"].hour < 21 and (c["t"].hour != 14 or c["t"].minute >= 30)
-                    ]
-                    prev_day_data = [
-                        c
-                        for c in prev_day_data
-                        if c["t"].hour >= 14 and c["t"].hour < 21 and (c["t"].hour != 14 or c["t"].minute >= 30)
-                    ]
-
-                    if not current_day_data or not prev_day_data:
+                    # Regular-hours 1-minute bars of the current and previous day
+                    sessions = history.get(getattr(symbol, "symbol", symbol), {})
+                    current_day_data = sessions.get(date)
+                    prev_day_data = sessions.get(prev_date)
+
+                    if current_day_data is None or prev_day_data is None:
+                        continue
+                    if not len(current_day_data) or not len(prev_day_data):
                         continue
 
                     # Extract relevant data
-                    current_open = current_day_data[0]["o"]
-                    current_price = current_day_data[5]["c"]
-                    current_volume = sum([p["v"] for p in current_day_data]) * 3
-                    prev_day_high = max([p["h"] for p in prev_day_data])
+                    current_open = float(current_day_data["o"][0])
+                    current_price = float(current_day_data["c"][5])
+                    current_volume = float(current_day_data["v"].sum()) * 3
+                    prev_day_high = float(prev_day_data["h"].max())
 
                     # Check if price is within range
                     if current_price < params.get("min_price", 1) or current_price > params.get("max_price", 20):
@@ -275,10 +294,9 @@ class StockScreenerService:
             # components of an index like S&P 500 or Russell 2000
 
             symbols = ["WULF", "FUBO", "PLUG", "RGTI", "CLSK", "DWTX", "WOLF", "SMST", "BITF"]
-            # Get assets from Alpaca
-            assets = self.alpaca.trading_client.get_all_assets()
-            active_assets = [asset for asset in assets if asset.status == AssetStatus.ACTIVE and asset.tradable]
-            active_assets = [asset for asset in active_assets if asset.symbol in symbols]
+            # Look the symbols up in the (cached) Alpaca asset catalog
+            active_assets = [self.alpaca.catalog.get(symbol) for symbol in symbols]
+            active_assets = [asset for asset in active_assets if asset is not None]
             # Limit to 500 stocks for performance
             return active_assets
 
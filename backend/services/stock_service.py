@@ -1,8 +1,11 @@
 import logging
+import os
 import random
+import threading
 import time
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 import requests
 import yfinance as yf
@@ -13,6 +16,68 @@ from backend.models.database import Stock, db_session
 
 logger = logging.getLogger(__name__)
 
+# Symbols requested per yfinance batch download
+PRICE_BATCH_SIZE = 200
+
+# Columns of the per-symbol frame returned by get_market_data_batch
+MARKET_DATA_COLUMNS = ["price", "volume", "change_percent"]
+
+# How long a symbol's market data is reused by get_market_data_batch callers
+MARKET_DATA_TTL_SECONDS = float(os.environ.get("MARKET_DATA_TTL_SECONDS", "30"))
+
+
+class MarketDataCache:
+    """
+    Per-symbol cache of the rows returned by get_market_data_batch.
+
+    The alert engine and the alerts page ask for overlapping symbols; rows younger than
+    the TTL are served from here and only the missing or stale symbols are downloaded.
+    """
+
+    def __init__(self, ttl_seconds: float = MARKET_DATA_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._rows = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, symbols, max_age_seconds=None):
+        """
+        Split symbols into cached rows and symbols to download.
+
+        Returns:
+            (dictionary of symbol to cached row tuple, list of missing or stale symbols)
+        """
+        max_age = self.ttl_seconds if max_age_seconds is None else max_age_seconds
+        now = time.monotonic()
+        cached, missing = {}, []
+        with self._lock:
+            for symbol in symbols:
+                entry = self._rows.get(symbol)
+                if entry is not None and now - entry[0] <= max_age:
+                    cached[symbol] = entry[1]
+                else:
+                    missing.append(symbol)
+            self.hits += len(cached)
+            self.misses += len(missing)
+        return cached, missing
+
+    def put(self, rows):
+        """Store freshly downloaded row tuples by symbol."""
+        now = time.monotonic()
+        with self._lock:
+            for symbol, row in rows.items():
+                self._rows[symbol] = (now, row)
+
+    def stats(self):
+        """Return cache counters for debugging."""
+        with self._lock:
+            return {"symbols": len(self._rows), "hits": self.hits, "misses": self.misses, "ttl": self.ttl_seconds}
+
+
+# Cache shared by the alert engine and the alert API
+market_data_cache = MarketDataCache()
+
 
 def with_rate_limit_retry(func):
     """Decorator to retry functions with rate limiting backoff"""
@@ -92,6 +157,78 @@ def get_current_price(symbol):
         return None
 
 
+def _yahoo_ticker(symbol):
+    """Strip an exchange prefix ("NASDAQ:AAPL" -> "AAPL") so the symbol can be passed to yfinance."""
+    return str(symbol).split(":")[-1].strip().upper()
+
+
+def _download_recent_bars(symbols, period="1d", tail=1):
+    """
+    Download recent daily bars for many symbols with one yfinance request per batch.
+
+    Returns:
+        Dictionary of requested symbol to its last `tail` non-empty bars (Open/High/Low/Close/Volume)
+    """
+    symbols = [symbol for symbol in dict.fromkeys(symbols) if symbol]
+    tickers = {}
+    for symbol in symbols:
+        tickers.setdefault(_yahoo_ticker(symbol), []).append(symbol)
+
+    rows = {}
+    names = list(tickers)
+    for start in range(0, len(names), PRICE_BATCH_SIZE):
+        batch = names[start : start + PRICE_BATCH_SIZE]
+        try:
+            data = yf.download(batch, period=period, group_by="ticker", progress=False, threads=True)
+        except Exception as e:
+            logger.error(f"Error downloading prices for {len(batch)} symbols: {str(e)}")
+            continue
+        if data is None or data.empty:
+            continue
+
+        for ticker in batch:
+            if isinstance(data.columns, pd.MultiIndex):
+                if ticker not in data.columns.get_level_values(0):
+                    continue
+                bars = data[ticker]
+            else:
+                bars = data
+            bars = bars.dropna(subset=["Close"])
+            if bars.empty:
+                continue
+            for symbol in tickers[ticker]:
+                rows[symbol] = bars.tail(tail)
+    return rows
+
+
+def get_market_data_batch(symbols, max_age_seconds=None):
+    """
+    Get price, volume and change % of many stocks with one yfinance download per batch of symbols.
+
+    The change is measured against the previous session's close, so the last two daily bars
+    are downloaded for every symbol. Symbols fetched within the cache TTL are not downloaded
+    again.
+
+    Args:
+        symbols: Stock symbols (an exchange prefix such as "NASDAQ:" is ignored)
+        max_age_seconds: Oldest cached row accepted (defaults to MARKET_DATA_TTL_SECONDS)
+
+    Returns:
+        DataFrame indexed by symbol with MARKET_DATA_COLUMNS; symbols without data are left out
+        and change_percent is NaN when there is no previous close
+    """
+    rows, missing = market_data_cache.get(list(dict.fromkeys(symbols)), max_age_seconds)
+    downloaded = {}
+    for symbol, bars in _download_recent_bars(missing, period="5d", tail=2).items():
+        closes = bars["Close"].to_numpy(dtype=float)
+        previous_close = closes[-2] if len(closes) > 1 else np.nan
+        change_percent = (closes[-1] / previous_close - 1) * 100 if previous_close else np.nan
+        downloaded[symbol] = (closes[-1], float(bars["Volume"].iloc[-1]), change_percent)
+    market_data_cache.put(downloaded)
+    rows.update(downloaded)
+    return pd.DataFrame.from_dict(rows, orient="index", columns=MARKET_DATA_COLUMNS).astype(float)
+
+
 def save_stock_to_db(stock_data):
     """Save or update stock information in the database."""
     try:
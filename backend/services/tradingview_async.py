@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import os
+from http.cookiejar import CookieJar
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+import pandas as pd
+from tradingview_screener import Query
+from tradingview_screener.query import DEFAULT_RANGE, HEADERS
+
+from backend.services.tradingview_credentials import AUTH_FAILURE_STATUS_CODES, TradingViewCredentialProvider
+
+logger = logging.getLogger(__name__)
+
+# Default total timeout for one scanner request
+SCAN_TIMEOUT_SECONDS = float(os.environ.get("TV_SCAN_TIMEOUT_SECONDS", "20"))
+
+# Maximum number of simultaneous connections to the scanner
+MAX_CONNECTIONS = int(os.environ.get("TV_MAX_CONNECTIONS", "20"))
+
+
+def _cookie_dict(cookies: Any) -> Dict[str, str]:
+    """Convert a cookie jar (as returned by rookiepy) or mapping to a plain dict for aiohttp."""
+    if not cookies:
+        return {}
+    if isinstance(cookies, CookieJar):
+        return {cookie.name: cookie.value for cookie in cookies}
+    return dict(cookies)
+
+
+def _to_frame(query: Query, payload: Dict[str, Any]) -> Tuple[int, pd.DataFrame]:
+    """Parse a scanner response the same way `Query.get_scanner_data` does."""
+    rows_count = payload["totalCount"]
+
+    if "/scan2" in query.url:
+        columns = ["ticker", *payload["fields"]]
+        rows = payload.get("symbols")
+        if rows:
+            return rows_count, pd.DataFrame(([row["s"], *row["f"]] for row in rows), columns=columns)
+        return rows_count, pd.DataFrame([], columns=columns)
+
+    columns = ["ticker", *query.query.get("columns", ())]
+    return rows_count, pd.DataFrame(([row["s"], *row["d"]] for row in payload["data"]), columns=columns)
+
+
+class AsyncScannerClient:
+    """
+    Non-blocking TradingView scanner client.
+
+    Requests go through one shared aiohttp session, so keep-alive connections are pooled
+    across calls instead of opening a new TLS connection per query. Every call carries its
+    own timeout and independent queries can be awaited together with `scan_many`.
+    """
+
+    def __init__(
+        self,
+        credentials: TradingViewCredentialProvider,
+        timeout_seconds: float = SCAN_TIMEOUT_SECONDS,
+        max_connections: int = MAX_CONNECTIONS,
+    ):
+        """
+        Args:
+            credentials: Provider used to authenticate the scanner requests
+            timeout_seconds: Default total timeout for one request
+            max_connections: Size of the shared connection pool
+        """
+        self._credentials = credentials
+        self.timeout_seconds = timeout_seconds
+        self.max_connections = max_connections
+
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        self.request_count = 0
+        self.error_count = 0
+        self.timeout_count = 0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the shared session on first use (it must be bound to the running loop)."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, headers=HEADERS)
+        return self._session
+
+    async def _post(self, query: Query, timeout: float) -> Dict[str, Any]:
+        """Send one scanner request and return the decoded JSON body."""
+        # Cookie extraction can touch the browser profile, keep it off the event loop
+        cookies = _cookie_dict(await asyncio.to_thread(self._credentials.get_cookies))
+        query.query.setdefault("range", DEFAULT_RANGE.copy())
+
+        self.request_count += 1
+        async with self._get_session().post(
+            query.url,
+            json=query.query,
+            cookies=cookies,
+            timeout=aiohttp.ClientTimeout(total=timeout),
+        ) as response:
+            if response.status >= 400:
+                body = await response.text()
+                raise aiohttp.ClientResponseError(
+                    response.request_info,
+                    response.history,
+                    status=response.status,
+                    message=f"{response.reason}\n Body: {body}\n",
+                )
+            return await response.json(content_type=None)
+
+    async def scan(self, query: Query, timeout: Optional[float] = None) -> Tuple[int, pd.DataFrame]:
+        """
+        Run a scanner query without blocking the event loop.
+
+        On an authentication failure the cookies are refreshed and the query is retried once.
+
+        Args:
+            query: TradingView screener query
+            timeout: Total timeout in seconds for this call (defaults to `timeout_seconds`)
+
+        Returns:
+            Tuple of (total matching rows, DataFrame), like `Query.get_scanner_data`
+        """
+        timeout = self.timeout_seconds if timeout is None else timeout
+        try:
+            try:
+                payload = await self._post(query, timeout)
+            except aiohttp.ClientResponseError as e:
+                if e.status not in AUTH_FAILURE_STATUS_CODES:
+                    raise
+                self._credentials.auth_failure_count += 1
+                logger.warning(f"TradingView rejected cached cookies ({e.status}), refreshing")
+                self._credentials.invalidate()
+                payload = await self._post(query, timeout)
+        except asyncio.TimeoutError:
+            self.timeout_count += 1
+            logger.error(f"TradingView scan timed out after {timeout}s")
+            raise
+        except Exception:
+            self.error_count += 1
+            raise
+
+        return _to_frame(query, payload)
+
+    async def scan_many(
+        self, queries: Sequence[Query], timeout: Optional[float] = None, return_exceptions: bool = False
+    ) -> List[Any]:
+        """
+        Run independent scanner queries concurrently over the shared connection pool.
+
+        Args:
+            queries: Queries to run
+            timeout: Per-query timeout in seconds
+            return_exceptions: Return failures in place of results instead of raising the first one
+
+        Returns:
+            List of (total, DataFrame) tuples (or exceptions) in the order of `queries`
+        """
+        return await asyncio.gather(
+            *(self.scan(query, timeout=timeout) for query in queries), return_exceptions=return_exceptions
+        )
+
+    async def close(self):
+        """Close the shared session and its pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return request counters for debugging."""
+        return {
+            "request_count": self.request_count,
+            "error_count": self.error_count,
+            "timeout_count": self.timeout_count,
+            "timeout_seconds": self.timeout_seconds,
+            "max_connections": self.max_connections,
+            "session_open": self._session is not None and not self._session.closed,
+        }
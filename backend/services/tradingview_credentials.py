@@ -0,0 +1,239 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+import requests
+from tradingview_screener import Query
+
+# Set logging level to a higher level (ERROR or CRITICAL) to suppress INFO messages
+logging.getLogger("rookiepy").setLevel(logging.ERROR)
+logging.getLogger("chromium").setLevel(logging.ERROR)
+logging.getLogger("rust").setLevel(logging.ERROR)
+
+import rookiepy
+
+logger = logging.getLogger(__name__)
+
+# Credential sources
+SOURCE_AUTO = "auto"
+SOURCE_BROWSER = "browser"
+SOURCE_FILE = "file"
+SOURCE_ENV = "env"
+
+# How long extracted cookies are reused before they are read again
+COOKIES_TTL_SECONDS = float(os.environ.get("TV_COOKIES_TTL_SECONDS", str(6 * 60 * 60)))
+
+# HTTP status codes TradingView returns for missing or expired sessions
+AUTH_FAILURE_STATUS_CODES = (401, 403)
+
+
+def get_cookies_from_browser():
+    """
+    Get TradingView cookies from browsers.
+    First tries Arc, then falls back to Chrome, Safari, Firefox.
+    """
+    try:
+        logger.debug("Attempting to extract TradingView cookies")
+
+        # Try Arc browser first (since the user mentioned they use it)
+        try:
+            logger.debug("Trying to get cookies from Arc browser")
+            cookies = rookiepy.to_cookiejar(rookiepy.arc([".tradingview.com"]))
+            logger.debug("Successfully extracted cookies from Arc browser")
+            return cookies
+        except Exception as e:
+            logger.warning(f"Couldn't get cookies from Arc: {str(e)}")
+
+        # Try Chrome next
+        try:
+            logger.debug("Trying to get cookies from Chrome browser")
+            cookies = rookiepy.to_cookiejar(rookiepy.chrome([".tradingview.com"]))
+            logger.debug("Successfully extracted cookies from Chrome browser")
+            return cookies
+        except Exception as e:
+            logger.warning(f"Couldn't get cookies from Chrome: {str(e)}")
+
+        # Try Safari
+        try:
+            logger.debug("Trying to get cookies from Safari browser")
+            cookies = rookiepy.to_cookiejar(rookiepy.safari([".tradingview.com"]))
+            logger.debug("Successfully extracted cookies from Safari browser")
+            return cookies
+        except Exception as e:
+            logger.warning(f"Couldn't get cookies from Safari: {str(e)}")
+
+        # Try Firefox as a last resort
+        try:
+            logger.debug("Trying to get cookies from Firefox browser")
+            cookies = rookiepy.to_cookiejar(rookiepy.firefox([".tradingview.com"]))
+            logger.debug("Successfully extracted cookies from Firefox browser")
+            return cookies
+        except Exception as e:
+            logger.warning(f"Couldn't get cookies from Firefox: {str(e)}")
+
+        logger.warning("Couldn't extract cookies from any browser")
+        return {}
+
+    except Exception as e:
+        logger.error(f"Error extracting cookies: {str(e)}")
+        return {}
+
+
+def get_cookies_from_file(path: str) -> Dict[str, str]:
+    """
+    Load TradingView cookies from a JSON file.
+
+    The file may contain either a mapping of cookie name to value, or a list of cookie
+    objects with "name" and "value" keys (the format exported by rookiepy and most
+    browser extensions).
+
+    Args:
+        path: Path to the JSON cookie file
+
+    Returns:
+        Dictionary of cookie name to value
+    """
+    try:
+        with open(path) as f:
+            data = json.load(f)
+
+        if isinstance(data, dict):
+            return {str(k): str(v) for k, v in data.items()}
+        return {c["name"]: c["value"] for c in data if "name" in c and "value" in c}
+    except Exception as e:
+        logger.error(f"Error reading TradingView cookies from {path}: {str(e)}")
+        return {}
+
+
+def get_cookies_from_env() -> Dict[str, str]:
+    """Build TradingView cookies from the TV_SESSIONID / TV_SESSIONID_SIGN variables."""
+    cookies = {}
+    if os.environ.get("TV_SESSIONID"):
+        cookies["sessionid"] = os.environ["TV_SESSIONID"]
+    if os.environ.get("TV_SESSIONID_SIGN"):
+        cookies["sessionid_sign"] = os.environ["TV_SESSIONID_SIGN"]
+    return cookies
+
+
+class TradingViewCredentialProvider:
+    """
+    Caches the TradingView cookie jar so cookie extraction stays off the request path.
+
+    Cookies are read once and reused for `ttl_seconds`; an authentication failure from
+    the scanner invalidates them and triggers a single re-read. Headless servers can
+    skip browser extraction entirely with TV_COOKIES_SOURCE=file (TV_COOKIES_FILE) or
+    TV_COOKIES_SOURCE=env (TV_SESSIONID / TV_SESSIONID_SIGN).
+    """
+
+    def __init__(
+        self,
+        source: Optional[str] = None,
+        cookies_file: Optional[str] = None,
+        ttl_seconds: float = COOKIES_TTL_SECONDS,
+    ):
+        """
+        Args:
+            source: One of "auto", "browser", "file" or "env" (defaults to TV_COOKIES_SOURCE)
+            cookies_file: JSON cookie file used by the "file" source (defaults to TV_COOKIES_FILE)
+            ttl_seconds: How long extracted cookies are reused
+        """
+        self.source = (source or os.environ.get("TV_COOKIES_SOURCE", SOURCE_AUTO)).lower()
+        self.cookies_file = cookies_file or os.environ.get("TV_COOKIES_FILE")
+        self.ttl_seconds = ttl_seconds
+
+        self._cookies: Any = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+        self.extraction_count = 0
+        self.cache_hit_count = 0
+        self.auth_failure_count = 0
+
+    def _resolve_source(self) -> str:
+        """Pick the concrete source for the "auto" mode."""
+        if self.source != SOURCE_AUTO:
+            return self.source
+        if os.environ.get("TV_SESSIONID"):
+            return SOURCE_ENV
+        if self.cookies_file:
+            return SOURCE_FILE
+        return SOURCE_BROWSER
+
+    def _extract(self) -> Any:
+        """Read cookies from the configured source."""
+        source = self._resolve_source()
+        if source == SOURCE_ENV:
+            return get_cookies_from_env()
+        if source == SOURCE_FILE:
+            if not self.cookies_file:
+                logger.error("TV_COOKIES_SOURCE is 'file' but TV_COOKIES_FILE is not set")
+                return {}
+            return get_cookies_from_file(self.cookies_file)
+        return get_cookies_from_browser()
+
+    def get_cookies(self) -> Any:
+        """
+        Get the cached TradingView cookies, extracting them if missing or expired.
+
+        Returns:
+            Cookie jar or dictionary accepted by `requests` (empty when unauthenticated)
+        """
+        with self._lock:
+            if self._cookies is not None and (time.monotonic() - self._loaded_at) < self.ttl_seconds:
+                self.cache_hit_count += 1
+                return self._cookies
+
+            self._cookies = self._extract()
+            self._loaded_at = time.monotonic()
+            self.extraction_count += 1
+
+            if self._cookies:
+                logger.info(f"Successfully loaded TradingView cookies ({self._resolve_source()})")
+            else:
+                logger.warning("No TradingView cookies found - using delayed data")
+            return self._cookies
+
+    def invalidate(self):
+        """Force the next `get_cookies` call to read the cookies again."""
+        with self._lock:
+            self._cookies = None
+
+    def scan(self, query: Query) -> Tuple[int, pd.DataFrame]:
+        """
+        Run a scanner query with the cached cookies.
+
+        On an authentication failure the cookies are refreshed and the query is retried once.
+
+        Args:
+            query: TradingView screener query
+
+        Returns:
+            Tuple of (total matching rows, DataFrame) as returned by `Query.get_scanner_data`
+        """
+        try:
+            return query.get_scanner_data(cookies=self.get_cookies())
+        except requests.HTTPError as e:
+            status_code = e.response.status_code if e.response is not None else None
+            if status_code not in AUTH_FAILURE_STATUS_CODES:
+                raise
+            self.auth_failure_count += 1
+            logger.warning(f"TradingView rejected cached cookies ({status_code}), refreshing")
+            self.invalidate()
+            return query.get_scanner_data(cookies=self.get_cookies())
+
+    def stats(self) -> Dict[str, Any]:
+        """Return extraction counters for debugging."""
+        cookies = self._cookies
+        return {
+            "source": self._resolve_source(),
+            "has_cookies": bool(cookies),
+            "cookie_count": len(cookies) if hasattr(cookies, "__len__") else 0,
+            "ttl_seconds": self.ttl_seconds,
+            "extraction_count": self.extraction_count,
+            "cache_hit_count": self.cache_hit_count,
+            "auth_failure_count": self.auth_failure_count,
+        }
@@ -0,0 +1,81 @@
+import logging
+from typing import AsyncIterator, Callable, Iterator, Optional, Tuple
+
+import pandas as pd
+from tradingview_screener import Query
+
+logger = logging.getLogger(__name__)
+
+# Rows requested per scanner page when the caller does not choose
+DEFAULT_PAGE_SIZE = 1000
+
+
+def _page_bounds(start: int, page_size: int, max_rows: Optional[int]) -> Tuple[int, int]:
+    """Return the scanner range [start, end) of the next page, clipped to `max_rows`."""
+    end = start + page_size
+    if max_rows is not None:
+        end = min(end, max_rows)
+    return start, end
+
+
+def iter_scan_pages(
+    scan: Callable[[Query], Tuple[int, pd.DataFrame]],
+    query: Query,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_rows: Optional[int] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Run a scanner query one offset page at a time.
+
+    Pages are requested lazily: the next request is only sent when the caller asks for the
+    next page, so a consumer that stops early never pays for the rest of the universe and
+    only one page is held in memory at a time. The scanner `range` is [start, end), which
+    is why each page sets both the offset and the end row.
+
+    Args:
+        scan: Function running one query, e.g. `TradingViewCredentialProvider.scan`
+        query: Query with filters and sort order; its range is overwritten per page
+        page_size: Rows per request
+        max_rows: Stop after this many rows (None for every matching row)
+
+    Yields:
+        One DataFrame per non-empty page, in the query's sort order
+    """
+    start = 0
+    total = None
+    while (total is None or start < total) and (max_rows is None or start < max_rows):
+        start, end = _page_bounds(start, page_size, max_rows)
+        total, df = scan(query.offset(start).limit(end))
+        if df.empty:
+            return
+        logger.debug(f"Scanner page {start}-{start + len(df)} of {total}")
+        yield df
+        if len(df) < end - start:
+            return
+        start += len(df)
+
+
+async def aiter_scan_pages(
+    scan,
+    query: Query,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_rows: Optional[int] = None,
+) -> AsyncIterator[pd.DataFrame]:
+    """
+    Async variant of `iter_scan_pages` for coroutine scanners such as `AsyncScannerClient.scan`.
+
+    Yields:
+        One DataFrame per non-empty page, in the query's sort order
+    """
+    start = 0
+    total = None
+    while (total is None or start < total) and (max_rows is None or start < max_rows):
+        start, end = _page_bounds(start, page_size, max_rows)
+        total, df = await scan(query.offset(start).limit(end))
+        if df.empty:
+            return
+        logger.debug(f"Scanner page {start}-{start + len(df)} of {total}")
+        yield df
+        if len(df) < end - start:
+            return
+        start += len(df)
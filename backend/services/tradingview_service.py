@@ -1,29 +1,29 @@
-import json
+import asyncio
 import logging
 import os
 import random
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
+import numpy as np
 import pandas as pd
 import yfinance as yf
 from rich.console import Console
 from rich.logging import RichHandler
 from rich.traceback import install
-from tqdm import tqdm
 from tradingview_screener import Query, col
 
-# Set logging level to a higher level (ERROR or CRITICAL) to suppress INFO messages
-logging.getLogger("rookiepy").setLevel(logging.ERROR)
-logging.getLogger("chromium").setLevel(logging.ERROR)
-logging.getLogger("rust").setLevel(logging.ERROR)
-
-
-# Then use rookiepy as normal
-import rookiepy
-
-# your code here
+from backend.services import tradingview_transforms as tvx
+from backend.services.cross_detector import CrossDetector
+from backend.services.market_calendar import market_calendar
+from backend.services.tradingview_async import AsyncScannerClient
+from backend.services.tradingview_credentials import (  # noqa: F401
+    TradingViewCredentialProvider,
+    get_cookies_from_browser,
+)
+from backend.services.tradingview_paging import iter_scan_pages
+from backend.services.tradingview_snapshot import TradingViewSnapshot
 
 
 # Define Interval enum that was missing
@@ -54,65 +54,34 @@ logging.basicConfig(
 # Get logger
 logger = logging.getLogger("tradingview")
 
+# Cookies are extracted lazily and cached; see TradingViewCredentialProvider
+tv_credentials = TradingViewCredentialProvider()
 
-def get_cookies_from_browser():
-    """
-    Get TradingView cookies from browsers.
-    First tries Arc, then falls back to Chrome, Safari, Firefox.
-    """
-    try:
-        logger.debug("Attempting to extract TradingView cookies")
+# Non-blocking scanner client with a shared connection pool, used by the async variants
+tv_async_client = AsyncScannerClient(tv_credentials)
 
-        # Try Arc browser first (since the user mentioned they use it)
-        try:
-            logger.debug("Trying to get cookies from Arc browser")
-            cookies = rookiepy.to_cookiejar(rookiepy.arc([".tradingview.com"]))
-            logger.debug("Successfully extracted cookies from Arc browser")
-            return cookies
-        except Exception as e:
-            logger.warning(f"Couldn't get cookies from Arc: {str(e)}")
+# Shared full-universe scan that the screeners below filter locally
+market_snapshot = TradingViewSnapshot(tv_credentials, async_client=tv_async_client)
 
-        # Try Chrome next
-        try:
-            logger.debug("Trying to get cookies from Chrome browser")
-            cookies = rookiepy.to_cookiejar(rookiepy.chrome([".tradingview.com"]))
-            logger.debug("Successfully extracted cookies from Chrome browser")
-            return cookies
-        except Exception as e:
-            logger.warning(f"Couldn't get cookies from Chrome: {str(e)}")
+# Columns used for the stock details views
+STOCK_DETAILS_COLUMNS = [
+    "name",
+    "close",
+    "change",
+    "change_abs",
+    "volume",
+    "description",
+    "market_cap_basic",
+    "sector",
+    "industry",
+    "price_earnings_ttm",
+    "earnings_per_share_basic_ttm",
+    "price_book_fq",
+    "average_volume_30d_calc",
+]
 
-        # Try Safari
-        try:
-            logger.debug("Trying to get cookies from Safari browser")
-            cookies = rookiepy.to_cookiejar(rookiepy.safari([".tradingview.com"]))
-            logger.debug("Successfully extracted cookies from Safari browser")
-            return cookies
-        except Exception as e:
-            logger.warning(f"Couldn't get cookies from Safari: {str(e)}")
-
-        # Try Firefox as a last resort
-        try:
-            logger.debug("Trying to get cookies from Firefox browser")
-            cookies = rookiepy.to_cookiejar(rookiepy.firefox([".tradingview.com"]))
-            logger.debug("Successfully extracted cookies from Firefox browser")
-            return cookies
-        except Exception as e:
-            logger.warning(f"Couldn't get cookies from Firefox: {str(e)}")
-
-        logger.warning("Couldn't extract cookies from any browser")
-        return {}
-
-    except Exception as e:
-        logger.error(f"Error extracting cookies: {str(e)}")
-        return {}
-
-
-# Extract cookies when the module is loaded
-tv_cookies = get_cookies_from_browser()
-if tv_cookies:
-    logger.info("Successfully loaded TradingView cookies")
-else:
-    logger.warning("No TradingView cookies found - using delayed data")
+# Maximum number of symbols resolved by one get_stock_details_bulk request
+DETAILS_CHUNK_SIZE = 500
 
 
 def explore_available_fields():
@@ -121,7 +90,7 @@ def explore_available_fields():
         logger.info("Exploring available TradingView fields")
 
         # Simple query to see what fields are available
-        count, df = Query().limit(3).get_scanner_data(cookies=tv_cookies)
+        count, df = tv_credentials.scan(Query().limit(3))
 
         if df.empty:
             logger.error("No data returned from TradingView")
@@ -139,6 +108,40 @@ def explore_available_fields():
         return False
 
 
+def _select_top_gainers(df: pd.DataFrame, limit: int) -> List[Dict[str, Any]]:
+    """Filter, sort and format top gainers from a snapshot frame."""
+    # The snapshot is already restricted to NASDAQ/NYSE
+    mask = (
+        df["active_symbol"]
+        & (df["change"] > 0)  # Use 'change' for percentage change
+        & (df["change"] < 500)
+        & df["close"].between(0.25, 20)
+    )
+    df = df[mask].sort_values("change", ascending=False).head(limit)  # Sort by percentage change
+
+    if df.empty:
+        logger.warning("No gainers found using TradingView API")
+        return get_demo_gainers(limit)
+
+    # Format the results to match the expected structure (whole-column operations)
+    df = tvx.clean_numeric(df.copy(), ["close", "change_abs", "change", "volume"])
+    gainers = tvx.to_records(
+        df,
+        {
+            "symbol": "name",
+            "name": tvx.fill_text(df, "description", df["name"]),
+            "price": "close",  # Keep as float for frontend formatting
+            "change": "change_abs",  # Keep as float for frontend formatting
+            "percent_change": "change",  # Keep as float for frontend formatting
+            "volume": tvx.format_volume_short(df["volume"]),
+            "sector": tvx.fill_text(df, "sector", "N/A"),
+        },
+    )
+
+    logger.info(f"Successfully fetched {len(gainers)} gainers using TradingView API")
+    return gainers
+
+
 def get_top_gainers(limit: int = 10) -> List[Dict[str, Any]]:
     """
     Get top gaining stocks using TradingView API.
@@ -156,92 +159,55 @@ def get_top_gainers(limit: int = 10) -> List[Dict[str, Any]]:
             explore_available_fields()
             get_top_gainers.fields_explored = True
 
-        count, df = (
-            Query()
-            .select(
-                "name",
-                "open",
-                "description",
-                "close",
-                "change_abs",
-                "change",
-                "volume",
-                "sector",
-                "exchange",
-                "active_symbol",
-            )
-            .where(col("active_symbol") == True)
-            .where(col("change") > 0)  # Use 'change' for percentage change
-            .where(col("change") < 500)
-            .where(col("close").between(0.25, 20))
-            .where(col("exchange").isin(["NASDAQ", "NYSE"]))
-            .order_by("change", ascending=False)  # Sort by percentage change
-            .limit(limit)
-            .get_scanner_data(cookies=tv_cookies)
-        )
-
-        if df.empty:
-            logger.warning("No gainers found using TradingView API")
-            return get_demo_gainers(limit)
+        return _select_top_gainers(market_snapshot.get_frame(), limit)
 
-        # Format the results to match the expected structure
-        gainers = []
-        for _, row in df.iterrows():
-            try:
-                # Extract and validate price
-                price = row.get("close", 0)
-                if pd.isna(price):
-                    price = 0
-                price = float(price)
-
-                # Extract and validate change
-                change_abs = row.get("change_abs", 0)
-                if pd.isna(change_abs):
-                    change_abs = 0
-                change_abs = float(change_abs)
-
-                # Extract and validate percent change
-                change_pct = row.get("change", 0)
-                if pd.isna(change_pct):
-                    change_pct = 0
-                change_pct = float(change_pct)
-
-                # Format volume with K/M suffix
-                volume = row.get("volume", 0)
-                if pd.isna(volume):
-                    volume = 0
-                volume = int(volume)
-                if volume >= 1_000_000:
-                    volume_display = f"{volume/1_000_000:.1f}M"
-                elif volume >= 1_000:
-                    volume_display = f"{volume/1_000:.0f}K"
-                else:
-                    volume_display = str(volume)
-
-                gainers.append(
-                    {
-                        "symbol": row.get("name"),
-                        "name": row.get("description", row.get("name")),
-                        "price": price,  # Keep as float for frontend formatting
-                        "change": change_abs,  # Keep as float for frontend formatting
-                        "percent_change": change_pct,  # Keep as float for frontend formatting
-                        "volume": volume_display,
-                        "sector": row.get("sector", "N/A"),
-                    }
-                )
-                logger.info(f"Stock {row.get('name')} - percent_change: {change_pct} (type: {type(change_pct)})")
-            except Exception as e:
-                logger.warning(f"Error processing row {row}: {str(e)}")
-                continue
+    except Exception as e:
+        logger.error(f"Error fetching top gainers using TradingView API: {str(e)}")
+        return get_demo_gainers(limit)
 
-        logger.info(f"Successfully fetched {len(gainers)} gainers using TradingView API")
-        return gainers
 
+async def aget_top_gainers(limit: int = 10) -> List[Dict[str, Any]]:
+    """Async variant of `get_top_gainers` that does not block the event loop."""
+    try:
+        logger.info("Fetching top gainers using TradingView API")
+        return _select_top_gainers(await market_snapshot.aget_frame(), limit)
     except Exception as e:
         logger.error(f"Error fetching top gainers using TradingView API: {str(e)}")
         return get_demo_gainers(limit)
 
 
+def _format_movers(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Format losers / most active rows (prices as strings, volume with thousands separators)."""
+    df = tvx.clean_numeric(df.copy(), ["close", "change_abs", "change"])
+    return tvx.to_records(
+        df,
+        {
+            "symbol": "name",
+            "name": "description",
+            "price": df["close"].astype(str),
+            "change": df["change_abs"].astype(str),
+            # 'change' is already the percentage, no need to multiply by 100
+            "percent_change": df["change"].round(2),
+            "volume": tvx.format_thousands_series(df["volume"]),
+        },
+    )
+
+
+def _select_top_losers(df: pd.DataFrame, limit: int) -> List[Dict[str, Any]]:
+    """Filter, sort and format top losers from a snapshot frame."""
+    # The snapshot is already restricted to NASDAQ/NYSE
+    mask = df["active_symbol"] & (df["change"] < -5) & df["close"].between(0.25, 20)
+    df = df[mask].sort_values("change", ascending=True).head(limit)  # Sort by percentage change
+
+    if df.empty:
+        logger.warning("No   found using TradingView API")
+        return get_demo_gainers(limit)
+
+    losers = _format_movers(df)
+    logger.info(f"Successfully fetched {len(losers)} losers using TradingView API")
+    return losers
+
+
 def get_top_losers(limit: int = 10) -> List[Dict[str, Any]]:
     """
     Get top losing stocks using TradingView API.
@@ -254,65 +220,38 @@ def get_top_losers(limit: int = 10) -> List[Dict[str, Any]]:
     """
     try:
         logger.info("Fetching top losers using TradingView API")
+        return _select_top_losers(market_snapshot.get_frame(), limit)
 
-        count, df = (
-            Query()
-            .select(
-                "name",
-                "open",
-                "description",
-                "close",
-                "change_abs",
-                "change",
-                "volume",
-                "sector",
-                "exchange",
-                "active_symbol",
-            )
-            .where(col("active_symbol") == True)
-            .where(col("change") < -5)  # Use 'change' for percentage change
-            .where(col("close").between(0.25, 20))
-            .where(col("exchange").isin(["NASDAQ", "NYSE"]))
-            .order_by("change", ascending=True)  # Sort by percentage change
-            .limit(limit)
-            .get_scanner_data(cookies=tv_cookies)
-        )
-
-        if df.empty:
-            logger.warning("No   found using TradingView API")
-            return get_demo_gainers(limit)
-
-        # Format the results to match the expected structure
-        losers = []
-        for _, row in df.iterrows():
-            try:
-                # Extract the symbol after the exchange prefix
-                price = row.get("close", 0)
-                change_abs = row.get("change_abs", 0)
-                # 'change' is already the percentage, no need to multiply by 100
-                change_pct = round(row.get("change", 0), 2)
+    except Exception as e:
+        logger.error(f"Error fetching top losers using TradingView API: {str(e)}")
+        return get_demo_losers(limit)
 
-                losers.append(
-                    {
-                        "symbol": row.get("name"),
-                        "name": row.get("description"),
-                        "price": str(price),
-                        "change": str(change_abs),
-                        "percent_change": change_pct,
-                        "volume": f"{int(row.get('volume', 0)):,}" if not pd.isna(row.get("volume")) else "N/A",
-                    }
-                )
-            except Exception as e:
-                logger.warning(f"Error processing row {row}: {str(e)}")
-                continue
-        logger.info(f"Successfully fetched {len(losers)} losers using TradingView API")
-        return losers
 
+async def aget_top_losers(limit: int = 10) -> List[Dict[str, Any]]:
+    """Async variant of `get_top_losers` that does not block the event loop."""
+    try:
+        logger.info("Fetching top losers using TradingView API")
+        return _select_top_losers(await market_snapshot.aget_frame(), limit)
     except Exception as e:
         logger.error(f"Error fetching top losers using TradingView API: {str(e)}")
         return get_demo_losers(limit)
 
 
+def _select_most_active(df: pd.DataFrame, limit: int) -> List[Dict[str, Any]]:
+    """Filter, sort and format the most active stocks from a snapshot frame."""
+    # The snapshot is already restricted to NASDAQ/NYSE
+    mask = df["active_symbol"] & (df["change"] < -5) & df["close"].between(0.25, 20)
+    df = df[mask].sort_values("volume", ascending=False).head(limit)
+
+    if df.empty:
+        logger.warning("No active stocks found using TradingView API")
+        return get_demo_most_active(limit)
+
+    active_stocks = _format_movers(df)
+    logger.info(f"Successfully fetched {len(active_stocks)} active stocks using TradingView API")
+    return active_stocks
+
+
 def get_most_active(limit: int = 10) -> List[Dict[str, Any]]:
     """
     Get most active stocks by volume using TradingView API.
@@ -325,65 +264,97 @@ def get_most_active(limit: int = 10) -> List[Dict[str, Any]]:
     """
     try:
         logger.info("Fetching most active stocks using TradingView API")
-        count, df = (
-            Query()
-            .select(
-                "name",
-                "open",
-                "description",
-                "close",
-                "change_abs",
-                "change",
-                "volume",
-                "sector",
-                "exchange",
-                "active_symbol",
-            )
-            .where(col("active_symbol") == True)
-            .where(col("change") < -5)  # Use 'change' for percentage change
-            .where(col("close").between(0.25, 20))
-            .where(col("exchange").isin(["NASDAQ", "NYSE"]))
-            .order_by("volume", ascending=False)
-            .limit(limit)
-            .get_scanner_data(cookies=tv_cookies)
-        )
-
-        if df.empty:
-            logger.warning("No active stocks found using TradingView API")
-            return get_demo_most_active(limit)
-
-        # Format the results to match the expected structure
-        active_stocks = []
-        for _, row in df.iterrows():
-            try:
-                # Extract the symbol after the exchange prefix
-                price = row.get("close", 0)
-                change_abs = row.get("change_abs", 0)
-                # 'change' is already the percentage, no need to multiply by 100
-                change_pct = round(row.get("change", 0), 2)
+        return _select_most_active(market_snapshot.get_frame(), limit)
 
-                active_stocks.append(
-                    {
-                        "symbol": row.get("name"),
-                        "name": row.get("description"),
-                        "price": str(price),
-                        "change": str(change_abs),
-                        "percent_change": change_pct,
-                        "volume": f"{int(row.get('volume', 0)):,}" if not pd.isna(row.get("volume")) else "N/A",
-                    }
-                )
-            except Exception as e:
-                logger.warning(f"Error processing row {row}: {str(e)}")
-                continue
+    except Exception as e:
+        logger.error(f"Error fetching most active stocks using TradingView API: {str(e)}")
+        return get_demo_most_active(limit)
 
-        logger.info(f"Successfully fetched {len(active_stocks)} active stocks using TradingView API")
-        return active_stocks
 
+async def aget_most_active(limit: int = 10) -> List[Dict[str, Any]]:
+    """Async variant of `get_most_active` that does not block the event loop."""
+    try:
+        logger.info("Fetching most active stocks using TradingView API")
+        return _select_most_active(await market_snapshot.aget_frame(), limit)
     except Exception as e:
         logger.error(f"Error fetching most active stocks using TradingView API: {str(e)}")
         return get_demo_most_active(limit)
 
 
+async def aget_market_movers(limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Get top gainers, top losers and most active stocks concurrently.
+
+    The three lists are awaited together and share a single snapshot refresh.
+
+    Args:
+        limit: Maximum number of stocks per list
+
+    Returns:
+        Dictionary with "gainers", "losers" and "most_active" lists
+    """
+    gainers, losers, most_active = await asyncio.gather(
+        aget_top_gainers(limit), aget_top_losers(limit), aget_most_active(limit)
+    )
+    return {"gainers": gainers, "losers": losers, "most_active": most_active}
+
+
+def _select_filtered_stocks(
+    df: pd.DataFrame,
+    min_price: Optional[float],
+    max_price: Optional[float],
+    min_change_percent: Optional[float],
+    max_change_percent: Optional[float],
+    min_volume: Optional[int],
+    max_volume: Optional[int],
+    sector: Optional[str],
+    limit: int,
+) -> List[Dict[str, Any]]:
+    """Apply the stock filter criteria to a snapshot frame and format the matches."""
+    # Build the filter mask with the correct field names (snapshot is already NASDAQ/NYSE only)
+    mask = pd.Series(True, index=df.index)
+    if min_price is not None:
+        mask &= df["close"] >= min_price
+    if max_price is not None:
+        mask &= df["close"] <= max_price
+    if min_change_percent is not None:
+        mask &= df["change"] >= min_change_percent  # No need to divide by 100
+    if max_change_percent is not None:
+        mask &= df["change"] <= max_change_percent  # No need to divide by 100
+    if min_volume is not None:
+        mask &= df["volume"] >= min_volume
+    if max_volume is not None:
+        mask &= df["volume"] <= max_volume
+    if sector is not None:
+        mask &= df["sector"] == sector
+
+    # Snapshot rows keep TradingView's default market cap ordering
+    df = df[mask].head(limit)
+
+    if df.empty:
+        logger.warning("No stocks found matching the criteria")
+        return []
+
+    # Format the results (whole-column operations)
+    df = tvx.clean_numeric(df.copy(), ["close", "change_abs", "change", "market_cap_basic"])
+    filtered_stocks = tvx.to_records(
+        df,
+        {
+            "symbol": "name",
+            "name": "name",
+            "price": df["close"].astype(str),
+            "change": df["change_abs"].astype(str),
+            "percent_change": "change",  # Already a percentage
+            "volume": tvx.format_thousands_series(df["volume"]),
+            "description": tvx.fill_text(df, "description", ""),
+            "market_cap": "market_cap_basic",
+        },
+    )
+
+    logger.info(f"Successfully fetched {len(filtered_stocks)} filtered stocks using TradingView API")
+    return filtered_stocks
+
+
 def get_stocks_with_filters(
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
@@ -421,293 +392,140 @@ def get_stocks_with_filters(
             return get_demo_stocks_for_date(date, limit)
 
         logger.info("Fetching filtered stocks using TradingView API")
-
-        # Build query conditions with the correct field names
-        conditions = []
-
-        conditions.append(col("exchange").isin(["NASDAQ", "NYSE"]))
-        if min_price is not None:
-            conditions.append(col("close") >= min_price)
-        if max_price is not None:
-            conditions.append(col("close") <= max_price)
-        if min_change_percent is not None:
-            conditions.append(col("change") >= min_change_percent)  # No need to divide by 100
-        if max_change_percent is not None:
-            conditions.append(col("change") <= max_change_percent)  # No need to divide by 100
-        if min_volume is not None:
-            conditions.append(col("volume") >= min_volume)
-        if max_volume is not None:
-            conditions.append(col("volume") <= max_volume)
-        if sector is not None:
-            conditions.append(col("sector") == sector)
-
-        # Query TradingView with filters
-        query = Query().select(
-            "name",
-            "close",
-            "open",
-            "high",
-            "low",
-            "change_abs",
-            "change",
-            "exchange",
-            "volume",
-            "description",
-            "market_cap_basic",
+        return _select_filtered_stocks(
+            market_snapshot.get_frame(),
+            min_price,
+            max_price,
+            min_change_percent,
+            max_change_percent,
+            min_volume,
+            max_volume,
+            sector,
+            limit,
         )
 
-        # Add conditions if there are any
-        if conditions:
-            query = query.where(*conditions)
-
-        # Set limit and execute
-        count, df = query.limit(limit).get_scanner_data(cookies=tv_cookies)
-
-        if df.empty:
-            logger.warning("No stocks found matching the criteria")
-            return []
+    except Exception as e:
+        logger.error(f"Error fetching filtered stocks using TradingView API: {str(e)}")
+        return []
 
-        # Format the results
-        filtered_stocks = []
-        for _, row in tqdm(df.iterrows(), total=len(df), desc="Processing stocks"):
-            try:
-                # Extract the symbol after the exchange prefix
-                symbol = row.get("name")
-                price = row.get("close", 0)
-                change_abs = row.get("change_abs", 0)
-                change_pct = row.get("change", 0)  # Already a percentage
 
-                filtered_stocks.append(
-                    {
-                        "symbol": symbol,
-                        "name": row.get("name", symbol),
-                        "price": str(price),
-                        "change": str(change_abs),
-                        "percent_change": change_pct,
-                        "volume": f"{int(row.get('volume', 0)):,}" if not pd.isna(row.get("volume")) else "N/A",
-                        "description": row.get("description", ""),
-                        "market_cap": row.get("market_cap_basic", 0),
-                    }
-                )
-            except Exception as e:
-                logger.warning(f"Error processing row {row}: {str(e)}")
-                continue
+async def aget_stocks_with_filters(
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_change_percent: Optional[float] = None,
+    max_change_percent: Optional[float] = None,
+    min_volume: Optional[int] = None,
+    max_volume: Optional[int] = None,
+    sector: Optional[str] = None,
+    date: Optional[str] = None,
+    limit: int = 50,
+) -> List[Dict[str, Any]]:
+    """Async variant of `get_stocks_with_filters` that does not block the event loop."""
+    try:
+        if date:
+            logger.info(f"Fetching filtered stocks for date {date} using TradingView API")
+            return get_demo_stocks_for_date(date, limit)
 
-        logger.info(f"Successfully fetched {len(filtered_stocks)} filtered stocks using TradingView API")
-        return filtered_stocks
+        logger.info("Fetching filtered stocks using TradingView API")
+        return _select_filtered_stocks(
+            await market_snapshot.aget_frame(),
+            min_price,
+            max_price,
+            min_change_percent,
+            max_change_percent,
+            min_volume,
+            max_volume,
+            sector,
+            limit,
+        )
 
     except Exception as e:
         logger.error(f"Error fetching filtered stocks using TradingView API: {str(e)}")
         return []
 
 
-def get_stocks_with_consecutive_positive_candles(
-    timeframe: str = "1d", num_candles: int = 3, limit: int = 20
-) -> List[Dict[str, Any]]:
-    """
-    Get stocks with consecutive positive candles.
-    """
-    try:
-        logger.info(f"Screening for stocks with {num_candles} consecutive positive candles on {timeframe} timeframe")
+# Minimum daily volume for the consecutive-candle universe (keeps the streaks meaningful)
+STREAK_MIN_VOLUME = 250_000
 
-        # Get cookies for TradingView
-        tv_cookies = get_cookies_from_browser()
 
-        # Get initial list of stocks to check
-        count, stock_df = (
-            Query()
-            .select(
-                "name",
-                "close",
-                "change_abs",
-                "change",
-                "volume",
-                "description",
-                "exchange",
-                "market_cap_basic",
-                "VWAP",
-                "MACD.macd",
-                "RSI",
-                "EMA5",
-                "EMA20",
-            )
-            .where(col("volume") > 250_000)  # Higher volume filter for more reliable results
-            .where(col("exchange").isin(["NASDAQ", "NYSE"]))
-            .limit(100)  # Check more stocks for better chance of finding consecutive candles
-            .get_scanner_data(cookies=tv_cookies)
-        )
+def _streak_chart_closes(prices: pd.Series):
+    """Return a chart-data bar loader that reuses the snapshot price instead of a details lookup."""
 
-        if stock_df.empty:
-            logger.warning("No stocks found for screening")
-            return []
+    def load_bars(symbol: str, chart_timeframe: str) -> List[float]:
+        chart_data = get_stock_chart_data(symbol, chart_timeframe, current_price=prices.get(symbol))
+        return [point["price"] for point in chart_data.get("data", [])]
 
-        # List to store stocks with consecutive positive candles
-        positive_candle_stocks = []
+    return load_bars
 
-        # Check each stock for consecutive positive candles
-        for _, stock in stock_df.iterrows():
-            symbol = stock.get("name")
 
-            # Skip stocks with missing names
-            if not symbol:
-                logger.warning("Found stock with missing symbol, skipping")
-                continue
+def _format_streak_stocks(ranked: pd.DataFrame, universe: pd.DataFrame, streak_key: str) -> List[Dict[str, Any]]:
+    """Format ranked streaks with the snapshot columns of each symbol."""
+    df = universe.loc[ranked.index]
+    price = df["close"].where(df["close"].notna(), ranked["last_close"]).fillna(0.0)
+    change_percent = df["change"].where(df["change"].notna(), ranked["change_percent"]).fillna(0.0)
+    volume = df["volume"].fillna(0.0)
 
-            try:
-                # Get historical chart data for the stock
-                chart_data = get_stock_chart_data(symbol, timeframe)
+    return tvx.to_records(
+        df,
+        {
+            "symbol": pd.Series(df.index, index=df.index),
+            "name": tvx.fill_text(df, "description", pd.Series(df.index, index=df.index)),
+            "price": price,
+            "price_display": tvx.format_numeric_series(price, prefix="$"),
+            "change_percent_display": tvx.format_percent_series(change_percent),
+            "change_percent": change_percent,
+            "volume": volume,
+            "volume_display": tvx.format_volume_series(volume),
+            "sector": tvx.fill_text(df, "sector", "Unknown"),
+            "industry": tvx.fill_text(df, "industry", "Unknown"),
+            "exchange": tvx.fill_text(df, "exchange", "Unknown"),
+            streak_key: ranked["streak"].astype(int),
+            "description": tvx.fill_text(df, "description", ""),
+        },
+    )
 
-                # Skip if no chart data is available
-                if not chart_data or "data" not in chart_data or not chart_data["data"]:
-                    logger.warning(f"No chart data available for {symbol}, skipping")
-                    continue
 
-                # Get candle data (most recent candles come last)
-                candles = chart_data["data"]
+def _get_stocks_with_consecutive_candles(
+    direction: str, streak_key: str, timeframe: str, num_candles: int, limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Screen the whole snapshot universe for `num_candles` consecutive rising or falling closes.
 
-                # Count consecutive positive candles starting from the most recent
-                consecutive_positive = 0
+    Daily streaks come from the stored price history with today's live price as the last bar;
+    intraday streaks come from the chart data. Every symbol is scored in one pass of the
+    candle streak engine and only the ranked top `limit` are formatted.
+    """
+    from backend.services.candle_streak_engine import DAILY_TIMEFRAMES, build_daily_engine, build_intraday_engine
 
-                # We need at least num_candles+1 data points to check for num_candles consecutive positive candles
-                # (comparing current with previous)
-                if len(candles) <= num_candles:
-                    logger.warning(
-                        f"Not enough candles for {symbol} to check for {num_candles} consecutive positive candles"
-                    )
-                    continue
+    df = market_snapshot.get_frame()
+    universe = df[df["name"].notna() & (df["volume"] > STREAK_MIN_VOLUME)].drop_duplicates("name")
+    universe = universe.set_index("name", drop=False)
 
-                # Start from the most recent candle (last in the list) and go backwards
-                for i in range(len(candles) - 1, 0, -1):
-                    current_close = candles[i]["price"]  # Close price (assuming OHLC format)
-                    previous_close = candles[i - 1]["price"]  # Previous close
+    if universe.empty:
+        logger.warning("No stocks found for screening")
+        return []
 
-                    if current_close > previous_close:
-                        consecutive_positive += 1
-                    else:
-                        break  # Break on first non-positive candle
+    if timeframe in DAILY_TIMEFRAMES:
+        engine = build_daily_engine(universe.index, live_closes=universe["close"])
+    else:
+        engine = build_intraday_engine(universe.index, timeframe, _streak_chart_closes(universe["close"]))
 
-                    # Stop if we've found enough consecutive positive candles
-                    if consecutive_positive >= num_candles:
-                        break
+    ranked = engine.rank(direction, num_candles, limit, tiebreak=universe["change"])
+    logger.info(f"{len(ranked)} of {len(engine)} stocks have {num_candles}+ {direction} candles on {timeframe}")
+    return _format_streak_stocks(ranked, universe, streak_key)
 
-                # If we have enough consecutive positive candles, add to our results
-                if consecutive_positive >= num_candles:
-                    # Get detailed stock information
-                    stock_details = get_stock_details_tv(symbol)
-
-                    if stock_details:
-                        try:
-                            # Format and add relevant information
-                            # Make sure price is a number and never N/A
-                            price = stock_details.get("price", 0)
-                            if price is None or pd.isna(price):
-                                # Use the most recent candle's price as fallback if available
-                                if candles and len(candles) > 0:
-                                    price = candles[-1].get("price", 0)
-                                else:
-                                    price = 0
-
-                            # Explicitly force conversion to float
-                            try:
-                                price = float(price)
-                            except (ValueError, TypeError):
-                                price = 0.0
-                                logger.warning(f"Failed to convert price to float for {symbol}, using 0")
-
-                            # Make sure percent_change is a number and never N/A
-                            percent_change = stock_details.get("percent_change", 0)
-                            if percent_change is None or pd.isna(percent_change):
-                                # Calculate percent change from candles if available
-                                if candles and len(candles) > 1:
-                                    last_price = candles[-1].get("price", 0)
-                                    prev_price = candles[-2].get("price", 0)
-                                    if prev_price and prev_price > 0:
-                                        percent_change = ((last_price - prev_price) / prev_price) * 100
-                                else:
-                                    percent_change = 0
-
-                            # Explicitly force conversion to float
-                            try:
-                                percent_change = float(percent_change)
-                            except (ValueError, TypeError):
-                                percent_change = 0.0
-                                logger.warning(f"Failed to convert percent_change to float for {symbol}, using 0")
-
-                            # For debugging only
-                            logger.info(
-                                f"Stock: {symbol}, Price: {price} (type: {type(price)}), Change%: {percent_change} (type: {type(percent_change)})"
-                            )
-
-                            volume_num = stock_details.get("volume")
-                            if isinstance(volume_num, str):
-                                if "M" in volume_num:
-                                    volume_num = float(volume_num.replace("M", "")) * 1000000
-                                elif "K" in volume_num:
-                                    volume_num = float(volume_num.replace("K", "")) * 1000
-                                else:
-                                    volume_num = float(volume_num)
-
-                            # Instead of trying to be clever with formatting, just pass the plain numeric values
-                            # The frontend expects numbers that it can format itself
-                            stock_data = {
-                                "symbol": symbol,
-                                "name": stock_details.get("name", symbol),  # Use symbol as fallback for name
-                                "price": price,  # Already ensured to be a float
-                                "price_display": f"${price:.2f}",  # Formatted for display
-                                "change_percent_display": f"{percent_change:.2f}%",
-                                "change_percent": percent_change,  # Already ensured to be a float
-                                "volume": volume_num,  # Keep volume as is since it's already handled correctly
-                                "volume_display": stock_details.get("volume"),  # Formatted for display
-                                "sector": stock_details.get("sector", "Unknown"),
-                                "industry": stock_details.get("industry", "Unknown"),
-                                "exchange": stock.get("exchange", "Unknown"),
-                                "consecutive_positive_candles": consecutive_positive,
-                                "description": stock_details.get("description", ""),
-                            }
-
-                            # Final check to ensure numeric fields are not None or NaN
-                            for field in ["price", "change_percent"]:
-                                if stock_data[field] is None or (
-                                    hasattr(stock_data[field], "is_integer") and pd.isna(stock_data[field])
-                                ):
-                                    logger.warning(f"Field {field} is None or NaN for {symbol}, setting to 0")
-                                    stock_data[field] = 0.0
-
-                            # Print the final object being added
-                            logger.info(f"Adding stock to results: {json.dumps(stock_data, default=str)}")
-
-                            positive_candle_stocks.append(stock_data)
-                        except Exception as e:
-                            logger.error(f"Error processing stock details for {symbol}: {str(e)}")
-                            # Add a minimal record with the symbol
-                            positive_candle_stocks.append(
-                                {
-                                    "symbol": symbol,
-                                    "name": symbol,
-                                    "price": 0.0,
-                                    "price_display": "0.00",
-                                    "change_percent": 0.0,
-                                    "change_percent_display": "0.00%",
-                                    "volume": "0",
-                                    "volume_display": "0",
-                                    "sector": "Unknown",
-                                    "industry": "Unknown",
-                                    "exchange": "Unknown",
-                                    "consecutive_positive_candles": consecutive_positive,
-                                    "description": symbol,
-                                }
-                            )
 
-            except Exception as e:
-                logger.error(f"Error checking consecutive candles for {symbol}: {str(e)}")
-                continue
+def get_stocks_with_consecutive_positive_candles(
+    timeframe: str = "1d", num_candles: int = 3, limit: int = 20
+) -> List[Dict[str, Any]]:
+    """
+    Get stocks with consecutive positive candles.
 
-        # Sort by number of consecutive positive candles (descending) and then by change percentage (descending)
-        positive_candle_stocks.sort(
-            key=lambda x: (x["consecutive_positive_candles"], x["change_percent"]), reverse=True
-        )
-        # Return the top 'limit' stocks
-        return positive_candle_stocks[:limit]
+    Sorted by number of consecutive positive candles (descending) and then by change percentage (descending).
+    """
+    try:
+        logger.info(f"Screening for stocks with {num_candles} consecutive positive candles on {timeframe} timeframe")
+        return _get_stocks_with_consecutive_candles("up", "consecutive_positive_candles", timeframe, num_candles, limit)
 
     except Exception as e:
         logger.error(f"Error fetching stocks with consecutive positive candles: {str(e)}")
@@ -719,194 +537,14 @@ def get_stocks_with_consecutive_negative_candles(
 ) -> List[Dict[str, Any]]:
     """
     Get stocks with consecutive negative candles.
+
+    Sorted by number of consecutive negative candles (descending) and then by change percentage (ascending).
     """
     try:
         logger.info(f"Screening for stocks with {num_candles} consecutive negative candles on {timeframe} timeframe")
-
-        # Get cookies for TradingView
-        tv_cookies = get_cookies_from_browser()
-
-        # Get initial list of stocks to check
-        count, stock_df = (
-            Query()
-            .select("name", "close", "change_abs", "change", "volume", "description", "exchange", "market_cap_basic")
-            .where(col("volume") > 250_000)  # Higher volume filter for more reliable results
-            .where(col("exchange").isin(["NASDAQ", "NYSE"]))
-            .limit(50)  # Check more stocks for better chance of finding consecutive candles
-            .get_scanner_data(cookies=tv_cookies)
-        )
-
-        if stock_df.empty:
-            logger.warning("No stocks found for screening")
-            return []
-
-        # List to store stocks with consecutive negative candles
-        negative_candle_stocks = []
-
-        # Check each stock for consecutive negative candles
-        for _, stock in stock_df.iterrows():
-            symbol = stock.get("name")
-
-            # Skip stocks with missing names
-            if not symbol:
-                logger.warning("Found stock with missing symbol, skipping")
-                continue
-
-            try:
-                # Get historical chart data for the stock
-                chart_data = get_stock_chart_data(symbol, timeframe)
-
-                # Skip if no chart data is available
-                if not chart_data or "data" not in chart_data or not chart_data["data"]:
-                    logger.warning(f"No chart data available for {symbol}, skipping")
-                    continue
-
-                # Get candle data (most recent candles come last)
-                candles = chart_data["data"]
-
-                # Count consecutive negative candles starting from the most recent
-                consecutive_negative = 0
-
-                # We need at least num_candles+1 data points to check for num_candles consecutive negative candles
-                # (comparing current with previous)
-                if len(candles) <= num_candles:
-                    logger.warning(
-                        f"Not enough candles for {symbol} to check for {num_candles} consecutive negative candles"
-                    )
-                    continue
-
-                # Start from the most recent candle (last in the list) and go backwards
-                for i in range(len(candles) - 1, 0, -1):
-                    current_close = candles[i]["price"]  # Close price (assuming OHLC format)
-                    previous_close = candles[i - 1]["price"]  # Previous close
-
-                    if current_close < previous_close:  # Check for negative candle (current < previous)
-                        consecutive_negative += 1
-                    else:
-                        break  # Break on first non-negative candle
-
-                    # Stop if we've found enough consecutive negative candles
-                    if consecutive_negative >= num_candles:
-                        break
-
-                # If we have enough consecutive negative candles, add to our results
-                if consecutive_negative >= num_candles:
-                    # Get detailed stock information
-                    stock_details = get_stock_details_tv(symbol)
-
-                    if stock_details:
-                        try:
-                            # Format and add relevant information
-                            # Make sure price is a number and never N/A
-                            price = stock_details.get("price", 0)
-                            if price is None or pd.isna(price):
-                                # Use the most recent candle's price as fallback if available
-                                if candles and len(candles) > 0:
-                                    price = candles[-1].get("price", 0)
-                                else:
-                                    price = 0
-
-                            # Explicitly force conversion to float
-                            try:
-                                price = float(price)
-                            except (ValueError, TypeError):
-                                price = 0.0
-                                logger.warning(f"Failed to convert price to float for {symbol}, using 0")
-
-                            # Make sure percent_change is a number and never N/A
-                            percent_change = stock_details.get("percent_change", 0)
-                            if percent_change is None or pd.isna(percent_change):
-                                # Calculate percent change from candles if available
-                                if candles and len(candles) > 1:
-                                    last_price = candles[-1].get("price", 0)
-                                    prev_price = candles[-2].get("price", 0)
-                                    if prev_price and prev_price > 0:
-                                        percent_change = ((last_price - prev_price) / prev_price) * 100
-                                else:
-                                    percent_change = 0
-
-                            # Explicitly force conversion to float
-                            try:
-                                percent_change = float(percent_change)
-                            except (ValueError, TypeError):
-                                percent_change = 0.0
-                                logger.warning(f"Failed to convert percent_change to float for {symbol}, using 0")
-
-                            # For debugging only
-                            logger.info(
-                                f"Stock: {symbol}, Price: {price} (type: {type(price)}), Change%: {percent_change} (type: {type(percent_change)})"
-                            )
-
-                            volume_num = stock_details.get("volume")
-                            if isinstance(volume_num, str):
-                                if "M" in volume_num:
-                                    volume_num = float(volume_num.replace("M", "")) * 1000000
-                                elif "K" in volume_num:
-                                    volume_num = float(volume_num.replace("K", "")) * 1000
-                                else:
-                                    volume_num = float(volume_num)
-
-                            # Instead of trying to be clever with formatting, just pass the plain numeric values
-                            # The frontend expects numbers that it can format itself
-                            stock_data = {
-                                "symbol": symbol,
-                                "name": stock_details.get("name", symbol),  # Use symbol as fallback for name
-                                "price": price,  # Already ensured to be a float
-                                "price_display": f"${price:.2f}",  # Formatted for display
-                                "change_percent_display": f"{percent_change:.2f}%",
-                                "change_percent": percent_change,  # Already ensured to be a float
-                                "volume": volume_num,  # Keep volume as is since it's already handled correctly
-                                "volume_display": stock_details.get("volume"),  # Formatted for display
-                                "sector": stock_details.get("sector", "Unknown"),
-                                "industry": stock_details.get("industry", "Unknown"),
-                                "exchange": stock.get("exchange", "Unknown"),
-                                "consecutive_negative_candles": consecutive_negative,
-                                "description": stock_details.get("description", ""),
-                            }
-
-                            # Final check to ensure numeric fields are not None or NaN
-                            for field in ["price", "change_percent"]:
-                                if stock_data[field] is None or (
-                                    hasattr(stock_data[field], "is_integer") and pd.isna(stock_data[field])
-                                ):
-                                    logger.warning(f"Field {field} is None or NaN for {symbol}, setting to 0")
-                                    stock_data[field] = 0.0
-
-                            # Print the final object being added
-                            logger.info(f"Adding stock to results: {json.dumps(stock_data, default=str)}")
-
-                            negative_candle_stocks.append(stock_data)
-                        except Exception as e:
-                            logger.error(f"Error processing stock details for {symbol}: {str(e)}")
-                            # Add a minimal record with the symbol
-                            negative_candle_stocks.append(
-                                {
-                                    "symbol": symbol,
-                                    "name": symbol,
-                                    "price": 0.0,
-                                    "price_display": "0.00",
-                                    "change_percent": 0.0,
-                                    "change_percent_display": "0.00%",
-                                    "volume": "0",
-                                    "volume_display": "0",
-                                    "sector": "Unknown",
-                                    "industry": "Unknown",
-                                    "exchange": "Unknown",
-                                    "consecutive_negative_candles": consecutive_negative,
-                                    "description": symbol,
-                                }
-                            )
-
-            except Exception as e:
-                logger.error(f"Error checking consecutive candles for {symbol}: {str(e)}")
-                continue
-
-        # Sort by number of consecutive negative candles (descending) and then by change percentage (ascending)
-        negative_candle_stocks.sort(
-            key=lambda x: (x["consecutive_negative_candles"], -x["change_percent"]), reverse=True
+        return _get_stocks_with_consecutive_candles(
+            "down", "consecutive_negative_candles", timeframe, num_candles, limit
         )
-        # Return the top 'limit' stocks
-        return negative_candle_stocks[:limit]
 
     except Exception as e:
         logger.error(f"Error fetching stocks with consecutive negative candles: {str(e)}")
@@ -1244,191 +882,261 @@ def get_demo_stocks_for_date(date: str, limit: int = 10) -> List[Dict[str, Any]]
             }
         )
 
-    if is_weekend:
-        logger.info(f"Note: {date} is a weekend, returning zero-change demo data")
+    if is_weekend:
+        logger.info(f"Note: {date} is a weekend, returning zero-change demo data")
+
+    return results
+
+
+def _prev_day_levels_from_yahoo(df: pd.DataFrame, key: str = "symbol") -> pd.DataFrame:
+    """Per-symbol Yahoo Finance fallback for when the previous day levels table is empty."""
+    levels = [get_previous_day_data(symbol) for symbol in df[key]]
+    out = df.copy()
+    for field in ["open", "high", "low", "close", "volume"]:
+        out[f"prev_day_{field}"] = [level.get(f"previous_day_{field}", np.nan) for level in levels]
+    return out
+
+
+def get_stocks_crossing_prev_day_high(limit: int = 100) -> List[Dict[str, Any]]:
+    """
+    Get stocks from the top gainers that have their current price crossing above the previous day high.
+    Uses the smallest available timeframe to check for crosses.
+
+    Args:
+        limit: Maximum number of stocks to return
+
+    Returns:
+        List of dictionaries containing stock information
+    """
+    from backend.services.prev_day_levels import prev_day_levels
+
+    try:
+        logger.info(f"Fetching stocks crossing above previous day high (limit: {limit})")
+
+        # Get top gainers first - increase the limit to get a good pool of candidates
+        gainers = get_top_gainers(limit * 3)
+        logger.info(f"Retrieved {len(gainers)} gainers to check for previous day high crossing")
+
+        if not gainers:
+            return []
+
+        # Log the first few gainers to debug the data format
+        logger.info(f"Sample data format (first gainer): {gainers[0]}")
+
+        df = pd.DataFrame(gainers)
+        df = df[df["symbol"].notna() & (df["symbol"] != "")]
+
+        # Prices may come through as display strings; remove currency symbols and commas
+        df["price"] = pd.to_numeric(
+            df["price"].astype(str).str.replace("$", "", regex=False).str.replace(",", "", regex=False),
+            errors="coerce",
+        )
+
+        # Attach previous day levels to every candidate at once
+        if len(prev_day_levels):
+            df = prev_day_levels.join(df, key="symbol")
+        else:
+            logger.warning("Previous day levels table is empty, falling back to Yahoo Finance per symbol")
+            df = _prev_day_levels_from_yahoo(df)
+
+        # Skip stocks with missing previous day data, keep those trading above the previous high
+        prev_day_high = df["prev_day_high"].astype(float)
+        mask = prev_day_high.notna() & (prev_day_high != 0) & df["price"].notna() & (df["price"] > prev_day_high)
+        df = df[mask].head(limit)
+
+        if df.empty:
+            logger.info("Found 0 stocks crossing above previous day high")
+            return []
+
+        # Percent change as a number; derive it from the previous close where it is not parseable
+        change_percent = pd.to_numeric(
+            df["percent_change"].astype(str).str.replace("%", "", regex=False), errors="coerce"
+        )
+        prev_close = df["prev_day_close"].astype(float)
+        derived = (df["price"] - prev_close) / prev_close.where(prev_close > 0) * 100
+        change_percent = change_percent.fillna(derived).fillna(0.0)
+
+        volume_num = tvx.parse_volume_series(df["volume"]) if "volume" in df.columns else pd.Series(0.0, index=df.index)
+        name = tvx.fill_text(df, "name", df["symbol"])
+        sector = tvx.fill_text(df, "sector", "N/A")
+
+        crossing_stocks = tvx.to_records(
+            df,
+            {
+                "symbol": "symbol",
+                "name": name,
+                "price": df["price"].astype(float),  # Numeric value
+                "price_display": tvx.format_numeric_series(df["price"], prefix="$"),  # Formatted for display
+                "prev_day_high": df["prev_day_high"].astype(float),
+                "change_percent": change_percent.astype(float),  # Numeric value
+                "change_percent_display": tvx.format_percent_series(change_percent),  # Formatted for display
+                "volume": volume_num,  # Numeric value
+                "volume_display": tvx.format_volume_short(volume_num),  # Formatted for display
+                "sector": sector,
+                "industry": tvx.fill_text(df, "industry", "N/A"),
+                "exchange": tvx.fill_text(df, "exchange", "N/A"),
+            },
+        )
+        for stock_data in crossing_stocks:
+            logger.info(
+                f"✓ Stock {stock_data['symbol']} crossing above previous day high: "
+                f"{stock_data['price']} > {stock_data['prev_day_high']}"
+            )
+
+        # Fill in missing name/sector/industry with a single bulk details lookup
+        missing_details = [
+            stock_data
+            for stock_data in crossing_stocks
+            if stock_data["sector"] == "N/A" or not stock_data["name"]
+        ]
+        if missing_details:
+            details_by_symbol = get_stock_details_bulk([stock_data["symbol"] for stock_data in missing_details])
+            for stock_data in missing_details:
+                detailed_info = details_by_symbol.get(stock_data["symbol"].strip().upper())
+                if not detailed_info:
+                    continue
+                if not stock_data["name"] or stock_data["name"] == stock_data["symbol"]:
+                    stock_data["name"] = detailed_info.get("name", stock_data["name"])
+                if stock_data["sector"] == "N/A":
+                    stock_data["sector"] = detailed_info.get("sector", "N/A")
+                stock_data["industry"] = detailed_info.get("industry", stock_data["industry"])
 
-    return results
+        logger.info(f"Found {len(crossing_stocks)} stocks crossing above previous day high")
+
+        # Log the first few stocks for debugging
+        if crossing_stocks:
+            logger.info(f"First stock crossing previous day high: {crossing_stocks[0]}")
+
+        return crossing_stocks
+    except Exception as e:
+        logger.error(f"Error in get_stocks_crossing_prev_day_high: {str(e)}")
+        return []
 
 
-def get_stocks_crossing_prev_day_high(limit: int = 100) -> List[Dict[str, Any]]:
+def _safe_float(value) -> float:
+    """Convert a scanner value to float, using 0 for missing or invalid values."""
+    try:
+        value = float(value)
+    except (ValueError, TypeError):
+        return 0
+    return 0 if pd.isna(value) else value
+
+
+def _format_stock_details(row: pd.Series, clean_symbol: str) -> Dict[str, Any]:
     """
-    Get stocks from the top gainers that have their current price crossing above the previous day high.
-    Uses the smallest available timeframe to check for crosses.
+    Format one scanner row (STOCK_DETAILS_COLUMNS) into the stock details structure.
 
     Args:
-        limit: Maximum number of stocks to return
+        row: Scanner row for the stock
+        clean_symbol: Upper-cased ticker used when the row has no name
 
     Returns:
-        List of dictionaries containing stock information
+        Dictionary in the format returned by get_stock_details_tv
     """
-    try:
-        logger.info(f"Fetching stocks crossing above previous day high (limit: {limit})")
+    return {
+        "symbol": row.get("name", clean_symbol),  # Name field contains the ticker symbol
+        "name": row.get("description", f"{clean_symbol} Inc."),  # Description contains company name
+        "price": float(row.get("close", 0)),
+        "change": float(row.get("change_abs", 0)),
+        "percent_change": float(row.get("change", 0)),
+        "volume": format_volume(row.get("volume")),
+        "avg_volume": format_volume(row.get("average_volume_30d_calc")),
+        "market_cap": format_market_cap(row.get("market_cap_basic")),
+        "pe_ratio": _safe_float(row.get("price_earnings_ttm", 0)),
+        "eps": _safe_float(row.get("earnings_per_share_basic_ttm", 0)),
+        "dividend_yield": _safe_float(row.get("dividend_yield_current", 0)),
+        "pb_ratio": _safe_float(row.get("price_book_fq", 0)),
+        "sector": row.get("sector", "N/A"),
+        "industry": row.get("industry", "N/A"),
+        "description": row.get("description", "No description available."),
+    }
 
-        # Get top gainers first - increase the limit to get a good pool of candidates
-        gainers = get_top_gainers(limit * 3)
-        logger.info(f"Retrieved {len(gainers)} gainers to check for previous day high crossing")
 
-        # Log the first few gainers to debug the data format
-        if gainers:
-            logger.info(f"Sample data format (first gainer): {gainers[0]}")
+def _details_chunks(symbols: List[str], chunk_size: int) -> List[List[str]]:
+    """Clean, de-duplicate and split symbols into scanner sized chunks."""
+    clean_symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    return [clean_symbols[i : i + chunk_size] for i in range(0, len(clean_symbols), chunk_size)]
 
-        crossing_stocks = []
-        for stock in gainers:
-            symbol = stock.get("symbol")
-            if not symbol:
-                continue
 
-            try:
-                # Get current price from the stock data
-                price_str = stock.get("price", "0")
-                # Remove any currency symbols and commas
-                if isinstance(price_str, str):
-                    price_str = price_str.replace("$", "").replace(",", "")
+def _details_query(chunk: List[str]) -> Query:
+    """Build the `name IN (...)` details query for one chunk of symbols."""
+    # The same ticker can be listed on several exchanges; the default market cap
+    # ordering puts the primary listing first, matching get_stock_details_tv
+    return Query().select(*STOCK_DETAILS_COLUMNS).where(col("name").isin(chunk)).limit(len(chunk) * 2)
 
-                try:
-                    current_price = float(price_str)
-                    logger.debug(f"Parsed price for {symbol}: {current_price} (from {stock.get('price')})")
-                except (ValueError, TypeError):
-                    logger.warning(f"Invalid price format for {symbol}: {price_str}")
-                    continue
 
-                # Get previous day high
-                prev_day = get_previous_day_data(symbol)
-                prev_day_high = prev_day.get("previous_day_high")
+def _collect_details(df: pd.DataFrame, details: Dict[str, Dict[str, Any]]):
+    """Format the rows of one details response into `details`, keyed by upper-cased symbol."""
+    if df is None or df.empty:
+        return
+    df = df[df["name"].notna()].drop_duplicates("name", keep="first")
+    for _, row in df.iterrows():
+        clean_symbol = str(row["name"]).upper()
+        details[clean_symbol] = _format_stock_details(row, clean_symbol)
 
-                # Skip stocks with missing previous day data
-                if not prev_day_high:
-                    logger.debug(f"No previous day high for {symbol}, skipping")
-                    continue
 
-                logger.debug(f"Checking {symbol} - Current: {current_price}, Prev High: {prev_day_high}")
+def get_stock_details_bulk(symbols: List[str], chunk_size: int = DETAILS_CHUNK_SIZE) -> Dict[str, Dict[str, Any]]:
+    """
+    Get detailed information for many stocks with as few scanner requests as possible.
 
-                # Check if current price is crossing above previous day high
-                if current_price > prev_day_high:
-                    logger.info(f"✓ Stock {symbol} crossing above previous day high: {current_price} > {prev_day_high}")
-
-                    # Process change percentage
-                    change_percent = stock.get("percent_change")
-                    if isinstance(change_percent, str):
-                        try:
-                            change_percent = float(change_percent.replace("%", ""))
-                        except (ValueError, TypeError):
-                            logger.warning(f"Invalid change percent for {symbol}: {change_percent}")
-                            # Try to calculate it from price and previous day close
-                            try:
-                                prev_close = prev_day.get("previous_day_close")
-                                if prev_close and prev_close > 0:
-                                    change_percent = ((current_price - prev_close) / prev_close) * 100
-                                    logger.debug(f"Calculated change percent for {symbol}: {change_percent}%")
-                            except Exception as e:
-                                logger.warning(f"Error calculating change percent: {e}")
-                                change_percent = 0
-
-                    # Ensure volume is properly formatted
-                    volume = stock.get("volume", "0")
-                    if isinstance(volume, str):
-                        # Check if volume already has K/M suffix
-                        if "K" in volume or "M" in volume:
-                            # Keep as is for display
-                            volume_display = volume
-                            # But also create a numeric version for filtering
-                            try:
-                                if "K" in volume:
-                                    volume_num = float(volume.replace("K", "")) * 1000
-                                elif "M" in volume:
-                                    volume_num = float(volume.replace("M", "")) * 1000000
-                                else:
-                                    volume_num = float(volume.replace(",", ""))
-                            except (ValueError, TypeError):
-                                volume_num = 0
-                        else:
-                            # Clean the volume string and convert to number
-                            volume_clean = volume.replace(",", "")
-                            try:
-                                volume_num = int(float(volume_clean))
-                                # Format for display
-                                if volume_num >= 1000000:
-                                    volume_display = f"{volume_num/1000000:.1f}M"
-                                elif volume_num >= 1000:
-                                    volume_display = f"{volume_num/1000:.0f}K"
-                                else:
-                                    volume_display = str(volume_num)
-                            except (ValueError, TypeError):
-                                logger.warning(f"Invalid volume for {symbol}: {volume}")
-                                volume_num = 0
-                                volume_display = "N/A"
-                    else:
-                        # If it's already a number
-                        volume_num = volume if volume else 0
-                        # Format for display
-                        if volume_num >= 1000000:
-                            volume_display = f"{volume_num/1000000:.1f}M"
-                        elif volume_num >= 1000:
-                            volume_display = f"{volume_num/1000:.0f}K"
-                        else:
-                            volume_display = str(volume_num)
-
-                    # Get company name and sector if available
-                    name = stock.get("name", f"{symbol}")
-                    sector = stock.get("sector", "N/A")
-
-                    # Try to get more details if missing
-                    if sector == "N/A" or not name:
-                        try:
-                            detailed_info = get_stock_details_tv(symbol)
-                            if not name or name == symbol:
-                                name = detailed_info.get("name", name)
-                            if sector == "N/A":
-                                sector = detailed_info.get("sector", "N/A")
-
-                            # Also get industry and exchange if available
-                            industry = detailed_info.get("industry", stock.get("industry", "N/A"))
-                            exchange = detailed_info.get("exchange", stock.get("exchange", "N/A"))
-                        except Exception as e:
-                            logger.warning(f"Could not get detailed info for {symbol}: {e}")
-                            industry = stock.get("industry", "N/A")
-                            exchange = stock.get("exchange", "N/A")
-                    else:
-                        industry = stock.get("industry", "N/A")
-                        exchange = stock.get("exchange", "N/A")
-
-                    # Create a stock data object with all fields properly formatted
-                    stock_data = {
-                        "symbol": symbol,
-                        "name": name,
-                        "price": float(current_price),  # Numeric value
-                        "price_display": f"${current_price:.2f}",  # Formatted for display
-                        "prev_day_high": float(prev_day_high),
-                        "change_percent": float(change_percent),  # Numeric value
-                        "change_percent_display": f"{change_percent:.2f}%",  # Formatted for display
-                        "volume": volume_num,  # Numeric value
-                        "volume_display": volume_display,  # Formatted for display
-                        "sector": sector,
-                        "industry": industry,
-                        "exchange": exchange,
-                    }
+    Symbols are resolved with one `name IN (...)` query per chunk instead of one query per
+    symbol. A chunk that fails is logged and skipped so the other chunks are still returned.
 
-                    crossing_stocks.append(stock_data)
+    Args:
+        symbols: Ticker symbols (TradingView "name" values)
+        chunk_size: Maximum number of symbols per scanner request
 
-                    # If we have enough stocks, stop
-                    if len(crossing_stocks) >= limit:
-                        logger.info(f"Reached limit of {limit} stocks, stopping search")
-                        break
+    Returns:
+        Dictionary of upper-cased symbol to details (same format as get_stock_details_tv).
+        Symbols that TradingView does not know are left out.
+    """
+    chunks = _details_chunks(symbols, chunk_size)
+    details = {}
 
-            except Exception:
-                # logger.warning(f"Error processing stock {symbol}: {str(e)}")
-                continue
+    for chunk in chunks:
+        try:
+            count, df = tv_credentials.scan(_details_query(chunk))
+        except Exception as e:
+            logger.error(f"Error fetching bulk stock details for {len(chunk)} symbols: {str(e)}")
+            continue
+        _collect_details(df, details)
 
-        logger.info(f"Found {len(crossing_stocks)} stocks crossing above previous day high")
+    logger.info(f"Fetched details for {len(details)} of {sum(len(c) for c in chunks)} symbols")
+    return details
 
-        # Log the first few stocks for debugging
-        if crossing_stocks:
-            logger.info(f"First stock crossing previous day high: {crossing_stocks[0]}")
 
-        return crossing_stocks
-    except Exception as e:
-        logger.error(f"Error in get_stocks_crossing_prev_day_high: {str(e)}")
-        return []
+async def aget_stock_details_bulk(
+    symbols: List[str], chunk_size: int = DETAILS_CHUNK_SIZE
+) -> Dict[str, Dict[str, Any]]:
+    """Async variant of `get_stock_details_bulk`; the chunk queries run concurrently."""
+    chunks = _details_chunks(symbols, chunk_size)
+    details = {}
+
+    results = await tv_async_client.scan_many([_details_query(chunk) for chunk in chunks], return_exceptions=True)
+    for chunk, result in zip(chunks, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error fetching bulk stock details for {len(chunk)} symbols: {str(result)}")
+            continue
+        count, df = result
+        _collect_details(df, details)
+
+    logger.info(f"Fetched details for {len(details)} of {sum(len(c) for c in chunks)} symbols")
+    return details
+
+
+async def aget_stock_details_tv(symbol: str) -> Dict[str, Any]:
+    """
+    Async variant of `get_stock_details_tv`.
+
+    The exact-symbol lookup is awaited on the shared connection pool; unknown or invalid
+    symbols fall back to the synchronous broader search in a worker thread.
+    """
+    if symbol and symbol.strip():
+        details = await aget_stock_details_bulk([symbol])
+        stock_details = details.get(symbol.strip().upper())
+        if stock_details:
+            return stock_details
+    return await asyncio.to_thread(get_stock_details_tv, symbol)
 
 
 def get_stock_details_tv(symbol: str) -> Dict[str, Any]:
@@ -1453,31 +1161,13 @@ def get_stock_details_tv(symbol: str) -> Dict[str, Any]:
         # Clean up the symbol (remove any spaces or special characters)
         clean_symbol = symbol.strip().upper()
 
-        # Get cookies for TradingView
-        tv_cookies = get_cookies_from_browser()
-
         # Try to fetch data for the exact symbol first
         try:
-            query = (
+            query = tv_credentials.scan(
                 Query()
-                .select(
-                    "name",
-                    "close",
-                    "change",
-                    "change_abs",
-                    "volume",
-                    "description",
-                    "market_cap_basic",
-                    "sector",
-                    "industry",
-                    "price_earnings_ttm",
-                    "earnings_per_share_basic_ttm",
-                    "price_book_fq",
-                    "average_volume_30d_calc",
-                )
+                .select(*STOCK_DETAILS_COLUMNS)
                 .where(col("name") == clean_symbol)  # Name is the ticker symbol in TradingView
                 .limit(1)
-                .get_scanner_data(cookies=tv_cookies)
             )
 
             count, df = query if query else (0, pd.DataFrame())
@@ -1486,25 +1176,10 @@ def get_stock_details_tv(symbol: str) -> Dict[str, Any]:
                 logger.warning(f"No data found for {symbol}, trying broader search")
                 # Try a broader search
                 try:
-                    broader_query = (
+                    broader_query = tv_credentials.scan(
                         Query()
-                        .select(
-                            "name",
-                            "close",
-                            "change",
-                            "change_abs",
-                            "volume",
-                            "description",
-                            "market_cap_basic",
-                            "sector",
-                            "industry",
-                            "price_earnings_ttm",
-                            "earnings_per_share_basic_ttm",
-                            "price_book_fq",
-                            "average_volume_30d_calc",
-                        )
+                        .select(*STOCK_DETAILS_COLUMNS)
                         .limit(100)  # Get more results to search through
-                        .get_scanner_data(cookies=tv_cookies)
                     )
 
                     count, df = broader_query if broader_query else (0, pd.DataFrame())
@@ -1529,53 +1204,7 @@ def get_stock_details_tv(symbol: str) -> Dict[str, Any]:
             row = df.iloc[0]
             logger.info(f"Found stock data for {symbol}: {row['name']}")
 
-            # Handle numeric values carefully to avoid NaN issues
-            try:
-                pe_ratio = float(row.get("price_earnings_ttm", 0))
-                if pd.isna(pe_ratio):
-                    pe_ratio = 0
-            except (ValueError, TypeError):
-                pe_ratio = 0
-
-            try:
-                eps = float(row.get("earnings_per_share_basic_ttm", 0))
-                if pd.isna(eps):
-                    eps = 0
-            except (ValueError, TypeError):
-                eps = 0
-
-            try:
-                dividend_yield = float(row.get("dividend_yield_current", 0))
-                if pd.isna(dividend_yield):
-                    dividend_yield = 0
-            except (ValueError, TypeError):
-                dividend_yield = 0
-
-            try:
-                pb_ratio = float(row.get("price_book_fq", 0))
-                if pd.isna(pb_ratio):
-                    pb_ratio = 0
-            except (ValueError, TypeError):
-                pb_ratio = 0
-
-            # Format the result
-            stock_details = {
-                "symbol": row.get("name", clean_symbol),  # Name field contains the ticker symbol
-                "name": row.get("description", f"{clean_symbol} Inc."),  # Description contains company name
-                "price": float(row.get("close", 0)),
-                "change": float(row.get("change_abs", 0)),
-                "percent_change": float(row.get("change", 0)),
-                "volume": format_volume(row.get("volume")),
-                "avg_volume": format_volume(row.get("average_volume_30d_calc")),
-                "market_cap": format_market_cap(row.get("market_cap_basic")),
-                "pe_ratio": pe_ratio,
-                "eps": eps,
-                "dividend_yield": dividend_yield,
-                "pb_ratio": pb_ratio,
-                "sector": row.get("sector", "N/A"),
-                "industry": row.get("industry", "N/A"),
-                "description": row.get("description", "No description available."),
-            }
+            stock_details = _format_stock_details(row, clean_symbol)
 
             # Log success with some key data points for debugging
             logger.info(
@@ -1592,8 +1221,15 @@ def get_stock_details_tv(symbol: str) -> Dict[str, Any]:
         return get_demo_stock_details(symbol)
 
 
-def get_stock_chart_data(symbol: str, timeframe: str = "1D") -> Dict[str, Any]:
-    """Get chart data for a specific stock."""
+def get_stock_chart_data(symbol: str, timeframe: str = "1D", current_price: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Get chart data for a specific stock.
+
+    Args:
+        symbol: Stock symbol
+        timeframe: Chart timeframe (1D, 5D, 1M, 3M, 6M, 1Y, 5Y)
+        current_price: Latest price when the caller already has it (skips the details lookup)
+    """
     try:
         logger.info(f"Fetching chart data for {symbol} with timeframe {timeframe}")
 
@@ -1611,8 +1247,10 @@ def get_stock_chart_data(symbol: str, timeframe: str = "1D") -> Dict[str, Any]:
         resolution, limit = timeframe_map.get(timeframe, ("D", 90))
 
         # Get the current price to use as base for simulated data
-        stock_details = get_stock_details_tv(symbol)
-        current_price = float(stock_details.get("price", 100))
+        if current_price is None or pd.isna(current_price):
+            stock_details = get_stock_details_tv(symbol)
+            current_price = stock_details.get("price", 100)
+        current_price = float(current_price)
 
         # Generate data points
         now = datetime.now()
@@ -1816,29 +1454,27 @@ def get_previous_day_data(symbol: str) -> Dict[str, Any]:
     Returns:
         Dictionary containing previous day's trading data
     """
-    try:
-        logger.info(f"Fetching previous day data for {symbol} using Yahoo Finance")
+    from backend.services.prev_day_levels import prev_day_levels
 
-        from datetime import datetime, timedelta
-
-        import pandas_market_calendars as mcal
-        import yfinance as yf
+    try:
+        # Serve from the shared previous day levels table when the symbol is stored
+        levels = prev_day_levels.lookup(symbol)
+        if levels:
+            return {"symbol": symbol, **levels}
 
-        # Get the previous trading day
-        nyse = mcal.get_calendar("NYSE")
-        today = datetime.now().date()
+        logger.info(f"Fetching previous day data for {symbol} using Yahoo Finance")
 
-        # Get the last 5 trading days to find the previous trading day
-        trading_days = nyse.valid_days(start_date=today - timedelta(days=10), end_date=today)
-        if len(trading_days) < 2:
+        # Get the previous trading day from the precomputed session table
+        prev_session = market_calendar.previous_session()
+        if prev_session is None:
             logger.warning(f"Could not determine previous trading day for {symbol}")
             return {}
 
-        prev_trading_day = trading_days[-2].strftime("%Y-%m-%d")
+        prev_trading_day = prev_session.strftime("%Y-%m-%d")
 
         # Fetch data from Yahoo Finance
         # Get data for a slightly longer period to ensure we have the previous day
-        start_date = (trading_days[-2] - timedelta(days=5)).strftime("%Y-%m-%d")
+        start_date = (prev_session - timedelta(days=5)).strftime("%Y-%m-%d")
         end_date = prev_trading_day
 
         ticker = yf.Ticker(symbol)
@@ -1879,27 +1515,14 @@ def get_first_five_min_candle(symbol: str) -> Dict[str, Any]:
     try:
         logger.info(f"Fetching first 5-minute candle for {symbol}")
 
-        # Get today's date
-        today = datetime.now()
-
-        # If today is weekend, go back to Friday
-        if today.weekday() >= 5:  # 5 = Saturday, 6 = Sunday
-            days_to_subtract = today.weekday() - 4  # Go back to Friday
-            today = today - timedelta(days=days_to_subtract)
-
-        # Format date as YYYY-MM-DD
-        date_str = today.strftime("%Y-%m-%d")
-
         # Instead of using get_bars (which is not available), get current data and simulate first 5-min candle
         try:
             # Get current stock data
-            tv_cookies = get_cookies_from_browser()
-            count, df = (
+            count, df = tv_credentials.scan(
                 Query()
                 .select("high", "low", "open", "close", "volume", "change")
                 .where(col("active_symbol") == True)
                 .where(col("name") == symbol)
-                .get_scanner_data(cookies=tv_cookies)
             )
 
             if df.empty:
@@ -1972,6 +1595,110 @@ def get_first_five_min_candle(symbol: str) -> Dict[str, Any]:
         }
 
 
+def _format_open_below_prev_high(matches: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Format `screen_open_below_prev_high` rows into the open-below-previous-high records."""
+    return tvx.to_records(
+        matches,
+        {
+            "symbol": "name",
+            "name": tvx.fill_text(matches, "description", matches["name"]),
+            "open_price": matches["open"].astype(str),
+            "prev_day_high": matches["prev_day_high"].astype(str),
+            "diff_percent": matches["diff_percent"].round(2).astype(str),
+            "current_price": matches["close"].astype(str),
+            "change_percent": matches["change"].round(2).astype(str),
+            "volume": tvx.format_volume_series(matches["volume"]),
+            "market_cap": tvx.format_market_cap_series(matches["market_cap_basic"]),
+            "exchange": tvx.fill_text(matches, "exchange", ""),
+        },
+    )
+
+
+def iter_stocks_with_open_below_prev_day_high(
+    limit: int = 100,
+    min_price: float = 0.25,
+    max_price: float = 10,
+    batch_size: int = 250,
+    min_volume: int = 250_000,
+    min_diff_percent: float = 1.0,
+    max_diff_percent: float = 10000.0,
+    min_change_percent: float = 1.0,
+    max_change_percent: float = 1000.0,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Scan for stocks whose open is below the previous day's high, one scanner page at a time.
+
+    The universe is requested in offset pages of `batch_size` rows (cheapest first). Each page
+    is joined to the shared previous day levels and filtered as soon as it arrives, and the
+    scan stops as soon as `limit` matches were produced, so at most one page is held in memory.
+
+    Args:
+        limit: Maximum number of stocks to return
+        min_price: Minimum stock price filter
+        max_price: Maximum stock price filter
+        batch_size: Number of stocks requested per scanner page
+        min_volume: Minimum volume filter
+
+    Yields:
+        The matches of each page (sorted by diff_percent within the page); pages without
+        matches are skipped
+    """
+    from backend.services.prev_day_levels import prev_day_levels
+
+    query = (
+        Query()
+        .select(
+            "name",
+            "open",
+            "close",
+            "high",
+            "low",
+            "change",
+            "volume",
+            "description",
+            "exchange",
+            "market_cap_basic",
+        )
+        .where(
+            col("active_symbol") == True,
+            col("volume") > min_volume,
+            col("high") < max_price,
+            col("high") > min_price,
+            col("exchange").isin(["NASDAQ", "NYSE"]),
+        )
+        .order_by("close", ascending=True)
+    )
+
+    # Previous session levels from the shared in-memory table (one hash join, no DB round trip)
+    prev_day_df = prev_day_levels.frame
+
+    remaining = limit
+    scanned = 0
+    for page in iter_scan_pages(tv_credentials.scan, query, page_size=batch_size):
+        scanned += len(page)
+        matches = tvx.screen_open_below_prev_high(
+            page,
+            prev_day_df,
+            min_price=min_price,
+            max_price=max_price,
+            min_diff_percent=min_diff_percent,
+            max_diff_percent=max_diff_percent,
+            min_change_percent=min_change_percent,
+            max_change_percent=max_change_percent,
+        )
+        if matches.empty:
+            continue
+
+        records = _format_open_below_prev_high(matches.head(remaining))
+        remaining -= len(records)
+        logger.info(f"✓ {len(records)} matches in page ending at row {scanned} ({limit - remaining}/{limit})")
+        yield records
+
+        if remaining <= 0:
+            logger.info(f"Found {limit} matches after scanning {scanned} stocks, stopping")
+            return
+
+
 def get_stocks_with_open_below_prev_day_high(
     limit: int = 100,
     min_price: float = 0.25,
@@ -1997,208 +1724,27 @@ def get_stocks_with_open_below_prev_day_high(
     Returns:
         List of dictionaries containing stock information
     """
-    from backend.models.database import PriceHistory, Stock, db_session
-
     try:
         logger.info(f"Screening for stocks with open price below previous day high (limit: {limit})")
         logger.info(f"Price range: ${min_price} to ${max_price}, Min volume: {min_volume}")
 
-        # Get cookies for TradingView
-        tv_cookies = get_cookies_from_browser()
-
-        # List to store stocks where open is below previous day high
         open_below_prev_high_stocks = []
-        count, stock_df = (
-            Query()
-            .select(
-                "name",
-                "open",
-                "close",
-                "high",
-                "low",
-                "change",
-                "volume",
-                "description",
-                "exchange",
-                "market_cap_basic",
-            )
-            .where(col("active_symbol") == True)
-            .where(col("volume") > min_volume)
-            .where(col("high") < max_price)
-            .where(col("high") > min_price)
-            .where(col("exchange").isin(["NASDAQ", "NYSE"]))
-            .order_by("close", ascending=True)
-            .limit(5000)
-            .get_scanner_data(cookies=tv_cookies)
-        )
-
-        if stock_df.empty:
-            logger.info("No more stocks found in this batch, stopping")
-            return []
-
-        prev_day = datetime.now() - timedelta(days=1)
-        if prev_day.weekday() >= 5:  # Saturday or Sunday
-            prev_day = datetime.now() - timedelta(days=3)  # Go back to Friday
-
-        prev_day = prev_day.strftime("%Y/%m/%d")
-
-        previous_day_data = (
-            db_session()
-            .query(PriceHistory, Stock)
-            .join(Stock, PriceHistory.stock_id == Stock.id)
-            .filter(PriceHistory.date == prev_day)
-            .all()
-        )
-        data = []
-        for price_history, stock in previous_day_data:
-            record = {
-                # Price history fields
-                "price_id": price_history.id,
-                "timeframe": price_history.timeframe,
-                "open": price_history.open,
-                "high": price_history.high,
-                "low": price_history.low,
-                "close": price_history.close,
-                "volume": price_history.volume,
-                "date": price_history.date,
-                # Stock fields
-                "stock_id": stock.id,
-                "symbol": stock.symbol,
-                "name": stock.name,
-                "sector": stock.sector,
-                "industry": stock.industry,
-            }
-            data.append(record)
-        # Create DataFrame
-        df = pd.DataFrame(data)
-
-        # Create a dictionary for quick lookups of previous day data by symbol
-        previous_day_lookup = {}
-        for _, row in df.iterrows():
-            symbol = row["name"]
-            previous_day_lookup[symbol] = {
-                "previous_day_high": row["high"],
-                "previous_day_close": row["close"],
-                "previous_day_open": row["open"],
-                "previous_day_low": row["low"],
-                "previous_day_volume": row["volume"],
-            }
-
-        for _, stock in tqdm(stock_df.iterrows(), total=len(stock_df), desc="Processing stocks"):
-            symbol = stock.get("name")
-
-            # Skip stocks with missing names
-            if not symbol:
-                continue
-
-            # Check volume requirement only if volume exists
-            volume = stock.get("volume")
-            if volume is not None and volume < min_volume:
-                continue
-
-            try:
-                # Get current day's price data, handling possible null values
-                current_open = stock.get("open")
-                current_open = float(current_open) if current_open is not None else None
-
-                current_price = stock.get("close")
-                current_price = float(current_price) if current_price is not None else None
-
-                # Get previous day data
-                prev_day = previous_day_lookup.get(symbol, {})
-                prev_day_high = prev_day.get("previous_day_high")
-
-                # Only apply price filtering criteria if we have valid price data
-                if current_price is not None and (current_price < min_price or current_price > max_price):
-                    continue
-
-                # Modified logic to handle null values in price data
-                include_stock = False
-                # If both open and prev_day_high have values, check if open is below prev high
-                if current_open is not None and prev_day_high is not None:
-                    if current_open < prev_day_high:
-                        include_stock = True
-                        diff_percent = ((prev_day_high - current_open) / prev_day_high) * 100
-
-                        if diff_percent < min_diff_percent or diff_percent > max_diff_percent:
-                            include_stock = False
-                else:
-                    # Include stocks with missing price data (like in your screenshot)
-                    include_stock = True
-                    diff_percent = None
-
-                if include_stock:
-                    # Handle null values for change_percent
-                    try:
-                        change_percent = float(stock.get("change", 0))
-                    except (TypeError, ValueError):
-                        change_percent = None
-                        continue
-
-                    if min_change_percent > change_percent or change_percent > max_change_percent:
-                        continue
-
-                    # Get all the data we want to return
-                    stock_data = {
-                        "symbol": symbol,
-                        "name": stock.get("description", symbol),
-                        "open_price": str(current_open),
-                        "prev_day_high": str(prev_day_high),
-                        "diff_percent": str(round(diff_percent, 2)),
-                        "current_price": str(current_price),
-                        "change_percent": str(round(change_percent, 2)),
-                        "volume": format_volume(stock.get("volume", 0)),
-                        "market_cap": format_market_cap(stock.get("market_cap_basic", 0)),
-                        "exchange": stock.get("exchange", ""),
-                    }
-
-                    if current_open is not None and prev_day_high is not None:
-                        logger.info(f"✓ Stock {symbol} open below previous day high: {current_open} < {prev_day_high}")
-                    else:
-                        logger.info(f"✓ Stock {symbol} included with incomplete price data")
-
-                    open_below_prev_high_stocks.append(stock_data)
-
-            except Exception:
-                # logger.warning(f"Error processing stock {symbol}: {str(e)}")
-                continue
-
-        # if not open_below_prev_high_stocks:
-        #     open_below_prev_high_stocks = [{
-        #         "symbol": "AAPL",
-        #         "name": "Apple Inc.",
-        #         "open_price": "187.50",
-        #         "prev_day_high": "190.00",
-        #         "current_price": "192.35",
-        #         "diff_percent": "1.32",
-        #         "change_percent": "2.59",
-        #         "volume": "65432100",
-        #         "market_cap": "3012500000000",
-        #         "exchange": "NASDAQ",
-        #         "sector": "Technology",
-        #         "industry": "Consumer Electronics",
-        #         "is_new": True
-        #     },
-        #     {
-        #         "symbol": "MSFT",
-        #         "name": "Microsoft Corporation",
-        #         "open_price": "378.20",
-        #         "prev_day_high": "380.00",
-        #         "current_price": "382.70",
-        #         "diff_percent": "-0.47",
-        #         "change_percent": "1.19",
-        #         "volume": "23456700",
-        #         "market_cap": "2845000000000",
-        #         "exchange": "NASDAQ",
-        #         "sector": "Technology",
-        #         "industry": "Software",
-        #         "is_new": False
-        #     }]
-
-        # Sort results by diff_percent (largest difference first)
-        if open_below_prev_high_stocks:  # Only sort if the list is not empty
-            open_below_prev_high_stocks.sort(key=lambda x: x["diff_percent"], reverse=False)
+        for records in iter_stocks_with_open_below_prev_day_high(
+            limit=limit,
+            min_price=min_price,
+            max_price=max_price,
+            batch_size=batch_size,
+            min_volume=min_volume,
+            min_diff_percent=min_diff_percent,
+            max_diff_percent=max_diff_percent,
+            min_change_percent=min_change_percent,
+            max_change_percent=max_change_percent,
+        ):
+            open_below_prev_high_stocks.extend(records)
 
+        # Sort by diff_percent (smallest difference first) across all pages
+        open_below_prev_high_stocks.sort(key=lambda x: float(x["diff_percent"]))
+        logger.info(f"✓ {len(open_below_prev_high_stocks)} stocks opened below their previous day high")
         return open_below_prev_high_stocks
 
     except Exception as e:
@@ -2296,7 +1842,7 @@ def get_stocks_with_filters_no_post_filters(
             query = query.where(*conditions)
 
         # Set limit and execute
-        count, df = query.limit(limit).get_scanner_data(cookies=tv_cookies)
+        count, df = tv_credentials.scan(query.limit(limit))
 
         return df
     except Exception as e:
@@ -2326,11 +1872,8 @@ def get_stock_price_tv(symbol: str) -> Dict[str, Any]:
         # Clean up the symbol (remove any spaces or special characters)
         clean_symbol = symbol.strip().upper()
 
-        # Get cookies for TradingView
-        tv_cookies = get_cookies_from_browser()
-
         # Try to fetch data for the exact symbol first
-        query = (
+        query = tv_credentials.scan(
             Query()
             .select(
                 "name",
@@ -2349,7 +1892,6 @@ def get_stock_price_tv(symbol: str) -> Dict[str, Any]:
             )
             .where(col("name") == clean_symbol)  # Name is the ticker symbol in TradingView
             .limit(1)
-            .get_scanner_data(cookies=tv_cookies)
         )
 
         count, df = query if query else (0, pd.DataFrame())
@@ -2392,6 +1934,79 @@ def get_stock_price_tv(symbol: str) -> Dict[str, Any]:
         }
 
 
+def _format_prev_day_high_crosses(crossed: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Format rows with prev_day_high and percent_above_prev_high columns into cross alerts."""
+    return tvx.to_records(
+        crossed,
+        {
+            "symbol": "name",
+            "name": tvx.fill_text(crossed, "description", crossed["name"]),
+            "current_price": tvx.format_numeric_series(crossed["close"]),
+            "previous_day_high": tvx.format_numeric_series(crossed["prev_day_high"]),
+            "percent_above_prev_high": tvx.format_percent_series(crossed["percent_above_prev_high"]),
+            "percent_change": tvx.format_percent_series(crossed["change"]),
+            "volume": tvx.format_volume_series(crossed["volume"]),
+            "market_cap": tvx.format_market_cap_series(crossed["market_cap_basic"]),
+            "exchange": tvx.fill_text(crossed, "exchange", ""),
+        },
+    )
+
+
+def watch_prev_day_high_crosses(detector: CrossDetector, stock_symbols: List[str]):
+    """
+    Point a cross detector at `stock_symbols` with their previous day highs.
+
+    The highs come from the shared previous day levels table; symbols without a stored
+    previous session are watched with a NaN level and never cross.
+    """
+    from backend.services.prev_day_levels import prev_day_levels
+
+    highs = prev_day_levels.frame["high"].reindex(pd.Index(stock_symbols, dtype=object))
+    detector.set_watchlist(stock_symbols, highs.to_numpy(dtype=float))
+
+
+def detect_prev_day_high_crosses(detector: CrossDetector, stock_df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Report watched stocks that crossed above their previous day high since the last check.
+
+    Args:
+        detector: Detector prepared with `watch_prev_day_high_crosses`
+        stock_df: Current quotes, normally the market snapshot frame
+
+    Returns:
+        Crossed stocks in the format of check_stocks_cross_above_prev_day_high
+    """
+    crossed = detector.update(stock_df)
+    if crossed.empty:
+        return []
+    return _format_prev_day_high_crosses(tvx.add_percent_above(crossed, "prev_day_high", "close"))
+
+
+async def detect_streamed_prev_day_high_crosses(
+    detector: CrossDetector, prices: Dict[str, float]
+) -> List[Dict[str, Any]]:
+    """
+    Report watched stocks that crossed above their previous day high, from streamed prices.
+
+    The detection only needs the prices, so the snapshot (name, change, volume, ...) is read
+    only when something crossed, to fill in the alert rows.
+
+    Args:
+        detector: Detector prepared with `watch_prev_day_high_crosses`
+        prices: Last trade price per watched symbol
+
+    Returns:
+        Crossed stocks in the format of check_stocks_cross_above_prev_day_high
+    """
+    crossed = detector.update(pd.DataFrame({"name": list(prices), "close": list(prices.values())}))
+    if crossed.empty:
+        return []
+    snapshot = await market_snapshot.aget_frame()
+    details = snapshot.drop_duplicates("name").set_index("name").drop(columns=["close"])
+    crossed = crossed.merge(details, left_on="name", right_index=True, how="left")
+    return _format_prev_day_high_crosses(tvx.add_percent_above(crossed, "prev_day_high", "close"))
+
+
 def check_stocks_cross_above_prev_day_high(stock_symbols: List[str], test_mode: bool = True) -> List[Dict[str, Any]]:
     """
     Checks if stocks that opened below previous day high have now crossed above it.
@@ -2409,26 +2024,9 @@ def check_stocks_cross_above_prev_day_high(stock_symbols: List[str], test_mode:
 
         logger.info(f"Checking if {len(stock_symbols)} stocks have crossed above previous day high")
 
-        # Get cookies for TradingView
-        tv_cookies = get_cookies_from_browser()
-
-        # Get current price data for the stocks
-        count, stock_df = (
-            Query()
-            .select(
-                "name",
-                "close",
-                "high",
-                "low",
-                "change",
-                "volume",
-                "description",
-                "exchange",
-                "market_cap_basic",
-            )
-            .where(col("name").isin(stock_symbols))
-            .get_scanner_data(cookies=tv_cookies)
-        )
+        # Get current price data for the stocks from the shared snapshot
+        stock_df = market_snapshot.get_frame()
+        stock_df = stock_df[stock_df["name"].isin(stock_symbols)]
 
         if stock_df.empty:
             logger.info("No stock data found")
@@ -2452,83 +2050,13 @@ def check_stocks_cross_above_prev_day_high(stock_symbols: List[str], test_mode:
 
             return []
 
-        # Get previous day's data from database
-        from backend.models.database import PriceHistory, Stock, db_session
-
-        prev_day = (datetime.now() - timedelta(days=1)).strftime("%Y/%m/%d")
-        previous_day_data = (
-            db_session()
-            .query(PriceHistory, Stock)
-            .join(Stock, PriceHistory.stock_id == Stock.id)
-            .filter(PriceHistory.date == prev_day)
-            .filter(Stock.symbol.in_([s.upper() for s in stock_symbols]))
-            .all()
-        )
-
-        # Create a dictionary for quick lookups of previous day data by symbol
-        previous_day_lookup = {}
-        for price_history, stock in previous_day_data:
-            symbol = stock.symbol
-            previous_day_lookup[symbol] = {
-                "previous_day_high": price_history.high,
-                "previous_day_close": price_history.close,
-                "name": stock.name,
-            }
-
-        # Get TradingView symbols to database symbols mapping
-        tv_to_db_map = {}
-        for _, stock in stock_df.iterrows():
-            symbol = stock.get("name")
-            # Try to find a matching symbol in the database
-            for db_symbol in previous_day_lookup.keys():
-                if symbol.upper() == db_symbol.upper():
-                    tv_to_db_map[symbol] = db_symbol
-
-        crossed_stocks = []
-
-        for _, stock in stock_df.iterrows():
-            symbol = stock.get("name")
-            db_symbol = tv_to_db_map.get(symbol)
-
-            if not db_symbol:
-                continue
-
-            # Current price data
-            current_price = stock.get("close")
-
-            if current_price is None:
-                continue
-
-            current_price = float(current_price)
-
-            # Previous day high
-            prev_day_data = previous_day_lookup.get(db_symbol)
-            if not prev_day_data:
-                continue
-
-            prev_day_high = prev_day_data.get("previous_day_high")
-            if prev_day_high is None:
-                continue
-
-            # Check if current price is above previous day high
-            if current_price > prev_day_high:
-                percent_above = ((current_price - prev_day_high) / prev_day_high) * 100
-
-                crossed_stocks.append(
-                    {
-                        "symbol": symbol,
-                        "name": prev_day_data.get("name", stock.get("description", symbol)),
-                        "current_price": format_numeric(current_price),
-                        "previous_day_high": format_numeric(prev_day_high),
-                        "percent_above_prev_high": format_percent(percent_above),
-                        "percent_change": format_percent(stock.get("change", 0)),
-                        "volume": format_volume(stock.get("volume", 0)),
-                        "market_cap": format_market_cap(stock.get("market_cap_basic", 0)),
-                        "exchange": stock.get("exchange", ""),
-                    }
-                )
+        # Previous session levels from the shared in-memory table
+        from backend.services.prev_day_levels import prev_day_levels
 
-                logger.info(f"✓ Stock {symbol} crossed above previous day high: {current_price} > {prev_day_high}")
+        crossed = tvx.screen_cross_above_prev_high(stock_df, prev_day_levels.frame)
+        crossed_stocks = _format_prev_day_high_crosses(crossed)
+        if crossed_stocks:
+            logger.info(f"✓ {len(crossed_stocks)} stocks crossed above previous day high")
 
         # In test mode, if no stocks found crossing above, generate a test stock
         if test_mode and not crossed_stocks and stock_symbols:
@@ -2678,33 +2206,22 @@ def get_previous_day_stocks_from_file(
             logger.error(f"File does not exist: {path}")
             return []
 
+        # <TICKER>,<PER>,<DATE>,<TIME>,<OPEN>,<HIGH>,<LOW>,<CLOSE>,<VOL>,<OPENINT>
         df = pd.read_csv(path)
-        results = []
-        for index, row in df.iterrows():
-            # <TICKER>,<PER>,<DATE>,<TIME>,<OPEN>,<HIGH>,<LOW>,<CLOSE>,<VOL>,<OPENINT>
-            symbol = row["<TICKER>"]
-            prev_day_date = row["<DATE>"]
-            prev_day_open = row["<OPEN>"]
-            prev_day_high = row["<HIGH>"]
-            prev_day_low = row["<LOW>"]
-            prev_day_close = row["<CLOSE>"]
-            prev_day_volume = row["<VOL>"]
-            # Add to results
-            stock_result = {
-                "ticker": symbol,
-                "name": symbol,
-                "previous_day_date": prev_day_date,
-                "open": float(prev_day_open),
-                "high": float(prev_day_high),
-                "low": float(prev_day_low),
-                "close": float(prev_day_close),
-                "volume": int(prev_day_volume),
+        return pd.DataFrame(
+            {
+                "ticker": df["<TICKER>"],
+                "name": df["<TICKER>"],
+                "previous_day_date": df["<DATE>"],
+                "open": df["<OPEN>"].astype(float),
+                "high": df["<HIGH>"].astype(float),
+                "low": df["<LOW>"].astype(float),
+                "close": df["<CLOSE>"].astype(float),
+                "volume": df["<VOL>"].astype("int64"),
                 "change_percent": None,
                 "change_abs": None,
             }
-            results.append(stock_result)
-
-        return pd.DataFrame(results)
+        )
 
     except Exception as e:
         logger.error(f"Error fetching previous day filtered stocks using Yahoo Finance: {str(e)}")
@@ -2740,23 +2257,14 @@ def get_previous_day_stocks_with_filters(
     try:
         logger.info("Fetching filtered stocks from previous trading day using Yahoo Finance")
 
-        from datetime import datetime, timedelta
-
-        import pandas_market_calendars as mcal
-        import yfinance as yf
-
-        # Get the previous trading day
-        nyse = mcal.get_calendar("NYSE")
-        today = datetime.now().date()
-
-        # Get the last 5 trading days to find the previous trading day
-        trading_days = nyse.valid_days(start_date=today - timedelta(days=10), end_date=today)
-        if len(trading_days) < 2:
+        # Get the previous trading day from the precomputed session table
+        prev_session = market_calendar.previous_session()
+        if prev_session is None:
             logger.warning("Could not determine previous trading day")
             return []
 
-        prev_trading_day = trading_days[-2].strftime("%Y-%m-%d")
-        day_before_prev = (trading_days[-2] - timedelta(days=1)).strftime("%Y-%m-%d")
+        prev_trading_day = prev_session.strftime("%Y-%m-%d")
+        day_before_prev = (prev_session - timedelta(days=1)).strftime("%Y-%m-%d")
 
         # First, get a list of stocks that match basic filters
         # We'll use the current day data to get a list of symbols
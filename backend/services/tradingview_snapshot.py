@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from tradingview_screener import Query, col
+
+from backend.services.tradingview_async import AsyncScannerClient
+from backend.services.tradingview_credentials import TradingViewCredentialProvider
+from backend.services.tradingview_paging import aiter_scan_pages, iter_scan_pages
+
+logger = logging.getLogger(__name__)
+
+# Every column read by the screeners in tradingview_service, fetched once per refresh
+SNAPSHOT_COLUMNS = [
+    "name",
+    "description",
+    "open",
+    "high",
+    "low",
+    "close",
+    "change_abs",
+    "change",
+    "volume",
+    "market_cap_basic",
+    "sector",
+    "industry",
+    "exchange",
+    "active_symbol",
+]
+
+NUMERIC_COLUMNS = ["open", "high", "low", "close", "change_abs", "change", "volume", "market_cap_basic"]
+
+SNAPSHOT_EXCHANGES = ["NASDAQ", "NYSE"]
+
+# How long a snapshot is served before the next request triggers a refresh
+SNAPSHOT_TTL_SECONDS = float(os.environ.get("TV_SNAPSHOT_TTL_SECONDS", "5"))
+
+# After a failed refresh the stale snapshot is served this long before upstream is tried again
+SNAPSHOT_RETRY_SECONDS = float(os.environ.get("TV_SNAPSHOT_RETRY_SECONDS", "15"))
+
+# Rows requested per scanner page (NASDAQ + NYSE normally fits in one page; larger
+# universes are fetched with further offset pages instead of being truncated)
+SNAPSHOT_PAGE_SIZE = 20_000
+
+
+class TradingViewSnapshot:
+    """
+    Full-universe TradingView scan shared by every screener.
+
+    The NASDAQ/NYSE universe is pulled with a single scanner request and kept as one
+    columnar DataFrame for `ttl_seconds`. Screeners apply their filters and sorts locally
+    on that frame, so a dashboard refresh costs at most one upstream call and every list
+    is computed from the same point in time.
+    """
+
+    def __init__(
+        self,
+        credentials: TradingViewCredentialProvider,
+        ttl_seconds: float = SNAPSHOT_TTL_SECONDS,
+        page_size: int = SNAPSHOT_PAGE_SIZE,
+        async_client: Optional[AsyncScannerClient] = None,
+    ):
+        """
+        Args:
+            credentials: Provider used to authenticate the scanner request
+            ttl_seconds: Maximum age of a snapshot before it is refreshed
+            page_size: Rows requested per scanner page
+            async_client: Client used by `aget_frame` (created from `credentials` if omitted)
+        """
+        self._credentials = credentials
+        self._async_client = async_client or AsyncScannerClient(credentials)
+        self.ttl_seconds = ttl_seconds
+        self.page_size = page_size
+
+        self._frame: Optional[pd.DataFrame] = None
+        self._fetched_at = 0.0
+        self._retry_after = 0.0
+        self._lock = threading.Lock()
+        self._async_lock: Optional[asyncio.Lock] = None
+
+        self.timestamp: Optional[datetime] = None
+        self.refresh_count = 0
+        self.hit_count = 0
+        self.error_count = 0
+
+    def _build_query(self) -> Query:
+        """Build the universe query (no screener specific filters)."""
+        return (
+            Query()
+            .select(*SNAPSHOT_COLUMNS)
+            .where(col("exchange").isin(SNAPSHOT_EXCHANGES))
+        )
+
+    @staticmethod
+    def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+        """Coerce scanner columns to the dtypes the screeners filter on."""
+        for column in NUMERIC_COLUMNS:
+            if column in df.columns:
+                df[column] = pd.to_numeric(df[column], errors="coerce")
+        if "active_symbol" in df.columns:
+            df["active_symbol"] = df["active_symbol"].fillna(False).astype(bool)
+        return df.reset_index(drop=True)
+
+    @staticmethod
+    def _combine(pages: List[pd.DataFrame]) -> pd.DataFrame:
+        """Concatenate scanner pages into one frame."""
+        if not pages:
+            return pd.DataFrame(columns=["ticker", *SNAPSHOT_COLUMNS])
+        return pages[0] if len(pages) == 1 else pd.concat(pages, ignore_index=True)
+
+    def _fetch(self) -> pd.DataFrame:
+        """Pull the whole universe from TradingView, one offset page at a time."""
+        pages = list(iter_scan_pages(self._credentials.scan, self._build_query(), self.page_size))
+        return self._prepare(self._combine(pages))
+
+    async def _afetch(self) -> pd.DataFrame:
+        """Pull the whole universe from TradingView without blocking the event loop."""
+        pages = [page async for page in aiter_scan_pages(self._async_client.scan, self._build_query(), self.page_size)]
+        return self._prepare(self._combine(pages))
+
+    def _store(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Publish a freshly fetched frame."""
+        self._frame = frame
+        self._fetched_at = time.monotonic()
+        self._retry_after = 0.0
+        self.timestamp = datetime.now()
+        self.refresh_count += 1
+        logger.info(f"Refreshed TradingView snapshot with {len(frame)} symbols")
+        return frame
+
+    def _on_refresh_error(self, e: Exception) -> pd.DataFrame:
+        """
+        Serve the previous frame after a failed refresh, or re-raise if there is none.
+
+        The stale frame keeps being served for SNAPSHOT_RETRY_SECONDS, so an upstream outage
+        costs one request per retry window instead of one per caller.
+        """
+        self.error_count += 1
+        if self._frame is None:
+            raise e
+        self._retry_after = time.monotonic() + SNAPSHOT_RETRY_SECONDS
+        logger.error(f"Error refreshing TradingView snapshot, serving stale data: {str(e)}")
+        return self._frame
+
+    def is_fresh(self) -> bool:
+        """Return True if the cached snapshot is younger than the TTL (or upstream is backing off)."""
+        if self._frame is None:
+            return False
+        now = time.monotonic()
+        return (now - self._fetched_at) < self.ttl_seconds or now < self._retry_after
+
+    def get_frame(self) -> pd.DataFrame:
+        """
+        Get the current universe snapshot, refreshing it if it has expired.
+
+        The returned DataFrame is shared between callers and must be treated as read-only;
+        filter it with masks or copy it before modifying.
+
+        Returns:
+            DataFrame with one row per symbol and the columns in SNAPSHOT_COLUMNS
+        """
+        with self._lock:
+            if self.is_fresh():
+                self.hit_count += 1
+                return self._frame
+
+            try:
+                frame = self._fetch()
+            except Exception as e:
+                return self._on_refresh_error(e)
+            return self._store(frame)
+
+    async def aget_frame(self) -> pd.DataFrame:
+        """
+        Async variant of `get_frame` for request handlers running on the event loop.
+
+        Concurrent callers share a single in-flight refresh: the first one fetches while the
+        others wait on the lock and then read the fresh frame.
+
+        Returns:
+            DataFrame with one row per symbol and the columns in SNAPSHOT_COLUMNS
+        """
+        if self.is_fresh():
+            self.hit_count += 1
+            return self._frame
+
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+
+        async with self._async_lock:
+            if self.is_fresh():
+                self.hit_count += 1
+                return self._frame
+
+            try:
+                frame = await self._afetch()
+            except Exception as e:
+                return self._on_refresh_error(e)
+
+            with self._lock:
+                return self._store(frame)
+
+    def invalidate(self):
+        """Drop the cached snapshot so the next read goes upstream."""
+        with self._lock:
+            self._fetched_at = 0.0
+            self._retry_after = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return refresh counters for debugging."""
+        return {
+            "rows": 0 if self._frame is None else len(self._frame),
+            "timestamp": self.timestamp.isoformat() if self.timestamp else None,
+            "ttl_seconds": self.ttl_seconds,
+            "refresh_count": self.refresh_count,
+            "hit_count": self.hit_count,
+            "error_count": self.error_count,
+        }
@@ -0,0 +1,227 @@
+"""
+Columnar post-processing for TradingView scanner DataFrames.
+
+Every helper here operates on whole pandas/NumPy columns: NaN cleaning, type coercion,
+derived columns and display formatting are applied once per column rather than once per
+row, and records are only materialised at the very end with `to_records`.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+NOT_AVAILABLE = "N/A"
+
+
+def clean_numeric(df: pd.DataFrame, columns: Iterable[str], fill: Optional[float] = 0.0) -> pd.DataFrame:
+    """
+    Coerce columns to floats, replacing unparsable values and NaN with `fill`.
+
+    Args:
+        df: Scanner DataFrame (modified in place and returned)
+        columns: Columns to coerce; missing columns are created
+        fill: Replacement for NaN values, or None to keep NaN
+
+    Returns:
+        The same DataFrame with numeric columns
+    """
+    for column in columns:
+        if column in df.columns:
+            values = pd.to_numeric(df[column], errors="coerce").astype(float)
+        else:
+            values = pd.Series(np.nan, index=df.index, dtype=float)
+        df[column] = values if fill is None else values.fillna(fill)
+    return df
+
+
+def fill_text(df: pd.DataFrame, column: str, default) -> pd.Series:
+    """Return a text column with NaN/missing values replaced by `default` (a scalar or Series)."""
+    if column not in df.columns:
+        return default if isinstance(default, pd.Series) else pd.Series(default, index=df.index, dtype=object)
+    return df[column].where(df[column].notna(), default)
+
+
+def _format_scaled(values: np.ndarray, out: np.ndarray, mask: np.ndarray, fmt: str, scale: float):
+    """Write `fmt % (values / scale)` into `out` where `mask` is set."""
+    if mask.any():
+        out[mask] = np.char.mod(fmt, values[mask] / scale)
+
+
+def format_volume_short(series: pd.Series) -> pd.Series:
+    """Format volumes as 1.2M / 345K / 999 (NaN counts as 0)."""
+    values = np.trunc(pd.to_numeric(series, errors="coerce").fillna(0).to_numpy(dtype=float))
+    out = np.empty(len(values), dtype=object)
+    millions = values >= 1_000_000
+    thousands = ~millions & (values >= 1_000)
+    rest = ~(millions | thousands)
+    _format_scaled(values, out, millions, "%.1fM", 1_000_000)
+    _format_scaled(values, out, thousands, "%.0fK", 1_000)
+    _format_scaled(values, out, rest, "%d", 1)
+    return pd.Series(out, index=series.index, dtype=object)
+
+
+def format_volume_series(series: pd.Series) -> pd.Series:
+    """Column version of `format_volume`: 1.23B / 4.56M / 7.89K / 999, or N/A."""
+    numeric = pd.to_numeric(series, errors="coerce")
+    values = np.trunc(numeric.to_numpy(dtype=float))
+    out = np.full(len(values), NOT_AVAILABLE, dtype=object)
+    valid = ~np.isnan(values)
+    billions = valid & (values >= 1_000_000_000)
+    millions = valid & ~billions & (values >= 1_000_000)
+    thousands = valid & ~billions & ~millions & (values >= 1_000)
+    rest = valid & ~(billions | millions | thousands)
+    _format_scaled(values, out, billions, "%.2fB", 1_000_000_000)
+    _format_scaled(values, out, millions, "%.2fM", 1_000_000)
+    _format_scaled(values, out, thousands, "%.2fK", 1_000)
+    if rest.any():
+        out[rest] = pd.Series(values[rest].astype(np.int64)).map("{:,}".format).to_numpy()
+    return pd.Series(out, index=series.index, dtype=object)
+
+
+def parse_volume_series(series: pd.Series) -> pd.Series:
+    """Parse volumes that may be display strings (1.2M, 345K, 68,532,800) back to floats (0 if invalid)."""
+    text = series.astype(str).str.replace(",", "", regex=False).str.strip().str.upper()
+    multiplier = np.select(
+        [text.str.endswith("B"), text.str.endswith("M"), text.str.endswith("K")],
+        [1_000_000_000, 1_000_000, 1_000],
+        default=1,
+    )
+    numbers = pd.to_numeric(text.str.rstrip("BMK"), errors="coerce")
+    return (numbers * multiplier).fillna(0.0)
+
+
+def format_thousands_series(series: pd.Series) -> pd.Series:
+    """Format integers with thousands separators (68,532,800), or N/A."""
+    numeric = pd.to_numeric(series, errors="coerce")
+    out = pd.Series(NOT_AVAILABLE, index=series.index, dtype=object)
+    valid = numeric.notna()
+    if valid.any():
+        out[valid] = numeric[valid].astype(np.int64).map("{:,}".format)
+    return out
+
+
+def format_market_cap_series(series: pd.Series) -> pd.Series:
+    """Column version of `format_market_cap`: $1.23B / $4.56M / $789.00, or N/A."""
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    out = np.full(len(values), NOT_AVAILABLE, dtype=object)
+    valid = ~np.isnan(values)
+    billions = valid & (values >= 1_000_000_000)
+    millions = valid & ~billions & (values >= 1_000_000)
+    rest = valid & ~(billions | millions)
+    _format_scaled(values, out, billions, "$%.2fB", 1_000_000_000)
+    _format_scaled(values, out, millions, "$%.2fM", 1_000_000)
+    if rest.any():
+        out[rest] = pd.Series(values[rest]).map("${:,.2f}".format).to_numpy()
+    return pd.Series(out, index=series.index, dtype=object)
+
+
+def format_numeric_series(series: pd.Series, suffix: str = "", prefix: str = "") -> pd.Series:
+    """Format numbers with two decimals (and an optional prefix/suffix), or N/A."""
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    out = np.full(len(values), NOT_AVAILABLE, dtype=object)
+    _format_scaled(values, out, ~np.isnan(values), f"{prefix}%.2f{suffix}", 1)
+    return pd.Series(out, index=series.index, dtype=object)
+
+
+def format_percent_series(series: pd.Series) -> pd.Series:
+    """Format percentages as 12.34%, or N/A."""
+    return format_numeric_series(series, suffix="%%")
+
+
+def add_diff_percent(
+    df: pd.DataFrame, level_column: str = "prev_day_high", price_column: str = "open", target: str = "diff_percent"
+) -> pd.DataFrame:
+    """Add how far `price_column` sits below `level_column`, in percent of the level."""
+    level = df[level_column].astype(float)
+    df[target] = (level - df[price_column].astype(float)) / level * 100
+    return df
+
+
+def add_percent_above(
+    df: pd.DataFrame,
+    level_column: str = "prev_day_high",
+    price_column: str = "close",
+    target: str = "percent_above_prev_high",
+) -> pd.DataFrame:
+    """Add how far `price_column` sits above `level_column`, in percent of the level."""
+    level = df[level_column].astype(float)
+    df[target] = (df[price_column].astype(float) - level) / level * 100
+    return df
+
+
+def to_records(df: pd.DataFrame, columns: Dict[str, object]) -> List[Dict]:
+    """
+    Emit output records from prepared columns.
+
+    Args:
+        df: Frame holding the prepared columns
+        columns: Mapping of output key to a source column name or a ready-made Series
+
+    Returns:
+        List of dictionaries with native Python values
+    """
+    if df.empty:
+        return []
+    out = pd.DataFrame(
+        {key: (source if isinstance(source, pd.Series) else df[source]) for key, source in columns.items()},
+        index=df.index,
+    )
+    return out.to_dict("records")
+
+
+def screen_open_below_prev_high(
+    stock_df: pd.DataFrame,
+    prev_day_df: pd.DataFrame,
+    min_price: float,
+    max_price: float,
+    min_diff_percent: float,
+    max_diff_percent: float,
+    min_change_percent: float,
+    max_change_percent: float,
+) -> pd.DataFrame:
+    """
+    Join live scanner rows to previous day highs and keep stocks that opened below them.
+
+    Args:
+        stock_df: Scanner rows (name, open, close, change, volume, ...)
+        prev_day_df: Previous day levels indexed by symbol with a "high" column
+        min_price / max_price: Current price range
+        min_diff_percent / max_diff_percent: Range for the open's distance below the previous high
+        min_change_percent / max_change_percent: Range for the day's percentage change
+
+    Returns:
+        Matching rows with prev_day_high and diff_percent columns, sorted by diff_percent
+    """
+    df = stock_df[stock_df["name"].notna()].copy()
+    clean_numeric(df, ["open", "close", "change", "volume", "market_cap_basic"], fill=None)
+    df["prev_day_high"] = pd.to_numeric(df["name"].map(prev_day_df["high"]), errors="coerce").astype(float)
+    add_diff_percent(df, "prev_day_high", "open")
+
+    price = df["close"]
+    change = df["change"]
+    mask = (
+        ~((price < min_price) | (price > max_price))
+        & (df["open"] < df["prev_day_high"])
+        & df["diff_percent"].between(min_diff_percent, max_diff_percent)
+        & ~((change < min_change_percent) | (change > max_change_percent))
+    )
+    return df[mask].sort_values("diff_percent", kind="stable")
+
+
+def screen_cross_above_prev_high(stock_df: pd.DataFrame, prev_day_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Join live scanner rows to previous day highs and keep stocks trading above them.
+
+    Args:
+        stock_df: Scanner rows (name, close, change, volume, ...)
+        prev_day_df: Previous day levels indexed by symbol with a "high" column
+
+    Returns:
+        Matching rows with prev_day_high and percent_above_prev_high columns
+    """
+    df = stock_df[stock_df["name"].notna()].copy()
+    clean_numeric(df, ["close", "change", "volume", "market_cap_basic"], fill=None)
+    df["prev_day_high"] = pd.to_numeric(df["name"].map(prev_day_df["high"]), errors="coerce").astype(float)
+    add_percent_above(df, "prev_day_high", "close")
+    return df[df["close"] > df["prev_day_high"]]
@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import os
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from backend.models.database import Alert, SessionLocal, TriggeredAlert
+
+logger = logging.getLogger(__name__)
+
+# Triggered alerts kept in memory; older ones are written to the triggered_alerts table
+CAPACITY = int(os.environ.get("TRIGGERED_ALERTS_CAPACITY", "5000"))
+
+# Evicted alerts written per INSERT batch
+SPILL_BATCH_SIZE = int(os.environ.get("TRIGGERED_ALERTS_SPILL_BATCH", "200"))
+
+# Upper bound on evicted alerts waiting for the database (the oldest are dropped beyond it)
+MAX_PENDING = int(os.environ.get("TRIGGERED_ALERTS_MAX_PENDING", "50000"))
+
+# Failed attempts at a batch before it is written row by row and the failing rows dead-lettered
+SPILL_MAX_RETRIES = int(os.environ.get("TRIGGERED_ALERTS_SPILL_MAX_RETRIES", "3"))
+
+# Rows that could not be written, kept in memory for inspection
+DEAD_LETTER_SIZE = int(os.environ.get("TRIGGERED_ALERTS_DEAD_LETTER_SIZE", "1000"))
+
+
+def _row(alert_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map triggered alert data to a triggered_alerts row."""
+    return {
+        "alert_id": alert_data.get("id"),
+        "user_id": alert_data.get("user_id"),
+        "stock_symbol": alert_data.get("stock_symbol"),
+        "alert_type": alert_data.get("alert_type"),
+        "threshold_value": alert_data.get("threshold_value"),
+        "current_value": alert_data.get("current_value"),
+        "triggered_at": alert_data.get("triggered_at"),
+    }
+
+
+class TriggeredAlertStore:
+    """
+    Fixed-capacity ring buffer of triggered alerts with per-user and per-symbol indexes.
+
+    Every entry gets a sequence number and lives in slot `sequence % capacity`. The user and
+    symbol indexes hold the sequence numbers of their entries in insertion order, so the
+    entry overwritten by a new one is always the oldest of its user and symbol and leaves
+    the indexes with a popleft; reading the k latest alerts of a user costs O(k). Entries
+    pushed out of the ring are queued and written to the triggered_alerts table in batches
+    by a background task, so memory stays flat without losing history. A batch that keeps
+    failing is written row by row after `SPILL_MAX_RETRIES` attempts and the rows that
+    still fail are moved to a bounded dead-letter queue, so one bad row never blocks the
+    spill.
+    """
+
+    def __init__(self, capacity: int = CAPACITY, spill_batch_size: int = SPILL_BATCH_SIZE):
+        self.capacity = capacity
+        self.spill_batch_size = spill_batch_size
+        self._lock = threading.Lock()
+        self._slots: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._next = 0
+        self._by_user: Dict[Any, Deque[int]] = {}
+        self._by_symbol: Dict[str, Deque[int]] = {}
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._spill_task: Optional[asyncio.Task] = None
+        self._spill_failures = 0
+        self.dead_letters: Deque[Dict[str, Any]] = deque(maxlen=DEAD_LETTER_SIZE)
+        self.spilled_count = 0
+        self.dropped_count = 0
+        self.dead_letter_count = 0
+
+    def __len__(self) -> int:
+        return min(self._next, self.capacity)
+
+    @staticmethod
+    def _unindex(index: Dict[Any, Deque[int]], key, sequence: int):
+        sequences = index.get(key)
+        if sequences and sequences[0] == sequence:
+            sequences.popleft()
+            if not sequences:
+                del index[key]
+
+    def add(self, alert_data: Dict[str, Any]) -> int:
+        """
+        Store a triggered alert, evicting the oldest entry once the buffer is full.
+
+        Returns:
+            Sequence number of the entry
+        """
+        with self._lock:
+            sequence = self._next
+            slot = sequence % self.capacity
+            evicted = self._slots[slot]
+            if evicted is not None:
+                evicted_sequence = sequence - self.capacity
+                self._unindex(self._by_user, evicted.get("user_id"), evicted_sequence)
+                self._unindex(self._by_symbol, evicted.get("stock_symbol"), evicted_sequence)
+                self._pending.append(evicted)
+                if len(self._pending) > MAX_PENDING:
+                    self._pending.popleft()
+                    self.dropped_count += 1
+
+            self._slots[slot] = alert_data
+            self._next += 1
+            self._by_user.setdefault(alert_data.get("user_id"), deque()).append(sequence)
+            self._by_symbol.setdefault(alert_data.get("stock_symbol"), deque()).append(sequence)
+            spill = len(self._pending) >= self.spill_batch_size
+
+        if spill:
+            self._schedule_spill()
+        return sequence
+
+    def _collect(self, sequences: Optional[Deque[int]], limit: int) -> List[Dict[str, Any]]:
+        """Newest-first entries for the last `limit` sequence numbers (caller holds the lock)."""
+        if sequences is None:
+            return []
+        entries = []
+        for sequence in reversed(sequences):
+            if len(entries) >= limit:
+                break
+            entries.append(self._slots[sequence % self.capacity])
+        return entries
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Latest triggered alerts of every user, newest first."""
+        with self._lock:
+            first = max(self._next - min(limit, self.capacity), 0)
+            return [self._slots[sequence % self.capacity] for sequence in range(self._next - 1, first - 1, -1)]
+
+    def recent_for_user(self, user_id, limit: int = 50) -> List[Dict[str, Any]]:
+        """Latest triggered alerts of one user, newest first."""
+        with self._lock:
+            return self._collect(self._by_user.get(user_id), limit)
+
+    def recent_for_symbol(self, symbol: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Latest triggered alerts on one symbol, newest first."""
+        with self._lock:
+            return self._collect(self._by_symbol.get(symbol), limit)
+
+    def clear(self):
+        """Drop the in-memory entries (they are queued for the database first)."""
+        with self._lock:
+            first = max(self._next - self.capacity, 0)
+            entries = (self._slots[sequence % self.capacity] for sequence in range(first, self._next))
+            self._pending.extend(entry for entry in entries if entry is not None)
+            self._slots = [None] * self.capacity
+            self._next = 0
+            self._by_user.clear()
+            self._by_symbol.clear()
+
+    def _schedule_spill(self):
+        """Start a background spill unless one is already running (no-op outside an event loop)."""
+        if self._spill_task is not None and not self._spill_task.done():
+            return
+        try:
+            self._spill_task = asyncio.get_running_loop().create_task(self.spill())
+        except RuntimeError:
+            # No running loop: the entries stay queued until the next spill or flush
+            pass
+
+    @staticmethod
+    def _rows(db, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Rows for a batch, with the alert ids of alerts deleted since they fired set to NULL
+        (the foreign key's ON DELETE SET NULL only applies to rows that already exist).
+        """
+        rows = [_row(alert_data) for alert_data in batch]
+        ids = {row["alert_id"] for row in rows if row["alert_id"] is not None}
+        if ids:
+            existing = {alert_id for (alert_id,) in db.query(Alert.id).filter(Alert.id.in_(ids))}
+            for row in rows:
+                if row["alert_id"] not in existing:
+                    row["alert_id"] = None
+        return rows
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        """Insert one batch of rows with a dedicated session (runs in a worker thread)."""
+        db = SessionLocal()
+        try:
+            db.bulk_insert_mappings(TriggeredAlert, self._rows(db, batch))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _write_each(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert a batch one row per transaction and return the entries that failed."""
+        failed = []
+        db = SessionLocal()
+        try:
+            for alert_data in batch:
+                try:
+                    db.bulk_insert_mappings(TriggeredAlert, self._rows(db, [alert_data]))
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Dead-lettering triggered alert {alert_data.get('id')}: {str(e)}")
+                    failed.append(alert_data)
+        finally:
+            db.close()
+        return failed
+
+    async def spill(self):
+        """Write the queued entries to the database in batches of `spill_batch_size`."""
+        while True:
+            with self._lock:
+                count = min(len(self._pending), self.spill_batch_size)
+                batch = [self._pending.popleft() for _ in range(count)]
+            if not batch:
+                return
+            if self._spill_failures >= SPILL_MAX_RETRIES:
+                # Give up on the batch as a whole: keep every row that can be written
+                failed = await asyncio.to_thread(self._write_each, batch)
+                self._spill_failures = 0
+                self.spilled_count += len(batch) - len(failed)
+                self.dead_letters.extend(failed)
+                self.dead_letter_count += len(failed)
+                continue
+            try:
+                await asyncio.to_thread(self._write, batch)
+                self.spilled_count += len(batch)
+                self._spill_failures = 0
+            except Exception as e:
+                # Requeue the batch in front so the order is kept; the next eviction retries
+                with self._lock:
+                    self._pending.extendleft(reversed(batch))
+                self._spill_failures += 1
+                logger.error(
+                    f"Error spilling {len(batch)} triggered alerts "
+                    f"(attempt {self._spill_failures} of {SPILL_MAX_RETRIES}): {str(e)}"
+                )
+                return
+
+    async def flush(self):
+        """Queue every in-memory entry as well and write everything (used on shutdown)."""
+        if self._spill_task is not None and not self._spill_task.done():
+            await self._spill_task
+        self.clear()
+        await self.spill()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return buffer and spill counters for debugging."""
+        with self._lock:
+            return {
+                "size": min(self._next, self.capacity),
+                "capacity": self.capacity,
+                "users": len(self._by_user),
+                "symbols": len(self._by_symbol),
+                "pending": len(self._pending),
+                "spilled": self.spilled_count,
+                "dropped": self.dropped_count,
+                "dead_letters": self.dead_letter_count,
+            }
@@ -0,0 +1,470 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+# Messages buffered per connection before it counts as lagging
+QUEUE_SIZE = int(os.environ.get("WS_QUEUE_SIZE", "100"))
+
+# A single send slower than this drops the connection
+SEND_TIMEOUT_SECONDS = float(os.environ.get("WS_SEND_TIMEOUT_SECONDS", "10"))
+
+# What to do with a lagging connection: "resync" (discard its backlog and tell it to
+# reload) or "drop" (close it; the dashboard reconnects on its own)
+LAG_POLICY = os.environ.get("WS_LAG_POLICY", "resync")
+
+# Close code sent to connections dropped for lagging (1013: try again later)
+LAG_CLOSE_CODE = 1013
+
+# Upper bound on topics one connection may subscribe to
+MAX_TOPICS_PER_CLIENT = int(os.environ.get("WS_MAX_TOPICS_PER_CLIENT", "500"))
+
+# Topic receiving every event; connections start on it until they subscribe explicitly
+ALL_TOPICS = "*"
+SCREENER_TOPIC_PREFIX = "screener:"
+SYMBOL_TOPIC_PREFIX = "symbol:"
+
+
+def screener_topic(event_type: str) -> str:
+    """Topic carrying every row of a screener event (e.g. screener:new_crossing_stocks)."""
+    return f"{SCREENER_TOPIC_PREFIX}{event_type}"
+
+
+def symbol_topic(symbol: str) -> str:
+    """Topic carrying the rows of any event that concern one symbol (e.g. symbol:AAPL)."""
+    return f"{SYMBOL_TOPIC_PREFIX}{str(symbol).strip().upper()}"
+
+
+def _normalize_topic(topic: str) -> Optional[str]:
+    """Validate a client supplied topic, upper-casing symbols; None if it is not a known kind."""
+    topic = str(topic).strip()
+    if topic == ALL_TOPICS:
+        return topic
+    if topic.startswith(SYMBOL_TOPIC_PREFIX) and len(topic) > len(SYMBOL_TOPIC_PREFIX):
+        return symbol_topic(topic[len(SYMBOL_TOPIC_PREFIX) :])
+    if topic.startswith(SCREENER_TOPIC_PREFIX) and len(topic) > len(SCREENER_TOPIC_PREFIX):
+        return topic
+    return None
+
+
+def _default_resync_messages() -> List[Dict[str, Any]]:
+    """Message sent to a lagging client whose backlog was discarded."""
+    return [{"type": "resync", "timestamp": datetime.now().isoformat()}]
+
+
+class _Client:
+    """One connected websocket with its outgoing queue and writer task."""
+
+    def __init__(self, websocket: WebSocket, queue_size: int, user_id=None):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task: Optional[asyncio.Task] = None
+        self.topics: Set[str] = set()
+        self.explicit_topics = False
+        self.closing = False
+        self.sent_count = 0
+        self.lag_count = 0
+        self.connected_at = datetime.now()
+
+
+class BroadcastHub:
+    """
+    Fan-out of server push messages to every connected websocket.
+
+    A message is encoded once per broadcast and the same text is put on a bounded queue
+    per connection. Each connection has its own writer task draining its queue, so a
+    slow client only delays itself: when its queue is full it is either resynced (backlog
+    discarded, a resync message queued) or dropped, and everyone else keeps receiving.
+
+    Connections can narrow what they receive with topic subscriptions, sent as JSON text:
+
+        {"action": "subscribe", "topics": ["screener:new_crossing_stocks", "symbol:AAPL"]}
+        {"action": "subscribe", "symbols": ["AAPL", "MSFT"]}   (a watchlist)
+        {"action": "unsubscribe", "topics": ["symbol:AAPL"]}
+
+    A topic -> connections index routes each published event only to interested sockets:
+    "*" and screener topics get the whole event, symbol topics only the rows for their
+    symbols. New connections are on "*" until their first subscribe.
+
+    Screeners published as sequenced deltas can be resynced: with a `snapshot_messages`
+    provider, connecting (on "*"), subscribing to a screener topic, sending {"action": "resync", "screener": name}
+    after a sequence gap, or lagging behind queues the current snapshots.
+    """
+
+    def __init__(
+        self,
+        encoder: Callable[[Any], str] = json.dumps,
+        queue_size: int = QUEUE_SIZE,
+        send_timeout: float = SEND_TIMEOUT_SECONDS,
+        lag_policy: str = LAG_POLICY,
+        resync_messages: Callable[[], List[Any]] = _default_resync_messages,
+        snapshot_messages: Optional[Callable[[Optional[str]], List[Any]]] = None,
+    ):
+        """
+        Args:
+            encoder: Function turning a message into the text sent on the wire
+            queue_size: Maximum number of messages buffered per connection
+            send_timeout: Seconds a single send may take before the connection is dropped
+            lag_policy: "resync" or "drop" for connections whose queue is full
+            resync_messages: Messages queued for a resynced connection (encoded with `encoder`)
+            snapshot_messages: Snapshot messages of one screener (or of all screeners for None)
+        """
+        if lag_policy not in ("resync", "drop"):
+            raise ValueError(f"Unknown websocket lag policy: {lag_policy}")
+        self.encoder = encoder
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.lag_policy = lag_policy
+        self.resync_messages = resync_messages
+        self.snapshot_messages = snapshot_messages
+
+        self._clients: Dict[WebSocket, _Client] = {}
+        self._topics: Dict[str, Set[_Client]] = {}
+        self._users: Dict[Any, Set[_Client]] = {}
+        self._symbol_subscription_count = 0
+        # Pending close tasks of dropped clients (referenced so they are not garbage collected)
+        self._close_tasks: Set[asyncio.Task] = set()
+
+        self.broadcast_count = 0
+        self.resync_count = 0
+        self.drop_count = 0
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def register(self, websocket: WebSocket, user_id=None) -> _Client:
+        """
+        Start delivering broadcasts to an accepted websocket.
+
+        Args:
+            websocket: Accepted websocket
+            user_id: Authenticated user of the connection (None for anonymous connections,
+                which never receive `send_to_user` messages)
+        """
+        client = _Client(websocket, self.queue_size, user_id)
+        client.task = asyncio.create_task(self._writer(client))
+        self._clients[websocket] = client
+        self._add_topics(client, [ALL_TOPICS])
+        # Start from the current screener snapshots so the first delta has a baseline and a seq
+        self._queue_snapshots(client, [None])
+        if user_id is not None:
+            self._users.setdefault(user_id, set()).add(client)
+        logger.info(f"WebSocket connected ({len(self._clients)} active)")
+        return client
+
+    def unregister(self, websocket: WebSocket):
+        """Stop delivering to a websocket and cancel its writer task."""
+        client = self._clients.pop(websocket, None)
+        if client is None:
+            return
+        self._remove_topics(client, list(client.topics))
+        connections = self._users.get(client.user_id)
+        if connections is not None:
+            connections.discard(client)
+            if not connections:
+                del self._users[client.user_id]
+        if client.task is not None and client.task is not asyncio.current_task():
+            client.task.cancel()
+        logger.info(f"WebSocket disconnected ({len(self._clients)} active)")
+
+    async def _writer(self, client: _Client):
+        """Send queued messages to one client until it disconnects or fails."""
+        try:
+            while True:
+                text = await client.queue.get()
+                await asyncio.wait_for(client.websocket.send_text(text), timeout=self.send_timeout)
+                client.sent_count += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"WebSocket send timed out after {self.send_timeout}s, dropping connection")
+            self.drop_count += 1
+            await self._close(client)
+        except Exception as e:
+            logger.error(f"Error sending to WebSocket: {e}")
+            self.unregister(client.websocket)
+
+    async def _close(self, client: _Client, code: int = 1000):
+        """Unregister a client and close its socket."""
+        self.unregister(client.websocket)
+        try:
+            await client.websocket.close(code=code)
+        except Exception:
+            # The socket may already be gone
+            pass
+
+    def _add_topics(self, client: _Client, topics: Iterable[str]):
+        for topic in topics:
+            if topic in client.topics:
+                continue
+            client.topics.add(topic)
+            self._topics.setdefault(topic, set()).add(client)
+            if topic.startswith(SYMBOL_TOPIC_PREFIX):
+                self._symbol_subscription_count += 1
+
+    def _remove_topics(self, client: _Client, topics: Iterable[str]):
+        for topic in topics:
+            if topic not in client.topics:
+                continue
+            client.topics.discard(topic)
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self._topics[topic]
+            if topic.startswith(SYMBOL_TOPIC_PREFIX):
+                self._symbol_subscription_count -= 1
+
+    def subscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        """
+        Subscribe a connection to topics.
+
+        The first explicit subscription replaces the default "*" topic (subscribe to "*"
+        again to keep receiving everything).
+
+        Args:
+            websocket: Registered websocket
+            topics: Topics ("*", "screener:<event type>", "symbol:<SYMBOL>")
+
+        Returns:
+            The connection's topics after the change
+        """
+        client = self._clients.get(websocket)
+        if client is None:
+            return []
+        valid = [topic for topic in map(_normalize_topic, topics) if topic is not None]
+        if not client.explicit_topics:
+            client.explicit_topics = True
+            self._remove_topics(client, [ALL_TOPICS])
+        room = max(0, MAX_TOPICS_PER_CLIENT - len(client.topics))
+        self._add_topics(client, [topic for topic in valid if topic not in client.topics][:room])
+        return sorted(client.topics)
+
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        """Unsubscribe a connection from topics and return the topics it still has."""
+        client = self._clients.get(websocket)
+        if client is None:
+            return []
+        client.explicit_topics = True
+        self._remove_topics(client, [topic for topic in map(_normalize_topic, topics) if topic is not None])
+        return sorted(client.topics)
+
+    def handle_message(self, websocket: WebSocket, text: str):
+        """
+        Apply a subscription request received from a client and queue the acknowledgement.
+
+        Anything that is not a JSON subscription request (such as the dashboard's "ping"
+        keep-alive) is ignored.
+        """
+        client = self._clients.get(websocket)
+        if client is None:
+            return
+        try:
+            request = json.loads(text)
+        except ValueError:
+            return
+        if not isinstance(request, dict) or request.get("action") not in ("subscribe", "unsubscribe", "resync"):
+            return
+
+        if request["action"] == "resync":
+            self._queue_snapshots(client, [request.get("screener")])
+            return
+
+        topics = list(request.get("topics") or [])
+        topics += [symbol_topic(symbol) for symbol in request.get("symbols") or []]
+        if request["action"] == "subscribe":
+            before = set(client.topics)
+            current = self.subscribe(websocket, topics)
+        else:
+            current = self.unsubscribe(websocket, topics)
+        self._deliver(client, self.encoder({"type": "subscriptions", "topics": current}))
+
+        # Start new screener subscribers from the current snapshot
+        if request["action"] == "subscribe":
+            new_topics = [topic for topic in current if topic not in before]
+            self._queue_snapshots(client, self._screener_names(new_topics))
+
+    @staticmethod
+    def _screener_names(topics: Iterable[str]) -> List[Optional[str]]:
+        """Screeners covered by topics ([None] meaning every screener when "*" is present)."""
+        topics = list(topics)
+        if ALL_TOPICS in topics:
+            return [None]
+        return [topic[len(SCREENER_TOPIC_PREFIX) :] for topic in topics if topic.startswith(SCREENER_TOPIC_PREFIX)]
+
+    def _queue_snapshots(self, client: _Client, screeners: List[Optional[str]]):
+        """Queue the snapshots of `screeners` for one client (no-op without a provider)."""
+        if self.snapshot_messages is None:
+            return
+        for screener in screeners:
+            for message in self.snapshot_messages(screener):
+                try:
+                    client.queue.put_nowait(self.encoder(message))
+                except asyncio.QueueFull:
+                    logger.warning("WebSocket queue full while queueing screener snapshots")
+                    return
+
+    def _drop(self, client: _Client):
+        """Close a lagging client from a background task (once)."""
+        if client.closing:
+            return
+        client.closing = True
+        self.drop_count += 1
+        task = asyncio.create_task(self._close(client, code=LAG_CLOSE_CODE))
+        self._close_tasks.add(task)
+        task.add_done_callback(self._close_tasks.discard)
+
+    def _on_lag(self, client: _Client):
+        """Handle a client whose queue is full."""
+        client.lag_count += 1
+        if client.closing:
+            return
+        if self.lag_policy == "drop":
+            logger.warning("WebSocket client is lagging, dropping connection")
+            self._drop(client)
+            return
+
+        logger.warning(f"WebSocket client is lagging, discarding {client.queue.qsize()} queued messages")
+        self.resync_count += 1
+        while not client.queue.empty():
+            client.queue.get_nowait()
+        try:
+            for message in self.resync_messages():
+                client.queue.put_nowait(self.encoder(message))
+        except asyncio.QueueFull:
+            logger.warning("WebSocket queue full while queueing the resync message, dropping connection")
+            self._drop(client)
+            return
+        self._queue_snapshots(client, self._screener_names(client.topics))
+
+    def _deliver(self, client: _Client, text: str) -> bool:
+        """Queue encoded text for one client; returns False if it was lagging."""
+        try:
+            client.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            self._on_lag(client)
+            return False
+
+    def broadcast(self, message: Any) -> int:
+        """
+        Queue a message for every connected client without waiting for any send.
+
+        Args:
+            message: JSON-serialisable message (encoded once with `encoder`)
+
+        Returns:
+            Number of clients the message was queued for
+        """
+        if not self._clients:
+            return 0
+        text = self.encoder(message)
+        self.broadcast_count += 1
+        return sum(self._deliver(client, text) for client in list(self._clients.values()))
+
+    def publish_message(self, topic: str, message: Any) -> int:
+        """
+        Queue one message for the subscribers of `topic` and of "*", encoded once.
+
+        Args:
+            topic: Topic of the message, e.g. screener_topic("crossing_prev_day_high")
+            message: JSON-serialisable message
+
+        Returns:
+            Number of connections the message was queued for
+        """
+        subscribers = self._topics.get(ALL_TOPICS, set()) | self._topics.get(topic, set())
+        if not subscribers:
+            return 0
+        text = self.encoder(message)
+        self.broadcast_count += 1
+        return sum(self._deliver(client, text) for client in subscribers)
+
+    def send_to_user(self, user_id, message: Any) -> int:
+        """
+        Queue a private message for every connection of one user, encoded once.
+
+        Returns:
+            Number of connections the message was queued for (0 if the user is not connected)
+        """
+        connections = self._users.get(user_id)
+        if not connections:
+            return 0
+        text = self.encoder(message)
+        return sum(self._deliver(client, text) for client in list(connections))
+
+    def publish(
+        self, event_type: str, rows: List[Dict[str, Any]], key: str = "symbol", timestamp: Optional[str] = None
+    ) -> int:
+        """
+        Route a screener event to the connections subscribed to it.
+
+        Subscribers of "*" or the event's screener topic get every row (encoded once for all
+        of them); connections subscribed only to symbols get the rows for those symbols, with
+        each distinct subset encoded once.
+
+        Args:
+            event_type: Message type, e.g. "new_crossing_stocks"
+            rows: JSON-serialisable rows of the event
+            key: Row field holding the symbol
+            timestamp: ISO timestamp of the event (defaults to now)
+
+        Returns:
+            Number of connections the event was queued for
+        """
+        if not self._clients or not rows:
+            return 0
+        timestamp = timestamp or datetime.now().isoformat()
+        self.broadcast_count += 1
+
+        full = self._topics.get(ALL_TOPICS, set()) | self._topics.get(screener_topic(event_type), set())
+        delivered = 0
+        if full:
+            text = self.encoder({"type": event_type, "data": rows, "timestamp": timestamp})
+            delivered += sum(self._deliver(client, text) for client in full)
+
+        if not self._symbol_subscription_count:
+            return delivered
+
+        # Row positions per symbol-only subscriber
+        selected: Dict[_Client, List[int]] = {}
+        for position, row in enumerate(rows):
+            for client in self._topics.get(symbol_topic(row.get(key, "")), ()):
+                if client not in full:
+                    selected.setdefault(client, []).append(position)
+
+        encoded: Dict[tuple, str] = {}
+        for client, positions in selected.items():
+            subset = tuple(positions)
+            if subset not in encoded:
+                data = [rows[position] for position in positions]
+                encoded[subset] = self.encoder({"type": event_type, "data": data, "timestamp": timestamp})
+            delivered += self._deliver(client, encoded[subset])
+        return delivered
+
+    async def close(self):
+        """Close every connection (used at shutdown)."""
+        for client in list(self._clients.values()):
+            await self._close(client, code=1001)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return connection and queue counters for debugging."""
+        return {
+            "connections": len(self._clients),
+            "topics": len(self._topics),
+            "users": len(self._users),
+            "symbol_subscriptions": self._symbol_subscription_count,
+            "queued": sum(client.queue.qsize() for client in self._clients.values()),
+            "broadcast_count": self.broadcast_count,
+            "resync_count": self.resync_count,
+            "drop_count": self.drop_count,
+            "queue_size": self.queue_size,
+            "lag_policy": self.lag_policy,
+        }
@@ -0,0 +1,22 @@
+import pytest
+from sqlalchemy import create_engine, event
+
+from backend.models.database import Base, db_session, engine
+
+
+@pytest.fixture
+def database(tmp_path):
+    """
+    Bind the scoped db_session to a SQLite file with every table (foreign keys enforced).
+
+    A file rather than an in-memory database, so sessions of worker threads see the same data.
+    """
+    sqlite_engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    event.listen(sqlite_engine, "connect", lambda connection, _: connection.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.create_all(sqlite_engine)
+    db_session.remove()
+    db_session.configure(bind=sqlite_engine)
+    yield db_session
+    db_session.remove()
+    db_session.configure(bind=engine)
+    sqlite_engine.dispose()
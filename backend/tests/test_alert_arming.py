@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from backend.services.alert_arming import AlertArming
+
+FIRED_AT = datetime(2024, 1, 2, 10, 0)
+
+
+def prices(**values):
+    return pd.DataFrame({"price": values}).rename_axis("symbol")
+
+
+def test_fire_disarms_until_rearmed():
+    arming = AlertArming(hysteresis_percent=1, cooldown_seconds=60)
+    assert arming.fire(1, "AAPL", "price_above", 100.0, now=FIRED_AT)
+    assert not arming.is_armed(1)
+    assert not arming.fire(1, "AAPL", "price_above", 100.0, now=FIRED_AT)
+    assert arming.stats()["suppressed"] == 1
+
+
+def test_rearm_on_hysteresis_band_or_cooldown():
+    arming = AlertArming(hysteresis_percent=1, cooldown_seconds=60)
+    arming.fire(1, "AAPL", "price_above", 100.0, now=FIRED_AT)
+    arming.fire(2, "MSFT", "price_above", 100.0, now=FIRED_AT)
+
+    # Inside the band and within the cooldown: stays disarmed
+    assert arming.rearm(prices(AAPL=99.5, MSFT=99.5), now=FIRED_AT + timedelta(seconds=10)) == []
+    assert not arming.is_armed(1)
+
+    # Beyond the band re-arms before the cooldown
+    assert arming.rearm(prices(AAPL=98.5, MSFT=99.5), now=FIRED_AT + timedelta(seconds=20)) == []
+    assert arming.is_armed(1)
+    assert not arming.is_armed(2)
+
+    # The cooldown re-arms an alert whose value never left the threshold
+    assert arming.rearm(prices(MSFT=101.0), now=FIRED_AT + timedelta(seconds=61)) == [(2, 101.0)]
+    assert arming.is_armed(2)
+
+
+def test_rearm_with_both_rule_needs_band_and_cooldown():
+    arming = AlertArming(hysteresis_percent=1, cooldown_seconds=60, rearm_rule="both")
+    arming.fire(1, "AAPL", "price_above", 100.0, now=FIRED_AT)
+
+    assert arming.rearm(prices(AAPL=101.0), now=FIRED_AT + timedelta(seconds=120)) == []
+    # Beyond the band within the cooldown: remembered, not re-armed yet
+    assert arming.rearm(prices(AAPL=98.0), now=FIRED_AT + timedelta(seconds=10)) == []
+    assert not arming.is_armed(1)
+
+    assert arming.rearm(prices(AAPL=98.5), now=FIRED_AT + timedelta(seconds=61)) == []
+    assert arming.is_armed(1)
+
+
+def test_rearm_reports_alerts_whose_condition_holds_again():
+    arming = AlertArming(hysteresis_percent=1, cooldown_seconds=60, rearm_rule="both")
+    arming.fire(1, "AAPL", "price_above", 100.0, now=FIRED_AT)
+    arming.rearm(prices(AAPL=98.0), now=FIRED_AT + timedelta(seconds=10))
+    assert arming.rearm(prices(AAPL=101.0), now=FIRED_AT + timedelta(seconds=61)) == [(1, 101.0)]
+    assert arming.is_armed(1)
+
+
+def test_rearm_keeps_alerts_without_a_value_on_the_tick():
+    arming = AlertArming(hysteresis_percent=1, cooldown_seconds=0)
+    arming.fire(1, "AAPL", "volume_above", 1e6, now=FIRED_AT)
+    arming.fire(2, "MSFT", "price_below", 50.0, now=FIRED_AT)
+
+    assert arming.rearm(prices(AAPL=10.0, MSFT=60.0), now=FIRED_AT) == []
+    assert not arming.is_armed(1)
+    assert arming.is_armed(2)
+
+
+def test_restore_disarms_recently_triggered_alerts():
+    arming = AlertArming(hysteresis_percent=1, cooldown_seconds=60)
+    arming.restore(
+        [
+            (1, "AAPL", "price_above", 100.0, FIRED_AT - timedelta(seconds=30)),
+            (2, "MSFT", "price_above", 100.0, FIRED_AT - timedelta(seconds=90)),
+            (3, "TSLA", "price_above", 100.0, None),
+        ],
+        now=FIRED_AT,
+    )
+    assert not arming.is_armed(1)
+    assert arming.is_armed(2)
+    assert arming.is_armed(3)
+    arming.forget(1)
+    assert arming.is_armed(1)
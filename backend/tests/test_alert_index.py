@@ -0,0 +1,59 @@
+from backend.services.alert_index import (
+    PRICE_ABOVE,
+    PRICE_BELOW,
+    ThresholdIndex,
+    _SymbolBook,
+)
+
+
+def make_book():
+    book = _SymbolBook()
+    for alert_id, threshold in ((1, 100.0), (2, 105.0), (3, 110.0)):
+        book.insert(PRICE_ABOVE, threshold, alert_id)
+    for alert_id, threshold in ((4, 90.0), (5, 95.0)):
+        book.insert(PRICE_BELOW, threshold, alert_id)
+    return book
+
+
+def test_crossed_upward_returns_price_above_thresholds_in_interval():
+    book = make_book()
+    assert sorted(book.crossed(99.0, 106.0)) == [1, 2]
+    # The threshold equal to the new price has not been exceeded yet
+    assert sorted(book.crossed(101.0, 110.0)) == [2]
+
+
+def test_crossed_downward_returns_price_below_thresholds_in_interval():
+    book = make_book()
+    assert sorted(book.crossed(96.0, 89.0)) == [4, 5]
+    assert sorted(book.crossed(95.0, 91.0)) == [5]
+    assert len(book.crossed(100.0, 100.0)) == 0
+
+
+def test_observe_reports_each_cross_once():
+    index = ThresholdIndex()
+    index.load([(1, "AAPL", PRICE_ABOVE, 100.0), (2, "AAPL", PRICE_BELOW, 90.0), (3, "MSFT", "volume_above", 1e6)])
+    assert len(index) == 2
+    assert index.symbols() == ["AAPL"]
+
+    assert index.observe({"AAPL": 95.0}) == []
+    assert index.observe({"AAPL": 101.0}) == [(1, 101.0)]
+    assert index.observe({"AAPL": 102.0}) == []
+    assert index.observe({"AAPL": 85.0}) == [(2, 85.0)]
+
+
+def test_fresh_alert_fires_on_already_true_condition():
+    index = ThresholdIndex()
+    index.load([])
+    index.observe({"AAPL": 120.0})
+    index.add(7, "AAPL", PRICE_ABOVE, 100.0)
+    assert index.observe({"AAPL": 121.0}) == [(7, 121.0)]
+    assert index.observe({"AAPL": 122.0}) == []
+
+
+def test_removed_alert_no_longer_fires():
+    index = ThresholdIndex()
+    index.load([(1, "AAPL", PRICE_ABOVE, 100.0)])
+    index.observe({"AAPL": 95.0})
+    index.remove(1)
+    assert index.observe({"AAPL": 105.0}) == []
+    assert index.symbols() == []
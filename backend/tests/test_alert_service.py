@@ -0,0 +1,221 @@
+import asyncio
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.models.database import Alert, Stock, User
+from backend.services import alert_service
+from backend.services.alert_service import AlertManager, _threshold_mask
+
+
+class FakeDispatcher:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, alert_data):
+        self.submitted.append(alert_data)
+        return True
+
+
+@pytest.fixture
+def dispatcher(monkeypatch):
+    fake = FakeDispatcher()
+    monkeypatch.setattr(alert_service, "notification_dispatcher", fake)
+    return fake
+
+
+def add_alerts(db, specs):
+    """Create one user's alerts from (symbol, alert type, threshold) tuples, in order."""
+    user = User(username="trader", email="trader@example.com", password_hash="x")
+    db.add(user)
+    stocks = {}
+    alerts = []
+    for symbol, alert_type, threshold in specs:
+        if symbol not in stocks:
+            stocks[symbol] = Stock(symbol=symbol, name=f"{symbol} Inc")
+            db.add(stocks[symbol])
+        alert = Alert(user=user, stock=stocks[symbol], alert_type=alert_type, threshold_value=threshold)
+        db.add(alert)
+        alerts.append(alert)
+    db.commit()
+    return alerts
+
+
+def market_frame(rows):
+    """Frame shaped like get_market_data_batch: symbol -> (price, volume, change_percent)."""
+    return pd.DataFrame.from_dict(rows, orient="index", columns=["price", "volume", "change_percent"])
+
+
+MARKET = market_frame({"AAPL": (190.0, 1e6, 1.0), "MSFT": (410.0, 2e6, -2.0)})
+
+
+def test_alerts_are_evaluated_with_one_download_of_the_distinct_symbols(database, dispatcher, monkeypatch):
+    alerts = add_alerts(
+        database,
+        [
+            ("AAPL", "price_above", 180.0),
+            ("MSFT", "price_above", 420.0),
+            ("AAPL", "price_below", 200.0),
+            ("MSFT", "price_below", 400.0),
+        ],
+    )
+    downloads = []
+
+    def get_market_data_batch(symbols):
+        downloads.append(symbols)
+        return MARKET
+
+    monkeypatch.setattr(alert_service, "get_market_data_batch", get_market_data_batch)
+    manager = AlertManager()
+
+    results = asyncio.run(manager.evaluate_alerts(alerts))
+
+    assert downloads == [["AAPL", "MSFT"]]
+    assert [result["id"] for result in results] == [alerts[0].id, alerts[2].id]
+    assert [result["current_value"] for result in results] == [190.0, 190.0]
+    assert results[0]["stock_symbol"] == "AAPL" and results[0]["user_email"] == "trader@example.com"
+    assert isinstance(results[0]["current_value"], float)
+    assert dispatcher.submitted == results
+    assert manager.get_recent_triggered_alerts() == results
+
+    database.expire_all()
+    assert [alert.last_triggered is not None for alert in alerts] == [True, False, True, False]
+    assert len({alert.last_triggered for alert in alerts if alert.last_triggered}) == 1
+
+
+def test_given_market_frame_is_used_without_downloading(database, dispatcher, monkeypatch):
+    alerts = add_alerts(database, [("MSFT", "price_below", 420.0)])
+
+    def get_market_data_batch(symbols):
+        raise AssertionError("downloaded despite a market frame")
+
+    monkeypatch.setattr(alert_service, "get_market_data_batch", get_market_data_batch)
+
+    results = asyncio.run(AlertManager().evaluate_alerts(alerts, MARKET))
+
+    assert [result["current_value"] for result in results] == [410.0]
+
+
+def test_symbols_without_market_data_never_trigger(database, dispatcher):
+    alerts = add_alerts(database, [("TSLA", "price_above", 0.0), ("TSLA", "price_below", 1e9)])
+
+    assert asyncio.run(AlertManager().evaluate_alerts(alerts, MARKET)) == []
+    assert dispatcher.submitted == []
+
+
+def test_fired_alert_stays_quiet_while_its_condition_holds(database, dispatcher):
+    alerts = add_alerts(database, [("AAPL", "price_above", 180.0)])
+    manager = AlertManager()
+
+    assert len(asyncio.run(manager.evaluate_alerts(alerts, MARKET))) == 1
+    assert asyncio.run(manager.evaluate_alerts(alerts, MARKET)) == []
+    assert len(dispatcher.submitted) == 1
+
+
+def test_failed_commit_triggers_nothing(database, dispatcher, monkeypatch):
+    alerts = add_alerts(database, [("AAPL", "price_above", 180.0)])
+
+    def fail():
+        raise RuntimeError("database is gone")
+
+    monkeypatch.setattr(database, "commit", fail)
+    manager = AlertManager()
+
+    assert asyncio.run(manager.evaluate_alerts(alerts, MARKET)) == []
+    assert dispatcher.submitted == []
+    assert manager.arming.is_armed(alerts[0].id)
+
+
+def test_empty_alert_list_skips_the_download(monkeypatch):
+    monkeypatch.setattr(alert_service, "get_market_data_batch", None)
+
+    assert asyncio.run(AlertManager().evaluate_alerts([])) == []
+
+
+def test_volume_alerts_fire_strictly_above_the_threshold(database, dispatcher):
+    alerts = add_alerts(database, [("AAPL", "volume_above", 5e5), ("AAPL", "volume_above", 1e6)])
+
+    results = asyncio.run(AlertManager().evaluate_alerts(alerts, MARKET))
+
+    assert [(result["id"], result["current_value"]) for result in results] == [(alerts[0].id, 1e6)]
+
+
+def test_percent_change_alerts_fire_on_gains_and_drops_including_the_threshold(database, dispatcher):
+    alerts = add_alerts(
+        database,
+        [
+            ("AAPL", "percent_change", 1.0),
+            ("AAPL", "percent_change", 1.5),
+            ("MSFT", "percent_change", -2.0),
+            ("MSFT", "percent_change", -1.0),
+            ("MSFT", "percent_change", -3.0),
+            ("AAPL", "percent_change", -0.5),
+        ],
+    )
+
+    results = asyncio.run(AlertManager().evaluate_alerts(alerts, MARKET))
+
+    assert [result["id"] for result in results] == [alerts[0].id, alerts[2].id, alerts[3].id]
+    assert [result["current_value"] for result in results] == [1.0, -2.0, -2.0]
+
+
+def test_threshold_mask_compares_each_alert_type():
+    alerts = [
+        Alert(alert_type="price_above", threshold_value=10.0),
+        Alert(alert_type="price_below", threshold_value=10.0),
+        Alert(alert_type="volume_above", threshold_value=10.0),
+        Alert(alert_type="percent_change", threshold_value=0.0),
+        Alert(alert_type="percent_change", threshold_value=None),
+        Alert(alert_type="price_above", threshold_value=10.0),
+    ]
+    current = np.array([10.0, 9.0, 11.0, 0.0, 5.0, np.nan])
+
+    assert _threshold_mask(alerts, current).tolist() == [False, True, True, True, False, False]
+
+
+def test_market_data_alerts_share_the_tick_frame_with_price_alerts(database, dispatcher, monkeypatch):
+    alerts = add_alerts(database, [("AAPL", "price_above", 180.0), ("MSFT", "volume_above", 1e6)])
+    downloads = []
+
+    def get_market_data_batch(symbols):
+        downloads.append(sorted(symbols))
+        return MARKET
+
+    monkeypatch.setattr(alert_service, "get_market_data_batch", get_market_data_batch)
+    manager = AlertManager()
+
+    results = asyncio.run(manager.check_all_alerts())
+
+    assert downloads == [["AAPL", "MSFT"]]
+    assert sorted(result["id"] for result in results) == [alerts[0].id, alerts[1].id]
+
+
+def test_streamed_prices_fire_alerts_from_a_worker_thread(database, dispatcher):
+    alerts = add_alerts(database, [("AAPL", "price_above", 100.0)])
+    manager = AlertManager()
+    manager.load_index()
+    commit_threads = []
+    commit = manager._commit_streamed_hits
+
+    def recording_commit(hits):
+        commit_threads.append(threading.current_thread())
+        return commit(hits)
+
+    manager._commit_streamed_hits = recording_commit
+
+    async def scenario():
+        manager.on_prices({"AAPL": 99.0})
+        assert manager._streamed_task is None
+        manager.on_prices({"AAPL": 101.0})
+        await manager._streamed_task
+        manager.on_prices({"AAPL": 102.0})
+        assert manager._streamed_task.done()
+
+    asyncio.run(scenario())
+
+    assert [(result["id"], result["current_value"]) for result in dispatcher.submitted] == [(alerts[0].id, 101.0)]
+    assert commit_threads and threading.main_thread() not in commit_threads
+    database.expire_all()
+    assert alerts[0].last_triggered is not None
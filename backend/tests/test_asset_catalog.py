@@ -0,0 +1,89 @@
+import uuid
+
+from alpaca.trading.models import Asset
+
+from backend.services.asset_catalog import AssetCatalog
+
+
+def asset(symbol, name, status="active", tradable=True):
+    return Asset(
+        **{
+            "id": uuid.uuid4(),
+            "class": "us_equity",
+            "exchange": "NASDAQ",
+            "symbol": symbol,
+            "name": name,
+            "status": status,
+            "tradable": tradable,
+            "marginable": True,
+            "shortable": True,
+            "easy_to_borrow": True,
+            "fractionable": True,
+        }
+    )
+
+
+class FakeTradingClient:
+    def __init__(self, assets):
+        self.assets = assets
+        self.calls = 0
+
+    def get_all_assets(self):
+        self.calls += 1
+        return self.assets
+
+
+def make_catalog(tmp_path=None):
+    client = FakeTradingClient(
+        [
+            asset("AAPL", "Apple Inc. Common Stock"),
+            asset("AAP", "Advance Auto Parts Inc."),
+            asset("MSFT", "Microsoft Corporation"),
+            asset("APLE", "Apple Hospitality REIT"),
+            asset("DEAD", "Delisted Corp", status="inactive"),
+            asset("NOTR", "Not Tradable Corp", tradable=False),
+        ]
+    )
+    cache_file = str(tmp_path / "assets.json") if tmp_path else None
+    return AssetCatalog(client, cache_file=cache_file), client
+
+
+def symbols(assets):
+    return [asset.symbol for asset in assets]
+
+
+def test_search_matches_symbols_and_names_case_insensitively():
+    catalog, _ = make_catalog()
+    assert symbols(catalog.search("apple")) == ["AAPL", "APLE"]
+    assert symbols(catalog.search("corp")) == ["MSFT"]
+    assert symbols(catalog.search("APL")) == ["AAPL", "APLE"]
+    assert catalog.search("nothing like it") == []
+
+
+def test_short_queries_scan_the_catalog():
+    catalog, _ = make_catalog()
+    assert symbols(catalog.search("ms")) == ["MSFT"]
+
+
+def test_only_active_tradable_assets_are_indexed():
+    catalog, _ = make_catalog()
+    assert catalog.get("dead") is None
+    assert catalog.search("NOTR") == []
+    assert catalog.get("msft").name == "Microsoft Corporation"
+
+
+def test_prefix_is_sorted_and_limited():
+    catalog, _ = make_catalog()
+    assert symbols(catalog.prefix("aa")) == ["AAP", "AAPL"]
+    assert symbols(catalog.prefix("a", limit=2)) == ["AAP", "AAPL"]
+
+
+def test_cache_is_reused_for_the_same_day(tmp_path):
+    catalog, client = make_catalog(tmp_path)
+    catalog.search("apple")
+    catalog.get("AAPL")
+    assert client.calls == 1
+
+    reloaded, other_client = make_catalog(tmp_path)
+    assert symbols(reloaded.search("apple")) == ["AAPL", "APLE"]
+    assert other_client.calls == 0
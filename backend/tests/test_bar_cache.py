@@ -0,0 +1,82 @@
+import os
+import time
+
+import numpy as np
+
+from backend.services.bar_cache import BarCache
+
+# Same layout as alpaca_service.BAR_DTYPE
+BAR_DTYPE = np.dtype([("t", "datetime64[ns]"), ("o", "f8"), ("h", "f8"), ("l", "f8"), ("c", "f8"), ("v", "f8")])
+
+
+def bars(*closes):
+    array = np.zeros(len(closes), dtype=BAR_DTYPE)
+    array["t"] = np.datetime64("2024-01-02T14:30", "ns") + np.arange(len(closes)) * np.timedelta64(1, "m")
+    array["c"] = closes
+    return array
+
+
+def test_stored_sessions_are_served_memory_mapped(tmp_path):
+    cache = BarCache(str(tmp_path))
+    cache.store("AAPL", "2024-01-02", "1Min", bars(1.0, 2.0))
+
+    loaded = cache.load("AAPL", "2024-01-02", "1Min")
+
+    assert isinstance(loaded, np.memmap)
+    assert not loaded.flags.writeable
+    assert loaded.dtype == BAR_DTYPE
+    assert loaded["c"].tolist() == [1.0, 2.0]
+    assert os.path.exists(tmp_path / "1Min" / "AAPL" / "2024-01-02.npy")
+
+
+def test_lookup_splits_cached_and_missing_sessions(tmp_path):
+    cache = BarCache(str(tmp_path))
+    cache.store("AAPL", "2024-01-02", "1Min", bars(1.0))
+    cache.store("MSFT", "2024-01-03", "1Min", bars(2.0))
+    cache.store("AAPL", "2024-01-03", "1Day", bars(3.0))
+
+    cached, missing = cache.lookup(["AAPL", "MSFT"], ["2024-01-02", "2024-01-03"], "1Min")
+
+    assert {symbol: sorted(days) for symbol, days in cached.items()} == {
+        "AAPL": ["2024-01-02"],
+        "MSFT": ["2024-01-03"],
+    }
+    assert missing == {"AAPL": ["2024-01-03"], "MSFT": ["2024-01-02"]}
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 2 and cache.stats()["writes"] == 3
+
+
+def test_empty_sessions_expire_but_sessions_with_bars_do_not(tmp_path):
+    cache = BarCache(str(tmp_path), empty_ttl_seconds=60)
+    cache.store("AAPL", "2024-01-02", "1Min", bars())
+    cache.store("MSFT", "2024-01-02", "1Min", bars(1.0))
+
+    assert len(cache.load("AAPL", "2024-01-02", "1Min")) == 0
+
+    old = time.time() - 120
+    for symbol in ("AAPL", "MSFT"):
+        os.utime(cache.path(symbol, "2024-01-02", "1Min"), (old, old))
+
+    assert cache.load("AAPL", "2024-01-02", "1Min") is None
+    assert cache.load("MSFT", "2024-01-02", "1Min")["c"].tolist() == [1.0]
+
+    # Storing the session again refreshes the entry
+    cache.store("AAPL", "2024-01-02", "1Min", bars())
+    assert cache.load("AAPL", "2024-01-02", "1Min") is not None
+
+
+def test_unreadable_files_are_misses(tmp_path):
+    cache = BarCache(str(tmp_path))
+    path = cache.path("AAPL", "2024-01-02", "1Min")
+    os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as file:
+        file.write(b"not numpy")
+
+    assert cache.load("AAPL", "2024-01-02", "1Min") is None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = BarCache(None)
+    cache.store("AAPL", "2024-01-02", "1Min", bars(1.0))
+
+    assert cache.load("AAPL", "2024-01-02", "1Min") is None
+    assert cache.lookup(["AAPL"], ["2024-01-02"], "1Min") == ({}, {"AAPL": ["2024-01-02"]})
@@ -0,0 +1,37 @@
+import numpy as np
+
+from backend.services.candle_streak_engine import CandleStreakEngine, trailing_streaks
+
+
+def test_trailing_streaks_counts_back_from_the_last_bar():
+    closes = np.array(
+        [
+            [1, 2, 3, 4, 5],
+            [5, 4, 3, 2, 1],
+            [3, 1, 2, 3, 4],
+            [1, 2, 2, 2, 1],
+        ],
+        dtype=float,
+    )
+    up, down = trailing_streaks(closes)
+    assert up.tolist() == [4, 0, 3, 0]
+    assert down.tolist() == [0, 4, 0, 1]
+
+
+def test_trailing_streaks_breaks_on_missing_bars():
+    closes = np.array([[1, np.nan, 2, 3, 4], [np.nan, np.nan, np.nan, np.nan, np.nan]])
+    up, down = trailing_streaks(closes)
+    assert up.tolist() == [2, 0]
+    assert down.tolist() == [0, 0]
+
+
+def test_trailing_streaks_without_enough_bars():
+    up, down = trailing_streaks(np.array([[1.0], [2.0]]))
+    assert up.tolist() == [0, 0]
+    assert down.tolist() == [0, 0]
+
+
+def test_engine_streaks_by_symbol():
+    engine = CandleStreakEngine.from_bars({"AAPL": [1, 2, 3], "MSFT": [3, 2, 1]})
+    assert engine.streaks("up").to_dict() == {"AAPL": 2, "MSFT": 0}
+    assert engine.streaks("down").to_dict() == {"AAPL": 0, "MSFT": 2}
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from backend.services.cross_detector import CrossDetector
+
+
+def tick(**prices):
+    return pd.DataFrame({"name": list(prices), "close": list(prices.values())})
+
+
+def test_reports_a_cross_once():
+    detector = CrossDetector()
+    detector.set_watchlist(["AAPL", "MSFT"], [100.0, 200.0])
+
+    assert detector.update(tick(AAPL=99.0, MSFT=199.0)).empty
+    crossed = detector.update(tick(AAPL=101.0, MSFT=199.0))
+    assert crossed["name"].tolist() == ["AAPL"]
+    assert crossed["prev_day_high"].tolist() == [100.0]
+
+    assert detector.update(tick(AAPL=102.0, MSFT=199.0)).empty
+    # Falling back below and crossing again is a new event
+    detector.update(tick(AAPL=99.0, MSFT=199.0))
+    assert detector.update(tick(AAPL=100.5, MSFT=199.0))["name"].tolist() == ["AAPL"]
+    assert detector.stats()["event_count"] == 2
+
+
+def test_missing_prices_and_levels_keep_state():
+    detector = CrossDetector()
+    detector.set_watchlist(["AAPL", "MSFT"], [100.0, np.nan])
+
+    detector.update(tick(AAPL=101.0))
+    # AAPL has no price this tick: it stays above and is not reported again
+    assert detector.update(tick(MSFT=500.0)).empty
+    assert detector.update(tick(AAPL=102.0, MSFT=600.0)).empty
+
+
+def test_refreshing_the_watchlist_carries_state():
+    detector = CrossDetector()
+    detector.set_watchlist(["AAPL"], [100.0])
+    detector.update(tick(AAPL=101.0))
+
+    detector.set_watchlist(["AAPL", "TSLA"], [100.0, 50.0])
+    assert detector.update(tick(AAPL=101.5, TSLA=51.0))["name"].tolist() == ["TSLA"]
+
+
+def test_duplicated_symbols_use_the_first_row():
+    detector = CrossDetector()
+    detector.set_watchlist(["AAPL"], [100.0])
+    frame = pd.DataFrame({"name": ["AAPL", "AAPL"], "close": [101.0, 50.0]})
+    assert detector.update(frame)["close"].tolist() == [101.0]
@@ -0,0 +1,103 @@
+import sys
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pytest
+
+from backend.services import market_calendar as calendar_module
+from backend.services.market_calendar import WEEKDAY_SOURCE, MarketCalendar
+
+
+@pytest.fixture(autouse=True)
+def weekday_sessions(monkeypatch):
+    # Hide pandas_market_calendars so the tables are plain weekdays wherever the tests run
+    monkeypatch.setitem(sys.modules, "pandas_market_calendars", None)
+
+
+def test_previous_and_next_session_skip_weekends(tmp_path):
+    calendar = MarketCalendar(cache_file=str(tmp_path / "calendar.npz"))
+
+    # 2024-01-06 is a Saturday
+    assert calendar.is_session("2024-01-05")
+    assert not calendar.is_session("2024-01-06")
+    assert calendar.previous_session("2024-01-08") == date(2024, 1, 5)
+    assert calendar.previous_session("2024-01-06") == date(2024, 1, 5)
+    assert calendar.session_on_or_before("2024-01-07") == date(2024, 1, 5)
+    assert calendar.session_on_or_before("2024-01-05") == date(2024, 1, 5)
+    assert calendar.next_session("2024-01-05") == date(2024, 1, 8)
+    assert calendar.next_session(datetime(2024, 1, 6, 12)) == date(2024, 1, 8)
+    assert calendar.source == WEEKDAY_SOURCE
+
+
+def test_sessions_between_is_inclusive(tmp_path):
+    calendar = MarketCalendar(cache_file=str(tmp_path / "calendar.npz"))
+
+    assert calendar.sessions_between("2024-01-05", "2024-01-09") == [
+        date(2024, 1, 5),
+        date(2024, 1, 8),
+        date(2024, 1, 9),
+    ]
+    assert calendar.sessions_between("2024-01-06", "2024-01-07") == []
+
+
+def test_session_hours_and_market_open(tmp_path):
+    calendar = MarketCalendar(cache_file=str(tmp_path / "calendar.npz"))
+
+    # Regular hours in January are 14:30-21:00 UTC
+    open_, close = calendar.session_open_close("2024-01-05")
+    assert open_ == datetime(2024, 1, 5, 14, 30, tzinfo=timezone.utc)
+    assert close == datetime(2024, 1, 5, 21, 0, tzinfo=timezone.utc)
+    assert calendar.session_open_close("2024-01-06") is None
+
+    assert calendar.is_market_open(datetime(2024, 1, 5, 15, 0, tzinfo=timezone.utc))
+    assert not calendar.is_market_open(datetime(2024, 1, 5, 21, 0, tzinfo=timezone.utc))
+    assert calendar.is_market_open(datetime(2024, 1, 5, 10, 0))  # naive times are New York time
+    assert not calendar.is_market_open(datetime(2024, 1, 6, 15, 0, tzinfo=timezone.utc))
+
+
+def test_days_outside_the_table_raise(tmp_path):
+    calendar = MarketCalendar(years_back=0, years_forward=0, cache_file=str(tmp_path / "calendar.npz"))
+
+    with pytest.raises(ValueError):
+        calendar.previous_session("2000-01-03")
+
+
+def test_table_is_reused_from_the_cache_file(tmp_path, monkeypatch):
+    cache_file = str(tmp_path / "calendar.npz")
+    MarketCalendar(cache_file=cache_file).load()
+
+    def fail(*args):
+        raise AssertionError("session table rebuilt despite a valid cache")
+
+    monkeypatch.setattr(calendar_module, "_build_sessions", fail)
+    calendar = MarketCalendar(cache_file=cache_file)
+
+    assert calendar.previous_session("2024-01-08") == date(2024, 1, 5)
+    assert calendar.source == WEEKDAY_SOURCE
+
+
+def test_cache_from_another_source_is_rebuilt(tmp_path, monkeypatch):
+    cache_file = str(tmp_path / "calendar.npz")
+    MarketCalendar(cache_file=cache_file).load()
+
+    # The exchange calendar is now available, so the weekday table must not be reused
+    built = []
+
+    def build(start, end):
+        built.append((start, end))
+        sessions = np.array(["2024-01-05", "2024-01-09"], dtype="datetime64[D]")
+        return sessions, np.zeros(2, dtype=np.int64), np.zeros(2, dtype=np.int64), "exchange"
+
+    monkeypatch.setattr(calendar_module, "_calendar_source", lambda: "exchange")
+    monkeypatch.setattr(calendar_module, "_build_sessions", build)
+    calendar = MarketCalendar(cache_file=cache_file)
+
+    assert calendar.previous_session("2024-01-09") == date(2024, 1, 5)
+    assert len(built) == 1
+    assert calendar.source == "exchange"
+
+    # The rebuilt table replaced the cache
+    assert MarketCalendar(cache_file=cache_file).sessions_between("2024-01-01", "2024-01-31") == [
+        date(2024, 1, 5),
+        date(2024, 1, 9),
+    ]
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import time
+
+import pandas as pd
+from aiohttp import web
+
+from backend.scripts.replay_market_data import ReplayServer, random_walk, replay_file
+from backend.services import market_data_stream
+from backend.services.market_data_stream import LastTickTable, MarketDataStream
+
+
+async def serve(server: ReplayServer):
+    """Run the replay server on a free local port and return its runner and stream URL."""
+    app = web.Application()
+    app.router.add_get("/{path:.*}", server.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"ws://127.0.0.1:{port}/v2/iex"
+
+
+async def eventually(condition, timeout: float = 5.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met in time")
+
+
+def test_last_tick_table_prefers_fresh_trades():
+    table = LastTickTable(max_age_seconds=60)
+    table.update_trade("AAPL", 101.0, 10, None, received=0.0)
+    assert table.price("AAPL") is None
+
+    table.update_trade("AAPL", 102.0, 10, None, received=time.time())
+    assert table.price("AAPL") == 102.0
+    assert table.prices(["AAPL", "MSFT"]) == {"AAPL": 102.0}
+
+    frame = pd.DataFrame({"name": ["AAPL", "MSFT"], "close": [100.0, 300.0]})
+    assert table.overlay(frame, key="name", price_column="close")["close"].tolist() == [102.0, 300.0]
+    table.forget(["AAPL"])
+    assert table.price("AAPL") is None
+
+
+def test_stream_subscribes_and_receives_random_walk_trades(monkeypatch):
+    monkeypatch.setattr(market_data_stream, "STREAM_ENABLED", True)
+
+    async def run():
+        server = ReplayServer()
+        runner, url = await serve(server)
+        source = asyncio.create_task(random_walk(server, rate=50))
+        stream = MarketDataStream(url, api_key="key", api_secret="secret")
+        received = []
+        stream.add_listener(received.append)
+        try:
+            stream.set_watchlist("alerts", ["aapl", "msft"])
+            stream.start()
+            await eventually(lambda: stream.connected and server.subscribed() == {"AAPL", "MSFT"})
+
+            price = await stream.next_price("AAPL", timeout=2)
+            assert price is not None
+            await eventually(lambda: stream.table.price("MSFT") is not None)
+            assert set().union(*received) <= {"AAPL", "MSFT"}
+
+            # Dropping a symbol unsubscribes it and forgets its last tick
+            stream.set_watchlist("alerts", ["aapl"])
+            await eventually(lambda: server.subscribed() == {"AAPL"})
+            await eventually(lambda: stream.table.price("MSFT") is None)
+            assert stream.stats()["subscribed"] == 1
+        finally:
+            await stream.stop()
+            source.cancel()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_stream_applies_replayed_messages(tmp_path, monkeypatch):
+    monkeypatch.setattr(market_data_stream, "STREAM_ENABLED", True)
+    recording = tmp_path / "ticks.jsonl"
+    messages = [
+        {"T": "t", "S": "AAPL", "p": 100.0, "s": 5, "t": "2024-01-02T14:30:00Z"},
+        {"T": "q", "S": "AAPL", "bp": 99.9, "bs": 1, "ap": 100.1, "as": 2, "t": "2024-01-02T14:30:00Z"},
+        {"T": "t", "S": "TSLA", "p": 250.0, "s": 5, "t": "2024-01-02T14:30:01Z"},
+        {"T": "t", "S": "AAPL", "p": 100.5, "s": 5, "t": "2024-01-02T14:30:02Z"},
+    ]
+    recording.write_text("\n".join(json.dumps(message) for message in messages))
+
+    async def run():
+        server = ReplayServer()
+        runner, url = await serve(server)
+        stream = MarketDataStream(url, api_key="key", api_secret="secret")
+        frames = []
+        stream.add_listener(frames.append)
+        try:
+            stream.set_watchlist("strategy", ["AAPL"])
+            stream.start()
+            await eventually(lambda: server.subscribed() == {"AAPL"})
+
+            await replay_file(server, str(recording), speed=100, loop=False)
+            await eventually(lambda: len(frames) == 2)
+            assert frames == [{"AAPL": 100.0}, {"AAPL": 100.5}]
+            assert stream.table.price("AAPL") == 100.5
+            assert stream.table.get("AAPL")["bid"] == 99.9
+            assert stream.table.price("TSLA") is None
+            assert stream.stats()["quotes"] == 1
+        finally:
+            await stream.stop()
+            await runner.cleanup()
+
+    asyncio.run(run())
@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from backend.services.notification_service import (
+    NOTIFICATION_MESSAGE_TYPE,
+    NotificationDispatcher,
+    NotificationSender,
+    WebSocketSender,
+)
+
+
+class RecordingSender(NotificationSender):
+    """Records delivered batches; fails the first `failures` sends."""
+
+    name = "recording"
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.attempts = 0
+        self.batches = []
+
+    async def send(self, user_id, alerts):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise ConnectionError("channel down")
+        self.batches.append((user_id, [alert["id"] for alert in alerts]))
+
+
+class FakeHub:
+    def __init__(self, connections):
+        self.connections = connections
+        self.messages = []
+
+    def send_to_user(self, user_id, message):
+        self.messages.append((user_id, message))
+        return self.connections
+
+
+def alert(alert_id, user_id):
+    return {"id": alert_id, "user_id": user_id}
+
+
+def make_dispatcher(sender, **kwargs):
+    dispatcher = NotificationDispatcher(workers=1, coalesce_seconds=0.05, retry_base_seconds=0.001, **kwargs)
+    dispatcher.add_sender(sender)
+    return dispatcher
+
+
+def test_alerts_collected_together_are_sent_once_per_user():
+    sender = RecordingSender()
+
+    async def scenario():
+        dispatcher = make_dispatcher(sender)
+        dispatcher.start()
+        for alert_id, user_id in [(1, "a"), (2, "b"), (3, "a")]:
+            assert dispatcher.submit(alert(alert_id, user_id))
+        await dispatcher.stop()
+        return dispatcher.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert sorted(sender.batches) == [("a", [1, 3]), ("b", [2])]
+    assert stats["submitted"] == 3 and stats["batches"] == 1 and stats["workers"] == 0
+
+
+def test_failed_send_is_retried_with_backoff():
+    sender = RecordingSender(failures=2)
+
+    async def scenario():
+        dispatcher = make_dispatcher(sender, max_retries=3)
+        dispatcher.start()
+        dispatcher.submit(alert(1, "a"))
+        await dispatcher.stop()
+        return dispatcher.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert sender.batches == [("a", [1])]
+    assert stats["retries"] == 2 and stats["failed"] == 0
+
+
+def test_delivery_is_given_up_after_the_last_retry():
+    sender = RecordingSender(failures=10)
+
+    async def scenario():
+        dispatcher = make_dispatcher(sender, max_retries=2)
+        dispatcher.start()
+        dispatcher.submit(alert(1, "a"))
+        await dispatcher.stop()
+        return dispatcher.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert sender.attempts == 3
+    assert stats["retries"] == 2 and stats["failed"] == 1
+
+
+def test_submit_without_workers_or_room_is_dropped():
+    sender = RecordingSender()
+    dispatcher = make_dispatcher(sender, queue_size=1)
+    assert not dispatcher.submit(alert(1, "a"))
+
+    async def scenario():
+        dispatcher.start()
+        assert dispatcher.submit(alert(1, "a"))
+        # The worker has not run yet, so the queue is still full
+        assert not dispatcher.submit(alert(2, "a"))
+        await dispatcher.stop()
+
+    asyncio.run(scenario())
+
+    assert dispatcher.stats()["dropped"] == 1
+    assert sender.batches == [("a", [1])]
+
+
+def test_websocket_sender_pushes_one_message_per_batch():
+    hub = FakeHub(connections=2)
+
+    asyncio.run(WebSocketSender(hub).send("a", [alert(1, "a"), alert(2, "a")]))
+
+    [(user_id, message)] = hub.messages
+    assert user_id == "a"
+    assert message["type"] == NOTIFICATION_MESSAGE_TYPE
+    assert message["count"] == 2
+
+
+def test_websocket_sender_fails_when_no_connection_accepted_the_batch():
+    with pytest.raises(ConnectionError):
+        asyncio.run(WebSocketSender(FakeHub(connections=0)).send("a", [alert(1, "a")]))
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from backend.models.database import PriceHistory, Stock
+from backend.services.prev_day_levels import PrevDayLevels
+
+
+def add_bars(db, day, bars):
+    for name, (open_, high, low, close, volume) in bars.items():
+        stock = db.query(Stock).filter(Stock.name == name).first()
+        if stock is None:
+            stock = Stock(symbol=name, name=name)
+            db.add(stock)
+            db.flush()
+        db.add(
+            PriceHistory(
+                stock_id=stock.id, timeframe="1d", open=open_, high=high, low=low, close=close, volume=volume, date=day
+            )
+        )
+    db.commit()
+
+
+def test_levels_of_the_latest_stored_session(database):
+    add_bars(database, "2024/01/02", {"AAPL": (1, 2, 0.5, 1.5, 100), "MSFT": (3, 4, 2, 3.5, 200)})
+    add_bars(database, "2024/01/03", {"AAPL": (10, 12, 9, 11, 1000)})
+    levels = PrevDayLevels()
+
+    assert len(levels) == 1
+    assert levels.lookup("aapl") == {
+        "previous_day_open": 10.0,
+        "previous_day_high": 12.0,
+        "previous_day_low": 9.0,
+        "previous_day_close": 11.0,
+        "previous_day_volume": 1000,
+        "previous_day_date": "2024-01-03",
+    }
+    assert levels.lookup("MSFT") is None
+    assert levels.frame.loc["AAPL", "high"] == 12.0
+
+
+def test_join_adds_level_columns(database):
+    add_bars(database, "2024/01/03", {"AAPL": (10, 12, 9, 11, 1000), "MSFT": (3, 4, 2, 3.5, 200)})
+    levels = PrevDayLevels()
+    frame = pd.DataFrame({"name": ["MSFT", "TSLA", "AAPL"], "close": [5.0, 6.0, 13.0]})
+
+    joined = levels.join(frame)
+    assert "prev_day_high" not in frame
+    assert joined["prev_day_high"].tolist()[::2] == [4.0, 12.0]
+    assert np.isnan(joined["prev_day_high"].iloc[1])
+
+
+def test_reload_after_invalidate_picks_up_a_newer_session(database):
+    add_bars(database, "2024/01/02", {"AAPL": (1, 2, 0.5, 1.5, 100)})
+    levels = PrevDayLevels(recheck_seconds=3600)
+    assert levels.lookup("AAPL")["previous_day_high"] == 2.0
+
+    add_bars(database, "2024/01/03", {"AAPL": (10, 12, 9, 11, 1000)})
+    # Within the recheck interval the loaded table is kept
+    assert levels.lookup("AAPL")["previous_day_high"] == 2.0
+    assert levels.stats()["load_count"] == 1
+
+    levels.invalidate()
+    assert levels.lookup("AAPL")["previous_day_high"] == 12.0
+    assert levels.stats()["session_date"] == "2024/01/03"
+
+
+def test_empty_history(database):
+    levels = PrevDayLevels()
+    assert len(levels) == 0
+    assert levels.lookup("AAPL") is None
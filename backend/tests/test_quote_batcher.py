@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from backend.services.quote_batcher import QuoteBatcher
+
+
+def test_concurrent_lookups_share_chunked_requests():
+    calls = []
+
+    def fetch(symbols):
+        calls.append(list(symbols))
+        return {symbol: f"quote-{symbol}" for symbol in symbols}
+
+    async def run():
+        batcher = QuoteBatcher(fetch, window_seconds=0.01, max_symbols=2)
+        results = await asyncio.gather(*(batcher.get(symbol) for symbol in ["A", "B", "C", "A"]))
+        return batcher, results
+
+    batcher, results = asyncio.run(run())
+    assert results == ["quote-A", "quote-B", "quote-C", "quote-A"]
+    assert sorted(symbol for chunk in calls for symbol in chunk) == ["A", "B", "C"]
+    assert all(len(chunk) <= 2 for chunk in calls)
+    assert batcher.stats() == {"lookups": 4, "batches": 1, "requests": 2, "pending": 0}
+
+
+def test_missing_quotes_and_errors_reach_the_callers():
+    def fetch(symbols):
+        if "BAD" in symbols:
+            raise RuntimeError("provider down")
+        return {"A": 1.0}
+
+    async def run():
+        batcher = QuoteBatcher(fetch, window_seconds=0.01, max_symbols=1)
+        return await asyncio.gather(batcher.get("A"), batcher.get("B"), batcher.get("BAD"), return_exceptions=True)
+
+    found, missing, failed = asyncio.run(run())
+    assert found == 1.0
+    assert isinstance(missing, KeyError)
+    assert isinstance(failed, RuntimeError)
+
+
+def test_later_lookups_open_a_new_batch():
+    def fetch(symbols):
+        return {symbol: symbol.lower() for symbol in symbols}
+
+    async def run():
+        batcher = QuoteBatcher(fetch, window_seconds=0.01)
+        assert await batcher.get("A") == "a"
+        assert await batcher.get("B") == "b"
+        return batcher
+
+    assert asyncio.run(run()).stats()["batches"] == 2
+
+
+def test_cancelled_callers_are_skipped():
+    async def run():
+        batcher = QuoteBatcher(lambda symbols: {"A": 1}, window_seconds=0.01)
+        cancelled = asyncio.create_task(batcher.get("A"))
+        waiting = asyncio.create_task(batcher.get("A"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        assert await waiting == 1
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+    asyncio.run(run())
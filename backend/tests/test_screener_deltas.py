@@ -0,0 +1,77 @@
+from backend.services.screener_deltas import DELTA_MESSAGE_TYPE, SNAPSHOT_MESSAGE_TYPE, ScreenerDeltaPublisher
+
+
+def apply(rows, delta):
+    """Apply a delta to rows the way the dashboard does."""
+    by_symbol = {row["symbol"]: dict(row) for row in rows}
+    for symbol in delta["removed"]:
+        by_symbol.pop(symbol)
+    for change in delta["changed"]:
+        row = by_symbol[change["symbol"]]
+        for field, value in change.items():
+            if value is None:
+                row.pop(field, None)
+            else:
+                row[field] = value
+    for row in delta["added"]:
+        by_symbol[row["symbol"]] = dict(row)
+    return by_symbol
+
+
+def test_first_update_adds_every_row():
+    publisher = ScreenerDeltaPublisher()
+    delta = publisher.update("gappers", [{"symbol": "AAPL", "price": 1}, {"symbol": "MSFT", "price": 2}])
+
+    assert delta["type"] == DELTA_MESSAGE_TYPE
+    assert delta["screener"] == "gappers"
+    assert delta["seq"] == 1
+    assert delta["added"] == [{"symbol": "AAPL", "price": 1}, {"symbol": "MSFT", "price": 2}]
+    assert delta["removed"] == [] and delta["changed"] == []
+
+
+def test_delta_holds_added_removed_and_changed_fields_only():
+    publisher = ScreenerDeltaPublisher()
+    first = [{"symbol": "AAPL", "price": 1, "volume": 10, "note": "x"}, {"symbol": "MSFT", "price": 2, "volume": 20}]
+    second = [{"symbol": "AAPL", "price": 1.5, "volume": 10}, {"symbol": "TSLA", "price": 3, "volume": 30}]
+    publisher.update("gappers", first)
+    delta = publisher.update("gappers", second)
+
+    assert delta["seq"] == 2
+    assert delta["added"] == [{"symbol": "TSLA", "price": 3, "volume": 30}]
+    assert delta["removed"] == ["MSFT"]
+    assert delta["changed"] == [{"symbol": "AAPL", "price": 1.5, "note": None}]
+    assert apply(first, delta) == {row["symbol"]: row for row in second}
+
+
+def test_unchanged_result_publishes_nothing_and_keeps_the_sequence():
+    publisher = ScreenerDeltaPublisher()
+    rows = [{"symbol": "AAPL", "price": 1}, {"symbol": "AAPL", "price": 9}, {"price": 5}]
+    publisher.update("gappers", rows)
+
+    assert publisher.update("gappers", [{"symbol": "AAPL", "price": 1}]) is None
+    assert publisher.stats() == {"gappers": {"rows": 1, "seq": 1}}
+
+
+def test_sequences_are_per_screener():
+    publisher = ScreenerDeltaPublisher()
+    publisher.update("gappers", [{"symbol": "AAPL"}])
+    publisher.update("gappers", [])
+
+    assert publisher.update("losers", [{"symbol": "MSFT"}])["seq"] == 1
+    assert publisher.update("gappers", [{"symbol": "TSLA"}])["seq"] == 3
+
+
+def test_snapshot_matches_the_last_result_and_sequence():
+    publisher = ScreenerDeltaPublisher()
+    publisher.update("gappers", [{"symbol": "AAPL", "price": 1}])
+    publisher.update("gappers", [{"symbol": "MSFT", "price": 2}, {"symbol": "AAPL", "price": 1}])
+    publisher.update("losers", [{"symbol": "TSLA", "price": 3}])
+
+    snapshot = publisher.snapshot("gappers")
+    assert snapshot["type"] == SNAPSHOT_MESSAGE_TYPE
+    assert snapshot["seq"] == 2
+    assert snapshot["rows"] == [{"symbol": "MSFT", "price": 2}, {"symbol": "AAPL", "price": 1}]
+    assert publisher.snapshot("unknown") is None
+    assert [message["screener"] for message in publisher.snapshots()] == ["gappers", "losers"]
+    assert [message["screener"] for message in publisher.snapshots("losers")] == ["losers"]
+    assert publisher.snapshots("unknown") == []
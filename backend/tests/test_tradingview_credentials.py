@@ -0,0 +1,87 @@
+import json
+
+import pandas as pd
+import pytest
+import requests
+
+from backend.services.tradingview_credentials import (
+    SOURCE_ENV,
+    SOURCE_FILE,
+    TradingViewCredentialProvider,
+    get_cookies_from_file,
+)
+
+
+class FakeQuery:
+    """Scanner query failing with the given status codes before answering."""
+
+    def __init__(self, *failures):
+        self.failures = list(failures)
+        self.cookies = []
+
+    def get_scanner_data(self, cookies=None):
+        self.cookies.append(cookies)
+        if self.failures:
+            response = requests.Response()
+            response.status_code = self.failures.pop(0)
+            raise requests.HTTPError(response=response)
+        return 1, pd.DataFrame({"name": ["AAPL"]})
+
+
+@pytest.fixture
+def env_cookies(monkeypatch):
+    monkeypatch.setenv("TV_SESSIONID", "session")
+    monkeypatch.setenv("TV_SESSIONID_SIGN", "sign")
+
+
+def test_cookie_file_accepts_mapping_and_cookie_list(tmp_path):
+    mapping = tmp_path / "mapping.json"
+    mapping.write_text(json.dumps({"sessionid": "a"}))
+    exported = tmp_path / "exported.json"
+    exported.write_text(json.dumps([{"name": "sessionid", "value": "b", "domain": ".tradingview.com"}, {"x": 1}]))
+
+    assert get_cookies_from_file(str(mapping)) == {"sessionid": "a"}
+    assert get_cookies_from_file(str(exported)) == {"sessionid": "b"}
+    assert get_cookies_from_file(str(tmp_path / "missing.json")) == {}
+
+
+def test_auto_source_prefers_env_then_file(env_cookies, tmp_path, monkeypatch):
+    assert TradingViewCredentialProvider(source="auto")._resolve_source() == SOURCE_ENV
+    monkeypatch.delenv("TV_SESSIONID")
+    provider = TradingViewCredentialProvider(source="auto", cookies_file=str(tmp_path / "cookies.json"))
+    assert provider._resolve_source() == SOURCE_FILE
+
+
+def test_cookies_are_extracted_once_per_ttl(env_cookies):
+    provider = TradingViewCredentialProvider(source="env", ttl_seconds=60)
+    for _ in range(3):
+        assert provider.get_cookies() == {"sessionid": "session", "sessionid_sign": "sign"}
+    assert provider.stats()["extraction_count"] == 1
+    assert provider.stats()["cache_hit_count"] == 2
+
+    provider.invalidate()
+    provider.get_cookies()
+    assert provider.stats()["extraction_count"] == 2
+
+
+def test_scan_refreshes_cookies_once_on_auth_failure(env_cookies):
+    provider = TradingViewCredentialProvider(source="env", ttl_seconds=60)
+    query = FakeQuery(401)
+    total, df = provider.scan(query)
+
+    assert total == 1
+    assert len(query.cookies) == 2
+    assert provider.stats()["extraction_count"] == 2
+    assert provider.stats()["auth_failure_count"] == 1
+
+    with pytest.raises(requests.HTTPError):
+        provider.scan(FakeQuery(403, 403))
+
+
+def test_scan_does_not_retry_other_errors(env_cookies):
+    provider = TradingViewCredentialProvider(source="env")
+    query = FakeQuery(500)
+    with pytest.raises(requests.HTTPError):
+        provider.scan(query)
+    assert len(query.cookies) == 1
+    assert provider.stats()["auth_failure_count"] == 0
@@ -0,0 +1,74 @@
+import asyncio
+
+import pandas as pd
+from tradingview_screener import Query
+
+from backend.services.tradingview_paging import aiter_scan_pages, iter_scan_pages
+
+ROWS = pd.DataFrame({"name": [f"S{i}" for i in range(7)], "close": range(7)})
+
+
+class FakeScanner:
+    """Serves ROWS for the requested scanner range, recording each range."""
+
+    def __init__(self, rows=ROWS, total=None):
+        self.rows = rows
+        self.total = len(rows) if total is None else total
+        self.ranges = []
+
+    def scan(self, query):
+        start, end = query.query["range"]
+        self.ranges.append((start, end))
+        return self.total, self.rows.iloc[start:end].reset_index(drop=True)
+
+    async def ascan(self, query):
+        return self.scan(query)
+
+
+def test_pages_cover_every_row_in_order():
+    scanner = FakeScanner()
+    pages = list(iter_scan_pages(scanner.scan, Query(), page_size=3))
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert pd.concat(pages)["name"].tolist() == ROWS["name"].tolist()
+    assert scanner.ranges == [(0, 3), (3, 6), (6, 9)]
+
+
+def test_pages_are_requested_lazily():
+    scanner = FakeScanner()
+    pages = iter_scan_pages(scanner.scan, Query(), page_size=3)
+
+    assert scanner.ranges == []
+    next(pages)
+    assert scanner.ranges == [(0, 3)]
+
+
+def test_max_rows_clips_the_last_page():
+    scanner = FakeScanner()
+    pages = list(iter_scan_pages(scanner.scan, Query(), page_size=3, max_rows=5))
+
+    assert pd.concat(pages)["name"].tolist() == ["S0", "S1", "S2", "S3", "S4"]
+    assert scanner.ranges == [(0, 3), (3, 5)]
+
+
+def test_short_or_empty_page_stops_paging():
+    # The reported total is stale: a short page means the universe ended early
+    short = FakeScanner(total=100)
+    assert sum(len(page) for page in iter_scan_pages(short.scan, Query(), page_size=3)) == 7
+    assert short.ranges[-1] == (6, 9)
+
+    empty = FakeScanner(rows=ROWS.iloc[:6], total=100)
+    assert sum(len(page) for page in iter_scan_pages(empty.scan, Query(), page_size=3)) == 6
+    assert empty.ranges == [(0, 3), (3, 6), (6, 9)]
+
+
+def test_async_pages_match_sync_pages():
+    scanner = FakeScanner()
+
+    async def collect():
+        return [page async for page in aiter_scan_pages(scanner.ascan, Query(), page_size=3, max_rows=5)]
+
+    pages = asyncio.run(collect())
+
+    assert pd.concat(pages)["name"].tolist() == ["S0", "S1", "S2", "S3", "S4"]
+    assert scanner.ranges == [(0, 3), (3, 5)]
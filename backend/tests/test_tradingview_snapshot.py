@@ -0,0 +1,106 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from backend.services import tradingview_snapshot
+from backend.services.tradingview_snapshot import TradingViewSnapshot
+
+UNIVERSE = pd.DataFrame(
+    {
+        "ticker": ["NASDAQ:AAPL", "NASDAQ:MSFT", "NYSE:IBM", "NYSE:KO", "NASDAQ:TSLA"],
+        "name": ["AAPL", "MSFT", "IBM", "KO", "TSLA"],
+        "close": ["190.5", "410", "180", "60", None],
+        "volume": [1e6, 2e6, 3e5, 4e5, 5e6],
+        "active_symbol": [True, True, None, True, False],
+    }
+)
+
+
+class FakeScanner:
+    """Serves UNIVERSE page by page like the scanner endpoint, counting the requests."""
+
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+
+    def _page(self, query):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        start, end = query.query["range"]
+        return len(UNIVERSE), UNIVERSE.iloc[start:end].reset_index(drop=True)
+
+    def scan(self, query):
+        return self._page(query)
+
+    async def ascan(self, query):
+        await asyncio.sleep(0.01)
+        return self._page(query)
+
+
+class FakeAsyncClient:
+    def __init__(self, scanner):
+        self.scan = scanner.ascan
+
+
+def make_snapshot(page_size=2, ttl_seconds=60):
+    scanner = FakeScanner()
+    snapshot = TradingViewSnapshot(
+        scanner, ttl_seconds=ttl_seconds, page_size=page_size, async_client=FakeAsyncClient(scanner)
+    )
+    return snapshot, scanner
+
+
+def test_frame_is_fetched_across_pages_and_typed():
+    snapshot, scanner = make_snapshot(page_size=2)
+    frame = snapshot.get_frame()
+
+    assert scanner.calls == 3
+    assert frame["name"].tolist() == ["AAPL", "MSFT", "IBM", "KO", "TSLA"]
+    assert frame["close"].iloc[0] == 190.5
+    assert frame["close"].isna().iloc[-1]
+    assert frame["active_symbol"].tolist() == [True, True, False, True, False]
+
+
+def test_frame_is_served_from_cache_within_ttl():
+    snapshot, scanner = make_snapshot(page_size=10)
+    first = snapshot.get_frame()
+    assert snapshot.get_frame() is first
+    assert scanner.calls == 1
+    assert snapshot.stats()["hit_count"] == 1
+
+    snapshot.invalidate()
+    snapshot.get_frame()
+    assert scanner.calls == 2
+
+
+def test_failed_refresh_serves_stale_frame_and_backs_off(monkeypatch):
+    monkeypatch.setattr(tradingview_snapshot, "SNAPSHOT_RETRY_SECONDS", 60)
+    snapshot, scanner = make_snapshot(page_size=10, ttl_seconds=0)
+    stale = snapshot.get_frame()
+
+    scanner.error = RuntimeError("upstream down")
+    for _ in range(5):
+        assert snapshot.get_frame() is stale
+    # One upstream attempt for the whole retry window
+    assert scanner.calls == 2
+    assert snapshot.stats()["error_count"] == 1
+
+
+def test_failed_first_refresh_raises():
+    snapshot, scanner = make_snapshot()
+    scanner.error = RuntimeError("upstream down")
+    with pytest.raises(RuntimeError):
+        snapshot.get_frame()
+
+
+def test_concurrent_async_reads_share_one_refresh():
+    snapshot, scanner = make_snapshot(page_size=10)
+
+    async def run():
+        return await asyncio.gather(*(snapshot.aget_frame() for _ in range(10)))
+
+    frames = asyncio.run(run())
+    assert scanner.calls == 1
+    assert all(frame is frames[0] for frame in frames)
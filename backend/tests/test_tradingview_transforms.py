@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from backend.services import tradingview_transforms as tvx
+from backend.services.tradingview_service import format_market_cap, format_volume
+
+VOLUMES = [np.nan, 0, 999, 1_000, 12_345, 999_999, 1_000_000, 68_532_800, 2_500_000_000]
+
+
+def test_clean_numeric_coerces_and_fills():
+    df = pd.DataFrame({"close": ["1.5", "bad", None]})
+    tvx.clean_numeric(df, ["close", "volume"])
+    assert df["close"].tolist() == [1.5, 0.0, 0.0]
+    assert df["volume"].tolist() == [0.0, 0.0, 0.0]
+
+    kept = tvx.clean_numeric(pd.DataFrame({"close": ["2", None]}), ["close"], fill=None)
+    assert kept["close"].iloc[0] == 2.0
+    assert np.isnan(kept["close"].iloc[1])
+
+
+def test_fill_text_replaces_missing_values():
+    df = pd.DataFrame({"sector": ["Tech", None]})
+    assert tvx.fill_text(df, "sector", "N/A").tolist() == ["Tech", "N/A"]
+    assert tvx.fill_text(df, "industry", "Unknown").tolist() == ["Unknown", "Unknown"]
+
+
+def test_series_formatters_match_the_scalar_formatters():
+    volumes = pd.Series(VOLUMES)
+    assert tvx.format_volume_series(volumes).tolist() == [format_volume(volume) for volume in VOLUMES]
+
+    caps = [np.nan, 12.5, 1_234.5, 5_600_000, 2_100_000_000_000]
+    assert tvx.format_market_cap_series(pd.Series(caps)).tolist() == [format_market_cap(cap) for cap in caps]
+
+
+def test_short_volume_and_percent_formats():
+    assert tvx.format_volume_short(pd.Series([np.nan, 999, 12_345, 1_250_000])).tolist() == ["0", "999", "12K", "1.2M"]
+    assert tvx.format_percent_series(pd.Series([12.345, None])).tolist() == ["12.35%", "N/A"]
+    assert tvx.format_thousands_series(pd.Series([68_532_800, None])).tolist() == ["68,532,800", "N/A"]
+
+
+def test_parse_volume_series_reads_display_strings():
+    parsed = tvx.parse_volume_series(pd.Series(["1.2M", "345K", "68,532,800", "2B", "n/a", 500]))
+    assert parsed.tolist() == [1_200_000, 345_000, 68_532_800, 2_000_000_000, 0, 500]
+
+
+def test_to_records_returns_native_values():
+    df = pd.DataFrame({"name": ["AAPL"], "close": [np.float64(1.5)]})
+    records = tvx.to_records(df, {"symbol": "name", "price": "close", "label": pd.Series(["x"], index=df.index)})
+    assert records == [{"symbol": "AAPL", "price": 1.5, "label": "x"}]
+    assert tvx.to_records(df.iloc[:0], {"symbol": "name"}) == []
+
+
+def test_open_below_prev_high_screen():
+    stocks = pd.DataFrame(
+        {
+            "name": ["AAA", "BBB", "CCC", "DDD", None],
+            "open": [95.0, 99.0, 105.0, 50.0, 10.0],
+            "close": [96.0, 99.5, 106.0, 51.0, 10.0],
+            "change": [1.0, 0.5, 1.0, 2.0, 0.0],
+            "volume": [1e6] * 5,
+            "market_cap_basic": [1e9] * 5,
+        }
+    )
+    prev_day = pd.DataFrame({"high": [100.0, 100.0, 100.0, 100.0]}, index=["AAA", "BBB", "CCC", "DDD"])
+    screened = tvx.screen_open_below_prev_high(stocks, prev_day, 1, 1000, 0.5, 10, -5, 5)
+
+    # CCC opened above its high and DDD is 50% below it
+    assert screened["name"].tolist() == ["BBB", "AAA"]
+    assert screened["diff_percent"].round(2).tolist() == [1.0, 5.0]
+
+
+def test_cross_above_prev_high_screen():
+    stocks = pd.DataFrame({"name": ["AAA", "BBB", "CCC"], "close": [101.0, 99.0, 50.0], "change": [1.0] * 3})
+    prev_day = pd.DataFrame({"high": [100.0, 100.0]}, index=["AAA", "BBB"])
+    crossed = tvx.screen_cross_above_prev_high(stocks, prev_day)
+    assert crossed["name"].tolist() == ["AAA"]
+    assert crossed["percent_above_prev_high"].round(2).tolist() == [1.0]
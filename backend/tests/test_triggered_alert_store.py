@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from backend.models.database import Alert, Base, Stock, TriggeredAlert, User
+from backend.services import triggered_alert_store
+from backend.services.triggered_alert_store import TriggeredAlertStore
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    """SQLite stand-in for SessionLocal with foreign keys enforced (a file, so worker threads share it)."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'alerts.db'}")
+    event.listen(engine, "connect", lambda connection, _: connection.execute("PRAGMA foreign_keys=ON"))
+    tables = [User.__table__, Stock.__table__, Alert.__table__, TriggeredAlert.__table__]
+    Base.metadata.create_all(engine, tables=tables)
+    factory = sessionmaker(bind=engine)
+
+    db = factory()
+    db.add(User(id=1, username="trader", email="trader@example.com", password_hash="x"))
+    db.add_all([Alert(id=alert_id, user_id=1, alert_type="price_above", threshold_value=100.0) for alert_id in (1, 2)])
+    db.commit()
+    db.close()
+
+    monkeypatch.setattr(triggered_alert_store, "SessionLocal", factory)
+    return factory
+
+
+def alert_data(alert_id, user_id=1, symbol="AAPL"):
+    return {
+        "id": alert_id,
+        "user_id": user_id,
+        "stock_symbol": symbol,
+        "alert_type": "price_above",
+        "threshold_value": 100.0,
+        "current_value": 101.0,
+        "triggered_at": datetime(2024, 1, 2, 10, 0),
+    }
+
+
+def stored_alert_ids(factory):
+    db = factory()
+    try:
+        return sorted((row.alert_id or 0) for row in db.query(TriggeredAlert))
+    finally:
+        db.close()
+
+
+def test_ring_buffer_indexes_newest_first():
+    store = TriggeredAlertStore(capacity=3, spill_batch_size=100)
+    for alert_id, user_id, symbol in ((1, 1, "AAPL"), (2, 2, "MSFT"), (3, 1, "MSFT"), (4, 1, "TSLA")):
+        store.add(alert_data(alert_id, user_id, symbol))
+
+    assert len(store) == 3
+    assert [entry["id"] for entry in store.recent()] == [4, 3, 2]
+    assert [entry["id"] for entry in store.recent_for_user(1)] == [4, 3]
+    assert [entry["id"] for entry in store.recent_for_symbol("MSFT", limit=1)] == [3]
+    assert store.recent_for_symbol("AAPL") == []
+    assert store.stats()["pending"] == 1
+
+
+def test_evicted_entries_are_spilled(session_factory):
+    async def run():
+        store = TriggeredAlertStore(capacity=2, spill_batch_size=2)
+        for alert_id in (1, 2, 1, 2):
+            store.add(alert_data(alert_id))
+        await store.flush()
+        return store
+
+    store = asyncio.run(run())
+    assert stored_alert_ids(session_factory) == [1, 1, 2, 2]
+    assert store.spilled_count == 4
+    assert len(store) == 0
+
+
+def test_deleted_alerts_are_spilled_without_their_alert_id(session_factory):
+    async def run():
+        store = TriggeredAlertStore(capacity=10, spill_batch_size=10)
+        store.add(alert_data(1))
+        store.add(alert_data(99))
+        await store.flush()
+
+    asyncio.run(run())
+    assert stored_alert_ids(session_factory) == [0, 1]
+
+
+def test_failing_batch_is_requeued_then_dead_lettered(session_factory, monkeypatch):
+    monkeypatch.setattr(triggered_alert_store, "SPILL_MAX_RETRIES", 2)
+
+    async def run():
+        store = TriggeredAlertStore(capacity=10, spill_batch_size=10)
+        store.add(alert_data(1))
+        # Unknown user: the row violates its foreign key and fails the whole batch
+        store.add(alert_data(2, user_id=42))
+        store.add(alert_data(2))
+        store.clear()
+
+        for attempt in (1, 2):
+            await store.spill()
+            assert store.stats()["pending"] == 3
+            assert store._spill_failures == attempt
+        await store.spill()
+        return store
+
+    store = asyncio.run(run())
+    assert stored_alert_ids(session_factory) == [1, 2]
+    assert store.spilled_count == 2
+    assert store.dead_letter_count == 1
+    assert [entry["user_id"] for entry in store.dead_letters] == [42]
+    assert store.stats()["pending"] == 0
+
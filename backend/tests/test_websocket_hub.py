@@ -0,0 +1,293 @@
+import asyncio
+import json
+
+import pytest
+
+from backend.services.screener_deltas import SNAPSHOT_MESSAGE_TYPE, ScreenerDeltaPublisher
+from backend.services.websocket_hub import LAG_CLOSE_CODE, BroadcastHub
+
+
+class FakeWebSocket:
+    """Records sent text; `blocked` sockets never finish a send."""
+
+    def __init__(self, blocked=False):
+        self.sent = []
+        self.closed_with = None
+        self.blocked = blocked
+
+    async def send_text(self, text):
+        if self.blocked:
+            await asyncio.Event().wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def settle():
+    # Let writer and close tasks run (each send goes through wait_for, so give them a few loop passes)
+    for _ in range(50):
+        await asyncio.sleep(0)
+
+
+def resync():
+    return [{"type": "resync"}]
+
+
+def test_broadcast_is_encoded_once_and_reaches_every_client():
+    async def scenario():
+        encoded = []
+
+        def encoder(message):
+            encoded.append(message)
+            return json.dumps(message)
+
+        hub = BroadcastHub(encoder=encoder)
+        sockets = [FakeWebSocket(), FakeWebSocket()]
+        for websocket in sockets:
+            hub.register(websocket)
+
+        assert hub.broadcast({"type": "tick", "n": 1}) == 2
+        await settle()
+
+        assert len(encoded) == 1
+        assert [websocket.sent for websocket in sockets] == [[{"type": "tick", "n": 1}]] * 2
+        await hub.close()
+        assert [websocket.closed_with for websocket in sockets] == [1001, 1001]
+        assert len(hub) == 0
+
+    asyncio.run(scenario())
+
+
+def test_broadcast_without_clients_is_a_no_op():
+    assert BroadcastHub().broadcast({"type": "tick"}) == 0
+
+
+def test_lagging_client_is_resynced_without_delaying_others():
+    async def scenario():
+        hub = BroadcastHub(queue_size=2, lag_policy="resync", resync_messages=resync)
+        slow, fast = FakeWebSocket(blocked=True), FakeWebSocket()
+        slow_client = hub.register(slow)
+        hub.register(fast)
+        await settle()
+
+        # The slow writer holds message 0; 1 and 2 fill its queue, 3 overflows it
+        delivered = []
+        for n in range(4):
+            delivered.append(hub.broadcast({"type": "tick", "n": n}))
+            await settle()
+
+        assert delivered == [2, 2, 2, 1]
+        assert hub.resync_count == 1
+        assert slow_client.lag_count == 1
+        assert [json.loads(slow_client.queue.get_nowait())] == [{"type": "resync"}]
+        assert [message["n"] for message in fast.sent] == [0, 1, 2, 3]
+        assert len(hub) == 2
+        await hub.close()
+
+    asyncio.run(scenario())
+
+
+def test_lagging_client_is_dropped_with_the_drop_policy():
+    async def scenario():
+        hub = BroadcastHub(queue_size=1, lag_policy="drop")
+        slow = FakeWebSocket(blocked=True)
+        hub.register(slow)
+        await settle()
+
+        hub.broadcast({"n": 0})
+        await settle()
+        hub.broadcast({"n": 1})
+        hub.broadcast({"n": 2})
+        hub.broadcast({"n": 3})
+        await settle()
+
+        assert slow.closed_with == LAG_CLOSE_CODE
+        assert hub.drop_count == 1
+        assert len(hub) == 0
+        assert not hub._close_tasks
+
+    asyncio.run(scenario())
+
+
+def test_client_is_dropped_when_the_resync_does_not_fit_its_queue():
+    async def scenario():
+        hub = BroadcastHub(queue_size=1, lag_policy="resync", resync_messages=lambda: resync() * 2)
+        slow = FakeWebSocket(blocked=True)
+        hub.register(slow)
+        await settle()
+
+        hub.broadcast({"n": 0})
+        await settle()
+        hub.broadcast({"n": 1})
+        hub.broadcast({"n": 2})
+        await settle()
+
+        assert slow.closed_with == LAG_CLOSE_CODE
+        assert hub.drop_count == 1
+        assert len(hub) == 0
+
+    asyncio.run(scenario())
+
+
+def test_slow_send_times_out_and_drops_the_client():
+    async def scenario():
+        hub = BroadcastHub(send_timeout=0.01)
+        slow = FakeWebSocket(blocked=True)
+        hub.register(slow)
+
+        hub.broadcast({"n": 0})
+        await asyncio.sleep(0.05)
+
+        assert slow.closed_with == 1000
+        assert hub.drop_count == 1
+        assert len(hub) == 0
+
+    asyncio.run(scenario())
+
+
+def test_unknown_lag_policy_is_rejected():
+    with pytest.raises(ValueError):
+        BroadcastHub(lag_policy="ignore")
+
+
+ROWS = [{"symbol": "AAPL", "price": 1}, {"symbol": "MSFT", "price": 2}, {"symbol": "aapl", "price": 3}]
+
+
+def test_subscriptions_replace_the_default_topic_and_are_normalised():
+    async def scenario():
+        hub = BroadcastHub()
+        websocket = FakeWebSocket()
+        client = hub.register(websocket)
+        assert client.topics == {"*"}
+
+        topics = hub.subscribe(websocket, ["symbol: aapl ", "screener:gappers", "bogus", "symbol:"])
+        assert topics == ["screener:gappers", "symbol:AAPL"]
+        assert hub.unsubscribe(websocket, ["symbol:AAPL"]) == ["screener:gappers"]
+        assert hub.stats()["symbol_subscriptions"] == 0
+
+        hub.unregister(websocket)
+        assert hub.stats()["topics"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_publish_routes_rows_by_topic():
+    async def scenario():
+        encoded = []
+
+        def encoder(message):
+            encoded.append(message)
+            return json.dumps(message)
+
+        hub = BroadcastHub(encoder=encoder)
+        everything, screener, apple, apple_too, other = (FakeWebSocket() for _ in range(5))
+        for websocket in (everything, screener, apple, apple_too, other):
+            hub.register(websocket)
+        hub.subscribe(screener, ["screener:gappers"])
+        hub.subscribe(apple, ["symbol:AAPL"])
+        hub.subscribe(apple_too, ["symbol:AAPL"])
+        hub.subscribe(other, ["symbol:TSLA", "screener:losers"])
+
+        assert hub.publish("gappers", ROWS, timestamp="t") == 4
+        await settle()
+
+        assert everything.sent == [{"type": "gappers", "data": ROWS, "timestamp": "t"}]
+        assert screener.sent == everything.sent
+        assert apple.sent == [{"type": "gappers", "data": [ROWS[0], ROWS[2]], "timestamp": "t"}]
+        assert apple_too.sent == apple.sent
+        assert other.sent == []
+        # One encoding for the full event and one for the AAPL subset
+        assert len(encoded) == 2
+        await hub.close()
+
+    asyncio.run(scenario())
+
+
+def test_handle_message_applies_requests_and_acknowledges_them():
+    async def scenario():
+        hub = BroadcastHub()
+        websocket = FakeWebSocket()
+        hub.register(websocket)
+
+        hub.handle_message(websocket, "ping")
+        hub.handle_message(websocket, json.dumps({"action": "subscribe", "symbols": ["msft"], "topics": ["symbol:A"]}))
+        hub.handle_message(websocket, json.dumps({"action": "unsubscribe", "topics": ["symbol:A"]}))
+        hub.handle_message(websocket, json.dumps({"action": "shout"}))
+        await settle()
+
+        assert websocket.sent == [
+            {"type": "subscriptions", "topics": ["symbol:A", "symbol:MSFT"]},
+            {"type": "subscriptions", "topics": ["symbol:MSFT"]},
+        ]
+        assert hub.publish_message("symbol:MSFT", {"type": "note"}) == 1
+        assert hub.publish_message("symbol:A", {"type": "note"}) == 0
+        await hub.close()
+
+    asyncio.run(scenario())
+
+
+def test_topic_count_per_client_is_capped(monkeypatch):
+    monkeypatch.setattr("backend.services.websocket_hub.MAX_TOPICS_PER_CLIENT", 2)
+
+    async def scenario():
+        hub = BroadcastHub()
+        websocket = FakeWebSocket()
+        hub.register(websocket)
+
+        assert hub.subscribe(websocket, ["symbol:A", "symbol:B", "symbol:C"]) == ["symbol:A", "symbol:B"]
+        await hub.close()
+
+    asyncio.run(scenario())
+
+
+def snapshot_hub(**kwargs):
+    publisher = ScreenerDeltaPublisher()
+    publisher.update("gappers", [{"symbol": "AAPL", "price": 1}])
+    publisher.update("losers", [{"symbol": "MSFT", "price": 2}])
+    return BroadcastHub(snapshot_messages=publisher.snapshots, **kwargs)
+
+
+def screeners(messages):
+    return [message["screener"] for message in messages if message["type"] == SNAPSHOT_MESSAGE_TYPE]
+
+
+def test_snapshots_are_queued_on_connect_subscribe_and_resync_request():
+    async def scenario():
+        hub = snapshot_hub()
+        websocket = FakeWebSocket()
+        hub.register(websocket)
+        await settle()
+        assert screeners(websocket.sent) == ["gappers", "losers"]
+
+        websocket.sent.clear()
+        hub.handle_message(websocket, json.dumps({"action": "subscribe", "topics": ["screener:losers", "symbol:A"]}))
+        hub.handle_message(websocket, json.dumps({"action": "subscribe", "topics": ["screener:losers"]}))
+        await settle()
+        assert screeners(websocket.sent) == ["losers"]
+
+        websocket.sent.clear()
+        hub.handle_message(websocket, json.dumps({"action": "resync", "screener": "gappers"}))
+        await settle()
+        assert screeners(websocket.sent) == ["gappers"]
+        await hub.close()
+
+    asyncio.run(scenario())
+
+
+def test_resynced_client_gets_snapshots_of_its_screener_topics():
+    async def scenario():
+        hub = snapshot_hub(queue_size=3, resync_messages=resync)
+        slow = FakeWebSocket(blocked=True)
+        client = hub.register(slow)
+        hub.subscribe(slow, ["screener:losers"])
+        await settle()
+
+        for n in range(3):
+            hub.broadcast({"n": n})
+
+        queued = [json.loads(client.queue.get_nowait()) for _ in range(client.queue.qsize())]
+        assert queued[0] == {"type": "resync"}
+        assert screeners(queued) == ["losers"]
+
+    asyncio.run(scenario())